@@ -0,0 +1,250 @@
+"""
+Benchmark the API endpoints.
+
+The benchmark sends requests to a running server and reports latency percentiles, the
+mean number of SQL queries (as reported by the X-DB-Query-Count header) and the
+number of failed requests for the endpoints of every router. It should be run against
+a server using a database filled with the generate_sdb_data script, logging in as one
+of the generated users. For example:
+
+```shell
+python -m benchmarks.benchmark_endpoints --base-url http://localhost:8001 \
+    --username benchmark-1 --requests 200
+```
+
+Ids of proposals, blocks and block visits are discovered by means of the API, so that
+the benchmarked user has access to them. Endpoints which return files, as well as
+endpoints which change data, are not benchmarked.
+"""
+import argparse
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+from benchmarks.generate_sdb_data import BENCHMARK_PASSWORD
+from saltapi.middleware import QUERY_COUNT_HEADER
+
+
+@dataclass
+class Case:
+    """An endpoint request to benchmark."""
+
+    router: str
+    method: str
+    url: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    data: Optional[Dict[str, Any]] = None
+    authenticated: bool = True
+
+
+@dataclass
+class CaseResult:
+    """Durations (in seconds), query counts and failures for a benchmarked case."""
+
+    case: Case
+    durations: List[float] = field(default_factory=list)
+    query_counts: List[int] = field(default_factory=list)
+    failures: int = 0
+
+    def percentile(self, p: float) -> float:
+        """Return a percentile of the durations, in milliseconds."""
+        if not self.durations:
+            return float("nan")
+        if len(self.durations) == 1:
+            return 1000 * self.durations[0]
+        quantiles = statistics.quantiles(self.durations, n=100, method="inclusive")
+        return 1000 * quantiles[int(p) - 1]
+
+    @property
+    def mean_query_count(self) -> float:
+        if not self.query_counts:
+            return float("nan")
+        return statistics.mean(self.query_counts)
+
+
+def _get_json(client: httpx.Client, url: str, **params: Any) -> Any:
+    response = client.get(url, params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+def discover_ids(client: httpx.Client) -> Dict[str, Any]:
+    """
+    Find the ids of a proposal, block, block visit and user accessible to the user.
+    """
+    ids: Dict[str, Any] = {}
+    user = _get_json(client, "/user")
+    ids["user_id"] = user["id"]
+
+    proposals = _get_json(client, "/proposals/", limit=100)
+    if not proposals:
+        raise ValueError("The user may not view any proposals.")
+    ids["proposal_code"] = proposals[0]["proposal_code"]
+    for proposal_item in proposals:
+        proposal = _get_json(client, f"/proposals/{proposal_item['proposal_code']}")
+        for block_summary in proposal.get("blocks", []):
+            block = _get_json(client, f"/blocks/{block_summary['id']}")
+            if block["block_visits"]:
+                ids["proposal_code"] = proposal_item["proposal_code"]
+                ids["block_id"] = block["id"]
+                ids["block_visit_id"] = block["block_visits"][0]["id"]
+                return ids
+    raise ValueError("The user may not view any block visits.")
+
+
+def benchmark_cases(ids: Dict[str, Any], username: str, password: str) -> List[Case]:
+    """Return the cases to benchmark."""
+    proposal_code = ids["proposal_code"]
+    return [
+        Case(
+            "authentication",
+            "POST",
+            "/token",
+            data={"username": username, "password": password},
+            authenticated=False,
+        ),
+        Case("block_visits", "GET", f"/block-visits/{ids['block_visit_id']}"),
+        Case("blocks", "GET", f"/blocks/{ids['block_id']}"),
+        Case("blocks", "GET", f"/blocks/{ids['block_id']}/status"),
+        Case("institutions", "GET", "/institutions/"),
+        Case(
+            "instruments",
+            "GET",
+            "/rss/masks-in-magazine",
+            params={"mask-type": ["Longslit", "MOS"]},
+        ),
+        Case("pipt", "GET", "/pipt/news"),
+        Case("pipt", "GET", "/pipt/partners"),
+        Case("pipt", "GET", "/pipt/proposals", params={"phase": 2}),
+        Case("pipt", "GET", "/pipt/nirwals/flat-details"),
+        Case("proposal_progress", "GET", f"/progress/{proposal_code}/"),
+        Case("proposals", "GET", "/proposals/"),
+        Case("proposals", "GET", f"/proposals/{proposal_code}"),
+        Case("proposals", "GET", f"/proposals/{proposal_code}/status"),
+        Case("salt_astronomers", "GET", "/salt-astronomers/"),
+        Case("status", "GET", "/status", authenticated=False),
+        Case("user", "GET", "/user"),
+        Case("users", "GET", "/users/"),
+        Case("users", "GET", f"/users/{ids['user_id']}"),
+    ]
+
+
+def run_case(
+    client: httpx.Client, anonymous_client: httpx.Client, case: Case, requests: int
+) -> CaseResult:
+    """Send a number of requests for a case and record the results."""
+    result = CaseResult(case)
+    request_client = client if case.authenticated else anonymous_client
+    for _ in range(requests):
+        start = time.perf_counter()
+        try:
+            response = request_client.request(
+                case.method, case.url, params=case.params, data=case.data
+            )
+        except httpx.HTTPError:
+            result.failures += 1
+            continue
+        duration = time.perf_counter() - start
+        if response.status_code >= 400:
+            result.failures += 1
+            continue
+        result.durations.append(duration)
+        query_count = response.headers.get(QUERY_COUNT_HEADER)
+        if query_count is not None:
+            result.query_counts.append(int(query_count))
+    return result
+
+
+def print_results(results: Sequence[CaseResult]) -> None:
+    header = (
+        f"{'Router':<18} {'Endpoint':<45} {'p50 (ms)':>9} {'p90 (ms)':>9}"
+        f" {'p99 (ms)':>9} {'Queries':>8} {'Failed':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        endpoint = f"{result.case.method} {result.case.url}"
+        print(
+            f"{result.case.router:<18} {endpoint:<45.45}"
+            f" {result.percentile(50):>9.1f} {result.percentile(90):>9.1f}"
+            f" {result.percentile(99):>9.1f} {result.mean_query_count:>8.1f}"
+            f" {result.failures:>7}"
+        )
+
+
+def _parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the API endpoints.")
+    parser.add_argument(
+        "--base-url",
+        default="http://localhost:8001",
+        help="base URL of the API server (default: http://localhost:8001)",
+    )
+    parser.add_argument(
+        "--username",
+        default="benchmark-1",
+        help="username of the benchmarked user (default: benchmark-1)",
+    )
+    parser.add_argument(
+        "--password",
+        default=BENCHMARK_PASSWORD,
+        help=(
+            "password of the benchmarked user (default: the password of the"
+            " generated users)"
+        ),
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=100,
+        help="number of requests per endpoint (default: 100)",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=5,
+        help="number of unrecorded requests per endpoint (default: 5)",
+    )
+    parser.add_argument(
+        "--endpoint",
+        action="append",
+        default=[],
+        help=(
+            "only benchmark endpoints whose URL contains this string (can be repeated)"
+        ),
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = _parse_args(argv)
+    with httpx.Client(base_url=args.base_url, timeout=60) as anonymous_client:
+        response = anonymous_client.post(
+            "/token", data={"username": args.username, "password": args.password}
+        )
+        response.raise_for_status()
+        token = response.json()["access_token"]
+        with httpx.Client(
+            base_url=args.base_url,
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=60,
+        ) as client:
+            ids = discover_ids(client)
+            cases = benchmark_cases(ids, args.username, args.password)
+            if args.endpoint:
+                cases = [
+                    case
+                    for case in cases
+                    if any(endpoint in case.url for endpoint in args.endpoint)
+                ]
+            results = []
+            for case in cases:
+                run_case(client, anonymous_client, case, args.warmup)
+                results.append(run_case(client, anonymous_client, case, args.requests))
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ from fastapi.responses import JSONResponse, Response
 from jose import JWTError
 from loguru import logger
 from pydantic.error_wrappers import ValidationError as PydanticValidationError
+from sqlalchemy.exc import OperationalError
 from starlette.datastructures import URL
 
 from saltapi.exceptions import (
@@ -17,6 +18,7 @@ from saltapi.exceptions import (
     SSDAError,
     ValidationError,
 )
+from saltapi.repository.statement_timeout import ER_QUERY_TIMEOUT
 
 
 def log_message(method: str, url: Union[str, URL], message: Any) -> None:
@@ -142,3 +144,28 @@ def setup_exception_handler(app: FastAPI) -> None:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={"message": exc.message},
         )
+
+    @app.exception_handler(OperationalError)
+    async def operational_error_handler(
+        request: Request, exc: OperationalError
+    ) -> Response:
+        """Catch an SQLAlchemy OperationalError."""
+
+        log_message(request.method, request.url, exc)
+        error_code = exc.orig.args[0] if exc.orig and exc.orig.args else None
+        if error_code == ER_QUERY_TIMEOUT:
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={
+                    "message": (
+                        "The request took too long to process. Please try"
+                        " again later or request less data."
+                    )
+                },
+            )
+        return JSONResponse(
+            content={
+                "message": "Sorry, something has gone wrong. Please try again later."
+            },
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
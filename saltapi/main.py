@@ -4,7 +4,18 @@ from starlette.middleware.sessions import SessionMiddleware
 
 from saltapi.exceptions_handling import setup_exception_handler
 from saltapi.logging_config import setup_logging
+from saltapi.middleware import (
+    QUERY_COUNT_HEADER,
+    SERVER_TIMING_HEADER,
+    AdmissionControlMiddleware,
+    QueryStatisticsMiddleware,
+    RequestConnectionsMiddleware,
+    admission_controller,
+)
+from saltapi.service.proposal_search import proposal_search_index
+from saltapi.service.proposal_service import all_proposal_texts
 from saltapi.settings import get_settings
+from saltapi.util import NEXT_CURSOR_HEADER
 from saltapi.web.api.authentication import router as authentication_router
 from saltapi.web.api.block_visits import router as block_visits_router
 from saltapi.web.api.blocks import router as blocks_router
@@ -28,18 +39,34 @@ settings = get_settings()
 setup_logging(app)
 setup_exception_handler(app)
 
+# The admission control must be added before the CORS middleware, so that rejected
+# requests get the CORS headers. The statistics endpoints don't need the database and
+# are exempt, so that they remain available if the server is saturated.
+app.add_middleware(
+    AdmissionControlMiddleware,
+    exempt_paths=[
+        "/status/admission-control",
+        "/status/database-pool",
+        "/status/async-database-pool",
+        "/status/replica-database-pool",
+        "/status/repository-caches",
+    ],
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origin_regex=settings.allow_origin_regex,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[QUERY_COUNT_HEADER, SERVER_TIMING_HEADER, NEXT_CURSOR_HEADER],
 )
 app.add_middleware(
     SessionMiddleware,
     secret_key=settings.secret_key,
     max_age=3600 * settings.auth_token_lifetime_hours,
 )
+app.add_middleware(RequestConnectionsMiddleware)
+app.add_middleware(QueryStatisticsMiddleware)
 
 app.include_router(progress_router)
 app.include_router(blocks_router)
@@ -55,3 +82,14 @@ app.include_router(submissions_router)
 app.include_router(finder_charts_router)
 app.include_router(status_router)
 app.include_router(pipt_router)
+
+
+@app.on_event("startup")
+def limit_worker_threads() -> None:
+    admission_controller.limit_worker_threads()
+
+
+@app.on_event("startup")
+def warm_up_proposal_search_index() -> None:
+    # Loading the search index takes too long for a request.
+    proposal_search_index.warm_up(all_proposal_texts)
@@ -0,0 +1,341 @@
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+import anyio
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+from starlette import status
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from saltapi.repository.cache import stop_using_request_cache, use_request_cache
+from saltapi.repository.query_statistics import (
+    QueryStatistics,
+    collect_query_statistics,
+    stop_collecting_query_statistics,
+)
+from saltapi.repository.unit_of_work import (
+    RequestConnections,
+    stop_using_request_connections,
+    use_request_connections,
+)
+from saltapi.settings import get_settings
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+
+class QueryStatisticsMiddleware:
+    """
+    Middleware for recording the SQL statements executed for a request.
+
+    The number of statements is returned in the X-DB-Query-Count header, and their
+    total duration in the Server-Timing header. Statements executed after the response
+    has started (for example, by a background task) are not included.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        statistics = QueryStatistics(f"{scope['method']} {scope['path']}")
+
+        async def send_with_statistics(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(QUERY_COUNT_HEADER, str(statistics.count))
+                headers.append(
+                    SERVER_TIMING_HEADER,
+                    f'db;dur={1000 * statistics.duration:.1f};desc="SQL queries"',
+                )
+            await send(message)
+
+        token = collect_query_statistics(statistics)
+        try:
+            await self.app(scope, receive, send_with_statistics)
+        finally:
+            stop_collecting_query_statistics(token)
+
+
+class RequestConnectionsMiddleware:
+    """
+    Middleware for sharing database connections between the units of work of a
+    request.
+
+    Authentication, permission checks and the endpoint thus use the same connection,
+    which is only checked out if the database is actually queried. The connections are
+    returned to the pool once the response has been sent. Similarly, the results of
+    repository methods decorated with request_cached are memoised for the request.
+
+    Unless the KILL_QUERIES_ON_DISCONNECT setting is false, the middleware also
+    listens for the client disconnecting, and if it does, the SQL statements currently
+    executed for the request are killed. Otherwise, they would continue running and
+    tie up both the database and the connections. This only works once the endpoint
+    has read the request body (if there is one).
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        connections = RequestConnections()
+        token = use_request_connections(connections)
+        request_cache_token = use_request_cache()
+        try:
+            if get_settings().kill_queries_on_disconnect:
+                await self._call_killing_on_disconnect(
+                    connections, scope, receive, send
+                )
+            else:
+                await self.app(scope, receive, send)
+        finally:
+            stop_using_request_cache(request_cache_token)
+            stop_using_request_connections(token)
+            if connections.is_connected:
+                # Closing a connection involves a rollback, which must not block the
+                # event loop.
+                await run_in_threadpool(connections.close)
+                await connections.close_async()
+
+    async def _call_killing_on_disconnect(
+        self,
+        connections: RequestConnections,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        # The messages are received by a separate task, which passes them on to the
+        # app. A one-message buffer ensures that the request body is not read faster
+        # than the app consumes it.
+        send_stream: MemoryObjectSendStream[Message]
+        receive_stream: MemoryObjectReceiveStream[Message]
+        send_stream, receive_stream = anyio.create_memory_object_stream(1)
+
+        async def listen_for_disconnect() -> None:
+            async with send_stream:
+                while True:
+                    message = await receive()
+                    if message["type"] == "http.disconnect":
+                        await self._kill_executing_statements(connections)
+                        await send_stream.send(message)
+                        return
+                    await send_stream.send(message)
+
+        async def receive_message() -> Message:
+            return await receive_stream.receive()
+
+        # The app's exception is re-raised outside the task group, as otherwise it
+        # might be wrapped in an exception group.
+        app_error: Optional[Exception] = None
+        async with anyio.create_task_group() as task_group:
+            # AnyIO types the arguments with a TypeVarTuple, which mypy doesn't handle
+            # for functions without arguments.
+            task_group.start_soon(listen_for_disconnect)  # type: ignore[arg-type]
+            try:
+                await self.app(scope, receive_message, send)
+            except Exception as e:
+                app_error = e
+            finally:
+                task_group.cancel_scope.cancel()
+        if app_error is not None:
+            raise app_error
+
+    @staticmethod
+    async def _kill_executing_statements(connections: RequestConnections) -> None:
+        if not connections.executing_connection_ids():
+            return
+        try:
+            # The worker threads may all be busy waiting for the database, so the
+            # statements are killed in a thread which is not subject to the default
+            # thread limit.
+            await anyio.to_thread.run_sync(
+                # See the comment on start_soon above.
+                connections.kill_executing_statements,  # type: ignore[arg-type]
+                limiter=anyio.CapacityLimiter(1),
+            )
+            logging.warning("The SQL statements of a disconnected request were killed.")
+        except Exception as e:
+            logging.warning(f"The SQL statements of a request could not be killed: {e}")
+
+
+class AdmissionController:
+    """
+    Controller for limiting the number of requests handled concurrently.
+
+    Sync endpoints run in a threadpool whose size is unrelated to that of the SDB
+    connection pool. Under a burst of requests they would thus pile up waiting for a
+    database connection until the clients time out. Instead, only as many requests are
+    admitted as are defined by the MAX_CONCURRENT_REQUESTS setting, which by default is
+    the maximum number of connections the SDB connection pool may open. The
+    limit_worker_threads method aligns the threadpool with the connection pool.
+
+    Async endpoints use the async connection pool and don't need a worker thread, so
+    they are not subject to the admission control.
+
+    Other requests have to wait in a queue. If the queue is full (as defined by the
+    MAX_QUEUED_REQUESTS setting) or a request has been waiting for longer than allowed
+    by the MAX_QUEUE_WAIT setting, the request is rejected.
+
+    The controller keeps track of the number of admitted, queued and rejected requests.
+    """
+
+    def __init__(self) -> None:
+        self._limiter: Optional[anyio.CapacityLimiter] = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset the limiter and all the recorded statistics."""
+        self._limiter = None
+        self.queued = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.max_queue_depth = 0
+
+    @staticmethod
+    def max_concurrent_requests() -> int:
+        """Return the maximum number of requests which may be handled concurrently."""
+        settings = get_settings()
+        if settings.max_concurrent_requests:
+            return settings.max_concurrent_requests
+        return settings.sdb_pool_size + settings.sdb_max_overflow
+
+    @staticmethod
+    def limit_worker_threads() -> None:
+        """
+        Limit the number of worker threads to the size of the SDB connection pool.
+
+        The threadpool is shared by sync endpoints and sync dependencies, and by
+        default it has 40 threads, irrespective of the number of connections the pool
+        may open. This method must be called in the event loop, such as on startup.
+        """
+        settings = get_settings()
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        limiter.total_tokens = settings.sdb_pool_size + settings.sdb_max_overflow
+
+    @property
+    def limiter(self) -> anyio.CapacityLimiter:
+        # The limiter must be created in an event loop.
+        if self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(self.max_concurrent_requests())
+        return self._limiter
+
+    async def admit(self) -> Optional[object]:
+        """
+        Wait until a request may be handled.
+
+        If the request is admitted, a token is returned, which must be passed to the
+        release method once the request has been handled. None is returned if the
+        request is rejected.
+        """
+        settings = get_settings()
+        limiter = self.limiter
+        if (
+            limiter.available_tokens == 0
+            and self.queued >= settings.max_queued_requests
+        ):
+            self.rejected_queue_full += 1
+            return None
+
+        token = object()
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        try:
+            with anyio.move_on_after(settings.max_queue_wait):
+                await limiter.acquire_on_behalf_of(token)
+                self.admitted += 1
+                return token
+        finally:
+            self.queued -= 1
+
+        self.rejected_timeout += 1
+        return None
+
+    def release(self, token: object) -> None:
+        """Release an admitted request."""
+        self.limiter.release_on_behalf_of(token)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the current state of the controller and the recorded statistics."""
+        limiter = self.limiter
+        return {
+            "max_concurrent_requests": int(limiter.total_tokens),
+            "active_requests": limiter.borrowed_tokens,
+            "queue_depth": self.queued,
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
+
+
+admission_controller = AdmissionController()
+
+
+class AdmissionControlMiddleware:
+    """
+    Middleware for rejecting requests if the server is saturated.
+
+    A rejected request gets a 503 (Service Unavailable) response with a Retry-After
+    header. See the AdmissionController class for details. Requests for async
+    endpoints and for paths starting with one of the given exempt path prefixes are
+    never rejected.
+    """
+
+    def __init__(self, app: ASGIApp, exempt_paths: Iterable[str] = ()) -> None:
+        self.app = app
+        self.exempt_paths = tuple(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["path"].startswith(self.exempt_paths)
+            or self._is_async_endpoint(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        token = await admission_controller.admit()
+        if token is None:
+            response = JSONResponse(
+                content={
+                    "message": (
+                        "The server is too busy to handle the request. Please"
+                        " try again later."
+                    )
+                },
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={
+                    "Retry-After": str(get_settings().rejected_request_retry_after)
+                },
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission_controller.release(token)
+
+    @staticmethod
+    def _is_async_endpoint(scope: Scope) -> bool:
+        # The route is looked up in the same way as by the application's router.
+        router = getattr(scope.get("app"), "router", None)
+        for route in getattr(router, "routes", []):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                endpoint = getattr(route, "endpoint", None)
+                return asyncio.iscoroutinefunction(endpoint)
+        return False
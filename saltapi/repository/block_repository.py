@@ -4,12 +4,13 @@ from typing import Any, Dict, Iterable, List, Literal, Optional, cast, get_args
 
 import pytz
 from astropy.coordinates import Angle
-from sqlalchemy import text
 from sqlalchemy.engine import Connection
 from sqlalchemy.exc import IntegrityError, NoResultFound
 
 from saltapi.exceptions import NotFoundError
 from saltapi.repository.instrument_repository import InstrumentRepository
+from saltapi.repository.lookup_tables import LookupTable
+from saltapi.repository.statements import StatementRegistry
 from saltapi.repository.target_repository import TargetRepository
 from saltapi.service.block import Block
 from saltapi.settings import get_settings
@@ -22,30 +23,27 @@ TECHNICAL_PROBLEMS = {
     BlockRejectionReason.TELESCOPE_TECHNICAL_PROBLEMS,
 }
 
+_block_visit_statuses = LookupTable(
+    "block_visit_statuses",
+    """
+SELECT BlockVisitStatus AS value, BlockVisitStatus_Id AS id
+FROM BlockVisitStatus
+    """,
+)
 
-class BlockRepository:
-    def __init__(
-        self,
-        connection: Connection,
-    ) -> None:
-        self.target_repository = TargetRepository(connection)
-        self.instrument_repository = InstrumentRepository(connection)
-        self.connection = connection
-
-    def get(self, block_id: int) -> Block:
-        """
-        Return the block content for a block id.
-        """
+_block_rejection_reasons = LookupTable(
+    "block_rejection_reasons",
+    """
+SELECT RejectedReason AS value, BlockRejectedReason_Id AS id
+FROM BlockRejectedReason
+    """,
+)
 
-        # Avoid blocks with subblocks or subsubblocks.
-        if self._has_subblock_or_subsubblock_iterations(block_id):
-            error = (
-                "Blocks which have subblock or subsubblock iterations are not supported"
-            )
-            raise ValueError(error)
+_statements = StatementRegistry()
 
-        stmt = text(
-            """
+_statements.register(
+    "block",
+    """
 SELECT B.Block_Id                      AS block_id,
        BC.BlockCode                    AS code,
        B.Block_Name                    AS name,
@@ -85,9 +83,423 @@ FROM Block B
          LEFT JOIN BlockProbabilities BP ON B.Block_Id = BP.Block_Id
          LEFT JOIN BlockCode BC ON B.BlockCode_Id = BC.BlockCode_Id
 WHERE B.Block_Id = :block_id;
+    """,
+)
+
+_statements.register(
+    "block_status",
+    """
+SELECT BS.BlockStatus AS value, B.BlockStatusReason AS reason
+FROM BlockStatus BS
+         JOIN Block B ON BS.BlockStatus_Id = B.BlockStatus_Id
+WHERE B.Block_Id = :block_id
+    """,
+)
+
+_statements.register(
+    "update_block_status",
+    """
+UPDATE Block B
+SET B.BlockStatus_Id = (SELECT BS.BlockStatus_Id
+                        FROM BlockStatus BS
+                        WHERE BS.BlockStatus = :status),
+    B.BlockStatusReason = :reason
+WHERE B.Block_Id = :block_id;
+    """,
+)
+
+_statements.register(
+    "proposal_code_for_block_id",
+    """
+SELECT PC.Proposal_code
+FROM ProposalCode PC
+         JOIN Block B ON PC.ProposalCode_Id = B.ProposalCode_Id
+WHERE B.Block_Id = :block_id;
+    """,
+)
+
+_statements.register(
+    "block_visit",
+    """
+SELECT BV.BlockVisit_Id     AS id,
+       NI.Date              AS night,
+       BVS.BlockVisitStatus AS status,
+       BRR.RejectedReason   AS rejection_reason
+FROM BlockVisit BV
+    LEFT JOIN BlockRejectedReason BRR
+                   ON BV.BlockRejectedReason_Id = BRR.BlockRejectedReason_Id
+    JOIN NightInfo NI ON BV.NightInfo_Id = NI.NightInfo_Id
+    JOIN BlockVisitStatus BVS ON BV.BlockVisitStatus_Id = BVS.BlockVisitStatus_Id
+WHERE BV.BlockVisit_Id = :block_visit_id
+  AND BVS.BlockVisitStatus NOT IN ('Deleted');
+    """,
+)
+
+_statements.register(
+    "observation_time",
+    """
+SELECT B.ObsTime  AS obs_time 
+FROM Block B 
+    JOIN BlockVisit BV ON B.Block_Id=BV.Block_Id 
+WHERE BlockVisit_Id=:block_visit_id
+    """,
+)
+
+_statements.register(
+    "night_info_id_for_block_visit",
+    """
+SELECT NightInfo_Id AS night_info_id FROM BlockVisit WHERE BlockVisit_Id=:block_visit_id
+    """,
+)
+
+_statements.register(
+    "night_info_times",
+    """
+SELECT 
+    ScienceTime         AS science_time, 
+    TimeLostToWeather   AS time_lost_to_weather, 
+    TimeLostToProblems  AS time_lost_to_problems
+FROM NightInfo
+WHERE NightInfo_Id=:night_info_id
+    """,
+)
+
+_statements.register(
+    "update_night_info_times",
+    """
+UPDATE NightInfo
+SET
+    ScienceTime=:science_time,
+    TimeLostToWeather=:time_lost_to_weather,
+    TimeLostToProblems=:time_lost_to_problems
+WHERE NightInfo_Id=:night_info_id
+    """,
+)
+
+_statements.register(
+    "update_block_visits_and_status",
+    """
+UPDATE Block B
+SET B.NDone = :n_done, 
+    B.NAttempted = :n_attempted,
+    B.BlockStatus_Id = (SELECT BS.BlockStatus_Id
+                        FROM BlockStatus BS
+                        WHERE BS.BlockStatus = :status)
+WHERE B.Block_Id = :block_id
+    """,
+)
+
+# The latest block with the same semester and block code as a block visit
+_statements.register(
+    "latest_block",
+    """
+SELECT
+    B.Block_Id AS block_id,
+    B.NDone AS n_done,
+    B.NVisits AS n_visits,
+    B.NAttempted AS n_attempted,
+    BS.BlockStatus AS block_status
+FROM Block AS B
+         JOIN Proposal AS P ON B.Proposal_Id = P.Proposal_Id
+    JOIN BlockStatus AS BS ON BS.BlockStatus_Id = B.BlockStatus_Id
+WHERE P.Semester_Id = (
+    SELECT P1.Semester_Id
+    FROM Proposal AS P1
+             JOIN Block AS B1 ON P1.Proposal_Id = B1.Proposal_Id
+             JOIN BlockVisit AS BV1 ON B1.Block_Id = BV1.Block_Id
+    WHERE BV1.BlockVisit_Id = :block_visit_id
+)
+  AND B.BlockCode_Id = (
+    SELECT B2.BlockCode_Id
+    FROM Block AS B2
+             JOIN BlockVisit AS BV2 USING (Block_Id)
+    WHERE BV2.BlockVisit_Id = :block_visit_id
+)
+ORDER BY B.Block_Id DESC
+    LIMIT 1
+    """,
+)
+
+_statements.register(
+    "update_block_visit_status",
+    """
+UPDATE BlockVisit BV
+SET BV.BlockVisitStatus_Id = :block_visit_status_id,
+    BV.BlockRejectedReason_Id = :block_rejected_reason_id
+WHERE BV.BlockVisit_Id = :block_visit_id
+AND BV.BlockVisitStatus_Id NOT IN (SELECT BVS2.BlockVisitStatus_Id
+                                    FROM BlockVisitStatus AS BVS2
+                                    WHERE BVS2.BlockVisitStatus = 'Deleted');
+    """,
+)
+
+_statements.register(
+    "block_visit_exists",
+    """
+SELECT COUNT(*) FROM BlockVisit WHERE BlockVisit_Id = :block_visit_id
+    """,
+)
+
+_statements.register(
+    "proposal_code_for_block_visit_id",
+    """
+SELECT PC.Proposal_code
+FROM ProposalCode PC
+         JOIN Block B ON PC.ProposalCode_Id = B.ProposalCode_Id
+         JOIN BlockVisit BV ON BV.Block_Id = B.Block_Id
+         JOIN BlockVisitStatus BVS ON BV.BlockVisitStatus_Id = BVS.BlockVisitStatus_Id
+WHERE BV.BlockVisit_Id = :block_visit_id
+  AND BVS.BlockVisitStatus NOT IN ('Deleted');
+    """,
+)
+
+_statements.register(
+    "block_visits",
+    """
+SELECT BV.BlockVisit_Id     AS id,
+       NI.Date              AS night,
+       BVS.BlockVisitStatus AS status,
+       BRR.RejectedReason   AS rejection_reason
+FROM BlockVisit BV
+         JOIN BlockVisitStatus BVS ON BV.BlockVisitStatus_Id = BVS.BlockVisitStatus_Id
+         LEFT JOIN BlockRejectedReason BRR
+                   ON BV.BlockRejectedReason_Id = BRR.BlockRejectedReason_Id
+         JOIN NightInfo NI ON BV.NightInfo_Id = NI.NightInfo_Id
+         JOIN Block B ON BV.Block_Id IN (
+    SELECT B1.Block_Id
+    FROM Block B1
+    WHERE B1.BlockCode_Id = B.BlockCode_Id
+)
+WHERE B.Block_Id = :block_id
+  AND BVS.BlockVisitStatus IN ('Accepted', 'Rejected');
+    """,
+)
+
+_statements.register(
+    "observing_windows",
+    """
+SELECT BVW.VisibilityStart AS start, BVW.VisibilityEnd AS end
+FROM BlockVisibilityWindow BVW
+WHERE BVW.Block_Id = :block_id
+ORDER BY BVW.VisibilityStart;
+    """,
+)
+
+_statements.register(
+    "finder_charts",
+    """
+SELECT FC.FindingChart_Id AS finding_chart_id,
+       FC.Comments        AS comments,
+       FC.ValidFrom       AS valid_from,
+       FC.ValidUntil      AS valid_until,
+       FC.Path            AS path
+FROM FindingChart FC
+WHERE FC.Pointing_Id = :pointing_id
+ORDER BY ValidFrom, FindingChart_Id
+    """,
+)
+
+_statements.register(
+    "time_restrictions",
+    """
+SELECT DISTINCT TR.ObsWindowStart AS start, TR.ObsWindowEnd AS end
+FROM TimeRestricted TR
+         JOIN Pointing P ON TR.Pointing_Id = P.Pointing_Id
+WHERE P.Pointing_Id = :pointing_id
+ORDER BY TR.ObsWindowStart;
+    """,
+)
+
+_statements.register(
+    "phase_constraints",
+    """
+SELECT PC.PhaseStart AS start, PC.PhaseEnd AS end
+FROM PhaseConstraint PC
+WHERE PC.Pointing_Id = :pointing_id
+ORDER BY PC.PhaseStart;
+    """,
+)
+
+_statements.register(
+    "pointings",
+    """
+SELECT P.Pointing_Id                                                  AS pointing_id,
+       P.ObsTime                                                      AS observation_time,
+       P.OverheadTime                                                 AS overhead_time,
+       TCOC.Observation_Order                                         AS observation_order,
+       TCOC.TelescopeConfig_Order                                     AS telescope_config_order,
+       TCOC.PlannedObsConfig_Order                                    AS planned_obsconfig_order,
+       O.Target_Id                                                    AS target_id,
+       TC.PositionAngle                                               AS position_angle,
+       TC.FixedAngle                                                  AS fixed_angle,
+       TC.UseParallacticAngle                                         AS use_parallactic_angle,
+       TC.Iterations                                                  AS tc_iterations,
+       DP.DitherPatternDescription                                    AS dp_description,
+       DP.NHorizontalTiles                                            AS dp_horizontal_tiles,
+       DP.NVerticalTiles                                              AS dp_vertical_tiles,
+       DP.Offsetsize                                                  AS dp_offset_size,
+       DP.NSteps                                                      AS dp_steps,
+       CONCAT(GS.RaH, ':', GS.RaM, ':', GS.RaS / 1000)                AS gs_ra,
+       CONCAT(GS.DecSign, GS.DecD, ':', GS.DecM, ':', GS.DecS / 1000) AS gs_dec,
+       GS.Equinox                                                     AS gs_equinox,
+       GS.Mag                                                         AS gs_magnitude,
+       L.Lamp                                                         AS pc_lamp,
+       CF.CalFilter                                                   AS pc_calibration_filter,
+       GM.GuideMethod                                                 AS pc_guide_method,
+       PCT.Type                                                       AS pc_type,
+       PC.CalScreenIn                                                 AS pc_calibration_screen_in,
+       OC.SalticamPattern_Id                                          AS salticam_pattern_id,
+       OC.RssPattern_Id                                               AS rss_pattern_id,
+       OC.HrsPattern_Id                                               AS hrs_pattern_id,
+       OC.BvitPattern_Id                                              AS bvit_pattern_id,
+       OC.NirPattern_Id                                               AS nir_pattern_id
+FROM TelescopeConfigObsConfig TCOC
+         JOIN Pointing P ON TCOC.Pointing_Id = P.Pointing_Id
+         JOIN Block B ON P.Block_Id = B.Block_Id
+         JOIN TelescopeConfig TC ON TCOC.Pointing_Id = TC.Pointing_Id AND
+                                    TCOC.Observation_Order = TC.Observation_Order AND
+                                    TCOC.TelescopeConfig_Order =
+                                    TC.TelescopeConfig_Order
+         LEFT JOIN DitherPattern DP ON TC.DitherPattern_Id = DP.DitherPattern_Id
+         LEFT JOIN GuideStar GS ON TC.GuideStar_Id = GS.GuideStar_Id
+         JOIN Observation O ON TCOC.Pointing_Id = O.Pointing_Id AND
+                               TCOC.Observation_Order = O.Observation_Order
+         JOIN Target T ON O.Target_Id = T.Target_Id
+         JOIN ObsConfig OC ON TCOC.PlannedObsConfig_Id = OC.ObsConfig_Id
+         JOIN PayloadConfig PC ON OC.PayloadConfig_Id = PC.PayloadConfig_Id
+         LEFT JOIN Lamp L ON PC.Lamp_Id = L.Lamp_Id
+         LEFT JOIN CalFilter CF ON PC.CalFilter_Id = CF.CalFilter_Id
+         LEFT JOIN GuideMethod GM ON PC.GuideMethod_Id = GM.GuideMethod_Id
+         LEFT JOIN PayloadConfigType PCT
+                   ON PC.PayloadConfigType_Id = PCT.PayloadConfigType_Id
+WHERE B.Block_Id = :block_id
+ORDER BY TCOC.Pointing_Id, TCOC.Observation_Order, TCOC.TelescopeConfig_Order,
+         TCOC.PlannedObsConfig_Order;
+    """,
+)
+
+_statements.register(
+    "salticam_setups",
+    """
+SELECT S.Salticam_Id AS salticam_id
+FROM Salticam S
+         JOIN SalticamPatternDetail SPD ON S.Salticam_Id = SPD.Salticam_Id
+WHERE SPD.SalticamPattern_Id = :salticam_pattern_id
+ORDER BY SPD.SalticamPattern_Order
+    """,
+)
+
+_statements.register(
+    "rss_setups",
+    """
+SELECT R.Rss_Id AS rss_id
+FROM Rss R
+         JOIN RssPatternDetail RPD ON R.Rss_Id = RPD.Rss_Id
+WHERE RPD.RssPattern_Id = :rss_pattern_id
+ORDER BY RPD.RssPattern_Order
+    """,
+)
+
+_statements.register(
+    "hrs_setups",
+    """
+SELECT H.Hrs_Id AS hrs_id
+FROM Hrs H
+         JOIN HrsPatternDetail HPD ON H.Hrs_Id = HPD.Hrs_Id
+WHERE HPD.HrsPattern_Id = :hrs_pattern_id
+ORDER BY HPD.HrsPattern_Order
+    """,
+)
+
+_statements.register(
+    "bvit_setups",
+    """
+SELECT B.Bvit_Id AS bvit_id
+FROM Bvit B
+         JOIN BvitPatternDetail BPD ON B.Bvit_Id = BPD.Bvit_Id
+WHERE BPD.BvitPattern_Id = :bvit_pattern_id
+ORDER BY BPD.BvitPattern_Order
+    """,
+)
+
+_statements.register(
+    "nir_setups",
+    """
+SELECT N.Nir_Id AS nir_id
+FROM Nir N
+         JOIN NirPatternDetail NPD ON N.Nir_Id = NPD.Nir_Id
+WHERE NPD.NirPattern_Id = :nir_pattern_id
+ORDER BY NPD.NirPattern_Order
+    """,
+)
+
+_statements.register(
+    "has_subblock_or_subsubblock_iterations",
+    """
+SELECT COUNT(*) AS c
+FROM Pointing P
+         JOIN SubBlock SB ON P.Block_Id = SB.Block_Id
+         JOIN SubSubBlock SSB
+              ON P.Block_Id = SSB.Block_Id AND P.SubBlock_Order = SSB.SubBlock_Order AND
+                 P.SubSubBlock_Order = SSB.SubSubBlock_Order
+         JOIN Block B ON P.Block_Id = B.Block_Id
+WHERE B.Block_Id = :block_id
+  AND (SB.Iterations > 1 OR SSB.Iterations > 1)
+    """,
+)
+
+_statements.register(
+    "has_multiple_observations",
+    """
+SELECT COUNT(DISTINCT Observation_Order) AS c
+FROM TelescopeConfigObsConfig TCOC
+WHERE TCOC.Pointing_Id = :pointing_id
+    """,
+)
+
+_statements.register(
+    "scheduled_block_id",
+    """
+SELECT Block_Id FROM schedule
+    """,
+)
+
+_statements.register(
+    "proposal_codes_for_block_visits",
+    """
+SELECT DISTINCT PC.Proposal_code
+FROM ProposalCode PC
+         JOIN Block B ON PC.ProposalCode_Id = B.ProposalCode_Id
+         JOIN BlockVisit BV ON BV.Block_Id = B.Block_Id
+         JOIN BlockVisitStatus BVS ON BV.BlockVisitStatus_Id = BVS.BlockVisitStatus_Id
+WHERE BV.BlockVisit_Id IN :block_visit_ids
+  AND BVS.BlockVisitStatus NOT IN ('Deleted');
+    """,
+)
+
+
+class BlockRepository:
+    def __init__(
+        self,
+        connection: Connection,
+    ) -> None:
+        self.target_repository = TargetRepository(connection)
+        self.instrument_repository = InstrumentRepository(connection)
+        self.connection = connection
+
+    def get(self, block_id: int) -> Block:
+        """
+        Return the block content for a block id.
         """
-        )
-        result = self.connection.execute(stmt, {"block_id": block_id})
+
+        # Avoid blocks with subblocks or subsubblocks.
+        if self._has_subblock_or_subsubblock_iterations(block_id):
+            error = (
+                "Blocks which have subblock or subsubblock iterations are not supported"
+            )
+            raise ValueError(error)
+
+        result = self.connection.execute(_statements["block"], {"block_id": block_id})
 
         row = result.one()
 
@@ -145,17 +557,10 @@ WHERE B.Block_Id = :block_id;
         """
         Return the block status for a block id.
         """
-        stmt = text(
-            """
-SELECT BS.BlockStatus AS value, B.BlockStatusReason AS reason
-FROM BlockStatus BS
-         JOIN Block B ON BS.BlockStatus_Id = B.BlockStatus_Id
-WHERE B.Block_Id = :block_id
-        """
+        result = self.connection.execute(
+            _statements["block_status"], {"block_id": block_id}
         )
 
-        result = self.connection.execute(stmt, {"block_id": block_id})
-
         row = result.one()
 
         value = row.value
@@ -170,22 +575,13 @@ WHERE B.Block_Id = :block_id
     ) -> None:
         """
         Update the status of a block.
-        """
-        if value == "On hold":
-            value = "On Hold"
-        stmt = text(
-            """
-UPDATE Block B
-SET B.BlockStatus_Id = (SELECT BS.BlockStatus_Id
-                        FROM BlockStatus BS
-                        WHERE BS.BlockStatus = :status),
-    B.BlockStatusReason = :reason
-WHERE B.Block_Id = :block_id;
-    """
-        )
+        """
+        if value == "On hold":
+            value = "On Hold"
         try:
             result = self.connection.execute(
-                stmt, {"block_id": block_id, "status": value, "reason": reason}
+                _statements["update_block_status"],
+                {"block_id": block_id, "status": value, "reason": reason},
             )
         except IntegrityError:
             raise ValueError("Unknown block status")
@@ -196,16 +592,8 @@ WHERE B.Block_Id = :block_id;
         """
         Return proposal code for a block id:
         """
-        stmt = text(
-            """
-SELECT PC.Proposal_code
-FROM ProposalCode PC
-         JOIN Block B ON PC.ProposalCode_Id = B.ProposalCode_Id
-WHERE B.Block_Id = :block_id;
-    """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["proposal_code_for_block_id"],
             {"block_id": block_id},
         )
 
@@ -218,23 +606,10 @@ WHERE B.Block_Id = :block_id;
         """
         Return the block visits for a block visit id.
         """
-        stmt = text(
-            """
-SELECT BV.BlockVisit_Id     AS id,
-       NI.Date              AS night,
-       BVS.BlockVisitStatus AS status,
-       BRR.RejectedReason   AS rejection_reason
-FROM BlockVisit BV
-    LEFT JOIN BlockRejectedReason BRR
-                   ON BV.BlockRejectedReason_Id = BRR.BlockRejectedReason_Id
-    JOIN NightInfo NI ON BV.NightInfo_Id = NI.NightInfo_Id
-    JOIN BlockVisitStatus BVS ON BV.BlockVisitStatus_Id = BVS.BlockVisitStatus_Id
-WHERE BV.BlockVisit_Id = :block_visit_id
-  AND BVS.BlockVisitStatus NOT IN ('Deleted');
-        """
-        )
         try:
-            result = self.connection.execute(stmt, {"block_visit_id": block_visit_id})
+            result = self.connection.execute(
+                _statements["block_visit"], {"block_visit_id": block_visit_id}
+            )
             row = result.one()
             return {
                 "id": row.id,
@@ -265,14 +640,10 @@ WHERE BV.BlockVisit_Id = :block_visit_id
            If no block visit is found for the given ID.
         """
 
-        stmt  = text("""
-SELECT B.ObsTime  AS obs_time 
-FROM Block B 
-    JOIN BlockVisit BV ON B.Block_Id=BV.Block_Id 
-WHERE BlockVisit_Id=:block_visit_id
-                     """)
         try:
-            return cast(int, self.connection.execute(stmt, {"block_visit_id": block_visit_id}).scalar_one())
+            return cast(int, self.connection.execute(
+                _statements["observation_time"], {"block_visit_id": block_visit_id}
+            ).scalar_one())
         except NoResultFound:
             raise NotFoundError(f"No block visit found for block_visit_id: {block_visit_id}")
 
@@ -296,11 +667,11 @@ WHERE BlockVisit_Id=:block_visit_id
             If the block visit does not exist.
         """
 
-        stmt  = text("""
-SELECT NightInfo_Id AS night_info_id FROM BlockVisit WHERE BlockVisit_Id=:block_visit_id      
-        """)
         try:
-            result = self.connection.execute(stmt, {"block_visit_id": block_visit_id})
+            result = self.connection.execute(
+                _statements["night_info_id_for_block_visit"],
+                {"block_visit_id": block_visit_id},
+            )
             return cast(int, result.scalar_one())
         except NoResultFound:
             raise NotFoundError(f"No block visit found for block_visit_id: {block_visit_id}")
@@ -328,16 +699,10 @@ SELECT NightInfo_Id AS night_info_id FROM BlockVisit WHERE BlockVisit_Id=:block_
             If NightInfo record does not exist.
         """
 
-        stmt  = text("""
-SELECT 
-    ScienceTime         AS science_time, 
-    TimeLostToWeather   AS time_lost_to_weather, 
-    TimeLostToProblems  AS time_lost_to_problems
-FROM NightInfo
-WHERE NightInfo_Id=:night_info_id
-                     """)
         try:
-            result = self.connection.execute(stmt, {"night_info_id": night_info_id})
+            result = self.connection.execute(
+                _statements["night_info_times"], {"night_info_id": night_info_id}
+            )
             row = result.one()
             return {
                 "science_time": cast(int, row.science_time),
@@ -492,16 +857,8 @@ WHERE NightInfo_Id=:night_info_id
         time_lost_to_problems : int
             Time lost due to technical problems.
         """
-        stmt = text("""
-                    UPDATE NightInfo
-                    SET
-                        ScienceTime=:science_time,
-                        TimeLostToWeather=:time_lost_to_weather,
-                        TimeLostToProblems=:time_lost_to_problems
-                    WHERE NightInfo_Id=:night_info_id
-                    """)
         self.connection.execute(
-            stmt, {
+            _statements["update_night_info_times"], {
                 "night_info_id": night_info_id,
                 "science_time": science_time,
                 "time_lost_to_weather": time_lost_to_weather,
@@ -524,18 +881,8 @@ WHERE NightInfo_Id=:night_info_id
         block_status : str
             Block status (Active / Complete).
         """
-        # Update SDB table Block
-        stmt_update = text("""
-UPDATE Block B
-SET B.NDone = :n_done, 
-    B.NAttempted = :n_attempted,
-    B.BlockStatus_Id = (SELECT BS.BlockStatus_Id
-                        FROM BlockStatus BS
-                        WHERE BS.BlockStatus = :status)
-WHERE B.Block_Id = :block_id 
-        """)
         self.connection.execute(
-            stmt_update, {
+            _statements["update_block_visits_and_status"], {
                 "n_done": n_done,
                 "n_attempted": n_attempted,
                 "status": block_status,
@@ -544,34 +891,9 @@ WHERE B.Block_Id = :block_id
         )
 
     def get_latest_block(self, block_visit_id: int) -> Dict[str, Any]:
-        # Get latest block for the same semester + block code
-        stmt_get = text("""
-SELECT
-    B.Block_Id AS block_id,
-    B.NDone AS n_done,
-    B.NVisits AS n_visits,
-    B.NAttempted AS n_attempted,
-    BS.BlockStatus AS block_status
-FROM Block AS B
-         JOIN Proposal AS P ON B.Proposal_Id = P.Proposal_Id
-    JOIN BlockStatus AS BS ON BS.BlockStatus_Id = B.BlockStatus_Id
-WHERE P.Semester_Id = (
-    SELECT P1.Semester_Id
-    FROM Proposal AS P1
-             JOIN Block AS B1 ON P1.Proposal_Id = B1.Proposal_Id
-             JOIN BlockVisit AS BV1 ON B1.Block_Id = BV1.Block_Id
-    WHERE BV1.BlockVisit_Id = :block_visit_id
-)
-  AND B.BlockCode_Id = (
-    SELECT B2.BlockCode_Id
-    FROM Block AS B2
-             JOIN BlockVisit AS BV2 USING (Block_Id)
-    WHERE BV2.BlockVisit_Id = :block_visit_id
-)
-ORDER BY B.Block_Id DESC
-    LIMIT 1
-        """)
-        result = self.connection.execute(stmt_get, {"block_visit_id": block_visit_id})
+        result = self.connection.execute(
+            _statements["latest_block"], {"block_visit_id": block_visit_id}
+        )
         row = result.one()
         return {
             "block_id": row.block_id,
@@ -671,19 +993,8 @@ ORDER BY B.Block_Id DESC
             block_status = BlockStatusValue.ACTIVE
         self.update_block_visits_and_status(block["block_id"], n_done=n_done, n_attempted=n_attempted, block_status=block_status)
 
-        stmt = text(
-            """
-UPDATE BlockVisit BV
-SET BV.BlockVisitStatus_Id = :block_visit_status_id,
-    BV.BlockRejectedReason_Id = :block_rejected_reason_id
-WHERE BV.BlockVisit_Id = :block_visit_id
-AND BV.BlockVisitStatus_Id NOT IN (SELECT BVS2.BlockVisitStatus_Id
-                                    FROM BlockVisitStatus AS BVS2
-                                    WHERE BVS2.BlockVisitStatus = 'Deleted');
-        """
-        )
         self.connection.execute(
-            stmt,
+            _statements["update_block_visit_status"],
             {
                 "block_visit_id": block_visit_id,
                 "block_visit_status_id": block_visit_status_id,
@@ -692,34 +1003,23 @@ AND BV.BlockVisitStatus_Id NOT IN (SELECT BVS2.BlockVisitStatus_Id
         )
 
     def _block_visit_status_id(self, status: str) -> int:
-        stmt = text(
-            """
-SELECT BVS.BlockVisitStatus_Id AS id
-FROM BlockVisitStatus BVS
-WHERE BVS.BlockVisitStatus = :status
-        """
-        )
-        result = self.connection.execute(stmt, {"status": status})
-        return cast(int, result.scalar_one())
+        block_visit_status_id = _block_visit_statuses.id(self.connection, status)
+        if block_visit_status_id is None:
+            raise NoResultFound()
+        return block_visit_status_id
 
     def _block_rejection_reason_id(self, rejection_reason: str) -> int:
-        stmt = text(
-            """
-SELECT BRR.BlockRejectedReason_Id AS id
-FROM BlockRejectedReason BRR
-WHERE BRR.RejectedReason = :rejected_reason
-        """
+        rejection_reason_id = _block_rejection_reasons.id(
+            self.connection, rejection_reason
         )
-        result = self.connection.execute(stmt, {"rejected_reason": rejection_reason})
-        return cast(int, result.scalar_one())
+        if rejection_reason_id is None:
+            raise NoResultFound()
+        return rejection_reason_id
 
     def _block_visit_exists(self, block_visit_id: int) -> bool:
-        stmt = text(
-            """
-SELECT COUNT(*) FROM BlockVisit WHERE BlockVisit_Id = :block_visit_id
-        """
+        result = self.connection.execute(
+            _statements["block_visit_exists"], {"block_visit_id": block_visit_id}
         )
-        result = self.connection.execute(stmt, {"block_visit_id": block_visit_id})
 
         return cast(int, result.scalar_one()) > 0
 
@@ -727,19 +1027,8 @@ SELECT COUNT(*) FROM BlockVisit WHERE BlockVisit_Id = :block_visit_id
         """
         Return proposal code for a block visit id:
         """
-        stmt = text(
-            """
-SELECT PC.Proposal_code
-FROM ProposalCode PC
-         JOIN Block B ON PC.ProposalCode_Id = B.ProposalCode_Id
-         JOIN BlockVisit BV ON BV.Block_Id = B.Block_Id
-         JOIN BlockVisitStatus BVS ON BV.BlockVisitStatus_Id = BVS.BlockVisitStatus_Id
-WHERE BV.BlockVisit_Id = :block_visit_id
-  AND BVS.BlockVisitStatus NOT IN ('Deleted');
-        """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["proposal_code_for_block_visit_id"],
             {"block_visit_id": block_visit_id},
         )
 
@@ -752,27 +1041,9 @@ WHERE BV.BlockVisit_Id = :block_visit_id
         """
         Return the executed observations.
         """
-        stmt = text(
-            """
-SELECT BV.BlockVisit_Id     AS id,
-       NI.Date              AS night,
-       BVS.BlockVisitStatus AS status,
-       BRR.RejectedReason   AS rejection_reason
-FROM BlockVisit BV
-         JOIN BlockVisitStatus BVS ON BV.BlockVisitStatus_Id = BVS.BlockVisitStatus_Id
-         LEFT JOIN BlockRejectedReason BRR
-                   ON BV.BlockRejectedReason_Id = BRR.BlockRejectedReason_Id
-         JOIN NightInfo NI ON BV.NightInfo_Id = NI.NightInfo_Id
-         JOIN Block B ON BV.Block_Id IN (
-    SELECT B1.Block_Id
-    FROM Block B1
-    WHERE B1.BlockCode_Id = B.BlockCode_Id
-)
-WHERE B.Block_Id = :block_id
-  AND BVS.BlockVisitStatus IN ('Accepted', 'Rejected');
-        """
+        result = self.connection.execute(
+            _statements["block_visits"], {"block_id": block_id}
         )
-        result = self.connection.execute(stmt, {"block_id": block_id})
         block_visits = [
             {
                 "id": row.id,
@@ -789,34 +1060,18 @@ WHERE B.Block_Id = :block_id
         """
         Return the observing windows.
         """
-        stmt = text(
-            """
-SELECT BVW.VisibilityStart AS start, BVW.VisibilityEnd AS end
-FROM BlockVisibilityWindow BVW
-WHERE BVW.Block_Id = :block_id
-ORDER BY BVW.VisibilityStart;
-        """
+        result = self.connection.execute(
+            _statements["observing_windows"], {"block_id": block_id}
         )
-        result = self.connection.execute(stmt, {"block_id": block_id})
         return [
             {"start": pytz.utc.localize(row.start), "end": pytz.utc.localize(row.end)}
             for row in result
         ]
 
     def _finder_charts(self, block_id: int, pointing_id: int) -> List[Dict[str, Any]]:
-        stmt = text(
-            """
-SELECT FC.FindingChart_Id AS finding_chart_id,
-       FC.Comments        AS comments,
-       FC.ValidFrom       AS valid_from,
-       FC.ValidUntil      AS valid_until,
-       FC.Path            AS path
-FROM FindingChart FC
-WHERE FC.Pointing_Id = :pointing_id
-ORDER BY ValidFrom, FindingChart_Id
-        """
+        result = self.connection.execute(
+            _statements["finder_charts"], {"pointing_id": pointing_id}
         )
-        result = self.connection.execute(stmt, {"pointing_id": pointing_id})
 
         finder_charts = [
             {
@@ -893,16 +1148,9 @@ ORDER BY ValidFrom, FindingChart_Id
         """
         Return the time restrictions.
         """
-        stmt = text(
-            """
-SELECT DISTINCT TR.ObsWindowStart AS start, TR.ObsWindowEnd AS end
-FROM TimeRestricted TR
-         JOIN Pointing P ON TR.Pointing_Id = P.Pointing_Id
-WHERE P.Pointing_Id = :pointing_id
-ORDER BY TR.ObsWindowStart;
-        """
+        result = self.connection.execute(
+            _statements["time_restrictions"], {"pointing_id": pointing_id}
         )
-        result = self.connection.execute(stmt, {"pointing_id": pointing_id})
         restrictions = [
             {"start": pytz.utc.localize(row.start), "end": pytz.utc.localize(row.end)}
             for row in result
@@ -914,15 +1162,9 @@ ORDER BY TR.ObsWindowStart;
         """
         Return the phase constraints.
         """
-        stmt = text(
-            """
-SELECT PC.PhaseStart AS start, PC.PhaseEnd AS end
-FROM PhaseConstraint PC
-WHERE PC.Pointing_Id = :pointing_id
-ORDER BY PC.PhaseStart;
-        """
+        result = self.connection.execute(
+            _statements["phase_constraints"], {"pointing_id": pointing_id}
         )
-        result = self.connection.execute(stmt, {"pointing_id": pointing_id})
         constraints = [dict(row) for row in result]
 
         return constraints if len(constraints) else None
@@ -931,63 +1173,9 @@ ORDER BY PC.PhaseStart;
         """
         Return the pointings.
         """
-        stmt = text(
-            """
-SELECT P.Pointing_Id                                                  AS pointing_id,
-       P.ObsTime                                                      AS observation_time,
-       P.OverheadTime                                                 AS overhead_time,
-       TCOC.Observation_Order                                         AS observation_order,
-       TCOC.TelescopeConfig_Order                                     AS telescope_config_order,
-       TCOC.PlannedObsConfig_Order                                    AS planned_obsconfig_order,
-       O.Target_Id                                                    AS target_id,
-       TC.PositionAngle                                               AS position_angle,
-       TC.FixedAngle                                                  AS fixed_angle,
-       TC.UseParallacticAngle                                         AS use_parallactic_angle,
-       TC.Iterations                                                  AS tc_iterations,
-       DP.DitherPatternDescription                                    AS dp_description,
-       DP.NHorizontalTiles                                            AS dp_horizontal_tiles,
-       DP.NVerticalTiles                                              AS dp_vertical_tiles,
-       DP.Offsetsize                                                  AS dp_offset_size,
-       DP.NSteps                                                      AS dp_steps,
-       CONCAT(GS.RaH, ':', GS.RaM, ':', GS.RaS / 1000)                AS gs_ra,
-       CONCAT(GS.DecSign, GS.DecD, ':', GS.DecM, ':', GS.DecS / 1000) AS gs_dec,
-       GS.Equinox                                                     AS gs_equinox,
-       GS.Mag                                                         AS gs_magnitude,
-       L.Lamp                                                         AS pc_lamp,
-       CF.CalFilter                                                   AS pc_calibration_filter,
-       GM.GuideMethod                                                 AS pc_guide_method,
-       PCT.Type                                                       AS pc_type,
-       PC.CalScreenIn                                                 AS pc_calibration_screen_in,
-       OC.SalticamPattern_Id                                          AS salticam_pattern_id,
-       OC.RssPattern_Id                                               AS rss_pattern_id,
-       OC.HrsPattern_Id                                               AS hrs_pattern_id,
-       OC.BvitPattern_Id                                              AS bvit_pattern_id,
-       OC.NirPattern_Id                                               AS nir_pattern_id
-FROM TelescopeConfigObsConfig TCOC
-         JOIN Pointing P ON TCOC.Pointing_Id = P.Pointing_Id
-         JOIN Block B ON P.Block_Id = B.Block_Id
-         JOIN TelescopeConfig TC ON TCOC.Pointing_Id = TC.Pointing_Id AND
-                                    TCOC.Observation_Order = TC.Observation_Order AND
-                                    TCOC.TelescopeConfig_Order =
-                                    TC.TelescopeConfig_Order
-         LEFT JOIN DitherPattern DP ON TC.DitherPattern_Id = DP.DitherPattern_Id
-         LEFT JOIN GuideStar GS ON TC.GuideStar_Id = GS.GuideStar_Id
-         JOIN Observation O ON TCOC.Pointing_Id = O.Pointing_Id AND
-                               TCOC.Observation_Order = O.Observation_Order
-         JOIN Target T ON O.Target_Id = T.Target_Id
-         JOIN ObsConfig OC ON TCOC.PlannedObsConfig_Id = OC.ObsConfig_Id
-         JOIN PayloadConfig PC ON OC.PayloadConfig_Id = PC.PayloadConfig_Id
-         LEFT JOIN Lamp L ON PC.Lamp_Id = L.Lamp_Id
-         LEFT JOIN CalFilter CF ON PC.CalFilter_Id = CF.CalFilter_Id
-         LEFT JOIN GuideMethod GM ON PC.GuideMethod_Id = GM.GuideMethod_Id
-         LEFT JOIN PayloadConfigType PCT
-                   ON PC.PayloadConfigType_Id = PCT.PayloadConfigType_Id
-WHERE B.Block_Id = :block_id
-ORDER BY TCOC.Pointing_Id, TCOC.Observation_Order, TCOC.TelescopeConfig_Order,
-         TCOC.PlannedObsConfig_Order;
-        """
+        result = self.connection.execute(
+            _statements["pointings"], {"block_id": block_id}
         )
-        result = self.connection.execute(stmt, {"block_id": block_id})
 
         # collect the pointings
         pointing_groups = self._group_by_pointing_id(result)
@@ -1171,72 +1359,35 @@ ORDER BY TCOC.Pointing_Id, TCOC.Observation_Order, TCOC.TelescopeConfig_Order,
         return instruments
 
     def _salticam_setups(self, salticam_pattern_id: int) -> List[Dict[str, Any]]:
-        stmt = text(
-            """
-SELECT S.Salticam_Id AS salticam_id
-FROM Salticam S
-         JOIN SalticamPatternDetail SPD ON S.Salticam_Id = SPD.Salticam_Id
-WHERE SPD.SalticamPattern_Id = :salticam_pattern_id
-ORDER BY SPD.SalticamPattern_Order
-        """
-        )
         result = self.connection.execute(
-            stmt, {"salticam_pattern_id": salticam_pattern_id}
+            _statements["salticam_setups"], {"salticam_pattern_id": salticam_pattern_id}
         )
         return [
             self.instrument_repository.get_salticam(row.salticam_id) for row in result
         ]
 
     def _rss_setups(self, rss_pattern_id: int) -> List[Dict[str, Any]]:
-        stmt = text(
-            """
-SELECT R.Rss_Id AS rss_id
-FROM Rss R
-         JOIN RssPatternDetail RPD ON R.Rss_Id = RPD.Rss_Id
-WHERE RPD.RssPattern_Id = :rss_pattern_id
-ORDER BY RPD.RssPattern_Order
-        """
+        result = self.connection.execute(
+            _statements["rss_setups"], {"rss_pattern_id": rss_pattern_id}
         )
-        result = self.connection.execute(stmt, {"rss_pattern_id": rss_pattern_id})
         return [self.instrument_repository.get_rss(row.rss_id) for row in result]
 
     def _hrs_setups(self, hrs_pattern_id: int) -> List[Dict[str, Any]]:
-        stmt = text(
-            """
-SELECT H.Hrs_Id AS hrs_id
-FROM Hrs H
-         JOIN HrsPatternDetail HPD ON H.Hrs_Id = HPD.Hrs_Id
-WHERE HPD.HrsPattern_Id = :hrs_pattern_id
-ORDER BY HPD.HrsPattern_Order
-        """
+        result = self.connection.execute(
+            _statements["hrs_setups"], {"hrs_pattern_id": hrs_pattern_id}
         )
-        result = self.connection.execute(stmt, {"hrs_pattern_id": hrs_pattern_id})
         return [self.instrument_repository.get_hrs(row.hrs_id) for row in result]
 
     def _bvit_setups(self, bvit_pattern_id: int) -> List[Dict[str, Any]]:
-        stmt = text(
-            """
-SELECT B.Bvit_Id AS bvit_id
-FROM Bvit B
-         JOIN BvitPatternDetail BPD ON B.Bvit_Id = BPD.Bvit_Id
-WHERE BPD.BvitPattern_Id = :bvit_pattern_id
-ORDER BY BPD.BvitPattern_Order
-        """
+        result = self.connection.execute(
+            _statements["bvit_setups"], {"bvit_pattern_id": bvit_pattern_id}
         )
-        result = self.connection.execute(stmt, {"bvit_pattern_id": bvit_pattern_id})
         return [self.instrument_repository.get_bvit(row.bvit_id) for row in result]
 
     def _nir_setups(self, nir_pattern_id: int) -> List[Dict[str, Any]]:
-        stmt = text(
-            """
-SELECT N.Nir_Id AS nir_id
-FROM Nir N
-         JOIN NirPatternDetail NPD ON N.Nir_Id = NPD.Nir_Id
-WHERE NPD.NirPattern_Id = :nir_pattern_id
-ORDER BY NPD.NirPattern_Order
-        """
+        result = self.connection.execute(
+            _statements["nir_setups"], {"nir_pattern_id": nir_pattern_id}
         )
-        result = self.connection.execute(stmt, {"nir_pattern_id": nir_pattern_id})
         return [self.instrument_repository.get_nir(row.nir_id) for row in result]
 
     def _has_subblock_or_subsubblock_iterations(self, block_id: int) -> bool:
@@ -1245,42 +1396,26 @@ ORDER BY NPD.NirPattern_Order
         iterations.
         """
 
-        stmt = text(
-            """
-SELECT COUNT(*) AS c
-FROM Pointing P
-         JOIN SubBlock SB ON P.Block_Id = SB.Block_Id
-         JOIN SubSubBlock SSB
-              ON P.Block_Id = SSB.Block_Id AND P.SubBlock_Order = SSB.SubBlock_Order AND
-                 P.SubSubBlock_Order = SSB.SubSubBlock_Order
-         JOIN Block B ON P.Block_Id = B.Block_Id
-WHERE B.Block_Id = :block_id
-  AND (SB.Iterations > 1 OR SSB.Iterations > 1)
-        """
+        result = self.connection.execute(
+            _statements["has_subblock_or_subsubblock_iterations"],
+            {"block_id": block_id},
         )
-        result = self.connection.execute(stmt, {"block_id": block_id})
         return cast(bool, result.scalar_one() > 0)
 
     def _has_multiple_observations(self, pointing_id: int) -> bool:
         """
         Check whether a pointing contains multiple observations.
         """
-        stmt = text(
-            """
-SELECT COUNT(DISTINCT Observation_Order) AS c
-FROM TelescopeConfigObsConfig TCOC
-WHERE TCOC.Pointing_Id = :pointing_id
-        """
+        result = self.connection.execute(
+            _statements["has_multiple_observations"], {"pointing_id": pointing_id}
         )
-        result = self.connection.execute(stmt, {"pointing_id": pointing_id})
         return cast(bool, result.scalar_one() > 1)
 
     def _get_scheduled_block_id(self) -> Optional[int]:
         """
         Get the id of the block scheduled next.
         """
-        stmt = text("SELECT Block_Id FROM schedule")
-        result = self.connection.execute(stmt)
+        result = self.connection.execute(_statements["scheduled_block_id"])
         block_id = result.one_or_none()
         if block_id:
             return cast(int, block_id)
@@ -1301,19 +1436,8 @@ WHERE TCOC.Pointing_Id = :pointing_id
         """
         Get the proposal codes for a list of block visit ids.
         """
-        stmt = text(
-            """
-SELECT DISTINCT PC.Proposal_code
-FROM ProposalCode PC
-         JOIN Block B ON PC.ProposalCode_Id = B.ProposalCode_Id
-         JOIN BlockVisit BV ON BV.Block_Id = B.Block_Id
-         JOIN BlockVisitStatus BVS ON BV.BlockVisitStatus_Id = BVS.BlockVisitStatus_Id
-WHERE BV.BlockVisit_Id IN :block_visit_ids
-  AND BVS.BlockVisitStatus NOT IN ('Deleted');
-        """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["proposal_codes_for_block_visits"],
             {"block_visit_ids": block_visit_ids},
         )
 
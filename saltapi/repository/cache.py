@@ -0,0 +1,346 @@
+import copy
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+from saltapi.settings import get_settings
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class RepositoryCache:
+    """
+    Cache for the results of a repository method.
+
+    Results expire after a time-to-live (in seconds), and the least recently used
+    results are evicted once the cache holds the maximum number of results. The cache
+    keeps track of its hits, misses and evictions.
+
+    The cache is shared by all connections. Results are copied when they are added to
+    or taken from the cache, so that callers may modify them.
+    """
+
+    def __init__(self, name: str, ttl: float, max_size: int) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._results: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Get a result from the cache.
+
+        A tuple of a boolean and the result is returned. The boolean is False (and the
+        result None) if there is no unexpired result for the key.
+        """
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._results[key]
+                self.misses += 1
+                return False, None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return True, copy.deepcopy(entry[1])
+
+    def put(self, key: Hashable, result: Any) -> None:
+        """Add a result to the cache."""
+        with self._lock:
+            self._results[key] = (time.monotonic() + self.ttl, copy.deepcopy(result))
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove the result for a key from the cache."""
+        with self._lock:
+            self._results.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all results from the cache."""
+        with self._lock:
+            self._results.clear()
+
+    def reset(self) -> None:
+        """Remove all results from the cache and reset the statistics."""
+        with self._lock:
+            self._results.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def statistics(self) -> Dict[str, Any]:
+        """Return the statistics for the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "ttl": self.ttl,
+                "size": len(self._results),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+_caches: Dict[str, RepositoryCache] = {}
+
+_key_functions: Dict[str, Callable[..., Hashable]] = {}
+
+_request_cache_names: Set[str] = set()
+
+_current_request_results: ContextVar[
+    Optional[Dict[Tuple[str, Hashable], Any]]
+] = ContextVar("current_request_results", default=None)
+
+PendingInvalidations = List[Tuple[str, Tuple[Any, ...], Dict[str, Any]]]
+
+_pending_invalidations: ContextVar[Optional[PendingInvalidations]] = ContextVar(
+    "pending_invalidations", default=None
+)
+
+
+def _key_function(f: Callable[..., Any]) -> Callable[..., Hashable]:
+    signature = inspect.signature(f)
+
+    def key(*args: Any, **kwargs: Any) -> Hashable:
+        # The first parameter is the repository instance, which does not affect the
+        # result.
+        arguments = signature.bind(None, *args, **kwargs)
+        arguments.apply_defaults()
+        return tuple(arguments.arguments.values())[1:]
+
+    return key
+
+
+def cached(name: str, ttl: float, max_size: int = 1000) -> Callable[[F], F]:
+    """
+    Decorator for caching the results of a repository method.
+
+    The results are cached per combination of method arguments, which hence must be
+    hashable. Exceptions are not cached. Write methods which change the cached data
+    must invalidate the affected results with the invalidate_cache function, passing
+    the same cache name and method arguments. For example:
+
+    ```python
+    @cached("proposal_status", ttl=60)
+    def get_proposal_status(self, proposal_code: str) -> Dict[str, Any]:
+        ...
+
+    def update_proposal_status(self, proposal_code: str, status: str) -> None:
+        ...
+        invalidate_cache("proposal_status", proposal_code)
+    ```
+
+    A result invalidated before the transaction changing the data is committed may be
+    cached again (by another request) while the transaction is still open. Units of
+    work therefore repeat the invalidations made while they are used once they have
+    been committed or rolled back (see track_cache_invalidations).
+
+    Data changed by other applications (or by other server processes) is only updated
+    once the cached result has expired, so the time-to-live should reflect how stale
+    the data may become. Data which must never be stale across requests, such as the
+    data needed for permission checks, should be memoised with the request_cached
+    decorator instead.
+
+    No results are cached if the REPOSITORY_CACHE_ENABLED setting is false.
+    """
+
+    def decorator(f: F) -> F:
+        if name in _caches or name in _request_cache_names:
+            raise ValueError(f"There exists a repository cache {name} already.")
+        cache = RepositoryCache(name, ttl, max_size)
+        _caches[name] = cache
+
+        key = _key_function(f)
+        _key_functions[name] = key
+
+        @functools.wraps(f)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            if not get_settings().repository_cache_enabled:
+                return f(self, *args, **kwargs)
+            cache_key = key(*args, **kwargs)
+            found, result = cache.get(cache_key)
+            if found:
+                return result
+            result = f(self, *args, **kwargs)
+            cache.put(cache_key, result)
+            return result
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+def invalidate_cache(name: str, *args: Any, **kwargs: Any) -> None:
+    """
+    Invalidate cached results.
+
+    If method arguments are passed, only the result for these arguments is removed from
+    the cache with the given name. Otherwise, all of its results are removed.
+
+    The name may also be that of a request cache (see request_cached), in which case
+    the results memoised for the current request are removed.
+
+    If invalidations are being tracked (see track_cache_invalidations), the
+    invalidation is recorded so that it can be repeated once the transaction has
+    ended.
+    """
+    _invalidate(name, args, kwargs)
+    pending = _pending_invalidations.get()
+    if pending is not None:
+        pending.append((name, args, kwargs))
+
+
+def _invalidate(name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> None:
+    if name in _request_cache_names:
+        results = _current_request_results.get()
+        if results is not None:
+            if args or kwargs:
+                results.pop((name, _key_functions[name](*args, **kwargs)), None)
+            else:
+                for key in [key for key in results if key[0] == name]:
+                    del results[key]
+        return
+
+    cache = _caches[name]
+    if args or kwargs:
+        cache.invalidate(_key_functions[name](*args, **kwargs))
+    else:
+        cache.clear()
+
+
+def track_cache_invalidations() -> Optional[PendingInvalidations]:
+    """
+    Start recording the cache invalidations, so that they can be repeated.
+
+    This is called by a unit of work when it is entered. The list in which the
+    invalidations are recorded is returned, and it must be passed to
+    stop_tracking_cache_invalidations once the unit of work has been exited. If
+    invalidations are being recorded already (by an enclosing unit of work), None is
+    returned instead.
+    """
+    if _pending_invalidations.get() is not None:
+        return None
+    pending: PendingInvalidations = []
+    _pending_invalidations.set(pending)
+    return pending
+
+
+def stop_tracking_cache_invalidations(
+    pending: Optional[PendingInvalidations],
+) -> None:
+    """
+    Stop recording cache invalidations in a list returned by track_cache_invalidations.
+
+    Nothing is done if the list is None or if invalidations are not recorded in it.
+    The latter may happen if the unit of work is exited in a different context (for
+    example, in a later step of a streaming response).
+    """
+    if pending is not None and _pending_invalidations.get() is pending:
+        _pending_invalidations.set(None)
+
+
+def repeat_cache_invalidations() -> None:
+    """
+    Repeat the recorded cache invalidations and forget them.
+
+    This is called after a transaction has been committed or rolled back, so that
+    results cached while the transaction was open are discarded. These results may
+    have been read before the changes were committed, or they may have been read from
+    changes which have been rolled back.
+    """
+    pending = _pending_invalidations.get()
+    if pending:
+        for name, args, kwargs in pending:
+            _invalidate(name, args, kwargs)
+        pending.clear()
+
+
+def clear_caches() -> None:
+    """Remove all results from all the caches and reset their statistics."""
+    for cache in _caches.values():
+        cache.reset()
+
+
+def cache_statistics() -> List[Dict[str, Any]]:
+    """Return the statistics for all the caches, sorted by cache name."""
+    return [_caches[name].statistics() for name in sorted(_caches)]
+
+
+def use_request_cache() -> Any:
+    """
+    Start memoising the results of methods decorated with request_cached.
+
+    This should be called at the start of a request. The returned token must be passed
+    to stop_using_request_cache once the request has been handled.
+    """
+    return _current_request_results.set({})
+
+
+def stop_using_request_cache(token: Any) -> None:
+    """Discard the memoised results and restore the request cache used before."""
+    _current_request_results.reset(token)
+
+
+def request_cached(name: str) -> Callable[[F], F]:
+    """
+    Decorator for memoising the results of a repository method for a request.
+
+    The results are memoised per combination of method arguments, which hence must be
+    hashable. Unlike for the cached decorator, the results do not expire; they are
+    discarded when the request ends. This is meant for data which is queried
+    repeatedly while a request is handled, but which must not be stale across
+    requests, such as the relationships between a user and a proposal.
+
+    Write methods which change the data must invalidate the memoised results with the
+    invalidate_cache function. Results are not memoised outside a request (i.e. if
+    use_request_cache has not been called).
+    """
+
+    def decorator(f: F) -> F:
+        if name in _caches or name in _request_cache_names:
+            raise ValueError(f"There exists a repository cache {name} already.")
+        _request_cache_names.add(name)
+
+        key = _key_function(f)
+        _key_functions[name] = key
+
+        @functools.wraps(f)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            results = _current_request_results.get()
+            if results is None:
+                return f(self, *args, **kwargs)
+            cache_key = (name, key(*args, **kwargs))
+            if cache_key in results:
+                return copy.deepcopy(results[cache_key])
+            result = f(self, *args, **kwargs)
+            results[cache_key] = copy.deepcopy(result)
+            return result
+
+        return cast(F, wrapper)
+
+    return decorator
@@ -1,12 +1,21 @@
-from typing import Any, Dict, List, cast
+from typing import Any, Dict, List
 
 from sqlalchemy import text
 from sqlalchemy.engine import Connection
 
 from saltapi.exceptions import NotFoundError, ValidationError
 from saltapi.repository.block_repository import BlockRepository
+from saltapi.repository.lookup_tables import LookupTable
 from saltapi.repository.proposal_repository import ProposalRepository
 
+_data_formats = LookupTable(
+    "data_formats",
+    """
+SELECT RequestDataFormat AS value, RequestDataFormat_Id AS id
+FROM RequestDataFormat
+    """,
+)
+
 
 class DataRepository:
     def __init__(self, connection: Connection) -> None:
@@ -15,18 +24,11 @@ class DataRepository:
         self.block_repository = BlockRepository(connection)
 
     def _get_data_format_id(self, data_format: str) -> int:
-        stmt = text(
-            """
-SELECT RequestDataFormat_Id FROM RequestDataFormat
-WHERE RequestDataFormat = :data_format
-        """
-        )
-        result = self.connection.execute(stmt, {"data_format": data_format})
-        data_format_id = result.one_or_none()
-        if not data_format_id:
+        data_format_id = _data_formats.id(self.connection, data_format)
+        if data_format_id is None:
             raise NotFoundError(f"Couldn't find requested data format '{data_format}'")
 
-        return cast(int, data_format_id[0])
+        return data_format_id
 
     def request_data(
         self,
@@ -1,16 +1,289 @@
-from typing import Any
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, make_url
+from sqlalchemy.engine.url import URL
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.pool import QueuePool
 
+from saltapi.repository.query_statistics import instrument
+from saltapi.repository.statement_timeout import record_connection_ids
 from saltapi.settings import get_settings
 
+ASYNC_DRIVER_NAME = "mysql+aiomysql"
+
 _engine: Any = None
+_async_engine: Any = None
+_replica_engine: Any = None
+_async_replica_engine: Any = None
+
+
+class PoolStatistics:
+    """
+    Statistics for the connection pool of the SALT Science Database engine.
+
+    The numbers of checked out and overflow connections are taken from the pool
+    itself. The wait times and timeouts are recorded by the connect function whenever
+    a connection is requested from the pool.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset all the recorded statistics."""
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.total_wait_time = 0.0
+            self.max_wait_time = 0.0
+
+    def record_checkout(self, wait_time: float) -> None:
+        """Record a successful connection checkout and the time spent waiting."""
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+
+    def record_timeout(self, wait_time: float) -> None:
+        """Record a checkout which timed out and the time spent waiting."""
+        with self._lock:
+            self.timeouts += 1
+            self.total_wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+
+    def as_dict(self, pool: Any) -> Dict[str, Any]:
+        """
+        Return the statistics together with the current state of a pool.
+
+        The pool size, checked out, checked in and overflow values are None if the
+        pool is not a queue pool.
+        """
+        with self._lock:
+            requests = self.checkouts + self.timeouts
+            statistics: Dict[str, Any] = {
+                "pool_size": None,
+                "checked_out": None,
+                "checked_in": None,
+                "overflow": None,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "average_wait_time": self.total_wait_time / requests
+                if requests
+                else 0.0,
+                "max_wait_time": self.max_wait_time,
+            }
+        if isinstance(pool, QueuePool):
+            statistics["pool_size"] = pool.size()
+            statistics["checked_out"] = pool.checkedout()
+            statistics["checked_in"] = pool.checkedin()
+            # The overflow is negative as long as the pool has not been filled.
+            statistics["overflow"] = max(pool.overflow(), 0)
+        return statistics
+
+
+pool_statistics = PoolStatistics()
+
+async_pool_statistics = PoolStatistics()
+
+replica_pool_statistics = PoolStatistics()
+
+async_replica_pool_statistics = PoolStatistics()
+
+
+class ReplicaMonitor:
+    """
+    Monitor for deciding whether the replica of the SALT Science Database may be used.
+
+    The replica may be used if its replication lag does not exceed the maximum lag
+    defined by the SDB_REPLICA_MAX_LAG setting. As checking the lag requires a query,
+    it is only checked again once the check interval defined by the
+    SDB_REPLICA_LAG_CHECK_INTERVAL setting has passed.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+        self.is_usable = False
+        self.lag: Optional[float] = None
+
+    def needs_check(self) -> bool:
+        """Check whether the replication lag needs to be checked again."""
+        with self._lock:
+            if self._checked_at is None:
+                return True
+            interval = get_settings().sdb_replica_lag_check_interval
+            return time.monotonic() - self._checked_at >= interval
+
+    def update(self, lag: Optional[float]) -> None:
+        """
+        Update the replication lag.
+
+        The lag must be None if replication is not running or could not be checked.
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            self.lag = lag
+            self.is_usable = (
+                lag is not None and lag <= get_settings().sdb_replica_max_lag
+            )
+            if not self.is_usable:
+                logging.warning(
+                    "The SDB replica is not used, as its replication lag is"
+                    f" {'unknown' if lag is None else f'{lag} seconds'}."
+                )
+
+    def reset(self) -> None:
+        """Force a new check of the replication lag."""
+        with self._lock:
+            self._checked_at = None
+            self.is_usable = False
+            self.lag = None
+
+
+replica_monitor = ReplicaMonitor()
+
+
+def replication_lag(connection: Connection) -> Optional[float]:
+    """
+    Return the replication lag of a replica, in seconds.
+
+    None is returned if replication is not running. If the database is no replica, the
+    lag is taken to be 0.
+    """
+    try:
+        row = connection.execute(text("SHOW REPLICA STATUS")).mappings().first()
+        lag_column = "Seconds_Behind_Source"
+    except DBAPIError:
+        # Older MySQL and MariaDB versions only support the deprecated syntax.
+        row = connection.execute(text("SHOW SLAVE STATUS")).mappings().first()
+        lag_column = "Seconds_Behind_Master"
+    if row is None:
+        return 0
+    if lag_column not in row:
+        lag_column = "Seconds_Behind_Master"
+    lag = row[lag_column]
+    return float(lag) if lag is not None else None
+
+
+def _pool_options() -> Dict[str, Any]:
+    settings = get_settings()
+    return dict(
+        echo=settings.echo_sql,
+        future=True,
+        pool_size=settings.sdb_pool_size,
+        max_overflow=settings.sdb_max_overflow,
+        pool_timeout=settings.sdb_pool_timeout,
+        pool_recycle=settings.sdb_pool_recycle,
+        pool_pre_ping=settings.sdb_pool_pre_ping,
+    )
 
 
 def engine() -> Any:
     global _engine
     if not _engine:
-        sdb_dsn = get_settings().sdb_dsn
-        echo_sql = get_settings().echo_sql
-        _engine = create_engine(sdb_dsn, echo=echo_sql, future=True)
+        _engine = create_engine(get_settings().sdb_dsn, **_pool_options())
+        instrument(_engine)
+        record_connection_ids(_engine)
     return _engine
+
+
+def replica_engine() -> Optional[Any]:
+    """
+    Return the engine for the replica of the SALT Science Database.
+
+    None is returned if no replica is defined.
+    """
+    global _replica_engine
+    replica_dsn = get_settings().sdb_replica_dsn
+    if not replica_dsn:
+        return None
+    if not _replica_engine:
+        _replica_engine = create_engine(replica_dsn, **_pool_options())
+        instrument(_replica_engine)
+        record_connection_ids(_replica_engine)
+    return _replica_engine
+
+
+def connect(db_engine: Any, statistics: PoolStatistics = pool_statistics) -> Connection:
+    """
+    Check out a connection from an engine's pool.
+
+    The time spent waiting for the connection is recorded in the given pool
+    statistics, and so is a timeout.
+    """
+    start = time.perf_counter()
+    try:
+        connection = db_engine.connect()
+    except PoolTimeoutError:
+        statistics.record_timeout(time.perf_counter() - start)
+        raise
+    statistics.record_checkout(time.perf_counter() - start)
+    return connection
+
+
+def async_dsn(dsn: Optional[str] = None) -> URL:
+    """
+    Return the DSN for an asyncio engine.
+
+    If a DSN is passed, it is returned with the aiomysql driver. Otherwise the DSN
+    defined by the SDB_ASYNC_DSN setting is returned or, if that setting is not
+    defined, the DSN for the SALT Science Database with the aiomysql driver.
+    """
+    settings = get_settings()
+    if dsn is None and settings.sdb_async_dsn:
+        return make_url(settings.sdb_async_dsn)
+    return make_url(dsn or settings.sdb_dsn).set(drivername=ASYNC_DRIVER_NAME)
+
+
+def async_engine() -> Any:
+    global _async_engine
+    if not _async_engine:
+        _async_engine = create_async_engine(async_dsn(), **_pool_options())
+        instrument(_async_engine.sync_engine)
+        record_connection_ids(_async_engine.sync_engine)
+    return _async_engine
+
+
+def async_replica_engine() -> Optional[Any]:
+    """
+    Return the asyncio engine for the replica of the SALT Science Database.
+
+    None is returned if no replica is defined.
+    """
+    global _async_replica_engine
+    replica_dsn = get_settings().sdb_replica_dsn
+    if not replica_dsn:
+        return None
+    if not _async_replica_engine:
+        _async_replica_engine = create_async_engine(
+            async_dsn(replica_dsn), **_pool_options()
+        )
+        instrument(_async_replica_engine.sync_engine)
+        record_connection_ids(_async_replica_engine.sync_engine)
+    return _async_replica_engine
+
+
+async def async_connect(
+    db_engine: Any, statistics: PoolStatistics = async_pool_statistics
+) -> AsyncConnection:
+    """
+    Check out a connection from an asyncio engine's pool.
+
+    The time spent waiting for the connection is recorded in the given pool
+    statistics, and so is a timeout.
+    """
+    start = time.perf_counter()
+    try:
+        connection = await db_engine.connect()
+    except PoolTimeoutError:
+        statistics.record_timeout(time.perf_counter() - start)
+        raise
+    statistics.record_checkout(time.perf_counter() - start)
+    return connection
@@ -5,12 +5,14 @@ from sqlalchemy.engine import Connection
 from sqlalchemy.exc import IntegrityError, NoResultFound
 
 from saltapi.exceptions import NotFoundError, ResourceExistsError
+from saltapi.repository.cache import cached, invalidate_cache
 
 
 class InstitutionRepository:
     def __init__(self, connection: Connection) -> None:
         self.connection = connection
 
+    @cached("institutions", ttl=3600)
     def get_institutions(self) -> List[Dict[str, Any]]:
         """
         Returns a list of institutions
@@ -109,6 +111,7 @@ AND I2.Department = :department
 
         institution_name_id = self._add_institution_name(new_institution_details)
         self._create_institution_details(new_institution_details, institution_name_id)
+        invalidate_cache("institutions")
 
     def _add_institution_name(self, new_institution_details: Dict[str, Any]) -> int:
         """
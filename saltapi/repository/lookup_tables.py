@@ -0,0 +1,86 @@
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+_lookup_tables: Dict[str, "LookupTable"] = {}
+
+
+class LookupTable:
+    """
+    In-memory copy of an enumeration table, such as BlockVisitStatus.
+
+    Enumeration tables are small and hardly ever change, but write methods need to
+    resolve their values to ids all the time. A lookup table is defined by a SELECT
+    statement returning the columns value and id, and it is loaded once per process
+    when an id is requested for the first time. The ids are then taken from memory:
+
+    ```python
+    _block_visit_statuses = LookupTable(
+        "block_visit_statuses",
+        '''
+    SELECT BlockVisitStatus AS value, BlockVisitStatus_Id AS id
+    FROM BlockVisitStatus
+        ''',
+    )
+
+    ...
+
+    block_visit_status_id = _block_visit_statuses.id(self.connection, status)
+    ```
+
+    As in the database, values are compared case-insensitively and trailing spaces are
+    ignored. If a value is not found, the table is reloaded before giving up, so that
+    values added since the table was loaded are found as well. Other changes only take
+    effect once the table is refreshed with the refresh_lookup_tables function.
+    """
+
+    def __init__(self, name: str, sql: str) -> None:
+        if name in _lookup_tables:
+            raise ValueError(f"There exists a lookup table {name} already.")
+        self.name = name
+        self.statement = text(sql)
+        self._lock = threading.Lock()
+        self._ids: Optional[Dict[str, int]] = None
+        _lookup_tables[name] = self
+
+    def id(self, connection: Connection, value: str) -> Optional[int]:
+        """
+        Return the id for a value, or None if the value does not exist.
+        """
+        key = self._key(value)
+        ids = self._ids
+        if ids is None or key not in ids:
+            ids = self._load(connection)
+        return ids.get(key)
+
+    def refresh(self) -> None:
+        """Discard the loaded values, so that they are loaded again when needed."""
+        with self._lock:
+            self._ids = None
+
+    def _load(self, connection: Connection) -> Dict[str, int]:
+        result = connection.execute(self.statement)
+        ids = {self._key(str(row.value)): int(row.id) for row in result}
+        with self._lock:
+            self._ids = ids
+        return ids
+
+    @staticmethod
+    def _key(value: str) -> str:
+        return value.rstrip(" ").lower()
+
+
+def refresh_lookup_tables(name: Optional[str] = None) -> None:
+    """
+    Refresh lookup tables.
+
+    If a name is passed, only the lookup table with that name is refreshed. Otherwise
+    all lookup tables are refreshed.
+    """
+    if name is not None:
+        _lookup_tables[name].refresh()
+        return
+    for lookup_table in _lookup_tables.values():
+        lookup_table.refresh()
@@ -1,15 +1,198 @@
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple, Literal
+from typing import Any, Dict, Iterator, List, Literal, Optional, Tuple
 
 import pytz
 from sqlalchemy import text
 from sqlalchemy.engine import Connection
 
 from saltapi.exceptions import NotFoundError
+from saltapi.repository.cache import cached
 from saltapi.repository.proposal_repository import ProposalRepository
+from saltapi.repository.statements import StatementRegistry
 from saltapi.service.user import User
 from saltapi.util import semester_of_datetime
 
+_statements = StatementRegistry()
+
+_statements.register(
+    "news_for_days",
+    """
+SELECT Time AS time, Title AS title, Text AS text
+FROM PiptNews
+WHERE DATE_SUB(CURDATE(), INTERVAL :days DAY) <= Time
+ORDER BY Time DESC
+    """,
+)
+
+# The semester filter is applied only if the year and semester parameters are not
+# NULL.
+_statements.register(
+    "proposal_constraints",
+    """
+SELECT s.Year AS year,
+       s.Semester AS semester,
+       pa.Priority AS priority,
+       m.Moon AS moon,
+       SUM(pa.TimeAlloc) AS allocated_time
+FROM ProposalCode AS pc
+         JOIN ProposalGeneralInfo AS pgi ON pc.ProposalCode_Id = pgi.ProposalCode_Id
+         JOIN MultiPartner AS mp ON pc.ProposalCode_Id = mp.ProposalCode_Id
+         JOIN PriorityAlloc AS pa ON pa.MultiPartner_Id = mp.MultiPartner_Id
+         JOIN Semester AS s ON mp.Semester_Id = s.Semester_Id
+         JOIN Moon AS m ON pa.Moon_Id = m.Moon_Id
+WHERE pc.Proposal_Code = :proposal_code
+  AND (:year IS NULL OR (s.Year = :year AND s.Semester = :semester))
+GROUP BY s.Semester_Id, pa.Moon_Id, pa.Priority
+HAVING SUM(pa.TimeAlloc) > 0
+    """,
+)
+
+_statements.register(
+    "semester",
+    """
+SELECT Semester_Id,
+       Year,
+       Semester,
+       UNIX_TIMESTAMP(StartSemester) AS start_unix,
+       UNIX_TIMESTAMP(EndSemester) AS end_unix
+FROM Semester
+WHERE Year = :year AND Semester = :semester
+LIMIT 1
+    """,
+)
+
+_statements.register(
+    "previous_proposals_allocated_time",
+    """
+SELECT Proposal_Code AS proposal_code, Title AS title, SUM(TimeAlloc) AS allocated_time
+FROM ProposalCode
+         JOIN ProposalText AS pt ON ProposalCode.ProposalCode_Id = pt.ProposalCode_Id
+         JOIN MultiPartner ON ProposalCode.ProposalCode_Id = MultiPartner.ProposalCode_Id
+         JOIN PriorityAlloc USING (MultiPartner_Id)
+WHERE MultiPartner.Semester_Id = pt.Semester_Id
+  AND Priority < 4
+  AND Proposal_Code IN (
+    SELECT DISTINCT pco.Proposal_Code
+    FROM ProposalCode AS pco
+             JOIN Proposal AS p USING (ProposalCode_Id)
+             JOIN ProposalContact AS pc ON pco.ProposalCode_Id = pc.ProposalCode_Id
+             JOIN Investigator AS i ON (pc.Leader_Id = i.Investigator_Id)
+             JOIN PiptUser AS pu USING (PiptUser_Id)
+             JOIN Semester AS s ON p.Semester_id = s.Semester_Id
+    WHERE pu.PiptUser_Id = :user_id
+      AND p.Current = 1
+      AND p.Phase = 2
+      AND (s.Year > :from_year OR (s.Year = :from_year AND s.Semester >= :from_semester))
+)
+GROUP BY Proposal_Code
+    """,
+)
+
+_statements.register(
+    "previous_proposals_observed_time",
+    """
+SELECT Proposal_Code AS proposal_code, SUM(Obstime) AS observed_time
+FROM Proposal
+         JOIN ProposalCode USING (ProposalCode_Id)
+         JOIN Block USING (Proposal_Id)
+         JOIN BlockVisit USING (Block_Id)
+         JOIN BlockVisitStatus USING (BlockVisitStatus_Id)
+WHERE BlockVisitStatus = 'Accepted'
+  AND Priority < 4
+  AND Proposal_Code IN (
+    SELECT DISTINCT pco.Proposal_Code
+    FROM ProposalCode AS pco
+             JOIN Proposal AS p ON pco.ProposalCode_Id = p.ProposalCode_Id
+             JOIN ProposalContact AS pc ON p.ProposalCode_Id = pc.ProposalCode_Id
+             JOIN Investigator AS i ON (pc.Leader_Id = i.Investigator_Id)
+             JOIN PiptUser AS pu USING (PiptUser_Id)
+             JOIN Semester AS s ON p.Semester_id = s.Semester_Id
+    WHERE pu.PiptUser_Id = :user_id
+      AND p.Current = 1
+      AND p.Phase = 2
+      AND (s.Year > :from_year OR (s.Year = :from_year AND s.Semester >= :from_semester))
+)
+GROUP BY Proposal_Code
+    """,
+)
+
+_statements.register(
+    "block_visits",
+    """
+SELECT DISTINCT bv.BlockVisit_Id,
+                bc.BlockCode AS BlockCode,
+                b.Block_Name AS BlockName,
+                bvs.BlockVisitStatus AS BlockVisitStatus,
+                b.Priority AS Priority,
+                m.Moon AS Moon,
+                b.ObsTime AS ObservedTime,
+                b.OverheadTime AS OverheadTime,
+                pool.PoolCode AS PoolCode,
+                s.Year AS Year,
+                s.Semester AS Semester
+FROM BlockVisit AS bv
+         JOIN BlockVisitStatus AS bvs ON (bv.BlockVisitStatus_Id=bvs.BlockVisitStatus_Id)
+         JOIN Block AS b ON (bv.Block_Id=b.Block_Id)
+         JOIN Moon AS m ON (b.Moon_Id=m.Moon_Id)
+         JOIN Proposal AS p ON (b.Proposal_Id=p.Proposal_Id)
+         JOIN ProposalCode AS pc ON (p.ProposalCode_Id=pc.ProposalCode_Id)
+         JOIN Semester AS s ON (p.Semester_Id=s.Semester_Id)
+         LEFT JOIN BlockCode AS bc ON (b.BlockCode_Id=bc.BlockCode_Id)
+         LEFT JOIN BlockPool AS bp ON (b.Block_Id=bp.Block_Id)
+         LEFT JOIN Pool AS pool ON (bp.Pool_Id=pool.Pool_Id)
+WHERE pc.Proposal_Code = :proposal_code
+    """,
+)
+
+_statements.register(
+    "partners",
+    """
+SELECT P.Partner_Code           AS partner_code,
+       P.Partner_Name           AS partner_name,
+       IName.InstituteName_Name AS institute_name,
+       I.Department             AS department
+FROM Partner P
+         JOIN Institute I ON P.Partner_Id = I.Partner_Id
+         JOIN InstituteName IName ON I.InstituteName_Id = IName.InstituteName_Id
+ORDER BY P.Partner_Code, IName.InstituteName_Name, I.Department
+    """,
+)
+
+# There may be multiple entries with the same email address. If so, we prefer one who
+# has the given institute name.
+_statements.register(
+    "investigator",
+    """
+SELECT PU.PiptUser_Id                                     AS id,
+       I.FirstName                                        AS given_name,
+       I.Surname                                          AS family_name,
+       I.email                                            AS email,
+       I.phone                                            AS phone,
+       InstName.InstituteName_Name                        AS institute,
+       Inst.Department                                    AS department,
+       P.Partner_Name                                     AS partner,
+       IF(InstName.InstituteName_Name = :institute, 1, 0) AS has_preferred_institute
+FROM Investigator I
+         JOIN Institute Inst ON I.Institute_Id = Inst.Institute_Id
+         JOIN InstituteName InstName
+              ON Inst.InstituteName_Id = InstName.InstituteName_Id
+         JOIN Partner P ON Inst.Partner_Id = P.Partner_Id
+         JOIN PiptUser PU ON I.PiptUser_Id = PU.PiptUser_Id
+WHERE I.Email = :email
+ORDER BY has_preferred_institute DESC, I.Investigator_Id DESC
+    """,
+)
+
+_statements.register(
+    "current_version",
+    """
+SELECT Pipt
+FROM PiptVersions
+ORDER BY DateActive DESC
+LIMIT 1
+    """,
+)
+
 
 class PiptRepository:
     def __init__(self, connection: Connection) -> None:
@@ -20,16 +203,7 @@ class PiptRepository:
         """
         Return a list of PIPT news entries issued within the last `days` days.
         """
-        stmt = text(
-            """
-            SELECT Time AS time, Title AS title, Text AS text
-            FROM PiptNews
-            WHERE DATE_SUB(CURDATE(), INTERVAL :days DAY) <= Time
-            ORDER BY Time DESC
-            """
-        )
-
-        result = self.connection.execute(stmt, {"days": days})
+        result = self.connection.execute(_statements["news_for_days"], {"days": days})
         news_items = [
             {
                 "date": pytz.utc.localize(row.time),
@@ -45,37 +219,17 @@ class PiptRepository:
     ) -> List[Dict[str, Any]]:
         constraints: List[Dict[str, Any]] = []
 
-        stmt = text(
-            """
-            SELECT s.Year AS year,
-                s.Semester AS semester,
-                pa.Priority AS priority,
-                m.Moon AS moon,
-                SUM(pa.TimeAlloc) AS allocated_time
-            FROM ProposalCode AS pc
-                JOIN ProposalGeneralInfo AS pgi ON pc.ProposalCode_Id = pgi.ProposalCode_Id
-                JOIN MultiPartner AS mp ON pc.ProposalCode_Id = mp.ProposalCode_Id
-                JOIN PriorityAlloc AS pa ON pa.MultiPartner_Id = mp.MultiPartner_Id
-                JOIN Semester AS s ON mp.Semester_Id = s.Semester_Id
-                JOIN Moon AS m ON pa.Moon_Id = m.Moon_Id
-            WHERE pc.Proposal_Code = :proposal_code
-             {semester_filter}
-            GROUP BY s.Semester_Id, pa.Moon_Id, pa.Priority
-            HAVING SUM(pa.TimeAlloc) > 0
-            """.format(
-                semester_filter="AND s.Year = :year AND s.Semester = :semester"
-                if semester is not None
-                else "",
-            )
-        )
-
-        params = {"proposal_code": proposal_code}
+        params: Dict[str, Any] = {
+            "proposal_code": proposal_code,
+            "year": None,
+            "semester": None,
+        }
         if semester is not None:
             semester_parts = semester.split("-")
             params["year"] = semester_parts[0]
             params["semester"] = semester_parts[1]
 
-        result = self.connection.execute(stmt, params)
+        result = self.connection.execute(_statements["proposal_constraints"], params)
         rows = result.fetchall()
 
         for row in rows:
@@ -89,6 +243,7 @@ class PiptRepository:
             )
         return constraints
 
+    @cached("nir_flat_details", ttl=3600)
     def get_nir_flat_details(self) -> List[Dict[str, Any]]:
         """
         Return flat field calibration entries from NirFlatBible joined with NirGrating and Lamp.
@@ -116,6 +271,7 @@ class PiptRepository:
             for row in result
         ]
 
+    @cached("nir_arc_exposures", ttl=3600)
     def get_exposures(self) -> List[Dict[str, Any]]:
         """
         Return exposures from arc calibration data.
@@ -228,6 +384,7 @@ class PiptRepository:
 
         return "; ".join(setup_parts)
 
+    @cached("nir_allowed_lamp_setups", ttl=3600)
     def get_allowed_nir_lamp_setups(self) -> List[Dict[str, Any]]:
         """
         Return allowed lamp setups, grouped by grating and art station.
@@ -260,6 +417,7 @@ class PiptRepository:
         allowed = [allowed_map[key] for key in sorted(keys)]
         return allowed
 
+    @cached("nir_preferred_lamp_setups", ttl=3600)
     def get_preferred_nir_lamp_setups(self) -> List[Dict[str, Any]]:
         """
         Return preferred lamp setups per grating/art_station combination.
@@ -282,6 +440,7 @@ class PiptRepository:
     def _w_obs(w_line: float) -> float:
         return w_line + 12
 
+    @cached("rss_calibration_regions", ttl=3600)
     def get_rss_calibration_regions(self) -> list[dict]:
         """
         Return Fabry-Perot calibration regions.
@@ -316,6 +475,7 @@ class PiptRepository:
             for row in rows
         ]
 
+    @cached("rss_calibration_lines", ttl=3600)
     def get_rss_calibration_lines(self) -> list[dict]:
         """
         Return Fabry-Perot calibration lines.
@@ -347,6 +507,7 @@ class PiptRepository:
             for row in rows
         ]
 
+    @cached("rss_exposure_times", ttl=3600)
     def get_rss_exposure_times(self) -> list[dict]:
         stmt = text(
             """
@@ -368,6 +529,7 @@ class PiptRepository:
             for row in result
         ]
 
+    @cached("rss_allowed_lamps", ttl=3600)
     def get_rss_allowed_lamps(self) -> list[dict]:
         stmt = text(
             """
@@ -423,6 +585,7 @@ class PiptRepository:
 
         return allowed_lamps
 
+    @cached("rss_preferred_lamps", ttl=3600)
     def get_rss_preferred_lamps(self) -> list[dict]:
         query = """
             SELECT g.Grating, ab.RssArtStation_Number, l.Lamp
@@ -437,6 +600,7 @@ class PiptRepository:
             for row in result
         ]
 
+    @cached("smi_flat_details", ttl=3600)
     def get_smi_flat_details(self) -> List[Dict[str, Any]]:
         """
         Return flat field calibration setup.
@@ -474,6 +638,7 @@ class PiptRepository:
             for row in result
         ]
 
+    @cached("smi_arc_details", ttl=3600)
     def get_smi_arc_details(self) -> List[Dict[str, Any]]:
         """
         Return the arc details for Slit Mask IFU setups.
@@ -580,6 +745,7 @@ class PiptRepository:
         )
         return list(self.connection.execute(stmt))
 
+    @cached("smi_allowed_lamp_setups", ttl=3600)
     def get_smi_allowed_lamp_setups(self) -> List[Dict[str, Any]]:
         """Return allowed arc lamp setups grouped by grating, art station number, pre-bin rows, and pre-bin columns."""
         meta_map = self._get_smi_arc_bible_setup()
@@ -606,6 +772,7 @@ class PiptRepository:
 
         return [grouped[k] for k in sorted(keys)]
 
+    @cached("smi_preferred_lamp_setups", ttl=3600)
     def get_smi_preferred_lamp_setups(self) -> List[Dict[str, Any]]:
         """Return the preferred arc setups for the RSS Slit Mask IFU."""
         raw_data = self._get_smi_preferred_lamp_setups_raw()
@@ -645,16 +812,9 @@ class PiptRepository:
         self, year: int, semester: int
     ) -> Dict[str, Any]:
         """Fetch semester details by year and semester."""
-        query = text(
-            """
-            SELECT Semester_Id, Year, Semester, UNIX_TIMESTAMP(StartSemester) AS start_unix,
-                   UNIX_TIMESTAMP(EndSemester) AS end_unix
-            FROM Semester
-            WHERE Year = :year AND Semester = :semester
-            LIMIT 1
-        """
+        result = self.connection.execute(
+            _statements["semester"], {"year": year, "semester": semester}
         )
-        result = self.connection.execute(query, {"year": year, "semester": semester})
         row = result.fetchone()
         if not row:
             raise NotFoundError(f"No semester found for {year} and {semester}.")
@@ -680,37 +840,13 @@ class PiptRepository:
             else:
                 from_semester = f"{current['year']-1}-1"
 
-        # Handles whether the starting semester is 1 or 2
         from_year, from_sem = map(int, from_semester.split("-"))
-        if from_sem == 1:
-            semester_condition = f"s.Year >= {from_year}"
-        else:
-            semester_condition = (
-                f"((s.Year={from_year} AND s.Semester=2) OR s.Year >= {from_year + 1})"
-            )
+        params = {"user_id": user_id, "from_year": from_year, "from_semester": from_sem}
 
         # Allocated time & title
-        stmt = text(
-            f"""
-            SELECT Proposal_Code AS proposal_code, Title AS title, SUM(TimeAlloc) AS allocated_time
-            FROM ProposalCode 
-            JOIN ProposalText AS pt ON ProposalCode.ProposalCode_Id = pt.ProposalCode_Id
-            JOIN MultiPartner ON ProposalCode.ProposalCode_Id=MultiPartner.ProposalCode_Id
-            JOIN PriorityAlloc USING (MultiPartner_Id)
-            WHERE MultiPartner.Semester_Id = pt.Semester_Id
-            AND Priority < 4
-            AND Proposal_Code IN (
-                SELECT DISTINCT pco.Proposal_Code FROM ProposalCode AS pco JOIN Proposal AS p USING (ProposalCode_Id)
-                JOIN ProposalContact AS pc ON pco.ProposalCode_Id = pc.ProposalCode_Id
-                JOIN Investigator AS i ON (pc.Leader_Id = i.Investigator_Id) JOIN PiptUser AS pu USING (PiptUser_Id)
-                JOIN Semester AS s ON p.Semester_id = s.Semester_Id
-                WHERE pu.PiptUser_Id = :user_id AND p.Current = 1 AND p.Phase = 2
-                AND {semester_condition}
-            )
-        GROUP BY Proposal_Code
-        """
+        result = self.connection.execute(
+            _statements["previous_proposals_allocated_time"], params
         )
-        result = self.connection.execute(stmt, {"user_id": user_id})
         allocated_times = {}
         titles = {}
         for row in result:
@@ -718,28 +854,9 @@ class PiptRepository:
             titles[row.proposal_code] = row.title
 
         # Observed time
-        sql_observed = text(
-            f"""
-            SELECT Proposal_Code AS proposal_code, SUM(Obstime) AS observed_time
-            FROM Proposal
-            JOIN ProposalCode USING (ProposalCode_Id)
-            JOIN Block USING (Proposal_Id)
-            JOIN BlockVisit USING (Block_Id)
-            JOIN BlockVisitStatus USING (BlockVisitStatus_Id)
-            WHERE BlockVisitStatus = 'Accepted'
-              AND Priority < 4
-              AND Proposal_Code IN (
-                    SELECT DISTINCT pco.Proposal_Code FROM ProposalCode AS pco JOIN Proposal AS p ON pco.ProposalCode_Id = p.ProposalCode_Id
-                    JOIN ProposalContact AS pc ON p.ProposalCode_Id = pc.ProposalCode_Id
-                    JOIN Investigator AS i ON (pc.Leader_Id = i.Investigator_Id) JOIN PiptUser AS pu USING (PiptUser_Id)
-                    JOIN Semester AS s ON p.Semester_id = s.Semester_Id
-                    WHERE pu.PiptUser_Id = :user_id AND p.Current = 1 AND p.Phase = 2
-                    AND {semester_condition}
-              )
-            GROUP BY Proposal_Code
-        """
+        result = self.connection.execute(
+            _statements["previous_proposals_observed_time"], params
         )
-        result = self.connection.execute(sql_observed, {"user_id": user_id})
         observed_times = {row.proposal_code: row.observed_time for row in result}
 
         previous_proposals = []
@@ -758,53 +875,36 @@ class PiptRepository:
     def get_block_visits(self, proposal_code: str) -> List[Dict[str, Any]]:
         """Get block visit records for a given proposal code."""
 
-        query = """
-            SELECT DISTINCT bv.BlockVisit_Id,
-                bc.BlockCode AS BlockCode,
-                b.Block_Name AS BlockName,
-                bvs.BlockVisitStatus AS BlockVisitStatus,
-                b.Priority AS Priority,
-                m.Moon AS Moon,
-                b.ObsTime AS ObservedTime,
-                b.OverheadTime AS OverheadTime,
-                pool.PoolCode AS PoolCode,
-                s.Year AS Year,
-                s.Semester AS Semester
-            FROM BlockVisit AS bv
-            JOIN BlockVisitStatus AS bvs ON (bv.BlockVisitStatus_Id=bvs.BlockVisitStatus_Id)
-            JOIN Block AS b ON (bv.Block_Id=b.Block_Id)
-            JOIN Moon AS m ON (b.Moon_Id=m.Moon_Id)
-            JOIN Proposal AS p ON (b.Proposal_Id=p.Proposal_Id)
-            JOIN ProposalCode AS pc ON (p.ProposalCode_Id=pc.ProposalCode_Id)
-            JOIN Semester AS s ON (p.Semester_Id=s.Semester_Id)
-            LEFT JOIN BlockCode AS bc ON (b.BlockCode_Id=bc.BlockCode_Id)
-            LEFT JOIN BlockPool AS bp ON (b.Block_Id=bp.Block_Id)
-            LEFT JOIN Pool AS pool ON (bp.Pool_Id=pool.Pool_Id)
-            WHERE pc.Proposal_Code = :proposal_code
+        return list(self.iter_block_visits(proposal_code))
+
+    def iter_block_visits(self, proposal_code: str) -> Iterator[Dict[str, Any]]:
         """
+        Generate the block visit records returned by get_block_visits.
 
-        result = self.connection.execute(text(query), {"proposal_code": proposal_code})
-        block_visits = []
+        The rows are read with a server-side cursor, so no other statement may be
+        executed with the connection until all block visits have been generated.
+        """
+
+        result = self.connection.execute(
+            _statements["block_visits"].execution_options(stream_results=True),
+            {"proposal_code": proposal_code},
+        )
 
         for row in result:
             moon = row.Moon
             if moon in ["Dark-Gray", "Bright-Gray"]:
                 moon = "Gray"
-            block_visits.append(
-                {
-                    "block_code": row.BlockCode,
-                    "block_name": row.BlockName,
-                    "block_visit_status": row.BlockVisitStatus,
-                    "priority": row.Priority,
-                    "moon": moon,
-                    "total_time": row.ObservedTime,
-                    "overhead_time": row.OverheadTime,
-                    "pool_code": row.PoolCode,
-                    "semester": f"{row.Year}-{row.Semester}",
-                }
-            )
-
-        return block_visits
+            yield {
+                "block_code": row.BlockCode,
+                "block_name": row.BlockName,
+                "block_visit_status": row.BlockVisitStatus,
+                "priority": row.Priority,
+                "moon": moon,
+                "total_time": row.ObservedTime,
+                "overhead_time": row.OverheadTime,
+                "pool_code": row.PoolCode,
+                "semester": f"{row.Year}-{row.Semester}",
+            }
 
     def get_proposals(
         self,
@@ -939,17 +1039,7 @@ class PiptRepository:
         -------
         The partner details.
         """
-        sql = """
-SELECT P.Partner_Code           AS partner_code,
-       P.Partner_Name           AS partner_name,
-       IName.InstituteName_Name AS institute_name,
-       I.Department             AS department
-FROM Partner P
-         JOIN Institute I ON P.Partner_Id = I.Partner_Id
-         JOIN InstituteName IName ON I.InstituteName_Id = IName.InstituteName_Id
-ORDER BY P.Partner_Code, IName.InstituteName_Name, I.Department
-        """
-        result = self.connection.execute(text(sql))
+        result = self.connection.execute(_statements["partners"])
 
         # Collect the results by partner in a dictionary
         partners_dict = {}
@@ -994,29 +1084,9 @@ ORDER BY P.Partner_Code, IName.InstituteName_Name, I.Department
         """
         if preferred_institute is None:
             preferred_institute = ""
-        # There may be multiple entries with the same email address. If so, we prefer
-        # one who has the given institute name.
-        sql = """
-SELECT PU.PiptUser_Id                                     AS id,
-       I.FirstName                                        AS given_name,
-       I.Surname                                          AS family_name,
-       I.email                                            AS email,
-       I.phone                                            AS phone,
-       InstName.InstituteName_Name                        AS institute,
-       Inst.Department                                    AS department,
-       P.Partner_Name                                     AS partner,
-       IF(InstName.InstituteName_Name = :institute, 1, 0) AS has_preferred_institute
-FROM Investigator I
-         JOIN Institute Inst ON I.Institute_Id = Inst.Institute_Id
-         JOIN InstituteName InstName
-              ON Inst.InstituteName_Id = InstName.InstituteName_Id
-         JOIN Partner P ON Inst.Partner_Id = P.Partner_Id
-         JOIN PiptUser PU ON I.PiptUser_Id = PU.PiptUser_Id
-WHERE I.Email = :email
-ORDER BY has_preferred_institute DESC, I.Investigator_Id DESC;
-        """
         result = self.connection.execute(
-            text(sql), {"email": email, "institute": preferred_institute}
+            _statements["investigator"],
+            {"email": email, "institute": preferred_institute},
         )
         investigator = result.fetchone()
 
@@ -1047,13 +1117,6 @@ ORDER BY has_preferred_institute DESC, I.Investigator_Id DESC;
         Returns
         -------
         """
-
-        sql = """
-    SELECT Pipt
-    FROM PiptVersions
-    ORDER BY DateActive DESC
-    LIMIT 1
-        """
-        result = self.connection.execute(text(sql))
+        result = self.connection.execute(_statements["current_version"])
         version = float(result.scalar_one())
         return {"version": str(round(version, 7))}
@@ -0,0 +1,82 @@
+from typing import Optional
+
+from sqlalchemy.engine import Connection
+
+from saltapi.exceptions import NotFoundError
+from saltapi.repository.cache import cached
+from saltapi.repository.statements import StatementRegistry
+from saltapi.service.proposal import ProposalMetadata
+
+_statements = StatementRegistry()
+
+_statements.register(
+    "proposal_metadata",
+    """
+SELECT PC.ProposalCode_Id AS proposal_code_id,
+       PT.ProposalType    AS proposal_type
+FROM ProposalCode PC
+         LEFT JOIN ProposalGeneralInfo PGI ON PC.ProposalCode_Id = PGI.ProposalCode_Id
+         LEFT JOIN ProposalType PT ON PGI.ProposalType_Id = PT.ProposalType_Id
+WHERE PC.Proposal_Code = :proposal_code
+    """,
+)
+
+_statements.register(
+    "latest_submission",
+    """
+SELECT MAX(P.Submission) AS latest_submission
+FROM Proposal P
+         JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
+WHERE PC.Proposal_Code = :proposal_code
+  AND P.Current = 1
+    """,
+)
+
+
+class ProposalMetadataRepository:
+    """
+    Repository for the basic details of proposals.
+
+    The proposal code id and proposal type are needed by most proposal-related
+    requests (for example, for checking permissions), so they are queried together
+    and cached. They don't change once a proposal has been created, so that it does
+    not matter that the cache is local to the process.
+
+    The latest submission changes with every resubmission, which may be made via
+    another process. It is therefore not cached, but queried whenever it is needed.
+    """
+
+    def __init__(self, connection: Connection) -> None:
+        self.connection = connection
+
+    @cached("proposal_metadata", ttl=300, max_size=10000)
+    def get(self, proposal_code: str) -> ProposalMetadata:
+        """
+        Return the metadata of a proposal.
+
+        A NotFoundError is raised if the proposal code does not exist.
+        """
+        result = self.connection.execute(
+            _statements["proposal_metadata"], {"proposal_code": proposal_code}
+        )
+        row = result.one_or_none()
+        if row is None:
+            raise NotFoundError(f"Couldn't find proposal code '{proposal_code}'")
+
+        return ProposalMetadata(
+            proposal_code_id=int(row.proposal_code_id),
+            proposal_type=row.proposal_type,
+        )
+
+    def latest_submission(self, proposal_code: str) -> Optional[int]:
+        """
+        Return the highest submission number of the current submissions of a proposal.
+
+        None is returned if the proposal has no current submission (or if the proposal
+        code does not exist).
+        """
+        result = self.connection.execute(
+            _statements["latest_submission"], {"proposal_code": proposal_code}
+        )
+        latest_submission = result.scalar_one()
+        return int(latest_submission) if latest_submission is not None else None
@@ -3,17 +3,27 @@ import pathlib
 import re
 from collections import defaultdict
 from datetime import date, datetime, time, timezone
-from typing import Any, DefaultDict, Dict, List, Optional, cast, Literal
+from typing import Any, DefaultDict, Dict, Iterator, List, Literal, Optional, cast
 
 import pytz
 from dateutil.relativedelta import relativedelta
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 from sqlalchemy.engine import Connection
 from sqlalchemy.exc import NoResultFound
 
 from saltapi.exceptions import NotFoundError, ValidationError
 from saltapi.repository.block_repository import BlockRepository
-from saltapi.service.proposal import Proposal, ProposalListItem
+from saltapi.repository.cache import cached, invalidate_cache
+from saltapi.repository.lookup_tables import LookupTable
+from saltapi.repository.proposal_metadata_repository import ProposalMetadataRepository
+from saltapi.repository.statements import StatementRegistry
+from saltapi.repository.user_repository import UserRepository
+from saltapi.service.proposal import (
+    Proposal,
+    ProposalListFilter,
+    ProposalListItem,
+    ProposalText,
+)
 from saltapi.service.user import User
 from saltapi.settings import get_settings
 from saltapi.util import (
@@ -31,7 +41,1303 @@ from saltapi.util import (
     target_type,
     tonight,
 )
-from saltapi.web.schema.proposal import ProposalStatusValue
+from saltapi.web.schema.proposal import ProposalStatusValue
+
+_proposal_statuses = LookupTable(
+    "proposal_statuses",
+    """
+SELECT Status AS value, ProposalStatus_Id AS id
+FROM ProposalStatus
+    """,
+)
+
+# Columns by which proposal lists can be sorted, and the SQL expressions for them.
+# Ties are broken by the proposal id.
+PROPOSAL_LIST_SORT_COLUMNS = {
+    "id": "P.Proposal_Id",
+    "proposal_code": "PC.Proposal_Code",
+    "semester": "CONCAT(S.Year, '-', S.Semester)",
+    "title": "PT.Title",
+}
+
+# The ids of the current proposals which a user may view, in the order of the list.
+# Only the tables needed for filtering and sorting are joined, and each of them has
+# (at most) one row per proposal, so that no duplicate rows can arise. The filters
+# and order are filled in by the _list method.
+_LISTED_PROPOSAL_IDS_SQL = """
+SELECT P.Proposal_Id AS id
+FROM Proposal P
+         JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
+         JOIN ProposalGeneralInfo PGI ON PC.ProposalCode_Id = PGI.ProposalCode_Id
+         JOIN ProposalText PT ON PC.ProposalCode_Id = PT.ProposalCode_Id AND
+                                 P.Semester_Id = PT.Semester_Id
+         JOIN ProposalType T ON PGI.ProposalType_Id = T.ProposalType_Id
+         JOIN Semester S ON P.Semester_Id = S.Semester_Id
+         JOIN ProposalContact C ON PC.ProposalCode_Id = C.ProposalCode_Id
+WHERE P.Current = 1
+  AND CONCAT(S.Year, '-', S.Semester) BETWEEN :from_semester AND :to_semester
+  AND PGI.ProposalStatus_Id != :deleted_status_id
+  AND (
+    -- The user is allowed to view all proposals
+            :may_view_all_proposals = 1
+        OR
+        -- The user is an investigator on the proposal, the proposal is requesting time
+        -- from a TAC to which the user belongs, or the user has been granted
+        -- permission to view the proposal
+            PC.Proposal_Code IN :proposal_codes
+        OR
+        -- The proposal is a Gravitational Wave Event and the user is affiliated to
+        -- a SALT partner
+            (:is_partner_affiliated = 1 AND T.ProposalType = 'Gravitational Wave Event')
+    )
+{filters}
+ORDER BY {order_by}
+LIMIT :limit
+"""
+
+# The summaries of the proposals with given ids, in the order of the list
+_PROPOSAL_SUMMARIES_SQL = """
+SELECT P.Proposal_Id                   AS id,
+       PC.Proposal_Code                AS proposal_code,
+       CONCAT(S.Year, '-', S.Semester) AS semester,
+       PT.Title                        AS title,
+       P.Phase                         AS phase,
+       PS.Status                       AS status,
+       PGI.StatusComment               AS comment,
+       T.ProposalType                  AS proposal_type,
+       Leader.PiptUser_Id              AS pi_user_id,
+       Leader.FirstName                AS pi_given_name,
+       Leader.Surname                  AS pi_family_name,
+       Leader.Email                    AS pi_email,
+       Contact.PiptUser_Id             AS pc_user_id,
+       Contact.FirstName               AS pc_given_name,
+       Contact.Surname                 AS pc_family_name,
+       Contact.Email                   AS pc_email,
+       Astronomer.PiptUser_Id          AS la_user_id,
+       Astronomer.FirstName            AS la_given_name,
+       Astronomer.Surname              AS la_family_name,
+       Astronomer.Email                AS la_email
+FROM Proposal P
+         JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
+         JOIN ProposalGeneralInfo PGI ON PC.ProposalCode_Id = PGI.ProposalCode_Id
+         JOIN ProposalText PT ON PC.ProposalCode_Id = PT.ProposalCode_Id AND
+                                 P.Semester_Id = PT.Semester_Id
+         JOIN Semester S ON P.Semester_Id = S.Semester_Id
+         JOIN ProposalStatus PS ON PGI.ProposalStatus_Id = PS.ProposalStatus_Id
+         JOIN ProposalType T ON PGI.ProposalType_Id = T.ProposalType_Id
+         JOIN ProposalContact C ON PC.ProposalCode_Id = C.ProposalCode_Id
+         LEFT JOIN Investigator Astronomer
+                   ON C.Astronomer_Id = Astronomer.Investigator_Id
+         JOIN Investigator Contact ON C.Contact_Id = Contact.Investigator_Id
+         JOIN Investigator Leader ON C.Leader_Id = Leader.Investigator_Id
+WHERE P.Proposal_Id IN :proposal_ids
+ORDER BY {order_by}
+"""
+
+_statements = StatementRegistry()
+
+_statements.register(
+    "proposal_types",
+    """
+SELECT PC.Proposal_Code AS proposal_code, PT.ProposalType AS proposal_type
+FROM ProposalType PT
+         JOIN ProposalGeneralInfo PGI ON PT.ProposalType_Id = PGI.ProposalType_Id
+         JOIN ProposalCode PC ON PGI.ProposalCode_Id = PC.ProposalCode_Id
+WHERE PC.Proposal_Code IN :proposal_codes
+    """,
+    bindparam("proposal_codes", expanding=True),
+)
+
+# The latest proposal text of the proposals which have not been deleted
+_PROPOSAL_TEXTS_SQL = """
+SELECT PC.Proposal_Code                AS proposal_code,
+       CONCAT(S.Year, '-', S.Semester) AS semester,
+       PT.Title                        AS title,
+       PT.Abstract                     AS abstract,
+       PT.ReadMe                       AS read_me
+FROM ProposalText PT
+         JOIN ProposalCode PC ON PT.ProposalCode_Id = PC.ProposalCode_Id
+         JOIN Semester S ON PT.Semester_Id = S.Semester_Id
+         JOIN ProposalGeneralInfo PGI ON PC.ProposalCode_Id = PGI.ProposalCode_Id
+         JOIN (SELECT PT2.ProposalCode_Id,
+                      MAX(S2.Year * 10 + S2.Semester) AS latest_semester
+               FROM ProposalText PT2
+                        JOIN Semester S2 ON PT2.Semester_Id = S2.Semester_Id
+               GROUP BY PT2.ProposalCode_Id) Latest
+              ON PT.ProposalCode_Id = Latest.ProposalCode_Id
+                  AND S.Year * 10 + S.Semester = Latest.latest_semester
+WHERE PGI.ProposalStatus_Id != :deleted_status_id
+"""
+
+_statements.register("proposal_texts", _PROPOSAL_TEXTS_SQL)
+
+_statements.register(
+    "proposal_texts_for_codes",
+    _PROPOSAL_TEXTS_SQL + "  AND PC.Proposal_Code IN :proposal_codes",
+    bindparam("proposal_codes", expanding=True),
+)
+
+_statements.register(
+    "semesters",
+    """
+SELECT DISTINCT CONCAT(S.Year, '-', S.Semester) AS semester 
+FROM MultiPartner MP
+    JOIN Semester S ON MP.Semester_Id = S.Semester_Id
+    JOIN ProposalCode PC ON MP.ProposalCode_Id = PC.ProposalCode_Id
+WHERE PC.Proposal_Code = :proposal_code
+ORDER BY S.Year, S.Semester;
+    """,
+)
+
+_statements.register(
+    "phases",
+    """
+SELECT DISTINCT P.Phase
+FROM ProposalCode PC
+JOIN Proposal P ON PC.ProposalCode_Id = P.ProposalCode_Id
+WHERE PC.Proposal_Code = :proposal_code
+ORDER BY P.Phase
+    """,
+)
+
+_statements.register(
+    "latest_submission_semester",
+    """
+SELECT CONCAT(S.Year, '-', S.Semester) AS semester
+FROM Proposal P
+         JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
+         JOIN Semester S ON P.Semester_Id = S.Semester_Id
+WHERE PC.Proposal_Code = :proposal_code
+  AND P.Current = 1
+ORDER BY S.Year DESC, S.Semester DESC
+LIMIT 1
+    """,
+)
+
+_statements.register(
+    "latest_submission_phase",
+    """
+SELECT P.Phase
+FROM Proposal P
+         JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
+WHERE Proposal_Code = :proposal_code
+ORDER BY P.Submission DESC
+LIMIT 1
+    """,
+)
+
+_statements.register(
+    "first_submission_date",
+    """
+SELECT P.SubmissionDate AS submission_date
+FROM Proposal P
+         JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
+WHERE PC.Proposal_Code = :proposal_code
+  AND P.Submission = 1;
+    """,
+)
+
+_statements.register(
+    "latest_submission_date",
+    """
+SELECT P.SubmissionDate
+FROM Proposal P
+         JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
+WHERE PC.Proposal_Code = :proposal_code
+ORDER BY P.Submission DESC
+LIMIT 1
+    """,
+)
+
+_statements.register(
+    "proposal_text",
+    """
+SELECT
+    PT.Title                            AS title,
+    PT.Abstract                         AS abstract,
+    PT.ReadMe                           AS summary_for_salt_astronomer,
+    PT.NightlogSummary                  AS summary_for_night_log
+FROM ProposalText PT
+         JOIN ProposalCode PC ON PT.ProposalCode_Id = PC.ProposalCode_Id
+         JOIN Semester S ON PT.Semester_Id = S.Semester_Id
+WHERE PC.Proposal_Code = :proposal_code
+  AND CONCAT(S.Year, '-', S.Semester) <= :semester
+ORDER BY S.Year, S.Semester DESC
+LIMIT 1;
+    """,
+)
+
+_statements.register(
+    "proposal_general_info",
+    """
+SELECT 
+    P.Submission                        AS submission_number,
+    T.ProposalType                      AS proposal_type,
+    PS.Status                           AS status,
+    PGI.StatusComment                   AS comment,
+    PGI.ActOnAlert                      AS target_of_opportunity,
+    P.TotalReqTime                      AS total_requested_time,
+    PGI.ProprietaryPeriod               AS proprietary_period,
+    I.PiptUser_Id                       AS astronomer_user_id,
+    I.FirstName                         AS astronomer_given_name,
+    I.Surname                           AS astronomer_family_name,
+    I.Email                             AS astronomer_email,
+    PGI.TimeRestricted                  AS is_time_restricted,
+    P1T.Reason						    AS too_reason,
+    I.PiptUser_Id                       AS liaison_salt_astronomer_id,
+    IF(PGI.P4 IS NOT NULL,
+      PGI.P4,
+      0)                               AS is_p4,
+    IF(PSA.PiPcMayActivate IS NOT NULL,
+      PSA.PiPcMayActivate,
+      0)                               AS self_activatable
+FROM Proposal P
+    JOIN Semester S ON P.Semester_Id = S.Semester_Id
+    JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
+    JOIN ProposalGeneralInfo PGI ON PC.ProposalCode_Id = PGI.ProposalCode_Id
+    JOIN ProposalType T ON PGI.ProposalType_Id = T.ProposalType_Id
+    JOIN ProposalStatus PS ON PGI.ProposalStatus_Id = PS.ProposalStatus_Id
+    JOIN ProposalContact C ON PC.ProposalCode_Id = C.ProposalCode_Id
+    LEFT JOIN Investigator I ON C.Astronomer_Id = I.Investigator_Id
+    LEFT JOIN ProposalSelfActivation PSA ON P.ProposalCode_Id = PSA.ProposalCode_Id
+    LEFT JOIN P1ToO P1T ON P.ProposalCode_Id = P1T.ProposalCode_Id
+WHERE PC.Proposal_Code = :proposal_code
+    AND P.Current = 1
+    AND CONCAT(S.Year, '-', S.Semester) <= :semester
+    ORDER BY S.Year DESC, S.Semester DESC, P.Submission DESC
+    LIMIT 1
+    """,
+)
+
+_statements.register(
+    "deadlines_and_submissions",
+    """
+SELECT
+    P.SubmissionDate        AS submission_date,
+    P.Submission            AS submission_number,
+    SP.Deadline             AS deadline
+FROM Proposal P
+    JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
+    JOIN Semester S ON S.Semester_Id=P.Semester_Id
+    JOIN SemesterPhase SP ON SP.Semester_Id = S.Semester_Id
+WHERE P.Phase = 1
+    AND SP.Phase = 1
+    AND CONCAT(S.Year, '-', S.Semester) = :semester
+    AND PC.Proposal_Code = :proposal_code
+    """,
+)
+
+_statements.register(
+    "investigators",
+    """
+SELECT
+    PU.PiptUser_Id          AS id,
+    I.FirstName             AS given_name,
+    I.Surname               AS family_name,
+    I.Email                 AS email,
+    P.Partner_Code          AS partner_code,
+    P.Partner_Name          AS partner_name,
+    `IN`.InstituteName_Name AS institution_name,
+    I2.Institute_Id         AS institution_id,
+    I2.Department           AS department,
+    PI.InvestigatorOkay     AS investigator_okay,
+    PI.ApprovalCode         AS approval_code,
+    ThesisType		        AS thesis_type,
+    ThesisDescr		        AS relevance_of_proposal,
+    CompletionYear	        AS year_of_completion
+FROM ProposalInvestigator PI
+    JOIN Investigator I ON PI.Investigator_Id = I.Investigator_Id
+    JOIN PiptUser PU ON I.PiptUser_Id = PU.PiptUser_Id
+    JOIN Institute I2 ON I.Institute_Id = I2.Institute_Id
+    JOIN Partner P ON I2.Partner_Id = P.Partner_Id
+    JOIN InstituteName `IN` ON I2.InstituteName_Id = `IN`.InstituteName_Id
+    JOIN ProposalCode PC ON PI.ProposalCode_Id = PC.ProposalCode_Id
+    LEFT JOIN P1Thesis PT ON PC.ProposalCode_Id = PT.ProposalCode_Id
+        AND PT.Student_Id = I.Investigator_Id
+    LEFT JOIN ThesisType TT ON PT.ThesisType_Id = TT.ThesisType_Id
+WHERE PC.Proposal_Code = :proposal_code
+ORDER BY I.Surname, I.FirstName
+    """,
+)
+
+_statements.register(
+    "principal_investigator_user_id",
+    """
+SELECT I.PiptUser_Id
+FROM ProposalContact PC
+         JOIN Investigator I ON PC.Leader_Id = I.Investigator_Id
+         JOIN ProposalCode P ON PC.ProposalCode_Id = P.ProposalCode_Id
+WHERE P.Proposal_Code = :proposal_code
+    """,
+)
+
+_statements.register(
+    "principal_contact_user_id",
+    """
+SELECT I.PiptUser_Id
+FROM ProposalContact PC
+         JOIN Investigator I ON PC.Contact_Id = I.Investigator_Id
+         JOIN ProposalCode P ON PC.ProposalCode_Id = P.ProposalCode_Id
+WHERE P.Proposal_Code = :proposal_code
+    """,
+)
+
+_statements.register(
+    "blocks",
+    """
+SELECT B.Block_Id                      AS id,
+       CONCAT(S.Year, '-', S.Semester) AS semester,
+       B.Block_Name                    AS name,
+       BS.BlockStatus                  AS status,
+       B.BlockStatusReason             AS reason,
+       B.ObsTime                       AS observation_time,
+       B.Priority                      AS priority,
+       B.NVisits                       AS requested_observations,
+       B.NDone                         AS accepted_observations,
+       B.NAttempted                    AS rejected_observations,
+       B.MinSeeing                     AS minimum_seeing,
+       B.MaxSeeing                     AS maximum_seeing,
+       T.Transparency                  AS transparency,
+       B.MinLunarAngularDistance       AS minimum_lunar_distance,
+       B.MaxLunarPhase                 AS maximum_lunar_phase
+FROM Block B
+         JOIN Transparency T ON B.Transparency_Id = T.Transparency_Id
+         JOIN BlockStatus BS ON B.BlockStatus_Id = BS.BlockStatus_Id
+         JOIN Proposal P ON B.Proposal_Id = P.Proposal_Id
+         JOIN Semester S ON P.Semester_Id = S.Semester_Id
+         JOIN ProposalCode PC ON B.ProposalCode_Id = PC.ProposalCode_Id
+WHERE BS.BlockStatus NOT IN :excluded_status_values
+  AND PC.Proposal_Code = :proposal_code
+  AND S.Year = :year
+  AND S.Semester = :semester
+    """,
+)
+
+_statements.register(
+    "block_visits",
+    """
+SELECT
+    BV.BlockVisit_Id                            AS id,
+    BV.Block_Id                                 AS block_id,
+    B.Block_Name                                AS block_name,
+    B.ObsTime                                   AS observation_time,
+    B.Priority                                  AS priority,
+    B.MaxLunarPhase                             AS maximum_lunar_phase,
+    NI.Date                                     AS night,
+    BVS.BlockVisitStatus                        AS status,
+    BRR.RejectedReason                          AS rejection_reason,
+    CONCAT(S.Year, '-', S.Semester)			    AS semester
+FROM BlockVisit BV
+    JOIN BlockVisitStatus BVS ON BV.BlockVisitStatus_Id = BVS.BlockVisitStatus_Id
+    LEFT JOIN BlockRejectedReason BRR
+           ON BV.BlockRejectedReason_Id = BRR.BlockRejectedReason_Id
+    JOIN NightInfo NI ON BV.NightInfo_Id = NI.NightInfo_Id
+    JOIN Block B ON BV.Block_Id = B.Block_Id
+    JOIN ProposalCode PC ON B.ProposalCode_Id = PC.ProposalCode_Id
+    JOIN Proposal P ON P.Proposal_Id = B.Proposal_Id
+    JOIN Semester S ON S.Semester_Id = P.Semester_Id
+WHERE PC.Proposal_Code = :proposal_code
+    AND BVS.BlockVisitStatus != 'Deleted'
+ORDER BY B.Block_Name, NI.Date
+    """,
+)
+
+_statements.register(
+    "block_targets",
+    """
+SELECT B.Block_Id       AS block_id,
+       GROUP_CONCAT(
+            DISTINCT T.Target_Name ORDER BY T.Target_Name SEPARATOR :separator
+        )               AS targets
+FROM Target T
+         JOIN Observation O ON T.Target_Id = O.Target_Id
+         JOIN Pointing P ON O.Pointing_Id = P.Pointing_Id
+         JOIN Block B ON P.Block_Id = B.Block_Id
+         JOIN BlockStatus BS ON B.BlockStatus_Id = BS.BlockStatus_Id
+         JOIN ProposalCode PC ON B.ProposalCode_Id = PC.ProposalCode_Id
+WHERE PC.Proposal_Code = :proposal_code
+GROUP BY B.Block_Id
+    """,
+)
+
+_statements.register(
+    "block_salticam_configurations",
+    """
+SELECT B.Block_Id AS block_id
+FROM ObsConfig OC
+         JOIN PayloadConfig PC ON OC.PayloadConfig_Id = PC.PayloadConfig_Id
+         JOIN PayloadConfigType PCT
+            ON PC.PayloadConfigType_Id = PCT.PayloadConfigType_Id
+         JOIN TelescopeConfigObsConfig TCOC
+            ON OC.ObsConfig_Id = TCOC.PlannedObsConfig_Id
+         JOIN Pointing P ON TCOC.Pointing_Id = P.Pointing_Id
+         JOIN Block B ON P.Block_Id = B.Block_Id
+         JOIN ProposalCode C ON B.ProposalCode_Id = C.ProposalCode_Id
+WHERE C.Proposal_Code = :proposal_code
+  AND OC.SalticamPattern_Id IS NOT NULL
+  AND PCT.Type != 'Acquisition'
+    """,
+)
+
+_statements.register(
+    "block_rss_configurations",
+    """
+SELECT B.Block_Id AS block_id,
+       GROUP_CONCAT(DISTINCT RM.Mode ORDER BY RM.Mode SEPARATOR :separator) AS modes,
+       GROUP_CONCAT(DISTINCT RG.Grating ORDER BY RG.Grating SEPARATOR :separator) AS gratings,
+       GROUP_CONCAT(DISTINCT RF.Barcode  ORDER BY RF.Barcode  SEPARATOR :separator) AS filters
+FROM RssMode RM
+         JOIN RssConfig RC ON RM.RssMode_Id = RC.RssMode_Id
+         JOIN Rss R ON RC.RssConfig_Id = R.RssConfig_Id
+         JOIN RssFilter RF ON RC.RssFilter_Id = RF.RssFilter_Id
+         JOIN RssPatternDetail RPD ON R.Rss_Id = RPD.Rss_Id
+         JOIN RssPattern RP ON RPD.RssPattern_Id = RP.RssPattern_Id
+         JOIN ObsConfig OC ON RP.RssPattern_Id = OC.RssPattern_Id
+         JOIN TelescopeConfigObsConfig TCOC
+            ON OC.ObsConfig_Id = TCOC.PlannedObsConfig_Id
+         JOIN Pointing P ON TCOC.Pointing_Id = P.Pointing_Id
+         JOIN Block B ON P.Block_Id = B.Block_Id
+         JOIN ProposalCode PC ON B.ProposalCode_Id = PC.ProposalCode_Id
+         LEFT JOIN RssSpectroscopy RS ON RC.RssSpectroscopy_Id = RS.RssSpectroscopy_Id
+         LEFT JOIN RssGrating RG ON RS.RssGrating_Id = RG.RssGrating_Id
+WHERE PC.Proposal_Code = :proposal_code
+GROUP BY B.Block_Id
+    """,
+)
+
+_statements.register(
+    "block_hrs_configurations",
+    """
+SELECT B.Block_Id AS block_id,
+       GROUP_CONCAT(
+            DISTINCT HM.ExposureMode ORDER BY HM.ExposureMode SEPARATOR :separator
+        ) AS modes
+FROM HrsMode HM
+         JOIN HrsConfig HC ON HM.HrsMode_Id = HC.HrsMode_Id
+         JOIN Hrs H ON HC.HrsConfig_Id = H.HrsConfig_Id
+         JOIN HrsPatternDetail HPD ON H.Hrs_Id = HPD.Hrs_Id
+         JOIN HrsPattern HP ON HPD.HrsPattern_Id = HP.HrsPattern_Id
+         JOIN ObsConfig OC ON HP.HrsPattern_Id = OC.HrsPattern_Id
+         JOIN TelescopeConfigObsConfig TCOC
+         ON OC.ObsConfig_Id = TCOC.PlannedObsConfig_Id
+         JOIN Pointing P ON TCOC.Pointing_Id = P.Pointing_Id
+         JOIN Block B ON P.Block_Id = B.Block_Id
+         JOIN ProposalCode PC ON B.ProposalCode_Id = PC.ProposalCode_Id
+WHERE PC.Proposal_Code = :proposal_code
+GROUP BY B.Block_Id
+    """,
+)
+
+_statements.register(
+    "block_bvit_configurations",
+    """
+SELECT B.Block_Id AS block_id
+FROM ObsConfig OC
+         JOIN TelescopeConfigObsConfig TCOC
+         ON OC.ObsConfig_Id = TCOC.PlannedObsConfig_Id
+         JOIN Pointing P ON TCOC.Pointing_Id = P.Pointing_Id
+         JOIN Block B ON P.Block_Id = B.Block_Id
+         JOIN ProposalCode C ON B.ProposalCode_Id = C.ProposalCode_Id
+WHERE C.Proposal_Code = :proposal_code
+  AND OC.BvitPattern_Id IS NOT NULL
+    """,
+)
+
+_statements.register(
+    "block_nir_configurations",
+    """
+SELECT B.Block_Id                                                                                   AS block_id,
+       GROUP_CONCAT(DISTINCT NG.Grating ORDER BY NG.Grating SEPARATOR :separator) AS gratings,
+       GROUP_CONCAT(DISTINCT NF.NirFilter  ORDER BY NF.NirFilter  SEPARATOR :separator) AS filters
+FROM Nir N
+         JOIN NirConfig NC ON N.NirConfig_Id = NC.NirConfig_Id
+         LEFT JOIN NirGrating NG ON NC.NirGrating_Id = NG.NirGrating_Id
+         JOIN NirFilter NF ON NC.NirFilter_Id = NF.NirFilter_Id
+         JOIN NirPatternDetail NPD ON N.Nir_Id = NPD.Nir_Id
+         JOIN NirProcedure NP ON N.NirProcedure_Id = NP.NirProcedure_Id
+         JOIN NirDitherPatternStep NDPS
+              ON NP.NirDitherPattern_Id = NDPS.NirDitherPattern_Id
+         JOIN NirExposureType NET ON NDPS.NirExposureType_Id = NET.NirExposureType_Id
+         JOIN ObsConfig OC ON NPD.NirPattern_Id = OC.NirPattern_Id
+         JOIN TelescopeConfigObsConfig TCOC
+              ON OC.ObsConfig_Id = TCOC.PlannedObsConfig_Id
+         JOIN Pointing P ON TCOC.Pointing_Id = P.Pointing_Id
+         JOIN Block B ON P.Block_Id = B.Block_Id
+         JOIN ProposalCode PC ON B.ProposalCode_Id = PC.ProposalCode_Id
+WHERE PC.Proposal_Code = :proposal_code
+GROUP BY B.Block_Id
+    """,
+)
+
+_statements.register(
+    "allocations",
+    """
+SELECT P.Partner_Code    AS partner_code,
+       PA.Priority       AS priority,
+       SUM(PA.TimeAlloc) AS time_allocation
+FROM PriorityAlloc PA
+         JOIN MultiPartner MP ON PA.MultiPartner_Id = MP.MultiPartner_Id
+         JOIN ProposalCode PC ON MP.ProposalCode_Id = PC.ProposalCode_Id
+         JOIN Semester S ON MP.Semester_Id = S.Semester_Id
+         JOIN Partner P ON MP.Partner_Id = P.Partner_Id
+WHERE PC.Proposal_Code = :proposal_code
+  AND S.Year = :year
+  AND S.Semester = :semester
+GROUP BY PA.MultiPartner_Id, PA.Priority
+    """,
+)
+
+_statements.register(
+    "tac_comments",
+    """
+SELECT P.Partner_Code AS partner_code,
+       TPC.TacComment AS tac_comment
+FROM TacProposalComment TPC
+         JOIN MultiPartner MP ON TPC.MultiPartner_Id = MP.MultiPartner_Id
+         JOIN Partner P ON MP.Partner_Id = P.Partner_Id
+         JOIN ProposalCode PC ON MP.ProposalCode_Id = PC.ProposalCode_Id
+         JOIN Semester S ON MP.Semester_Id = S.Semester_Id
+WHERE PC.Proposal_Code = :proposal_code
+  AND S.Year = :year
+  AND S.Semester = :semester
+    """,
+)
+
+_statements.register(
+    "charged_time",
+    """
+SELECT B.Priority AS priority, SUM(B.ObsTime) AS charged_time
+FROM BlockVisit BV
+    JOIN BlockVisitStatus BVS ON BV.BlockVisitStatus_Id = BVS.BlockVisitStatus_Id
+    JOIN Block B ON BV.Block_Id = B.Block_Id
+    JOIN Proposal P ON B.Proposal_Id = P.Proposal_Id
+    JOIN ProposalCode PC ON B.ProposalCode_Id = PC.ProposalCode_Id
+    JOIN Semester S ON P.Semester_Id = S.Semester_Id
+WHERE PC.Proposal_Code = :proposal_code
+    AND S.Year = :year
+    AND S.Semester = :semester
+    AND BVS.BlockVisitStatus = 'Accepted'
+GROUP BY B.Priority
+    """,
+)
+
+# There may be multiple observing windows for a block in a night. But if we
+# shift all times by 12 hours, all windows in the same night end up with the
+# same date. The number of nights is then the number of distinct dates.
+_statements.register(
+    "block_observable_nights",
+    """
+SELECT B.Block_Id                                                           AS block_id,
+       COUNT(DISTINCT DATE(DATE_SUB(BVW.VisibilityStart, INTERVAL 12 HOUR))) AS nights
+FROM BlockVisibilityWindow BVW
+         JOIN BlockVisibilityWindowType BVWT
+         ON BVW.BlockVisibilityWindowType_Id = BVWT.BlockVisibilityWindowType_Id
+         JOIN Block B ON BVW.Block_Id = B.Block_Id
+         JOIN Proposal P ON B.Proposal_Id = P.Proposal_Id
+         JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
+         JOIN Semester S ON P.Semester_Id = S.Semester_Id
+WHERE PC.Proposal_Code = :proposal_code
+  AND S.Year = :year
+  AND S.Semester = :semester
+  AND BVW.VisibilityStart BETWEEN :start AND :end
+  AND BVWT.BlockVisibilityWindowType='Strict'
+GROUP BY B.Block_Id
+    """,
+)
+
+_statements.register(
+    "observation_comments",
+    """
+SELECT PC.ProposalComment_Id               AS id,
+       PC.CommentDate                      AS comment_date,
+       CONCAT(I.FirstName, ' ', I.Surname) AS author,
+       PC.ProposalComment                  AS comment
+FROM ProposalComment PC
+         JOIN Investigator I ON PC.Investigator_Id = I.Investigator_Id
+         JOIN ProposalCode P ON PC.ProposalCode_Id = P.ProposalCode_Id
+WHERE P.Proposal_Code = :proposal_code
+ORDER BY PC.CommentDate, PC.ProposalComment_Id
+    """,
+)
+
+_statements.register(
+    "add_observation_comment",
+    """
+INSERT INTO ProposalComment(
+    ProposalCode_Id,
+    CommentDate,
+    Investigator_Id,
+    ProposalComment
+)
+VALUES (
+    (SELECT ProposalCode_Id FROM ProposalCode WHERE Proposal_Code = :proposal_code),
+    :date,
+    (SELECT Investigator_Id FROM PiptUser WHERE Username = :username),
+    :comment
+)
+    """,
+)
+
+_statements.register(
+    "observation_comment",
+    """
+SELECT PC.ProposalComment_Id               AS id,
+       PC.CommentDate                      AS comment_date,
+       CONCAT(I.FirstName, ' ', I.Surname) AS author,
+       PC.ProposalComment                  AS comment
+FROM ProposalComment PC
+         JOIN Investigator I ON PC.Investigator_Id = I.Investigator_Id
+         JOIN ProposalCode P ON PC.ProposalCode_Id = P.ProposalCode_Id
+WHERE PC.ProposalComment_Id = :proposal_comment_id
+    """,
+)
+
+_statements.register(
+    "proposal_status",
+    """
+SELECT
+    PS.Status 			AS `status`,
+    PGI.StatusComment 	AS `comment`
+FROM ProposalGeneralInfo PGI
+         JOIN ProposalStatus PS ON PS.ProposalStatus_Id = PGI.ProposalStatus_Id
+         JOIN ProposalCode PC ON PGI.ProposalCode_Id = PC.ProposalCode_Id
+WHERE PC.Proposal_Code = :proposal_code
+    """,
+)
+
+_statements.register(
+    "update_proposal_status",
+    """
+UPDATE ProposalGeneralInfo  PGI
+SET
+    PGI.ProposalStatus_Id = :status_id,
+    PGI.StatusComment = :status_comment
+WHERE ProposalCode_Id = :proposal_code_id;
+    """,
+)
+
+_statements.register(
+    "is_self_activatable",
+    """
+SELECT PSA.PiPcMayActivate
+FROM ProposalSelfActivation PSA
+         JOIN ProposalCode PC ON PSA.ProposalCode_Id = PC.ProposalCode_Id
+WHERE PC.Proposal_Code = :proposal_code;
+    """,
+)
+
+_statements.register(
+    "current_version",
+    """
+SELECT MAX(Submission) AS version
+FROM Proposal P
+JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
+WHERE PC.Proposal_Code = :proposal_code AND P.Phase IN :phases
+    """,
+)
+
+_statements.register(
+    "current_phase1_version",
+    """
+SELECT COUNT(Submission) AS version
+FROM Proposal P
+JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
+WHERE PC.Proposal_Code = :proposal_code AND P.Phase = 1
+    """,
+)
+
+_statements.register(
+    "insert_or_update_proposal_progress",
+    """
+INSERT INTO ProposalProgress (
+    ProposalCode_Id,
+    Semester_Id,
+    TimeRequestChangeReasons,
+    StatusSummary,
+    StrategyChanges,
+    ReportPath,
+    SupplementaryPath,
+    SubmissionDate
+)
+VALUES(
+    (SELECT ProposalCode_Id FROM ProposalCode WHERE Proposal_Code = :proposal_code),
+    (SELECT Semester_Id FROM Semester WHERE CONCAT(`Year`, '-', Semester) = :semester),
+    :change_reason,
+    :summary_of_proposal_status,
+    :strategy_changes,
+    :report_path,
+    :supplementary_path,
+    NOW()
+) ON DUPLICATE KEY UPDATE
+    TimeRequestChangeReasons = :change_reason,
+    StatusSummary = :summary_of_proposal_status,
+    StrategyChanges = :strategy_changes,
+    ReportPath = :report_path,
+    SupplementaryPath = :supplementary_path,
+    SubmissionDate = NOW()
+;
+    """,
+)
+
+_statements.register(
+    "reset_partner_requested_time_and_percentages",
+    """
+UPDATE MultiPartner
+SET ReqTimeAmount=:requested_time,
+    ReqTimePercent=0
+WHERE ProposalCode_Id =
+      (SELECT ProposalCode_Id FROM ProposalCode WHERE Proposal_Code = :proposal_code)
+  AND Semester_Id =
+      (SELECT Semester_Id FROM Semester WHERE CONCAT(Year, '-', semester) = :semester);
+    """,
+)
+
+_statements.register(
+    "insert_or_update_requested_time",
+    """
+INSERT INTO MultiPartner(
+    ProposalCode_Id,
+    Partner_Id,
+    Semester_Id,
+    ReqTimePercent,
+    ReqTimeAmount
+)
+VALUES (
+    (SELECT ProposalCode_Id FROM ProposalCode WHERE Proposal_Code = :proposal_code),
+    (SELECT Partner_Id FROM Partner WHERE Partner_Code = :partner_code),
+    (SELECT Semester_Id FROM Semester WHERE CONCAT(`Year`, '-', Semester) = :semester),
+    :requested_time_percent,
+    :requested_time_amount
+) ON DUPLICATE KEY UPDATE
+    ReqTimePercent = :requested_time_percent,
+    ReqTimeAmount = :requested_time_amount
+    """,
+)
+
+_statements.register(
+    "insert_or_update_observing_conditions",
+    """
+INSERT INTO P1ObservingConditions (
+    ProposalCode_Id,
+    Semester_Id,
+    MaxSeeing,
+    Transparency_Id,
+    ObservingConditionsDescription
+)
+VALUES
+(
+    (SELECT ProposalCode_Id FROM ProposalCode WHERE Proposal_Code = :proposal_code),
+    (SELECT Semester_Id FROM Semester WHERE CONCAT(`Year`, '-', Semester) = :semester),
+    :maximum_seeing,
+    (SELECT Transparency_Id FROM Transparency WHERE Transparency = :transparency),
+    :observing_conditions_description
+) ON DUPLICATE KEY UPDATE
+    MaxSeeing = :maximum_seeing,
+    Transparency_Id = (SELECT Transparency_Id FROM Transparency WHERE Transparency = :transparency),
+    ObservingConditionsDescription = :observing_conditions_description
+    """,
+)
+
+# It would be tempting to use a WHERE condition like "semester <= :semester".
+# However, the alias "semester" is not known to the WHERE clause, and hence
+# "semester" would be interpreted as the Semester column of the Semester table,
+# leading to incorrect results.
+_statements.register(
+    "latest_observing_conditions",
+    """
+SELECT
+    CONCAT(S.`Year`, '-', S.Semester)   AS semester,
+    MaxSeeing						    AS seeing,
+    Transparency					    AS transparency,
+    ObservingConditionsDescription	    AS description
+FROM P1ObservingConditions AS OC
+    JOIN Transparency AS T ON (OC.Transparency_Id = T.Transparency_Id)
+    JOIN ProposalCode AS PC ON (OC.ProposalCode_Id = PC.ProposalCode_Id)
+    JOIN Semester AS S ON (OC.Semester_Id = S.Semester_Id)
+WHERE PC.Proposal_Code = :proposal_code
+    AND (S.`Year` < :year OR (S.`Year` = :year AND S.Semester <= :sem))
+ORDER BY semester DESC;
+    """,
+)
+
+_statements.register(
+    "observed_p0_to_p3_time",
+    """
+SELECT
+    CONCAT(S.`Year`, '-', S.Semester) AS semester,
+    SUM(Obstime)                AS observed_time
+FROM Proposal		    AS P
+    JOIN ProposalCode 	AS PC USING (ProposalCode_Id)
+    JOIN `Block` 		AS B USING (Proposal_Id)
+    JOIN BlockVisit 	AS BV USING (Block_Id)
+    JOIN BlockVisitStatus AS BVS USING (BlockVisitStatus_Id)
+    JOIN Semester 		AS S ON (P.Semester_Id = S.Semester_Id)
+WHERE BlockVisitStatus = 'Accepted'
+    AND B.Priority < 4
+    AND Proposal_Code = :proposal_code
+    GROUP BY S.Semester_Id
+    """,
+)
+
+# ReqTimeAmount is the total amount of time requested by a proposal per semester
+# for all partners combined; hence there is no need to sum its value.
+_statements.register(
+    "allocated_and_requested_time",
+    """
+SELECT
+    CONCAT(S.`Year`, '-', S.Semester) AS semester,
+    ReqTimeAmount 	AS requested_time,
+    SUM(IF(TimeAlloc IS NULL, 0, TimeAlloc)) 	AS allocated_time
+FROM MultiPartner 	AS MP
+    LEFT JOIN PriorityAlloc 	AS PA ON (MP.MultiPartner_Id = PA.MultiPartner_Id)
+    JOIN ProposalCode 	AS PC ON (MP.ProposalCode_Id = PC.ProposalCode_Id)
+    JOIN Semester 		AS S ON (MP.Semester_Id = S.Semester_Id)
+WHERE Proposal_Code=:proposal_code
+    GROUP BY S.Semester_Id
+    """,
+)
+
+_statements.register(
+    "partner_requested_percentages",
+    """
+SELECT
+    Partner_Code 						AS partner_code,
+    Partner_Name 						AS partner_name,
+    ReqTimePercent						AS requested_percentage,
+    CONCAT(S.Year, '-', S.Semester)     AS semester
+FROM MultiPartner MP
+    JOIN ProposalCode PC ON MP.ProposalCode_Id = PC.ProposalCode_Id
+    JOIN Semester S ON MP.Semester_Id = S.Semester_Id
+    JOIN Partner AS P ON (MP.Partner_Id = P.Partner_Id)
+WHERE PC.Proposal_Code = :proposal_code
+    """,
+)
+
+_statements.register(
+    "progress_report_semesters",
+    """
+SELECT CONCAT(S.Year, '-', S.Semester) AS semester
+FROM ProposalProgress PP
+         JOIN ProposalCode PC ON PP.ProposalCode_Id = PC.ProposalCode_Id
+         JOIN Semester S ON PP.Semester_Id = S.Semester_Id
+WHERE PC.Proposal_Code = :proposal_code;
+    """,
+)
+
+# The progress report of a proposal for a semester
+_statements.register(
+    "progress_report",
+    """
+SELECT
+    TimeRequestChangeReasons			AS change_reason,
+    StatusSummary						AS summary_of_proposal_status,
+    StrategyChanges						AS strategy_changes,
+    CONCAT(S.`Year`, '-', S.Semester)   AS semester,
+    ReportPath                          AS proposal_progress_pdf,
+    SupplementaryPath                   AS additional_pdf
+FROM ProposalProgress PP
+    JOIN ProposalCode PC ON PP.ProposalCode_Id = PC.ProposalCode_Id
+    JOIN Semester S ON PP.Semester_Id = S.Semester_Id
+WHERE PC.Proposal_Code = :proposal_code
+    AND CONCAT(S.`Year`, '-', S.Semester) = :semester
+    """,
+)
+
+_statements.register(
+    "insert_proprietary_period_extension_request",
+    """
+INSERT INTO ProprietaryPeriodExtensionRequest(
+    ProposalCode_Id,
+    Reason,
+    RequestedBy,
+    RequestedPeriod
+)
+VALUES (
+    (SELECT ProposalCode_Id FROM ProposalCode WHERE Proposal_Code = :proposal_code),
+    :reason,
+    (SELECT PiptUser_Id FROM PiptUser WHERE Username = :username),
+    :requested_period
+)
+    """,
+)
+
+_statements.register(
+    "is_partner_allocated",
+    """
+SELECT P.Partner_Code    AS partner_code,
+       SUM(PA.TimeAlloc) AS time_allocation
+FROM PriorityAlloc PA
+         JOIN MultiPartner MP ON PA.MultiPartner_Id = MP.MultiPartner_Id
+         JOIN ProposalCode PC ON MP.ProposalCode_Id = PC.ProposalCode_Id
+         JOIN Semester S ON MP.Semester_Id = S.Semester_Id
+         JOIN Partner P ON MP.Partner_Id = P.Partner_Id
+WHERE PC.Proposal_Code = :proposal_code
+GROUP BY PA.MultiPartner_Id, PA.Priority
+    """,
+)
+
+_statements.register(
+    "update_proprietary_period",
+    """
+UPDATE ProposalGeneralInfo
+SET ProprietaryPeriod = :proprietary_period, ReleaseDate = :release_date
+WHERE ProposalCode_Id = (SELECT PC.ProposalCode_Id
+                         FROM ProposalCode PC
+                         WHERE PC.Proposal_Code = :proposal_code)
+    """,
+)
+
+# The phase 1 targets.
+_statements.register(
+    "phase_one_observations",
+    """
+SELECT DISTINCT RequestedTime                                   AS observing_time,
+                T.Target_Id                                     AS id,
+                T.Target_Name                                   AS name,
+                TC.RaH                                          AS ra_h,
+                TC.RaM                                          AS ra_m,
+                TC.RaS                                          AS ra_s,
+                TC.DecSign                                      AS dec_sign,
+                TC.DecD                                         AS dec_d,
+                TC.DecM                                         AS dec_m,
+                TC.DecS                                         AS dec_s,
+                TC.Equinox                                      AS equinox,
+                TM.MinMag                                       AS min_mag,
+                TM.MaxMag                                       AS max_mag,
+                BP.FilterName                                   AS bandpass,
+                TST.TargetSubType                               AS target_sub_type,
+                TT.TargetType                                   AS target_type,
+                PPT.Optional									AS optional,
+                PPT.NVisits										AS requested_observations,
+                PPT.MaxLunarPhase								AS max_lunar_phase,
+                PR.Ranking										AS ranking,
+                PPT.TrackCount									AS track_count,
+                PPT.NightCount									AS nights_count,
+                M.Moon											AS moon,
+                PTP.CompetitionProbability						AS competition_probability,
+                PTP.ObservabilityProbability					AS observability_probability,
+                PTP.SeeingProbability							AS seeing_probability,
+                PTP.TotalProbability							AS total_probability,
+                MT.RaDot                                        AS ra_dot,
+                MT.DecDot                                       AS dec_dot,
+                MT.Epoch                                        AS epoch,
+                PT.Period                                       AS period,
+                PT.Pdot                                         AS period_change_rate,
+                PT.T0                                           AS period_zero_point,
+                TB.Time_Base                                    AS period_time_base,
+                HT.Identifier                                   AS horizons_identifier,
+                IF((MT1.Target_Id IS NOT NULL
+                    OR MTF.Target_Id IS NOT NULL
+                    OR HT.Identifier IS NOT NULL),
+                    1,
+                    0)                                          AS non_sidereal
+FROM P1ProposalTarget PPT
+    JOIN ProposalCode  PC ON PPT.ProposalCode_Id = PC.ProposalCode_Id
+    JOIN Target T ON PPT.Target_Id = T.Target_Id
+    JOIN TargetCoordinates TC ON T.TargetCoordinates_Id = TC.TargetCoordinates_Id
+    JOIN P1ObservingConditions POC ON PC.ProposalCode_Id = POC.ProposalCode_Id
+     LEFT JOIN TargetMagnitudes TM ON T.TargetMagnitudes_Id = TM.TargetMagnitudes_Id
+     LEFT JOIN Bandpass BP ON TM.Bandpass_Id = BP.Bandpass_Id
+         LEFT JOIN TargetSubType TST ON T.TargetSubType_Id = TST.TargetSubType_Id
+         LEFT JOIN TargetType TT ON TST.TargetType_Id = TT.TargetType_Id
+         LEFT JOIN MovingTarget MT ON T.MovingTarget_Id = MT.MovingTarget_Id
+         LEFT JOIN PeriodicTarget PT ON T.PeriodicTarget_Id = PT.PeriodicTarget_Id
+         LEFT JOIN TimeBase TB ON PT.TimeBase_Id = TB.TimeBase_Id
+         LEFT JOIN HorizonsTarget HT ON T.HorizonsTarget_Id = HT.HorizonsTarget_Id
+         LEFT JOIN MovingTable MT1 ON T.Target_Id = MT1.Target_Id
+         LEFT JOIN MovingTableFile MTF ON T.Target_Id = MTF.Target_Id
+         LEFT JOIN PiRanking PR ON PPT.PiRanking_Id = PR.PiRanking_Id
+         LEFT JOIN Moon M ON POC.Moon_Id = M.Moon_Id
+         LEFT JOIN P1TargetProbabilities PTP ON PC.ProposalCode_Id = PTP.ProposalCode_Id
+WHERE Proposal_Code = :proposal_code
+    """,
+)
+
+_statements.register(
+    "requested_times",
+    """
+SELECT
+    MP.ReqTimePercent					AS percentage,
+    PMT.P1MinimumUsefulTime				AS minimum_useful_time,
+    MP.ReqTimeAmount					AS total_requested_time,
+    PMT.P1TimeComment					AS `comment`,
+    P.Partner_Name						AS partner_name,
+    CONCAT(S.`Year`, '-', S.Semester)   AS semester
+FROM MultiPartner MP
+    JOIN ProposalCode PC ON MP.ProposalCode_Id = PC.ProposalCode_Id
+    JOIN Semester S ON MP.Semester_Id = S.Semester_Id
+    JOIN Partner P ON MP.Partner_Id = P.Partner_Id
+    JOIN P1MinTime PMT ON MP.ProposalCode_Id = PMT.ProposalCode_Id AND MP.Semester_Id = PMT.Semester_Id
+WHERE Proposal_Code = :proposal_code
+    """,
+)
+
+_statements.register(
+    "nir_simulations",
+    """
+SELECT
+    P1NirSimulation_Id          AS id,
+    P1NirSimulation_Name		AS `name`,
+    PiComment					AS description
+FROM P1NirSimulation P1NS
+    JOIN ProposalCode PC ON	P1NS.ProposalCode_Id = PC.ProposalCode_Id
+WHERE Proposal_Code = :proposal_code AND P1Nir_Id = :configuration_id
+    """,
+)
+
+_statements.register(
+    "hrs_simulations",
+    """
+SELECT
+    P1HrsSimulation_Id          AS id,
+    P1HrsSimulation_Name		AS `name`,
+    PiComment					AS description
+FROM P1HrsSimulation P1HS
+    JOIN ProposalCode PC ON	P1HS.ProposalCode_Id = PC.ProposalCode_Id
+WHERE Proposal_Code = :proposal_code AND P1Hrs_Id = :configuration_id
+    """,
+)
+
+_statements.register(
+    "rss_simulations",
+    """
+SELECT
+    P1RssSimulation_Id          AS id,
+    P1RssSimulation_Name		AS `name`,
+    PiComment					AS description
+FROM P1RssSimulation P1RS
+    JOIN ProposalCode PC ON	P1RS.ProposalCode_Id = PC.ProposalCode_Id
+WHERE Proposal_Code = :proposal_code AND P1Rss_Id = :configuration_id
+    """,
+)
+
+_statements.register(
+    "salticam_simulations",
+    """
+SELECT
+    P1SalticamSimulation_Id         AS id,
+    P1SalticamSimulation_Name		AS `name`,
+    PiComment					    AS description
+FROM P1SalticamSimulation P1SS
+    JOIN ProposalCode PC ON	P1SS.ProposalCode_Id = PC.ProposalCode_Id
+WHERE Proposal_Code = :proposal_code AND P1Salticam_Id = :configuration_id
+    """,
+)
+
+_statements.register(
+    "p1_rss_config",
+    """
+SELECT
+    RG.Grating              AS grating,
+    RFPM.FabryPerot_Mode    AS fabry_perot_mode,
+    RPP.PatternName         AS polarimetry_pattern_name,
+    RMT.RssMaskType         AS mask_type,
+    P1RM.MosDescription     AS mos_description
+FROM P1Config P1C
+    JOIN ProposalCode PC ON P1C.ProposalCode_Id = PC.ProposalCode_Id
+    JOIN P1Rss P1R ON P1C.P1Rss_Id = P1R.P1Rss_Id
+    JOIN RssMode RM ON P1R.RssMode_Id = RM.RssMode_Id
+    LEFT JOIN P1RssSpectroscopy P1RS ON P1R.P1RssSpectroscopy_Id = P1RS.P1RssSpectroscopy_Id
+    LEFT JOIN P1RssPolarimetry P1RP ON P1R.P1RssPolarimetry_Id = P1RP.P1RssPolarimetry_Id
+    LEFT JOIN P1RssFabryPerot P1RFP ON P1R.P1RssFabryPerot_Id = P1RFP.P1RssFabryPerot_Id
+    LEFT JOIN P1RssMask P1RM ON P1R.P1RssMask_Id = P1RM.P1RssMask_Id
+    LEFT JOIN RssGrating RG ON P1RS.RssGrating_Id = RG.RssGrating_Id
+    LEFT JOIN RssFabryPerotMode RFPM ON P1RFP.RssFabryPerotMode_Id = RFPM.RssFabryPerotMode_Id
+    LEFT JOIN RssPolarimetryPattern RPP ON P1RP.RssPolarimetryPattern_Id = RPP.RssPolarimetryPattern_Id
+    LEFT JOIN RssMaskType RMT ON P1RM.RssMaskType_Id = RMT.RssMaskType_Id
+WHERE Proposal_Code = :proposal_code AND P1C.P1Rss_Id = :config_id
+    """,
+)
+
+_statements.register(
+    "p1_scam_filters",
+    """
+SELECT
+    SF.SalticamFilter_Name          AS `name`,
+    SF.DescriptiveName              AS description
+FROM P1Salticam  P1S
+    JOIN P1SalticamFilterPattern P1SFP ON P1S.P1SalticamFilterPattern_Id = P1SFP.P1SalticamFilterPattern_Id
+    JOIN P1SalticamFilterPatternDetail P1SFD ON P1SFP.P1SalticamFilterPattern_Id = P1SFD.P1SalticamFilterPattern_Id
+    JOIN SalticamFilter SF ON P1SFD.SalticamFilter_Id = SF.SalticamFilter_Id
+WHERE P1S.P1Salticam_Id = :scam_id
+    """,
+)
+
+_statements.register(
+    "science_configurations",
+    """
+SELECT
+    P1C.P1Bvit_Id				        AS bvit,
+    P1C.P1Hrs_Id				        AS hrs,
+    P1C.P1Nir_Id				        AS nir,
+    P1C.P1Rss_Id				        AS rss,
+    P1C.P1Salticam_Id			        AS scam,
+    BF.BvitFilter_Name			        AS bvit_filter,
+    HM.ExposureMode				        AS hrs_mode,
+    NG.Grating					        AS nir_grating,
+    RM.`Mode`					        AS rss_mode,
+    RDM.DetectorMode					AS rss_detector_mode,
+    SM.DetectorMode				        AS scam_detector_mode
+FROM P1Config P1C
+    JOIN ProposalCode PC ON P1C.ProposalCode_Id = PC.ProposalCode_Id
+    LEFT JOIN P1Bvit PB ON P1C.P1Bvit_Id = PB.P1Bvit_Id
+    LEFT JOIN BvitFilter BF ON PB.BvitFilter_Id = BF.BvitFilter_Id
+    LEFT JOIN P1Hrs PH ON P1C.P1Hrs_Id = PH.P1Hrs_Id
+    LEFT JOIN HrsMode HM ON PH.HrsMode_Id = HM.HrsMode_Id
+    LEFT JOIN P1Nir PN ON P1C.P1Nir_Id = PN.P1Nir_Id
+    LEFT JOIN NirGrating NG ON PN.NirGrating_Id = NG.NirGrating_Id
+    LEFT JOIN P1Rss PR ON P1C.P1Rss_Id = PR.P1Rss_Id
+    LEFT JOIN RssDetectorMode RDM ON PR.RssDetectorMode_Id = RDM.RssDetectorMode_Id
+    LEFT JOIN RssMode RM ON PR.RssMode_Id = RM.RssMode_Id
+    LEFT JOIN P1Salticam PS ON P1C.P1Salticam_Id = PS.P1Salticam_Id
+    LEFT JOIN SalticamDetectorMode SM ON PS.SalticamDetectorMode_Id = SM.SalticamDetectorMode_Id
+WHERE PC.Proposal_Code = :proposal_code
+    """,
+)
+
+_statements.register(
+    "update_is_self_activatable",
+    """
+INSERT INTO ProposalSelfActivation (ProposalCode_Id, PiPcMayActivate)
+VALUE(
+    :proposal_code_id,
+    :is_self_activatable
+)
+ON DUPLICATE KEY UPDATE PiPcMayActivate = :is_self_activatable;
+    """,
+)
+
+_statements.register(
+    "liaison_astronomer",
+    """
+SELECT
+    I2.PiptUser_Id           AS id,
+    I2.FirstName             AS given_name,
+    I2.Surname               AS family_name,
+    I2.Email                 AS email
+FROM ProposalContact PCon
+    JOIN Investigator I ON I.Investigator_Id = PCon.Astronomer_Id
+    JOIN PiptUser PU ON PU.PiptUser_Id = I.PiptUser_Id
+    JOIN Investigator I2 ON I2.Investigator_Id = PU.Investigator_Id
+    JOIN ProposalCode PC ON PC.ProposalCode_Id = PCon.ProposalCode_Id
+WHERE PCon.ProposalCode_Id = :proposal_code_id
+    """,
+)
+
+_statements.register(
+    "update_liaison_astronomer",
+    """
+UPDATE ProposalContact
+SET Astronomer_Id = :liaison_astronomer_id
+WHERE ProposalCode_Id = :proposal_code_id
+    """,
+)
+
+_statements.register(
+    "salt_astronomer_investigator_id",
+    """
+SELECT PU.Investigator_Id FROM PiptUser PU
+    JOIN SaltAstronomers SA ON PU.Investigator_Id = SA.Investigator_Id
+WHERE PU.PiptUser_Id = :salt_astronomer_user_id
+    """,
+)
+
+# The temporary tables tmp1 and tmp2 are necessary as the ProposalInvestigator
+# table cannot be included in the FROM statement. Note that if a user is present
+# as multiple investigators, the approval status is updated for all of these
+# investigators.
+_statements.register(
+    "update_investigator_proposal_approval_status",
+    """
+UPDATE ProposalInvestigator
+SET InvestigatorOkay=:approved,
+    ApprovalCode=NULL
+WHERE Investigator_Id IN (SELECT tmp1.Investigator_Id
+                         FROM (SELECT I.Investigator_Id
+                               FROM Investigator I
+                                        JOIN PiptUser PU ON I.PiptUser_Id = PU.PiptUser_Id
+                                        JOIN ProposalInvestigator PI
+                                             ON I.Investigator_Id = PI.Investigator_Id
+                                        JOIN ProposalCode PC
+                                             ON PI.ProposalCode_Id = PC.ProposalCode_Id
+                               WHERE PU.PiptUser_Id = :user_id
+                                 AND PC.ProposalCode_Id = (SELECT ProposalCode_Id
+                                                           FROM ProposalCode
+                                                           WHERE Proposal_Code = :proposal_code)) AS tmp1)
+  AND ProposalCode_Id = (SELECT tmp2.ProposalCode_Id
+                         FROM (SELECT PC.ProposalCode_Id
+                               FROM ProposalCode PC
+                               WHERE PC.Proposal_Code = :proposal_code) AS tmp2);
+    """,
+)
+
+_statements.register(
+    "pool_times",
+    """
+SELECT
+    PAT.Priority        AS priority,
+    PAT.AssignedTime    AS assigned_time
+FROM PoolAssignedTime PAT
+WHERE PAT.Pool_Id = :pool_id
+    """,
+)
+
+_statements.register(
+    "pool_rules",
+    """
+SELECT
+    PRS.X1              AS rule_parameter,
+    PR.Pool_Rule_short  AS rule
+FROM PoolRuleSet    PRS
+    JOIN PoolRule   PR ON PRS.PoolRule_Id = PR.PoolRule_Id
+WHERE PRS.Pool_Id = :pool_id
+    """,
+)
+
+_statements.register(
+    "block_total_observed_time",
+    """
+SELECT SUM(B.ObsTime) AS total_observed_time FROM BlockVisit BV 
+    JOIN Block B ON BV.Block_Id = B.Block_Id
+    JOIN BlockVisitStatus BVS ON BV.BlockVisitStatus_Id = BVS.BlockVisitStatus_Id
+WHERE BV.Block_Id = :block_id AND BVS.BlockVisitStatus = 'Accepted'
+    """,
+)
+
+_statements.register(
+    "pool_blocks",
+    """
+SELECT
+    B.Block_Id          AS id,
+    B.Block_Name        AS name,
+    B.Priority          AS priority,
+    B.MaxLunarPhase     AS max_lunar_phase,
+    B.NVisits           AS n_visits,
+    B.NDone             AS n_done,
+    B.ObsTime           AS observation_time,
+    BS.BlockStatus      AS status,
+    BP.Block_Id         AS block_id
+FROM BlockPool  BP
+    JOIN Block B ON BP.Block_Id = B.Block_Id
+    JOIN BlockStatus BS ON B.BlockStatus_Id = BS.BlockStatus_Id
+WHERE BS.BlockStatus NOT IN ('Deleted', 'Superseded')
+    AND BP.Pool_Id = :pool_id
+    """,
+)
+
+_statements.register(
+    "pools",
+    """
+SELECT
+    P.Pool_Id           AS id,
+    P.Pool_Name         AS name
+FROM Pool P
+    JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
+    JOIN Semester S ON P.Semester_Id = S.Semester_Id
+WHERE PC.Proposal_Code = :proposal_code
+    AND CONCAT(S.Year, '-', S.Semester) = :semester
+    """,
+)
 
 
 class ProposalRepository:
@@ -40,129 +1346,115 @@ class ProposalRepository:
     def __init__(self, connection: Connection):
         self.connection = connection
         self.block_repository = BlockRepository(connection)
+        self.user_repository = UserRepository(connection)
+        self.proposal_metadata_repository = ProposalMetadataRepository(connection)
 
     def _list(
-        self, username: str, from_semester: str, to_semester: str, limit: int
-    ) -> List[ProposalListItem]:
-        """
-        Return a list of proposal summaries.
-        """
-        stmt = text(
-            """
-SELECT DISTINCT P.Proposal_Id                   AS id,
-                PC.Proposal_Code                AS proposal_code,
-                CONCAT(S.Year, '-', S.Semester) AS semester,
-                PT.Title                        AS title,
-                P.Phase                         AS phase,
-                PS.Status                       AS status,
-                PGI.StatusComment               AS comment,
-                T.ProposalType                  AS proposal_type,
-                Leader.PiptUser_Id              AS pi_user_id,
-                Leader.FirstName                AS pi_given_name,
-                Leader.Surname                  AS pi_family_name,
-                Leader.Email                    AS pi_email,
-                Contact.PiptUser_Id             AS pc_user_id,
-                Contact.FirstName               AS pc_given_name,
-                Contact.Surname                 AS pc_family_name,
-                Contact.Email                   AS pc_email,
-                Astronomer.PiptUser_Id          AS la_user_id,
-                Astronomer.FirstName            AS la_given_name,
-                Astronomer.Surname              AS la_family_name,
-                Astronomer.Email                AS la_email,
-                IF(PU.Username = :username,
-                    1,
-                    0
-                )                               AS is_user_an_investigator
-FROM Proposal P
-         JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
-         JOIN ProposalGeneralInfo PGI ON PC.ProposalCode_Id = PGI.ProposalCode_Id
-         JOIN ProposalText PT ON PC.ProposalCode_Id = PT.ProposalCode_Id AND
-                                 P.Semester_Id = PT.Semester_Id
-         JOIN Semester S ON P.Semester_Id = S.Semester_Id
-         JOIN ProposalStatus PS ON PGI.ProposalStatus_Id = PS.ProposalStatus_Id
-         JOIN ProposalType T ON PGI.ProposalType_Id = T.ProposalType_Id
-         JOIN ProposalContact C ON PC.ProposalCode_Id = C.ProposalCode_Id
-         LEFT JOIN Investigator Astronomer
-                   ON C.Astronomer_Id = Astronomer.Investigator_Id
-         JOIN Investigator Contact ON C.Contact_Id = Contact.Investigator_Id
-         JOIN Investigator Leader ON C.Leader_Id = Leader.Investigator_Id
-         JOIN ProposalInvestigator PI ON PC.ProposalCode_Id = PI.ProposalCode_Id
-         JOIN Investigator I ON PI.Investigator_Id = I.Investigator_Id
-         JOIN PiptUser PU ON I.PiptUser_Id = PU.PiptUser_Id
-         LEFT JOIN P1RequestedTime P1RT ON P.Proposal_Id = P1RT.Proposal_Id
-         LEFT JOIN MultiPartner MP ON PC.ProposalCode_Id = MP.ProposalCode_Id AND
-                                      S.Semester_Id = MP.Semester_Id
-         LEFT JOIN PiptUserTAC PUT ON MP.Partner_Id = PUT.Partner_Id
-         LEFT JOIN PiptUser TACUser ON PUT.PiptUser_Id = TACUser.PiptUser_Id
-WHERE P.Current = 1
-  AND S.Semester_Id IN (SELECT S2.Semester_Id
-                        FROM Semester AS S2
-                        WHERE CONCAT(S2.Year, '-', S2.Semester)
-                                  BETWEEN :from_semester AND :to_semester)
-  AND PS.Status != 'Deleted'
-  AND (
-    -- The user is an investigator on the proposal
-            PU.Username = :username
-        OR
-        -- Proposal is requesting time from TAC to which the user belongs
-            (TACUser.Username = :username AND MP.ReqTimePercent > 0)
-        OR
-        -- The proposal is a Gravitational Wave Event and the user is affiliated to
-        -- a SALT partner
-            (T.ProposalType = 'Gravitational Wave Event' AND (
-                    (SELECT COUNT(*)
-                     FROM Partner PUser
-                              JOIN Institute IUser
-                                   ON PUser.Partner_Id = IUser.Partner_Id
-                              JOIN Investigator I2User
-                                   ON IUser.Institute_Id = I2User.Institute_Id
-                              JOIN PiptUser PUUser
-                                   ON I2User.PiptUser_Id = PUUser.PiptUser_Id
-                     WHERE PUUser.Username = :username
-                       AND PUser.Partner_Code != 'OTH') > 0)
-                )
-        OR
-        -- The user is allowed to view all proposals
-            (
-                    (SELECT COUNT(*)
-                     FROM PiptUserSetting PUSRights
-                              JOIN PiptSetting PSRights
-                                   ON PUSRights.PiptSetting_Id = PSRights.PiptSetting_Id
-                              JOIN PiptUser PURights
-                                   ON PUSRights.PiptUser_Id = PURights.PiptUser_Id
-                     WHERE PURights.Username = :username
-                       AND PSRights.PiptSetting_Name = 'RightProposals'
-                       AND PUSRights.Value >= 2) > 0
-                )
-        OR
-        -- The user has been granted permission to view the proposal
-            (
-                    (SELECT COUNT(*)
-                     FROM ProposalPermissionGrant PPG
-                              JOIN PiptUser U ON PPG.Grantee_Id = U.PiptUser_Id
-                              JOIN ProposalPermission PP ON PPG.ProposalPermission_Id =
-                                                            PP.ProposalPermission_Id
-                     WHERE U.Username = :username
-                       AND PPG.ProposalCode_Id = PC.ProposalCode_Id
-                        AND PP.ProposalPermission = 'View') > 0
+        self,
+        username: str,
+        from_semester: str,
+        to_semester: str,
+        limit: int,
+        list_filter: ProposalListFilter,
+        sort_by: str,
+        descending: bool,
+        after_id: Optional[int],
+        after_sort_value: Optional[str],
+    ) -> Iterator[ProposalListItem]:
+        """
+        Generate proposal summaries.
+
+        The proposals the user may view are taken from the user's index of accessible
+        proposals (see UserRepository.get_accessible_proposals).
+
+        The list is obtained in two phases. First the ids of the (current) proposals
+        to list are found, using only the tables needed for filtering and sorting.
+        Then the summaries are fetched for these ids, so that every proposal is only
+        joined with the tables for its details once. The summaries are read with a
+        server-side cursor and generated one by one.
+        """
+        accessible_proposals = self.user_repository.get_accessible_proposals(username)
+        params: Dict[str, Any] = {
+            "from_semester": from_semester,
+            "to_semester": to_semester,
+            "limit": limit,
+            "deleted_status_id": self._proposal_status_id("Deleted"),
+            "may_view_all_proposals": int(accessible_proposals.may_view_all_proposals),
+            "proposal_codes": sorted(accessible_proposals.proposal_codes),
+            "is_partner_affiliated": int(accessible_proposals.is_partner_affiliated),
+        }
+        bind_parameters = [bindparam("proposal_codes", expanding=True)]
+
+        filters = []
+        if list_filter.statuses:
+            filters.append("PGI.ProposalStatus_Id IN :status_ids")
+            params["status_ids"] = [
+                self._proposal_status_id(status) for status in list_filter.statuses
+            ]
+            bind_parameters.append(bindparam("status_ids", expanding=True))
+        if list_filter.proposal_types:
+            filters.append("T.ProposalType IN :proposal_types")
+            params["proposal_types"] = [
+                self._db_proposal_type(proposal_type)
+                for proposal_type in list_filter.proposal_types
+            ]
+            bind_parameters.append(bindparam("proposal_types", expanding=True))
+        if list_filter.principal_investigator_id is not None:
+            filters.append(
+                "C.Leader_Id IN (SELECT Investigator_Id FROM Investigator"
+                " WHERE PiptUser_Id = :pi_user_id)"
+            )
+            params["pi_user_id"] = list_filter.principal_investigator_id
+        if list_filter.liaison_astronomer_id is not None:
+            filters.append(
+                "C.Astronomer_Id IN (SELECT Investigator_Id FROM Investigator"
+                " WHERE PiptUser_Id = :la_user_id)"
+            )
+            params["la_user_id"] = list_filter.liaison_astronomer_id
+        if list_filter.title:
+            # The database collation makes the comparison case-insensitive
+            filters.append("PT.Title LIKE :title ESCAPE '!'")
+            params["title"] = f"%{self._escape_like(list_filter.title)}%"
+
+        # Keyset pagination: only include proposals listed after the previous page
+        comparison = "<" if descending else ">"
+        sort_column = PROPOSAL_LIST_SORT_COLUMNS[sort_by]
+        if after_id is not None:
+            if sort_by == "id":
+                filters.append(f"P.Proposal_Id {comparison} :after_id")
+            else:
+                filters.append(
+                    f"({sort_column} {comparison} :after_sort_value OR"
+                    f" ({sort_column} = :after_sort_value AND"
+                    f" P.Proposal_Id {comparison} :after_id))"
                 )
-    )
-ORDER BY P.Proposal_Id DESC
-LIMIT :limit;
-        """
-        )
-        result = self.connection.execute(
-            stmt,
-            {
-                "username": username,
-                "from_semester": from_semester,
-                "to_semester": to_semester,
-                "limit": limit,
-            },
+                params["after_sort_value"] = after_sort_value
+            params["after_id"] = after_id
+
+        direction = "DESC" if descending else "ASC"
+        order_by = f"P.Proposal_Id {direction}"
+        if sort_by != "id":
+            order_by = f"{sort_column} {direction}, {order_by}"
+
+        stmt = text(
+            _LISTED_PROPOSAL_IDS_SQL.format(
+                filters="".join(f"  AND {f}\n" for f in filters), order_by=order_by
+            )
+        ).bindparams(*bind_parameters)
+        result = self.connection.execute(stmt, params)
+        proposal_ids = [row.id for row in result]
+        if not proposal_ids:
+            return
+
+        stmt = (
+            text(_PROPOSAL_SUMMARIES_SQL.format(order_by=order_by))
+            .bindparams(bindparam("proposal_ids", expanding=True))
+            .execution_options(stream_results=True)
         )
+        result = self.connection.execute(stmt, {"proposal_ids": proposal_ids})
 
-        proposals = [
-            {
+        for row in result:
+            yield {
                 "id": row.id,
                 "proposal_code": row.proposal_code,
                 "semester": row.semester,
@@ -183,26 +1475,9 @@ LIMIT :limit;
                     "email": row.pc_email,
                 },
                 "liaison_astronomer": self._liaison_astronomer(row),
-                "is_user_an_investigator": row.is_user_an_investigator > 0,
+                "is_user_an_investigator": row.proposal_code
+                in accessible_proposals.investigator_proposal_codes,
             }
-            for row in result
-        ]
-
-        # The list of proposals returned may contain proposals twice, once with
-        # is_user_an_investigator=0 and once with is_user_an_investigator=1. In this
-        # case only one of the two should be retained, and it should be the one with
-        # is_user_an_investigator=1.
-        unique_proposals_dict: Dict[str, Dict[str, Any]] = dict()
-        for p in proposals:
-            if (
-                p["id"] not in unique_proposals_dict
-                or p["is_user_an_investigator"] == 1
-            ):
-                unique_proposals_dict[p["id"]] = p
-
-        unique_proposals = list(unique_proposals_dict.values())
-
-        return unique_proposals
 
     @staticmethod
     def _liaison_astronomer(row: Any) -> Optional[Dict[str, str]]:
@@ -224,12 +1499,60 @@ LIMIT :limit;
         from_semester: str = "2000-1",
         to_semester: str = "2099-2",
         limit: int = 1000000,
+        list_filter: Optional[ProposalListFilter] = None,
+        sort_by: str = "id",
+        descending: bool = True,
+        after_id: Optional[int] = None,
+        after_sort_value: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """
         Return a list of proposal summaries.
 
         The from and to semester are inclusive. The "from" semester must not be later
-        than the "to" semester.
+        than the "to" semester. The proposals can be filtered further by passing a
+        list filter.
+
+        The proposals are sorted by the column given by sort_by, which must be one of
+        the keys of PROPOSAL_LIST_SORT_COLUMNS, and then by their id. By default they
+        are sorted by id, latest first.
+
+        The list can be fetched page by page. For the next page, the id of the last
+        proposal on the current page must be passed as after_id, and (unless the
+        proposals are sorted by id) its value for the sort column as
+        after_sort_value.
+        """
+        return list(
+            self.iter_list(
+                username=username,
+                from_semester=from_semester,
+                to_semester=to_semester,
+                limit=limit,
+                list_filter=list_filter,
+                sort_by=sort_by,
+                descending=descending,
+                after_id=after_id,
+                after_sort_value=after_sort_value,
+            )
+        )
+
+    def iter_list(
+        self,
+        username: str,
+        from_semester: str = "2000-1",
+        to_semester: str = "2099-2",
+        limit: int = 1000000,
+        list_filter: Optional[ProposalListFilter] = None,
+        sort_by: str = "id",
+        descending: bool = True,
+        after_id: Optional[int] = None,
+        after_sort_value: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Generate the proposal summaries returned by the list method.
+
+        The arguments are validated straight away, but the database is only queried
+        when the first summary is requested. No other statement may be executed with
+        the connection until all the summaries have been generated.
         """
 
         if not re.match(r"^\d{4}-\d$", from_semester):
@@ -245,11 +1568,22 @@ LIMIT :limit;
         if limit < 0:
             raise ValueError("The limit must not be negative.")
 
+        if sort_by not in PROPOSAL_LIST_SORT_COLUMNS:
+            raise ValueError(f"Proposals cannot be sorted by {sort_by}.")
+
+        if after_id is not None and sort_by != "id" and after_sort_value is None:
+            raise ValueError(f"The last value of {sort_by} is missing.")
+
         return self._list(
             username=username,
             from_semester=from_semester,
             to_semester=to_semester,
             limit=limit,
+            list_filter=list_filter or ProposalListFilter(),
+            sort_by=sort_by,
+            descending=descending,
+            after_id=after_id,
+            after_sort_value=after_sort_value,
         )
 
     def _get(
@@ -329,17 +1663,9 @@ LIMIT :limit;
         Return an ordered list of the semesters for which this a proposal has been
         submitted.
         """
-        stmt = text(
-            """
-SELECT DISTINCT CONCAT(S.Year, '-', S.Semester) AS semester 
-FROM MultiPartner MP
-    JOIN Semester S ON MP.Semester_Id = S.Semester_Id
-    JOIN ProposalCode PC ON MP.ProposalCode_Id = PC.ProposalCode_Id
-WHERE PC.Proposal_Code = :proposal_code
-ORDER BY S.Year, S.Semester;
-        """
+        result = self.connection.execute(
+            _statements["semesters"], {"proposal_code": proposal_code}
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
         return list(result.scalars())
 
     def list_of_semesters(self, proposal_code: str) -> List[str]:
@@ -353,68 +1679,57 @@ ORDER BY S.Year, S.Semester;
         """
         Return a list of phases (1 or 2) for a given proposal.
         """
-        stmt = text(
-            """
-        SELECT DISTINCT P.Phase
-        FROM ProposalCode PC
-        JOIN Proposal P ON PC.ProposalCode_Id = P.ProposalCode_Id
-        WHERE PC.Proposal_Code = :proposal_code
-        ORDER BY P.Phase
-        """
+        result = self.connection.execute(
+            _statements["phases"], {"proposal_code": proposal_code}
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
         phases = list(result.scalars())
         return phases
 
     def get_proposal_type(self, proposal_code: str) -> str:
-        stmt = text(
-            """
-SELECT PT.ProposalType AS proposal_type
-FROM ProposalType PT
-         JOIN ProposalGeneralInfo PGI ON PT.ProposalType_Id = PGI.ProposalType_Id
-         JOIN ProposalCode PC ON PGI.ProposalCode_Id = PC.ProposalCode_Id
-WHERE PC.Proposal_Code = :proposal_code
-            """
-        )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
-        proposal_type = result.scalar_one_or_none()
+        """
+        Return the proposal type.
+
+        The type is taken from the cached proposal metadata.
+        """
+        proposal_type = self.proposal_metadata_repository.get(
+            proposal_code
+        ).proposal_type
         if not proposal_type:
             raise NotFoundError()
 
         return self._map_proposal_type(proposal_type)
 
-    def _latest_submission_semester(self, proposal_code: str) -> str:
+    def get_proposal_types(self, proposal_codes: List[str]) -> Dict[str, str]:
         """
-        Return the semester for which the latest submission was made.
+        Get the proposal types for a list of proposal codes.
+
+        A dictionary of proposal codes and types is returned. Proposal codes which do
+        not exist are not included.
         """
-        stmt = text(
-            """
-SELECT CONCAT(S.Year, '-', S.Semester) AS semester
-FROM Proposal P
-         JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
-         JOIN Semester S ON P.Semester_Id = S.Semester_Id
-WHERE PC.Proposal_Code = :proposal_code
-  AND P.Current = 1
-ORDER BY S.Year DESC, S.Semester DESC
-LIMIT 1
+        if not proposal_codes:
+            return {}
+        result = self.connection.execute(
+            _statements["proposal_types"], {"proposal_codes": proposal_codes}
+        )
+        return {
+            row.proposal_code: self._map_proposal_type(row.proposal_type)
+            for row in result
+        }
+
+    def _latest_submission_semester(self, proposal_code: str) -> str:
+        """
+        Return the semester for which the latest submission was made.
         """
+        result = self.connection.execute(
+            _statements["latest_submission_semester"], {"proposal_code": proposal_code}
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
         return cast(str, result.scalar_one())
 
     def latest_submission_phase(self, proposal_code: str) -> int:
         """Return the proposal phase of the latest submission."""
-        stmt = text(
-            """
-SELECT P.Phase
-FROM Proposal P
-         JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
-WHERE Proposal_Code = :proposal_code
-ORDER BY P.Submission DESC
-LIMIT 1
-        """
+        result = self.connection.execute(
+            _statements["latest_submission_phase"], {"proposal_code": proposal_code}
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
         try:
             return cast(int, result.scalar_one())
         except NoResultFound:
@@ -424,16 +1739,9 @@ LIMIT 1
         """
         Return the date and time when the first submission was made.
         """
-        stmt = text(
-            """
-SELECT P.SubmissionDate AS submission_date
-FROM Proposal P
-         JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
-WHERE PC.Proposal_Code = :proposal_code
-  AND P.Submission = 1;
-        """
+        result = self.connection.execute(
+            _statements["first_submission_date"], {"proposal_code": proposal_code}
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
         dt = result.scalar_one()
         if type(dt) == date:
             dt = datetime.combine(dt, time.min)
@@ -441,36 +1749,18 @@ WHERE PC.Proposal_Code = :proposal_code
 
     def _latest_submission_date(self, proposal_code: str) -> datetime:
         """Return the date and time when the latest submission was made."""
-        stmt = text(
-            """
-SELECT P.SubmissionDate
-FROM Proposal P
-         JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
-WHERE PC.Proposal_Code = :proposal_code
-ORDER BY P.Submission DESC
-LIMIT 1
-        """
+        result = self.connection.execute(
+            _statements["latest_submission_date"], {"proposal_code": proposal_code}
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
         return cast(datetime, result.scalar_one()).astimezone(timezone.utc)
 
     def _latest_submission(self, proposal_code: str) -> int:
         """
         Return the submission number of the latest submission for any semester.
         """
-        stmt = text(
-            """
-SELECT Submission
-FROM Proposal P
-         JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
-WHERE P.Current = 1
-  AND PC.Proposal_Code = :proposal_code
-ORDER BY Submission DESC
-LIMIT 1
-        """
+        return cast(
+            int, self.proposal_metadata_repository.latest_submission(proposal_code)
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
-        return cast(int, result.scalar())
 
     @staticmethod
     def _map_proposal_type(db_proposal_type: str) -> str:
@@ -479,6 +1769,18 @@ LIMIT 1
 
         return db_proposal_type
 
+    @staticmethod
+    def _db_proposal_type(proposal_type: str) -> str:
+        if proposal_type == "Director's Discretionary Time":
+            return "Director Discretionary Time (DDT)"
+
+        return proposal_type
+
+    @staticmethod
+    def _escape_like(value: str) -> str:
+        """Escape the wildcards of a LIKE pattern, with ! as the escape character."""
+        return re.sub(r"([!%_])", r"!\1", value)
+
     def _proposal_text(self, proposal_code, semester):
         """
         Return the proposal text for a semester.
@@ -489,24 +1791,9 @@ LIMIT 1
         No text may exist for the given semester as no phase 2 has been submitted for
         the proposal yet. In this case the latest text (preceding the semester) is used.
         """
-        stmt = text(
-            """
-SELECT
-    PT.Title                            AS title,
-    PT.Abstract                         AS abstract,
-    PT.ReadMe                           AS summary_for_salt_astronomer,
-    PT.NightlogSummary                  AS summary_for_night_log
-FROM ProposalText PT
-         JOIN ProposalCode PC ON PT.ProposalCode_Id = PC.ProposalCode_Id
-         JOIN Semester S ON PT.Semester_Id = S.Semester_Id
-WHERE PC.Proposal_Code = :proposal_code
-  AND CONCAT(S.Year, '-', S.Semester) <= :semester
-ORDER BY S.Year, S.Semester DESC
-LIMIT 1;
-        """
-        )
         result = self.connection.execute(
-            stmt, {"proposal_code": proposal_code, "semester": semester}
+            _statements["proposal_text"],
+            {"proposal_code": proposal_code, "semester": semester},
         )
         row = result.one()
         return {
@@ -516,53 +1803,45 @@ LIMIT 1;
             "summary_for_night_log": row.summary_for_night_log,
         }
 
-    def _proposal_general_info(self, proposal_code: str, semester: str):
-        """
-        Return general proposal information for a semester.
+    def iter_proposal_texts(
+        self, proposal_codes: Optional[List[str]] = None
+    ) -> Iterator[ProposalText]:
         """
-        stmt = text(
-            """
-SELECT 
-    P.Submission                        AS submission_number,
-    T.ProposalType                      AS proposal_type,
-    PS.Status                           AS status,
-    PGI.StatusComment                   AS comment,
-    PGI.ActOnAlert                      AS target_of_opportunity,
-    P.TotalReqTime                      AS total_requested_time,
-    PGI.ProprietaryPeriod               AS proprietary_period,
-    I.PiptUser_Id                       AS astronomer_user_id,
-    I.FirstName                         AS astronomer_given_name,
-    I.Surname                           AS astronomer_family_name,
-    I.Email                             AS astronomer_email,
-    PGI.TimeRestricted                  AS is_time_restricted,
-    P1T.Reason						    AS too_reason,
-    I.PiptUser_Id                       AS liaison_salt_astronomer_id,
-    IF(PGI.P4 IS NOT NULL,
-      PGI.P4,
-      0)                               AS is_p4,
-    IF(PSA.PiPcMayActivate IS NOT NULL,
-      PSA.PiPcMayActivate,
-      0)                               AS self_activatable
-FROM Proposal P
-    JOIN Semester S ON P.Semester_Id = S.Semester_Id
-    JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
-    JOIN ProposalGeneralInfo PGI ON PC.ProposalCode_Id = PGI.ProposalCode_Id
-    JOIN ProposalType T ON PGI.ProposalType_Id = T.ProposalType_Id
-    JOIN ProposalStatus PS ON PGI.ProposalStatus_Id = PS.ProposalStatus_Id
-    JOIN ProposalContact C ON PC.ProposalCode_Id = C.ProposalCode_Id
-    LEFT JOIN Investigator I ON C.Astronomer_Id = I.Investigator_Id
-    LEFT JOIN ProposalSelfActivation PSA ON P.ProposalCode_Id = PSA.ProposalCode_Id
-    LEFT JOIN P1ToO P1T ON P.ProposalCode_Id = P1T.ProposalCode_Id
-WHERE PC.Proposal_Code = :proposal_code
-    AND P.Current = 1
-    AND CONCAT(S.Year, '-', S.Semester) <= :semester
-    ORDER BY S.Year DESC, S.Semester DESC, P.Submission DESC
-    LIMIT 1
+        Generate the latest proposal text of proposals.
 
+        The texts are generated for all proposals which have not been deleted, or only
+        for those with the given proposal codes. They are read with a server-side
+        cursor, so no other statement may be executed with the connection until all
+        texts have been generated.
         """
+        if proposal_codes is not None and not proposal_codes:
+            return
+        params: Dict[str, Any] = {
+            "deleted_status_id": self._proposal_status_id("Deleted")
+        }
+        stmt = _statements["proposal_texts"]
+        if proposal_codes is not None:
+            stmt = _statements["proposal_texts_for_codes"]
+            params["proposal_codes"] = proposal_codes
+        result = self.connection.execute(
+            stmt.execution_options(stream_results=True), params
         )
+        for row in result:
+            yield ProposalText(
+                proposal_code=row.proposal_code,
+                semester=row.semester,
+                title=row.title,
+                abstract=row.abstract,
+                read_me=row.read_me,
+            )
+
+    def _proposal_general_info(self, proposal_code: str, semester: str):
+        """
+        Return general proposal information for a semester.
+        """
         result = self.connection.execute(
-            stmt, {"proposal_code": proposal_code, "semester": semester}
+            _statements["proposal_general_info"],
+            {"proposal_code": proposal_code, "semester": semester},
         )
         row = result.one()
 
@@ -595,24 +1874,9 @@ WHERE PC.Proposal_Code = :proposal_code
     def _get_deadlines_and_submissions(
         self, proposal_code: str, semester: str
     ) -> Dict[str, Any]:
-        stmt = text(
-            """
-SELECT
-    P.SubmissionDate        AS submission_date,
-    P.Submission            AS submission_number,
-    SP.Deadline             AS deadline
-FROM Proposal P
-    JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
-    JOIN Semester S ON S.Semester_Id=P.Semester_Id
-    JOIN SemesterPhase SP ON SP.Semester_Id = S.Semester_Id
-WHERE P.Phase = 1
-    AND SP.Phase = 1
-    AND CONCAT(S.Year, '-', S.Semester) = :semester
-    AND PC.Proposal_Code = :proposal_code
-        """
-        )
         results = self.connection.execute(
-            stmt, {"proposal_code": proposal_code, "semester": semester}
+            _statements["deadlines_and_submissions"],
+            {"proposal_code": proposal_code, "semester": semester},
         )
         submissions = []
         deadline = None
@@ -657,38 +1921,9 @@ WHERE P.Phase = 1
 
         The list is ordered by family nme and given name.
         """
-        stmt = text(
-            """
-SELECT
-    PU.PiptUser_Id          AS id,
-    I.FirstName             AS given_name,
-    I.Surname               AS family_name,
-    I.Email                 AS email,
-    P.Partner_Code          AS partner_code,
-    P.Partner_Name          AS partner_name,
-    `IN`.InstituteName_Name AS institution_name,
-    I2.Institute_Id         AS institution_id,
-    I2.Department           AS department,
-    PI.InvestigatorOkay     AS investigator_okay,
-    PI.ApprovalCode         AS approval_code,
-    ThesisType		        AS thesis_type,
-    ThesisDescr		        AS relevance_of_proposal,
-    CompletionYear	        AS year_of_completion
-FROM ProposalInvestigator PI
-    JOIN Investigator I ON PI.Investigator_Id = I.Investigator_Id
-    JOIN PiptUser PU ON I.PiptUser_Id = PU.PiptUser_Id
-    JOIN Institute I2 ON I.Institute_Id = I2.Institute_Id
-    JOIN Partner P ON I2.Partner_Id = P.Partner_Id
-    JOIN InstituteName `IN` ON I2.InstituteName_Id = `IN`.InstituteName_Id
-    JOIN ProposalCode PC ON PI.ProposalCode_Id = PC.ProposalCode_Id
-    LEFT JOIN P1Thesis PT ON PC.ProposalCode_Id = PT.ProposalCode_Id
-        AND PT.Student_Id = I.Investigator_Id
-    LEFT JOIN ThesisType TT ON PT.ThesisType_Id = TT.ThesisType_Id
-WHERE PC.Proposal_Code = :proposal_code
-ORDER BY I.Surname, I.FirstName
-        """
+        result = self.connection.execute(
+            _statements["investigators"], {"proposal_code": proposal_code}
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
         investigators = [dict(row) for row in result]
 
         pi_id = self._principal_investigator_user_id(proposal_code)
@@ -738,32 +1973,19 @@ ORDER BY I.Surname, I.FirstName
         """
         Return the user id of the Principal Investigator.
         """
-        stmt = text(
-            """
-SELECT I.PiptUser_Id
-FROM ProposalContact PC
-         JOIN Investigator I ON PC.Leader_Id = I.Investigator_Id
-         JOIN ProposalCode P ON PC.ProposalCode_Id = P.ProposalCode_Id
-WHERE P.Proposal_Code = :proposal_code
-        """
+        result = self.connection.execute(
+            _statements["principal_investigator_user_id"],
+            {"proposal_code": proposal_code},
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
         return cast(int, result.scalar_one())
 
     def _principal_contact_user_id(self, proposal_code: str) -> int:
         """
         Return the user id of the Principal Contact.
         """
-        stmt = text(
-            """
-SELECT I.PiptUser_Id
-FROM ProposalContact PC
-         JOIN Investigator I ON PC.Contact_Id = I.Investigator_Id
-         JOIN ProposalCode P ON PC.ProposalCode_Id = P.ProposalCode_Id
-WHERE P.Proposal_Code = :proposal_code
-        """
+        result = self.connection.execute(
+            _statements["principal_contact_user_id"], {"proposal_code": proposal_code}
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
         return cast(int, result.scalar_one())
 
     def _blocks(self, proposal_code: str, semester: str) -> List[Dict[str, Any]]:
@@ -771,37 +1993,8 @@ WHERE P.Proposal_Code = :proposal_code
         Return the blocks for a semester.
         """
         year, sem = semester.split("-")
-        stmt = text(
-            """
-SELECT B.Block_Id                      AS id,
-       CONCAT(S.Year, '-', S.Semester) AS semester,
-       B.Block_Name                    AS name,
-       BS.BlockStatus                  AS status,
-       B.BlockStatusReason             AS reason,
-       B.ObsTime                       AS observation_time,
-       B.Priority                      AS priority,
-       B.NVisits                       AS requested_observations,
-       B.NDone                         AS accepted_observations,
-       B.NAttempted                    AS rejected_observations,
-       B.MinSeeing                     AS minimum_seeing,
-       B.MaxSeeing                     AS maximum_seeing,
-       T.Transparency                  AS transparency,
-       B.MinLunarAngularDistance       AS minimum_lunar_distance,
-       B.MaxLunarPhase                 AS maximum_lunar_phase
-FROM Block B
-         JOIN Transparency T ON B.Transparency_Id = T.Transparency_Id
-         JOIN BlockStatus BS ON B.BlockStatus_Id = BS.BlockStatus_Id
-         JOIN Proposal P ON B.Proposal_Id = P.Proposal_Id
-         JOIN Semester S ON P.Semester_Id = S.Semester_Id
-         JOIN ProposalCode PC ON B.ProposalCode_Id = PC.ProposalCode_Id
-WHERE BS.BlockStatus NOT IN :excluded_status_values
-  AND PC.Proposal_Code = :proposal_code
-  AND S.Year = :year
-  AND S.Semester = :semester
-        """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["blocks"],
             {
                 "excluded_status_values": self.EXCLUDED_BLOCK_STATUS_VALUES,
                 "proposal_code": proposal_code,
@@ -863,34 +2056,9 @@ WHERE BS.BlockStatus NOT IN :excluded_status_values
 
         The observations are ordered by block name and observation night.
         """
-        stmt = text(
-            """
-SELECT
-    BV.BlockVisit_Id                            AS id,
-    BV.Block_Id                                 AS block_id,
-    B.Block_Name                                AS block_name,
-    B.ObsTime                                   AS observation_time,
-    B.Priority                                  AS priority,
-    B.MaxLunarPhase                             AS maximum_lunar_phase,
-    NI.Date                                     AS night,
-    BVS.BlockVisitStatus                        AS status,
-    BRR.RejectedReason                          AS rejection_reason,
-    CONCAT(S.Year, '-', S.Semester)			    AS semester
-FROM BlockVisit BV
-    JOIN BlockVisitStatus BVS ON BV.BlockVisitStatus_Id = BVS.BlockVisitStatus_Id
-    LEFT JOIN BlockRejectedReason BRR
-           ON BV.BlockRejectedReason_Id = BRR.BlockRejectedReason_Id
-    JOIN NightInfo NI ON BV.NightInfo_Id = NI.NightInfo_Id
-    JOIN Block B ON BV.Block_Id = B.Block_Id
-    JOIN ProposalCode PC ON B.ProposalCode_Id = PC.ProposalCode_Id
-    JOIN Proposal P ON P.Proposal_Id = B.Proposal_Id
-    JOIN Semester S ON S.Semester_Id = P.Semester_Id
-WHERE PC.Proposal_Code = :proposal_code
-    AND BVS.BlockVisitStatus != 'Deleted'
-ORDER BY B.Block_Name, NI.Date
-        """
+        result = self.connection.execute(
+            _statements["block_visits"], {"proposal_code": proposal_code}
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
         block_visits = [
             {
                 "id": row.id,
@@ -919,24 +2087,8 @@ ORDER BY B.Block_Name, NI.Date
         for all semesters.
         """
         separator = "::::"
-        stmt = text(
-            """
-SELECT B.Block_Id       AS block_id,
-       GROUP_CONCAT(
-            DISTINCT T.Target_Name ORDER BY T.Target_Name SEPARATOR :separator
-        )               AS targets
-FROM Target T
-         JOIN Observation O ON T.Target_Id = O.Target_Id
-         JOIN Pointing P ON O.Pointing_Id = P.Pointing_Id
-         JOIN Block B ON P.Block_Id = B.Block_Id
-         JOIN BlockStatus BS ON B.BlockStatus_Id = BS.BlockStatus_Id
-         JOIN ProposalCode PC ON B.ProposalCode_Id = PC.ProposalCode_Id
-WHERE PC.Proposal_Code = :proposal_code
-GROUP BY B.Block_Id
-        """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["block_targets"],
             {
                 "separator": separator,
                 "proposal_code": proposal_code,
@@ -954,25 +2106,8 @@ GROUP BY B.Block_Id
         A block is only included in the dictionary if it is using Salticam. There is
         only one mode, which is an empty string.
         """
-        stmt = text(
-            """
-SELECT B.Block_Id AS block_id
-FROM ObsConfig OC
-         JOIN PayloadConfig PC ON OC.PayloadConfig_Id = PC.PayloadConfig_Id
-         JOIN PayloadConfigType PCT
-            ON PC.PayloadConfigType_Id = PCT.PayloadConfigType_Id
-         JOIN TelescopeConfigObsConfig TCOC
-            ON OC.ObsConfig_Id = TCOC.PlannedObsConfig_Id
-         JOIN Pointing P ON TCOC.Pointing_Id = P.Pointing_Id
-         JOIN Block B ON P.Block_Id = B.Block_Id
-         JOIN ProposalCode C ON B.ProposalCode_Id = C.ProposalCode_Id
-WHERE C.Proposal_Code = :proposal_code
-  AND OC.SalticamPattern_Id IS NOT NULL
-  AND PCT.Type != 'Acquisition'
-        """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["block_salticam_configurations"],
             {
                 "proposal_code": proposal_code,
             },
@@ -990,32 +2125,8 @@ WHERE C.Proposal_Code = :proposal_code
         ordered alphabetically for every block.
         """
         separator = "::::"
-        stmt = text(
-            """
-SELECT B.Block_Id AS block_id,
-       GROUP_CONCAT(DISTINCT RM.Mode ORDER BY RM.Mode SEPARATOR :separator) AS modes,
-       GROUP_CONCAT(DISTINCT RG.Grating ORDER BY RG.Grating SEPARATOR :separator) AS gratings,
-       GROUP_CONCAT(DISTINCT RF.Barcode  ORDER BY RF.Barcode  SEPARATOR :separator) AS filters
-FROM RssMode RM
-         JOIN RssConfig RC ON RM.RssMode_Id = RC.RssMode_Id
-         JOIN Rss R ON RC.RssConfig_Id = R.RssConfig_Id
-         JOIN RssFilter RF ON RC.RssFilter_Id = RF.RssFilter_Id
-         JOIN RssPatternDetail RPD ON R.Rss_Id = RPD.Rss_Id
-         JOIN RssPattern RP ON RPD.RssPattern_Id = RP.RssPattern_Id
-         JOIN ObsConfig OC ON RP.RssPattern_Id = OC.RssPattern_Id
-         JOIN TelescopeConfigObsConfig TCOC
-            ON OC.ObsConfig_Id = TCOC.PlannedObsConfig_Id
-         JOIN Pointing P ON TCOC.Pointing_Id = P.Pointing_Id
-         JOIN Block B ON P.Block_Id = B.Block_Id
-         JOIN ProposalCode PC ON B.ProposalCode_Id = PC.ProposalCode_Id
-         LEFT JOIN RssSpectroscopy RS ON RC.RssSpectroscopy_Id = RS.RssSpectroscopy_Id
-         LEFT JOIN RssGrating RG ON RS.RssGrating_Id = RG.RssGrating_Id
-WHERE PC.Proposal_Code = :proposal_code
-GROUP BY B.Block_Id
-        """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["block_rss_configurations"],
             {
                 "separator": separator,
                 "proposal_code": proposal_code,
@@ -1041,29 +2152,8 @@ GROUP BY B.Block_Id
         ordered alphabetically for every block.
         """
         separator = "::::"
-        stmt = text(
-            """
-SELECT B.Block_Id AS block_id,
-       GROUP_CONCAT(
-            DISTINCT HM.ExposureMode ORDER BY HM.ExposureMode SEPARATOR :separator
-        ) AS modes
-FROM HrsMode HM
-         JOIN HrsConfig HC ON HM.HrsMode_Id = HC.HrsMode_Id
-         JOIN Hrs H ON HC.HrsConfig_Id = H.HrsConfig_Id
-         JOIN HrsPatternDetail HPD ON H.Hrs_Id = HPD.Hrs_Id
-         JOIN HrsPattern HP ON HPD.HrsPattern_Id = HP.HrsPattern_Id
-         JOIN ObsConfig OC ON HP.HrsPattern_Id = OC.HrsPattern_Id
-         JOIN TelescopeConfigObsConfig TCOC
-         ON OC.ObsConfig_Id = TCOC.PlannedObsConfig_Id
-         JOIN Pointing P ON TCOC.Pointing_Id = P.Pointing_Id
-         JOIN Block B ON P.Block_Id = B.Block_Id
-         JOIN ProposalCode PC ON B.ProposalCode_Id = PC.ProposalCode_Id
-WHERE PC.Proposal_Code = :proposal_code
-GROUP BY B.Block_Id
-        """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["block_hrs_configurations"],
             {
                 "separator": separator,
                 "proposal_code": proposal_code,
@@ -1087,21 +2177,8 @@ GROUP BY B.Block_Id
         A block is only included in the dictionary if it is using BVIT. There is only
         one mode, which is an empty string.
         """
-        stmt = text(
-            """
-SELECT B.Block_Id AS block_id
-FROM ObsConfig OC
-         JOIN TelescopeConfigObsConfig TCOC
-         ON OC.ObsConfig_Id = TCOC.PlannedObsConfig_Id
-         JOIN Pointing P ON TCOC.Pointing_Id = P.Pointing_Id
-         JOIN Block B ON P.Block_Id = B.Block_Id
-         JOIN ProposalCode C ON B.ProposalCode_Id = C.ProposalCode_Id
-WHERE C.Proposal_Code = :proposal_code
-  AND OC.BvitPattern_Id IS NOT NULL
-        """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["block_bvit_configurations"],
             {
                 "excluded_status_values": self.EXCLUDED_BLOCK_STATUS_VALUES,
                 "proposal_code": proposal_code,
@@ -1113,32 +2190,8 @@ WHERE C.Proposal_Code = :proposal_code
         self, proposal_code: str
     ) -> Dict[int, Dict[str, List[str]]]:
         separator = "::::"
-        stmt = text(
-            """
-SELECT B.Block_Id                                                                                   AS block_id,
-       GROUP_CONCAT(DISTINCT NG.Grating ORDER BY NG.Grating SEPARATOR :separator) AS gratings,
-       GROUP_CONCAT(DISTINCT NF.NirFilter  ORDER BY NF.NirFilter  SEPARATOR :separator) AS filters
-FROM Nir N
-         JOIN NirConfig NC ON N.NirConfig_Id = NC.NirConfig_Id
-         LEFT JOIN NirGrating NG ON NC.NirGrating_Id = NG.NirGrating_Id
-         JOIN NirFilter NF ON NC.NirFilter_Id = NF.NirFilter_Id
-         JOIN NirPatternDetail NPD ON N.Nir_Id = NPD.Nir_Id
-         JOIN NirProcedure NP ON N.NirProcedure_Id = NP.NirProcedure_Id
-         JOIN NirDitherPatternStep NDPS
-              ON NP.NirDitherPattern_Id = NDPS.NirDitherPattern_Id
-         JOIN NirExposureType NET ON NDPS.NirExposureType_Id = NET.NirExposureType_Id
-         JOIN ObsConfig OC ON NPD.NirPattern_Id = OC.NirPattern_Id
-         JOIN TelescopeConfigObsConfig TCOC
-              ON OC.ObsConfig_Id = TCOC.PlannedObsConfig_Id
-         JOIN Pointing P ON TCOC.Pointing_Id = P.Pointing_Id
-         JOIN Block B ON P.Block_Id = B.Block_Id
-         JOIN ProposalCode PC ON B.ProposalCode_Id = PC.ProposalCode_Id
-WHERE PC.Proposal_Code = :proposal_code
-GROUP BY B.Block_Id
-        """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["block_nir_configurations"],
             {
                 "separator": separator,
                 "proposal_code": proposal_code,
@@ -1227,24 +2280,9 @@ GROUP BY B.Block_Id
         Return the time allocations for a semester.
         """
         year, sem = semester.split("-")
-        stmt = text(
-            """
-SELECT P.Partner_Code    AS partner_code,
-       PA.Priority       AS priority,
-       SUM(PA.TimeAlloc) AS time_allocation
-FROM PriorityAlloc PA
-         JOIN MultiPartner MP ON PA.MultiPartner_Id = MP.MultiPartner_Id
-         JOIN ProposalCode PC ON MP.ProposalCode_Id = PC.ProposalCode_Id
-         JOIN Semester S ON MP.Semester_Id = S.Semester_Id
-         JOIN Partner P ON MP.Partner_Id = P.Partner_Id
-WHERE PC.Proposal_Code = :proposal_code
-  AND S.Year = :year
-  AND S.Semester = :semester
-GROUP BY PA.MultiPartner_Id, PA.Priority
-        """
-        )
         result = self.connection.execute(
-            stmt, {"proposal_code": proposal_code, "year": year, "semester": sem}
+            _statements["allocations"],
+            {"proposal_code": proposal_code, "year": year, "semester": sem},
         )
         return [
             {
@@ -1260,22 +2298,9 @@ GROUP BY PA.MultiPartner_Id, PA.Priority
         Return the TAC comments for a semester.
         """
         year, sem = semester.split("-")
-        stmt = text(
-            """
-SELECT P.Partner_Code AS partner_code,
-       TPC.TacComment AS tac_comment
-FROM TacProposalComment TPC
-         JOIN MultiPartner MP ON TPC.MultiPartner_Id = MP.MultiPartner_Id
-         JOIN Partner P ON MP.Partner_Id = P.Partner_Id
-         JOIN ProposalCode PC ON MP.ProposalCode_Id = PC.ProposalCode_Id
-         JOIN Semester S ON MP.Semester_Id = S.Semester_Id
-WHERE PC.Proposal_Code = :proposal_code
-  AND S.Year = :year
-  AND S.Semester = :semester
-        """
-        )
         result = self.connection.execute(
-            stmt, {"proposal_code": proposal_code, "year": year, "semester": sem}
+            _statements["tac_comments"],
+            {"proposal_code": proposal_code, "year": year, "semester": sem},
         )
         return {
             row.partner_code: row.tac_comment if row.tac_comment else None
@@ -1284,24 +2309,9 @@ WHERE PC.Proposal_Code = :proposal_code
 
     def _charged_time(self, proposal_code: str, semester: str) -> Dict[str, int]:
         year, sem = semester.split("-")
-        stmt = text(
-            """
-SELECT B.Priority AS priority, SUM(B.ObsTime) AS charged_time
-FROM BlockVisit BV
-    JOIN BlockVisitStatus BVS ON BV.BlockVisitStatus_Id = BVS.BlockVisitStatus_Id
-    JOIN Block B ON BV.Block_Id = B.Block_Id
-    JOIN Proposal P ON B.Proposal_Id = P.Proposal_Id
-    JOIN ProposalCode PC ON B.ProposalCode_Id = PC.ProposalCode_Id
-    JOIN Semester S ON P.Semester_Id = S.Semester_Id
-WHERE PC.Proposal_Code = :proposal_code
-    AND S.Year = :year
-    AND S.Semester = :semester
-    AND BVS.BlockVisitStatus = 'Accepted'
-GROUP BY B.Priority
-        """
-        )
         result = self.connection.execute(
-            stmt, {"proposal_code": proposal_code, "year": year, "semester": sem}
+            _statements["charged_time"],
+            {"proposal_code": proposal_code, "year": year, "semester": sem},
         )
 
         priority_charged_time: Dict[str, int] = {f"priority_{p}": 0 for p in range(5)}
@@ -1330,30 +2340,8 @@ GROUP BY B.Priority
         """
         year, sem = semester.split("-")
 
-        # There may be multiple observing windows for a block in a night. But if we
-        # shift all times by 12 hours, all windows in the same night end up with the
-        # same date. The number of nights is then the number of distinct dates.
-        stmt = text(
-            """
-SELECT B.Block_Id                                                           AS block_id,
-       COUNT(DISTINCT DATE(DATE_SUB(BVW.VisibilityStart, INTERVAL 12 HOUR))) AS nights
-FROM BlockVisibilityWindow BVW
-         JOIN BlockVisibilityWindowType BVWT
-         ON BVW.BlockVisibilityWindowType_Id = BVWT.BlockVisibilityWindowType_Id
-         JOIN Block B ON BVW.Block_Id = B.Block_Id
-         JOIN Proposal P ON B.Proposal_Id = P.Proposal_Id
-         JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
-         JOIN Semester S ON P.Semester_Id = S.Semester_Id
-WHERE PC.Proposal_Code = :proposal_code
-  AND S.Year = :year
-  AND S.Semester = :semester
-  AND BVW.VisibilityStart BETWEEN :start AND :end
-  AND BVWT.BlockVisibilityWindowType='Strict'
-GROUP BY B.Block_Id
-        """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["block_observable_nights"],
             {
                 "proposal_code": proposal_code,
                 "year": year,
@@ -1368,44 +2356,17 @@ GROUP BY B.Block_Id
         """
         Return the proposal comments ordered by the time when they were made.
         """
-        stmt = text(
-            """
-SELECT PC.ProposalComment_Id               AS id,
-       PC.CommentDate                      AS comment_date,
-       CONCAT(I.FirstName, ' ', I.Surname) AS author,
-       PC.ProposalComment                  AS comment
-FROM ProposalComment PC
-         JOIN Investigator I ON PC.Investigator_Id = I.Investigator_Id
-         JOIN ProposalCode P ON PC.ProposalCode_Id = P.ProposalCode_Id
-WHERE P.Proposal_Code = :proposal_code
-ORDER BY PC.CommentDate, PC.ProposalComment_Id
-        """
+        result = self.connection.execute(
+            _statements["observation_comments"], {"proposal_code": proposal_code}
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
         return [dict(row) for row in result]
 
     def add_observation_comment(
         self, proposal_code: str, comment: str, user: User
     ) -> Dict[str, Any]:
-        istmt = text(
-            """
-INSERT INTO ProposalComment(
-    ProposalCode_Id,
-    CommentDate,
-    Investigator_Id,
-    ProposalComment
-)
-VALUES (
-    (SELECT ProposalCode_Id FROM ProposalCode WHERE Proposal_Code = :proposal_code),
-    :date,
-    (SELECT Investigator_Id FROM PiptUser WHERE Username = :username),
-    :comment
-)
-    """
-        )
         comment_date = date.today()
         insert_results = self.connection.execute(
-            istmt,
+            _statements["add_observation_comment"],
             {
                 "proposal_code": proposal_code,
                 "username": user.username,
@@ -1413,40 +2374,21 @@ VALUES (
                 "date": comment_date,
             },
         )
-        sstmt = text(
-            """
-SELECT PC.ProposalComment_Id               AS id,
-       PC.CommentDate                      AS comment_date,
-       CONCAT(I.FirstName, ' ', I.Surname) AS author,
-       PC.ProposalComment                  AS comment
-FROM ProposalComment PC
-         JOIN Investigator I ON PC.Investigator_Id = I.Investigator_Id
-         JOIN ProposalCode P ON PC.ProposalCode_Id = P.ProposalCode_Id
-WHERE PC.ProposalComment_Id = :proposal_comment_id
-    """
-        )
         select_results = self.connection.execute(
-            sstmt, {"proposal_comment_id": insert_results.lastrowid}
+            _statements["observation_comment"],
+            {"proposal_comment_id": insert_results.lastrowid},
         )
 
         return dict(select_results.one())
 
+    @cached("proposal_status", ttl=60, max_size=10000)
     def get_proposal_status(self, proposal_code: str) -> Dict[str, Any]:
         """
         Return the proposal status for a proposal.
         """
-        stmt = text(
-            """
-SELECT
-    PS.Status 			AS `status`,
-    PGI.StatusComment 	AS `comment`
-FROM ProposalGeneralInfo PGI
-         JOIN ProposalStatus PS ON PS.ProposalStatus_Id = PGI.ProposalStatus_Id
-         JOIN ProposalCode PC ON PGI.ProposalCode_Id = PC.ProposalCode_Id
-WHERE PC.Proposal_Code = :proposal_code
-        """
+        result = self.connection.execute(
+            _statements["proposal_status"], {"proposal_code": proposal_code}
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
         try:
             row = result.one()
 
@@ -1498,17 +2440,8 @@ WHERE PC.Proposal_Code = :proposal_code
 
         self._validate_status_update(proposal_code, status)
 
-        stmt = text(
-            """
-UPDATE ProposalGeneralInfo  PGI
-SET
-    PGI.ProposalStatus_Id = :status_id,
-    PGI.StatusComment = :status_comment
-WHERE ProposalCode_Id = :proposal_code_id;
-        """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["update_proposal_status"],
             {
                 "proposal_code_id": proposal_code_id,
                 "status_id": status_id,
@@ -1518,34 +2451,25 @@ WHERE ProposalCode_Id = :proposal_code_id;
         if not result.rowcount:
             raise NotFoundError()
 
+        invalidate_cache("proposal_status", proposal_code)
+
     def _proposal_status_id(self, status: str) -> int:
         """
         Return the id of a proposal status value.
         """
-        stmt = text(
-            """
-SELECT PS.ProposalStatus_Id
-FROM ProposalStatus PS
-WHERE PS.Status = :status
-        """
-        )
-        result = self.connection.execute(stmt, {"status": status})
-        return cast(int, result.scalar_one())
+        status_id = _proposal_statuses.id(self.connection, status)
+        if status_id is None:
+            raise NoResultFound()
+        return status_id
 
     def is_self_activatable(self, proposal_code: str) -> bool:
         """
         Check whether the proposal may be activated by the Principal Investigator and
         Principal Contact.
         """
-        stmt = text(
-            """
-SELECT PSA.PiPcMayActivate
-FROM ProposalSelfActivation PSA
-         JOIN ProposalCode PC ON PSA.ProposalCode_Id = PC.ProposalCode_Id
-WHERE PC.Proposal_Code = :proposal_code;
-        """
+        result = self.connection.execute(
+            _statements["is_self_activatable"], {"proposal_code": proposal_code}
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
         try:
             one = result.scalar_one_or_none()
         except NoResultFound:
@@ -1575,16 +2499,9 @@ WHERE PC.Proposal_Code = :proposal_code;
             phases = [1, 2]
         else:
             phases = [phase]
-        stmt = text(
-            """
-SELECT MAX(Submission) AS version
-FROM Proposal P
-JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
-WHERE PC.Proposal_Code = :proposal_code AND P.Phase IN :phases
-        """
-        )
         result = self.connection.execute(
-            stmt, {"proposal_code": proposal_code, "phases": phases}
+            _statements["current_version"],
+            {"proposal_code": proposal_code, "phases": phases},
         )
         version = result.scalar_one()
         if version is None:
@@ -1610,15 +2527,9 @@ WHERE PC.Proposal_Code = :proposal_code AND P.Phase IN :phases
         int
             The proposal version.
         """
-        stmt = text(
-            """
-SELECT COUNT(Submission) AS version
-FROM Proposal P
-JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
-WHERE PC.Proposal_Code = :proposal_code AND P.Phase = 1
-        """
+        result = self.connection.execute(
+            _statements["current_phase1_version"], {"proposal_code": proposal_code}
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
         current_version = result.scalar_one()
         if current_version == 0:
             return None
@@ -1637,47 +2548,16 @@ WHERE PC.Proposal_Code = :proposal_code AND P.Phase = 1
 
     def insert_or_update_proposal_progress(
         self,
-        progress_report_data: Dict[str, Any],
-        proposal_code: str,
-        semester: str,
-        filenames: Dict[str, Optional[str]],
-    ) -> None:
-        """
-        Insert or update the proposal progress information.
-        """
-        stmt = text(
-            """
-INSERT INTO ProposalProgress (
-    ProposalCode_Id,
-    Semester_Id,
-    TimeRequestChangeReasons,
-    StatusSummary,
-    StrategyChanges,
-    ReportPath,
-    SupplementaryPath,
-    SubmissionDate
-)
-VALUES(
-    (SELECT ProposalCode_Id FROM ProposalCode WHERE Proposal_Code = :proposal_code),
-    (SELECT Semester_Id FROM Semester WHERE CONCAT(`Year`, '-', Semester) = :semester),
-    :change_reason,
-    :summary_of_proposal_status,
-    :strategy_changes,
-    :report_path,
-    :supplementary_path,
-    NOW()
-) ON DUPLICATE KEY UPDATE
-    TimeRequestChangeReasons = :change_reason,
-    StatusSummary = :summary_of_proposal_status,
-    StrategyChanges = :strategy_changes,
-    ReportPath = :report_path,
-    SupplementaryPath = :supplementary_path,
-    SubmissionDate = NOW()
-;
+        progress_report_data: Dict[str, Any],
+        proposal_code: str,
+        semester: str,
+        filenames: Dict[str, Optional[str]],
+    ) -> None:
+        """
+        Insert or update the proposal progress information.
         """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["insert_or_update_proposal_progress"],
             {
                 "proposal_code": proposal_code,
                 "semester": semester,
@@ -1696,19 +2576,8 @@ VALUES(
     def _reset_partner_requested_time_and_percentages(
         self, proposal_code: str, semester: str, requested_time: int
     ) -> None:
-        stmt = text(
-            """
-UPDATE MultiPartner
-SET ReqTimeAmount=:requested_time,
-    ReqTimePercent=0
-WHERE ProposalCode_Id =
-      (SELECT ProposalCode_Id FROM ProposalCode WHERE Proposal_Code = :proposal_code)
-  AND Semester_Id =
-      (SELECT Semester_Id FROM Semester WHERE CONCAT(Year, '-', semester) = :semester);
-              """
-        )
         self.connection.execute(
-            stmt,
+            _statements["reset_partner_requested_time_and_percentages"],
             {
                 "proposal_code": proposal_code,
                 "semester": semester,
@@ -1727,28 +2596,8 @@ WHERE ProposalCode_Id =
         """
         Insert or update proposal progress requested time.
         """
-        stmt = text(
-            """
-INSERT INTO MultiPartner(
-    ProposalCode_Id,
-    Partner_Id,
-    Semester_Id,
-    ReqTimePercent,
-    ReqTimeAmount
-)
-VALUES (
-    (SELECT ProposalCode_Id FROM ProposalCode WHERE Proposal_Code = :proposal_code),
-    (SELECT Partner_Id FROM Partner WHERE Partner_Code = :partner_code),
-    (SELECT Semester_Id FROM Semester WHERE CONCAT(`Year`, '-', Semester) = :semester),
-    :requested_time_percent,
-    :requested_time_amount
-) ON DUPLICATE KEY UPDATE
-    ReqTimePercent = :requested_time_percent,
-    ReqTimeAmount = :requested_time_amount
-        """
-        )
         self.connection.execute(
-            stmt,
+            _statements["insert_or_update_requested_time"],
             {
                 "proposal_code": proposal_code,
                 "semester": semester,
@@ -1769,31 +2618,8 @@ VALUES (
         """
         Insert or update the observing conditions
         """
-        stmt = text(
-            """
-INSERT INTO P1ObservingConditions (
-    ProposalCode_Id,
-    Semester_Id,
-    MaxSeeing,
-    Transparency_Id,
-    ObservingConditionsDescription
-)
-VALUES
-(
-    (SELECT ProposalCode_Id FROM ProposalCode WHERE Proposal_Code = :proposal_code),
-    (SELECT Semester_Id FROM Semester WHERE CONCAT(`Year`, '-', Semester) = :semester),
-    :maximum_seeing,
-    (SELECT Transparency_Id FROM Transparency WHERE Transparency = :transparency),
-    :observing_conditions_description
-) ON DUPLICATE KEY UPDATE
-    MaxSeeing = :maximum_seeing,
-    Transparency_Id = (SELECT Transparency_Id FROM Transparency WHERE Transparency = :transparency),
-    ObservingConditionsDescription = :observing_conditions_description
-
-        """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["insert_or_update_observing_conditions"],
             {
                 "proposal_code": proposal_code,
                 "semester": semester,
@@ -1817,29 +2643,10 @@ VALUES
         None is returned if there are no conditions defined for the given or any earlier
         semester.
         """
-        # It would be tempting to use a WHERE condition like "semester <= :semester".
-        # However, the alias "semester" is not known to the WHERE clause, and hence
-        # "semester" would be interpreted as the Semester column of the Semester table,
-        # leading to incorrect results.
-        stmt = text(
-            """
-SELECT
-    CONCAT(S.`Year`, '-', S.Semester)   AS semester,
-    MaxSeeing						    AS seeing,
-    Transparency					    AS transparency,
-    ObservingConditionsDescription	    AS description
-FROM P1ObservingConditions AS OC
-    JOIN Transparency AS T ON (OC.Transparency_Id = T.Transparency_Id)
-    JOIN ProposalCode AS PC ON (OC.ProposalCode_Id = PC.ProposalCode_Id)
-    JOIN Semester AS S ON (OC.Semester_Id = S.Semester_Id)
-WHERE PC.Proposal_Code = :proposal_code
-    AND (S.`Year` < :year OR (S.`Year` = :year AND S.Semester <= :sem))
-ORDER BY semester DESC;
-    """
-        )
         year, sem = semester.split("-")
         results = self.connection.execute(
-            stmt, {"proposal_code": proposal_code, "year": year, "sem": sem}
+            _statements["latest_observing_conditions"],
+            {"proposal_code": proposal_code, "year": year, "sem": sem},
         )
         last = results.first()
         if last:
@@ -1858,24 +2665,9 @@ ORDER BY semester DESC;
         Priority 4 observations are not included. Rejected observations are not included
         either.
         """
-        stmt = text(
-            """
-SELECT
-    CONCAT(S.`Year`, '-', S.Semester) AS semester,
-    SUM(Obstime)                AS observed_time
-FROM Proposal		    AS P
-    JOIN ProposalCode 	AS PC USING (ProposalCode_Id)
-    JOIN `Block` 		AS B USING (Proposal_Id)
-    JOIN BlockVisit 	AS BV USING (Block_Id)
-    JOIN BlockVisitStatus AS BVS USING (BlockVisitStatus_Id)
-    JOIN Semester 		AS S ON (P.Semester_Id = S.Semester_Id)
-WHERE BlockVisitStatus = 'Accepted'
-    AND B.Priority < 4
-    AND Proposal_Code = :proposal_code
-    GROUP BY S.Semester_Id
-    """
+        result = self.connection.execute(
+            _statements["observed_p0_to_p3_time"], {"proposal_code": proposal_code}
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
         try:
             return [
                 {"semester": row.semester, "observed_time": row.observed_time}
@@ -1887,23 +2679,10 @@ WHERE BlockVisitStatus = 'Accepted'
     def get_allocated_and_requested_time(
         self, proposal_code: str
     ) -> List[Dict[str, Any]]:
-        # ReqTimeAmount is the total amount of time requested by a proposal per semester
-        # for all partners combined; hence there is no need to sum its value.
-        stmt = text(
-            """
-SELECT
-    CONCAT(S.`Year`, '-', S.Semester) AS semester,
-    ReqTimeAmount 	AS requested_time,
-    SUM(IF(TimeAlloc IS NULL, 0, TimeAlloc)) 	AS allocated_time
-FROM MultiPartner 	AS MP
-    LEFT JOIN PriorityAlloc 	AS PA ON (MP.MultiPartner_Id = PA.MultiPartner_Id)
-    JOIN ProposalCode 	AS PC ON (MP.ProposalCode_Id = PC.ProposalCode_Id)
-    JOIN Semester 		AS S ON (MP.Semester_Id = S.Semester_Id)
-WHERE Proposal_Code=:proposal_code
-    GROUP BY S.Semester_Id
-    """
+        result = self.connection.execute(
+            _statements["allocated_and_requested_time"],
+            {"proposal_code": proposal_code},
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
         try:
             return [
                 {
@@ -1936,21 +2715,10 @@ WHERE Proposal_Code=:proposal_code
     def _get_partner_requested_percentages(
         self, proposal_code: str, semester: str
     ) -> List[Dict[str, Any]]:
-        stmt = text(
-            """
-SELECT
-    Partner_Code 						AS partner_code,
-    Partner_Name 						AS partner_name,
-    ReqTimePercent						AS requested_percentage,
-    CONCAT(S.Year, '-', S.Semester)     AS semester
-FROM MultiPartner MP
-    JOIN ProposalCode PC ON MP.ProposalCode_Id = PC.ProposalCode_Id
-    JOIN Semester S ON MP.Semester_Id = S.Semester_Id
-    JOIN Partner AS P ON (MP.Partner_Id = P.Partner_Id)
-WHERE PC.Proposal_Code = :proposal_code
-    """
+        result = self.connection.execute(
+            _statements["partner_requested_percentages"],
+            {"proposal_code": proposal_code},
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
         tmp = dict()
         # Some partners may have a time request (which may be 0) for other semesters,
         # but not for the one under consideration. We therefore collect the partners for
@@ -2089,17 +2857,9 @@ WHERE PC.Proposal_Code = :proposal_code
         list of str
             The sorted list of semesters.
         """
-        stmt = text(
-            """
-SELECT CONCAT(S.Year, '-', S.Semester) AS semester
-FROM ProposalProgress PP
-         JOIN ProposalCode PC ON PP.ProposalCode_Id = PC.ProposalCode_Id
-         JOIN Semester S ON PP.Semester_Id = S.Semester_Id
-WHERE PC.Proposal_Code = :proposal_code;
-
-        """
+        result = self.connection.execute(
+            _statements["progress_report_semesters"], {"proposal_code": proposal_code}
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
         return sorted(row.semester for row in result)
 
     def get_progress_report(self, proposal_code: str, semester: str) -> Dict[str, Any]:
@@ -2111,25 +2871,9 @@ WHERE PC.Proposal_Code = :proposal_code;
             if _next_semester == t["semester"]:
                 requested_time = t["requested_time"]
 
-        # Get the progress details
-        stmt = text(
-            """
-SELECT
-    TimeRequestChangeReasons			AS change_reason,
-    StatusSummary						AS summary_of_proposal_status,
-    StrategyChanges						AS strategy_changes,
-    CONCAT(S.`Year`, '-', S.Semester)   AS semester,
-    ReportPath                          AS proposal_progress_pdf,
-    SupplementaryPath                   AS additional_pdf
-FROM ProposalProgress PP
-    JOIN ProposalCode PC ON PP.ProposalCode_Id = PC.ProposalCode_Id
-    JOIN Semester S ON PP.Semester_Id = S.Semester_Id
-WHERE PC.Proposal_Code = :proposal_code
-    AND CONCAT(S.`Year`, '-', S.Semester) = :semester
-    """
-        )
         result = self.connection.execute(
-            stmt, {"proposal_code": proposal_code, "semester": semester}
+            _statements["progress_report"],
+            {"proposal_code": proposal_code, "semester": semester},
         )
 
         # Add the observing conditions and put everything together
@@ -2254,24 +2998,8 @@ WHERE PC.Proposal_Code = :proposal_code
         motivation: str,
         username: str,
     ) -> None:
-        stmt = text(
-            """
-INSERT INTO ProprietaryPeriodExtensionRequest(
-    ProposalCode_Id,
-    Reason,
-    RequestedBy,
-    RequestedPeriod
-)
-VALUES (
-    (SELECT ProposalCode_Id FROM ProposalCode WHERE Proposal_Code = :proposal_code),
-    :reason,
-    (SELECT PiptUser_Id FROM PiptUser WHERE Username = :username),
-    :requested_period
-)
-    """
-        )
         self.connection.execute(
-            stmt,
+            _statements["insert_proprietary_period_extension_request"],
             {
                 "proposal_code": proposal_code,
                 "username": username,
@@ -2323,20 +3051,9 @@ VALUES (
         return self._data_release_date(proprietary_period, block_visits)
 
     def _is_partner_allocated(self, proposal_code: str, partner_code: str) -> bool:
-        stmt = text(
-            """
-SELECT P.Partner_Code    AS partner_code,
-       SUM(PA.TimeAlloc) AS time_allocation
-FROM PriorityAlloc PA
-         JOIN MultiPartner MP ON PA.MultiPartner_Id = MP.MultiPartner_Id
-         JOIN ProposalCode PC ON MP.ProposalCode_Id = PC.ProposalCode_Id
-         JOIN Semester S ON MP.Semester_Id = S.Semester_Id
-         JOIN Partner P ON MP.Partner_Id = P.Partner_Id
-WHERE PC.Proposal_Code = :proposal_code
-GROUP BY PA.MultiPartner_Id, PA.Priority
-        """
+        result = self.connection.execute(
+            _statements["is_partner_allocated"], {"proposal_code": proposal_code}
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
 
         for row in result:
             if row.partner_code == partner_code and row.time_allocation > 0:
@@ -2364,101 +3081,28 @@ GROUP BY PA.MultiPartner_Id, PA.Priority
             "Large Science Proposal",
             "Science",
             "Science - Long Term",
-        ]:
-            if self._is_partner_allocated(proposal_code, "RSA"):
-                return 24
-            return 1200
-        raise ValueError("Unknown proposal type.")
-
-    def update_proprietary_period(
-        self, proposal_code: str, proprietary_period: int
-    ) -> None:
-        stmt = text(
-            """
-UPDATE ProposalGeneralInfo
-SET ProprietaryPeriod = :proprietary_period, ReleaseDate = :release_date
-WHERE ProposalCode_Id = (SELECT PC.ProposalCode_Id
-                         FROM ProposalCode PC
-                         WHERE PC.Proposal_Code = :proposal_code)
-    """
-        )
-        block_visits = self.block_visits(proposal_code)
-        self.connection.execute(
-            stmt,
-            {
-                "proposal_code": proposal_code,
-                "release_date": self._data_release_date(
-                    proprietary_period, block_visits
-                ),
-                "proprietary_period": proprietary_period,
-            },
-        )
-
-    def _get_phase_one_observations(self, proposal_code: str) -> List[Dict[str, Any]]:
-        # The phase 1 targets.
-        stmt = text(
-            """
-SELECT DISTINCT RequestedTime                                   AS observing_time,
-                T.Target_Id                                     AS id,
-                T.Target_Name                                   AS name,
-                TC.RaH                                          AS ra_h,
-                TC.RaM                                          AS ra_m,
-                TC.RaS                                          AS ra_s,
-                TC.DecSign                                      AS dec_sign,
-                TC.DecD                                         AS dec_d,
-                TC.DecM                                         AS dec_m,
-                TC.DecS                                         AS dec_s,
-                TC.Equinox                                      AS equinox,
-                TM.MinMag                                       AS min_mag,
-                TM.MaxMag                                       AS max_mag,
-                BP.FilterName                                   AS bandpass,
-                TST.TargetSubType                               AS target_sub_type,
-                TT.TargetType                                   AS target_type,
-                PPT.Optional									AS optional,
-                PPT.NVisits										AS requested_observations,
-                PPT.MaxLunarPhase								AS max_lunar_phase,
-                PR.Ranking										AS ranking,
-                PPT.TrackCount									AS track_count,
-                PPT.NightCount									AS nights_count,
-                M.Moon											AS moon,
-                PTP.CompetitionProbability						AS competition_probability,
-                PTP.ObservabilityProbability					AS observability_probability,
-                PTP.SeeingProbability							AS seeing_probability,
-                PTP.TotalProbability							AS total_probability,
-                MT.RaDot                                        AS ra_dot,
-                MT.DecDot                                       AS dec_dot,
-                MT.Epoch                                        AS epoch,
-                PT.Period                                       AS period,
-                PT.Pdot                                         AS period_change_rate,
-                PT.T0                                           AS period_zero_point,
-                TB.Time_Base                                    AS period_time_base,
-                HT.Identifier                                   AS horizons_identifier,
-                IF((MT1.Target_Id IS NOT NULL
-                    OR MTF.Target_Id IS NOT NULL
-                    OR HT.Identifier IS NOT NULL),
-                    1,
-                    0)                                          AS non_sidereal
-FROM P1ProposalTarget PPT
-    JOIN ProposalCode  PC ON PPT.ProposalCode_Id = PC.ProposalCode_Id
-    JOIN Target T ON PPT.Target_Id = T.Target_Id
-    JOIN TargetCoordinates TC ON T.TargetCoordinates_Id = TC.TargetCoordinates_Id
-    JOIN P1ObservingConditions POC ON PC.ProposalCode_Id = POC.ProposalCode_Id
-     LEFT JOIN TargetMagnitudes TM ON T.TargetMagnitudes_Id = TM.TargetMagnitudes_Id
-     LEFT JOIN Bandpass BP ON TM.Bandpass_Id = BP.Bandpass_Id
-         LEFT JOIN TargetSubType TST ON T.TargetSubType_Id = TST.TargetSubType_Id
-         LEFT JOIN TargetType TT ON TST.TargetType_Id = TT.TargetType_Id
-         LEFT JOIN MovingTarget MT ON T.MovingTarget_Id = MT.MovingTarget_Id
-         LEFT JOIN PeriodicTarget PT ON T.PeriodicTarget_Id = PT.PeriodicTarget_Id
-         LEFT JOIN TimeBase TB ON PT.TimeBase_Id = TB.TimeBase_Id
-         LEFT JOIN HorizonsTarget HT ON T.HorizonsTarget_Id = HT.HorizonsTarget_Id
-         LEFT JOIN MovingTable MT1 ON T.Target_Id = MT1.Target_Id
-         LEFT JOIN MovingTableFile MTF ON T.Target_Id = MTF.Target_Id
-         LEFT JOIN PiRanking PR ON PPT.PiRanking_Id = PR.PiRanking_Id
-         LEFT JOIN Moon M ON POC.Moon_Id = M.Moon_Id
-         LEFT JOIN P1TargetProbabilities PTP ON PC.ProposalCode_Id = PTP.ProposalCode_Id
-WHERE Proposal_Code = :proposal_code
-    """
+        ]:
+            if self._is_partner_allocated(proposal_code, "RSA"):
+                return 24
+            return 1200
+        raise ValueError("Unknown proposal type.")
+
+    def update_proprietary_period(
+        self, proposal_code: str, proprietary_period: int
+    ) -> None:
+        block_visits = self.block_visits(proposal_code)
+        self.connection.execute(
+            _statements["update_proprietary_period"],
+            {
+                "proposal_code": proposal_code,
+                "release_date": self._data_release_date(
+                    proprietary_period, block_visits
+                ),
+                "proprietary_period": proprietary_period,
+            },
         )
+
+    def _get_phase_one_observations(self, proposal_code: str) -> List[Dict[str, Any]]:
         return [
             {
                 "target": {
@@ -2487,30 +3131,16 @@ WHERE Proposal_Code = :proposal_code
                     "total": row.total_probability,
                 },
             }
-            for row in self.connection.execute(stmt, {"proposal_code": proposal_code})
+            for row in self.connection.execute(
+                _statements["phase_one_observations"], {"proposal_code": proposal_code}
+            )
         ]
 
     def _get_requested_times(self, proposal_code: str) -> List[Dict[str, Any]]:
-        stmt = text(
-            """
-SELECT
-    MP.ReqTimePercent					AS percentage,
-    PMT.P1MinimumUsefulTime				AS minimum_useful_time,
-    MP.ReqTimeAmount					AS total_requested_time,
-    PMT.P1TimeComment					AS `comment`,
-    P.Partner_Name						AS partner_name,
-    CONCAT(S.`Year`, '-', S.Semester)   AS semester
-FROM MultiPartner MP
-    JOIN ProposalCode PC ON MP.ProposalCode_Id = PC.ProposalCode_Id
-    JOIN Semester S ON MP.Semester_Id = S.Semester_Id
-    JOIN Partner P ON MP.Partner_Id = P.Partner_Id
-    JOIN P1MinTime PMT ON MP.ProposalCode_Id = PMT.ProposalCode_Id AND MP.Semester_Id = PMT.Semester_Id
-WHERE Proposal_Code = :proposal_code
-        """
-        )
-
         req_time: DefaultDict[str, Dict[str, Any]] = defaultdict(lambda: dict())
-        for row in self.connection.execute(stmt, {"proposal_code": proposal_code}):
+        for row in self.connection.execute(
+            _statements["requested_times"], {"proposal_code": proposal_code}
+        ):
             semester = row.semester
             if not req_time[semester]:
                 req_time[semester] = {
@@ -2529,20 +3159,10 @@ WHERE Proposal_Code = :proposal_code
     def _get_nir_simulations(
         self, proposal_code: str, configuration_id: int
     ) -> List[Dict[str, Any]]:
-        stmt = text(
-            """
-SELECT
-    P1NirSimulation_Id          AS id,
-    P1NirSimulation_Name		AS `name`,
-    PiComment					AS description
-FROM P1NirSimulation P1NS
-    JOIN ProposalCode PC ON	P1NS.ProposalCode_Id = PC.ProposalCode_Id
-WHERE Proposal_Code = :proposal_code AND P1Nir_Id = :configuration_id
-        """
-        )
         simulations = []
         for row in self.connection.execute(
-            stmt, {"proposal_code": proposal_code, "configuration_id": configuration_id}
+            _statements["nir_simulations"],
+            {"proposal_code": proposal_code, "configuration_id": configuration_id},
         ):
             simulations.append(
                 {
@@ -2556,20 +3176,10 @@ WHERE Proposal_Code = :proposal_code AND P1Nir_Id = :configuration_id
     def _get_hrs_simulations(
         self, proposal_code: str, configuration_id: int
     ) -> List[Dict[str, Any]]:
-        stmt = text(
-            """
-SELECT
-    P1HrsSimulation_Id          AS id,
-    P1HrsSimulation_Name		AS `name`,
-    PiComment					AS description
-FROM P1HrsSimulation P1HS
-    JOIN ProposalCode PC ON	P1HS.ProposalCode_Id = PC.ProposalCode_Id
-WHERE Proposal_Code = :proposal_code AND P1Hrs_Id = :configuration_id
-        """
-        )
         simulations = []
         for row in self.connection.execute(
-            stmt, {"proposal_code": proposal_code, "configuration_id": configuration_id}
+            _statements["hrs_simulations"],
+            {"proposal_code": proposal_code, "configuration_id": configuration_id},
         ):
             simulations.append(
                 {
@@ -2583,20 +3193,10 @@ WHERE Proposal_Code = :proposal_code AND P1Hrs_Id = :configuration_id
     def _get_rss_simulations(
         self, proposal_code: str, configuration_id: int
     ) -> List[Dict[str, Any]]:
-        stmt = text(
-            """
-SELECT
-    P1RssSimulation_Id          AS id,
-    P1RssSimulation_Name		AS `name`,
-    PiComment					AS description
-FROM P1RssSimulation P1RS
-    JOIN ProposalCode PC ON	P1RS.ProposalCode_Id = PC.ProposalCode_Id
-WHERE Proposal_Code = :proposal_code AND P1Rss_Id = :configuration_id
-        """
-        )
         simulations = []
         for row in self.connection.execute(
-            stmt, {"proposal_code": proposal_code, "configuration_id": configuration_id}
+            _statements["rss_simulations"],
+            {"proposal_code": proposal_code, "configuration_id": configuration_id},
         ):
             simulations.append(
                 {
@@ -2610,20 +3210,10 @@ WHERE Proposal_Code = :proposal_code AND P1Rss_Id = :configuration_id
     def _get_salticam_simulations(
         self, proposal_code: str, configuration_id: int
     ) -> List[Dict[str, Any]]:
-        stmt = text(
-            """
-SELECT
-    P1SalticamSimulation_Id         AS id,
-    P1SalticamSimulation_Name		AS `name`,
-    PiComment					    AS description
-FROM P1SalticamSimulation P1SS
-    JOIN ProposalCode PC ON	P1SS.ProposalCode_Id = PC.ProposalCode_Id
-WHERE Proposal_Code = :proposal_code AND P1Salticam_Id = :configuration_id
-        """
-        )
         simulations = []
         for row in self.connection.execute(
-            stmt, {"proposal_code": proposal_code, "configuration_id": configuration_id}
+            _statements["salticam_simulations"],
+            {"proposal_code": proposal_code, "configuration_id": configuration_id},
         ):
             simulations.append(
                 {
@@ -2635,31 +3225,9 @@ WHERE Proposal_Code = :proposal_code AND P1Salticam_Id = :configuration_id
         return simulations
 
     def _get_p1_rss_config(self, proposal_code, config_id):
-        stmt = text(
-            """
-SELECT
-    RG.Grating              AS grating,
-    RFPM.FabryPerot_Mode    AS fabry_perot_mode,
-    RPP.PatternName         AS polarimetry_pattern_name,
-    RMT.RssMaskType         AS mask_type,
-    P1RM.MosDescription     AS mos_description
-FROM P1Config P1C
-    JOIN ProposalCode PC ON P1C.ProposalCode_Id = PC.ProposalCode_Id
-    JOIN P1Rss P1R ON P1C.P1Rss_Id = P1R.P1Rss_Id
-    JOIN RssMode RM ON P1R.RssMode_Id = RM.RssMode_Id
-    LEFT JOIN P1RssSpectroscopy P1RS ON P1R.P1RssSpectroscopy_Id = P1RS.P1RssSpectroscopy_Id
-    LEFT JOIN P1RssPolarimetry P1RP ON P1R.P1RssPolarimetry_Id = P1RP.P1RssPolarimetry_Id
-    LEFT JOIN P1RssFabryPerot P1RFP ON P1R.P1RssFabryPerot_Id = P1RFP.P1RssFabryPerot_Id
-    LEFT JOIN P1RssMask P1RM ON P1R.P1RssMask_Id = P1RM.P1RssMask_Id
-    LEFT JOIN RssGrating RG ON P1RS.RssGrating_Id = RG.RssGrating_Id
-    LEFT JOIN RssFabryPerotMode RFPM ON P1RFP.RssFabryPerotMode_Id = RFPM.RssFabryPerotMode_Id
-    LEFT JOIN RssPolarimetryPattern RPP ON P1RP.RssPolarimetryPattern_Id = RPP.RssPolarimetryPattern_Id
-    LEFT JOIN RssMaskType RMT ON P1RM.RssMaskType_Id = RMT.RssMaskType_Id
-WHERE Proposal_Code = :proposal_code AND P1C.P1Rss_Id = :config_id
-        """
-        )
         result = self.connection.execute(
-            stmt, {"proposal_code": proposal_code, "config_id": config_id}
+            _statements["p1_rss_config"],
+            {"proposal_code": proposal_code, "config_id": config_id},
         )
         row = result.one()
         return {
@@ -2671,55 +3239,17 @@ WHERE Proposal_Code = :proposal_code AND P1C.P1Rss_Id = :config_id
         }
 
     def _get_p1_scam_filters(self, scam_id: int):
-        stmt = text(
-            """
-SELECT
-    SF.SalticamFilter_Name          AS `name`,
-    SF.DescriptiveName              AS description
-FROM P1Salticam  P1S
-    JOIN P1SalticamFilterPattern P1SFP ON P1S.P1SalticamFilterPattern_Id = P1SFP.P1SalticamFilterPattern_Id
-    JOIN P1SalticamFilterPatternDetail P1SFD ON P1SFP.P1SalticamFilterPattern_Id = P1SFD.P1SalticamFilterPattern_Id
-    JOIN SalticamFilter SF ON P1SFD.SalticamFilter_Id = SF.SalticamFilter_Id
-WHERE P1S.P1Salticam_Id = :scam_id
-        """
+        result = self.connection.execute(
+            _statements["p1_scam_filters"], {"scam_id": scam_id}
         )
-        result = self.connection.execute(stmt, {"scam_id": scam_id})
         return [{"name": row.name, "description": row.description} for row in result]
 
     def _get_science_configurations(self, proposal_code: str) -> List[Dict[str, Any]]:
-        stmt = text(
-            """
-SELECT
-    P1C.P1Bvit_Id				        AS bvit,
-    P1C.P1Hrs_Id				        AS hrs,
-    P1C.P1Nir_Id				        AS nir,
-    P1C.P1Rss_Id				        AS rss,
-    P1C.P1Salticam_Id			        AS scam,
-    BF.BvitFilter_Name			        AS bvit_filter,
-    HM.ExposureMode				        AS hrs_mode,
-    NG.Grating					        AS nir_grating,
-    RM.`Mode`					        AS rss_mode,
-    RDM.DetectorMode					AS rss_detector_mode,
-    SM.DetectorMode				        AS scam_detector_mode
-FROM P1Config P1C
-    JOIN ProposalCode PC ON P1C.ProposalCode_Id = PC.ProposalCode_Id
-    LEFT JOIN P1Bvit PB ON P1C.P1Bvit_Id = PB.P1Bvit_Id
-    LEFT JOIN BvitFilter BF ON PB.BvitFilter_Id = BF.BvitFilter_Id
-    LEFT JOIN P1Hrs PH ON P1C.P1Hrs_Id = PH.P1Hrs_Id
-    LEFT JOIN HrsMode HM ON PH.HrsMode_Id = HM.HrsMode_Id
-    LEFT JOIN P1Nir PN ON P1C.P1Nir_Id = PN.P1Nir_Id
-    LEFT JOIN NirGrating NG ON PN.NirGrating_Id = NG.NirGrating_Id
-    LEFT JOIN P1Rss PR ON P1C.P1Rss_Id = PR.P1Rss_Id
-    LEFT JOIN RssDetectorMode RDM ON PR.RssDetectorMode_Id = RDM.RssDetectorMode_Id
-    LEFT JOIN RssMode RM ON PR.RssMode_Id = RM.RssMode_Id
-    LEFT JOIN P1Salticam PS ON P1C.P1Salticam_Id = PS.P1Salticam_Id
-    LEFT JOIN SalticamDetectorMode SM ON PS.SalticamDetectorMode_Id = SM.SalticamDetectorMode_Id
-WHERE PC.Proposal_Code = :proposal_code
-        """
-        )
         configurations = []
 
-        for row in self.connection.execute(stmt, {"proposal_code": proposal_code}):
+        for row in self.connection.execute(
+            _statements["science_configurations"], {"proposal_code": proposal_code}
+        ):
             if row.bvit:
                 configurations.append(
                     {  # There are no BVIT simulations
@@ -2788,18 +3318,7 @@ WHERE PC.Proposal_Code = :proposal_code
         """
         Return the proposal code id of a proposal code.
         """
-        stmt = text(
-            """
-SELECT ProposalCode_Id FROM ProposalCode
-WHERE Proposal_Code = :proposal_code
-        """
-        )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
-        proposal_code_id = result.one_or_none()
-        if not proposal_code_id:
-            raise NotFoundError(f"Couldn't find proposal code '{proposal_code}'")
-
-        return cast(int, proposal_code_id[0])
+        return self.proposal_metadata_repository.get(proposal_code).proposal_code_id
 
     def update_is_self_activatable(
         self, proposal_code: str, is_self_activatable: bool
@@ -2807,18 +3326,8 @@ WHERE Proposal_Code = :proposal_code
         # The id could be evaluated in the INSERT query, but this would lead to more
         # cryptic errors for a non-existing proposal code.
         proposal_code_id = self.get_proposal_code_id(proposal_code)
-        stmt = text(
-            """
-        INSERT INTO ProposalSelfActivation (ProposalCode_Id, PiPcMayActivate)
-        VALUE(
-            :proposal_code_id,
-            :is_self_activatable
-        )
-        ON DUPLICATE KEY UPDATE PiPcMayActivate = :is_self_activatable;
-        """
-        )
         self.connection.execute(
-            stmt,
+            _statements["update_is_self_activatable"],
             {
                 "proposal_code_id": proposal_code_id,
                 "is_self_activatable": 1 if is_self_activatable else 0,
@@ -2829,23 +3338,8 @@ WHERE Proposal_Code = :proposal_code
         # The id could be evaluated in the INSERT query, but this would lead to more
         # cryptic errors for a non-existing proposal code.
         proposal_code_id = self.get_proposal_code_id(proposal_code)
-        stmt = text(
-            """
-SELECT
-    I2.PiptUser_Id           AS id,
-    I2.FirstName             AS given_name,
-    I2.Surname               AS family_name,
-    I2.Email                 AS email
-FROM ProposalContact PCon
-    JOIN Investigator I ON I.Investigator_Id = PCon.Astronomer_Id
-    JOIN PiptUser PU ON PU.PiptUser_Id = I.PiptUser_Id
-    JOIN Investigator I2 ON I2.Investigator_Id = PU.Investigator_Id
-    JOIN ProposalCode PC ON PC.ProposalCode_Id = PCon.ProposalCode_Id
-WHERE PCon.ProposalCode_Id = :proposal_code_id
-        """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["liaison_astronomer"],
             {
                 "proposal_code_id": proposal_code_id,
             },
@@ -2874,15 +3368,8 @@ WHERE PCon.ProposalCode_Id = :proposal_code_id
         )
         proposal_code_id = self.get_proposal_code_id(proposal_code)
 
-        stmt = text(
-            """
-UPDATE ProposalContact
-SET Astronomer_Id = :liaison_astronomer_id
-WHERE ProposalCode_Id = :proposal_code_id
-        """
-        )
         self.connection.execute(
-            stmt,
+            _statements["update_liaison_astronomer"],
             {
                 "proposal_code_id": proposal_code_id,
                 "liaison_astronomer_id": salt_astronomer_id,
@@ -2891,16 +3378,9 @@ WHERE ProposalCode_Id = :proposal_code_id
 
     def _salt_astronomer_investigator_id(self, salt_astronomer_user_id: int) -> int:
         """Return the id of the preferred investigator entry for a SALT Astronomer."""
-        stmt = text(
-            """
-SELECT PU.Investigator_Id FROM PiptUser PU
-    JOIN SaltAstronomers SA ON PU.Investigator_Id = SA.Investigator_Id
-WHERE PU.PiptUser_Id = :salt_astronomer_user_id
-
-        """
-        )
         result = self.connection.execute(
-            stmt, {"salt_astronomer_user_id": salt_astronomer_user_id}
+            _statements["salt_astronomer_investigator_id"],
+            {"salt_astronomer_user_id": salt_astronomer_user_id},
         )
         investigator_id = result.one_or_none()
         if not investigator_id:
@@ -2917,35 +3397,8 @@ WHERE PU.PiptUser_Id = :salt_astronomer_user_id
         Update the investigator's approval status of the proposal with the given
         proposal code.
         """
-        # The temporary tables tmp1 and tmp2 are necessary as the ProposalInvestigator
-        # table cannot be included in the FROM statement. Note that if a user is present
-        # as multiple investigators, the approval status is updated for all of these
-        # investigators.
-        stmt = text(
-            """
-UPDATE ProposalInvestigator
-SET InvestigatorOkay=:approved,
-    ApprovalCode=NULL
-WHERE Investigator_Id IN (SELECT tmp1.Investigator_Id
-                         FROM (SELECT I.Investigator_Id
-                               FROM Investigator I
-                                        JOIN PiptUser PU ON I.PiptUser_Id = PU.PiptUser_Id
-                                        JOIN ProposalInvestigator PI
-                                             ON I.Investigator_Id = PI.Investigator_Id
-                                        JOIN ProposalCode PC
-                                             ON PI.ProposalCode_Id = PC.ProposalCode_Id
-                               WHERE PU.PiptUser_Id = :user_id
-                                 AND PC.ProposalCode_Id = (SELECT ProposalCode_Id
-                                                           FROM ProposalCode
-                                                           WHERE Proposal_Code = :proposal_code)) AS tmp1)
-  AND ProposalCode_Id = (SELECT tmp2.ProposalCode_Id
-                         FROM (SELECT PC.ProposalCode_Id
-                               FROM ProposalCode PC
-                               WHERE PC.Proposal_Code = :proposal_code) AS tmp2);
-        """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["update_investigator_proposal_approval_status"],
             {
                 "proposal_code": proposal_code,
                 "approved": 1 if approved else 0,
@@ -2957,18 +3410,10 @@ WHERE Investigator_Id IN (SELECT tmp1.Investigator_Id
             raise NotFoundError()
 
     def _get_pool_times(self, pool_id: int, total_times_per_priority: Dict[int, int]):
-        stmt = text(
-            """
-SELECT
-    PAT.Priority        AS priority,
-    PAT.AssignedTime    AS assigned_time
-FROM PoolAssignedTime PAT
-WHERE PAT.Pool_Id = :pool_id
-            """
-        )
-
         pool_times = []
-        for row in self.connection.execute(stmt, {"pool_id": pool_id}):
+        for row in self.connection.execute(
+            _statements["pool_times"], {"pool_id": pool_id}
+        ):
             used_time = total_times_per_priority[row.priority]
             pool_times.append(
                 {
@@ -2980,19 +3425,10 @@ WHERE PAT.Pool_Id = :pool_id
         return pool_times
 
     def _get_pool_rules(self, pool_id: int) -> List[Dict[str, int]]:
-        stmt = text(
-            """
-SELECT
-    PRS.X1              AS rule_parameter,
-    PR.Pool_Rule_short  AS rule
-FROM PoolRuleSet    PRS
-    JOIN PoolRule   PR ON PRS.PoolRule_Id = PR.PoolRule_Id
-WHERE PRS.Pool_Id = :pool_id
-            """
-        )
-
         pool_rules = []
-        for row in self.connection.execute(stmt, {"pool_id": pool_id}):
+        for row in self.connection.execute(
+            _statements["pool_rules"], {"pool_id": pool_id}
+        ):
             pool_rules.append(
                 {
                     "rule": row.rule,
@@ -3002,16 +3438,8 @@ WHERE PRS.Pool_Id = :pool_id
         return pool_rules
 
     def _get_block_total_observed_time(self, block_id: int) -> int:
-        stmt = text(
-            """
-SELECT SUM(B.ObsTime) AS total_observed_time FROM BlockVisit BV 
-    JOIN Block B ON BV.Block_Id = B.Block_Id
-    JOIN BlockVisitStatus BVS ON BV.BlockVisitStatus_Id = BVS.BlockVisitStatus_Id
-WHERE BV.Block_Id = :block_id AND BVS.BlockVisitStatus = 'Accepted'      
-            """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["block_total_observed_time"],
             {
                 "block_id": block_id,
             },
@@ -3024,31 +3452,14 @@ WHERE BV.Block_Id = :block_id AND BVS.BlockVisitStatus = 'Accepted'
     def _get_pool_blocks(
         self, pool_id: int, semester: str, proposal_code: str
     ) -> List[Dict[str, Any]]:
-        stmt = text(
-            """
-SELECT
-    B.Block_Id          AS id,
-    B.Block_Name        AS name,
-    B.Priority          AS priority,
-    B.MaxLunarPhase     AS max_lunar_phase,
-    B.NVisits           AS n_visits,
-    B.NDone             AS n_done,
-    B.ObsTime           AS observation_time,
-    BS.BlockStatus      AS status,
-    BP.Block_Id         AS block_id
-FROM BlockPool  BP
-    JOIN Block B ON BP.Block_Id = B.Block_Id
-    JOIN BlockStatus BS ON B.BlockStatus_Id = BS.BlockStatus_Id
-WHERE BS.BlockStatus NOT IN ('Deleted', 'Superseded')
-    AND BP.Pool_Id = :pool_id
-            """
-        )
         block_observable_tonight = self._block_observable_nights(
             proposal_code, semester, tonight()
         )
 
         blocks = []
-        for block in self.connection.execute(stmt, {"pool_id": pool_id}):
+        for block in self.connection.execute(
+            _statements["pool_blocks"], {"pool_id": pool_id}
+        ):
             blocks.append(
                 {
                     "id": block.id,
@@ -3076,21 +3487,9 @@ WHERE BS.BlockStatus NOT IN ('Deleted', 'Superseded')
         if semester is None:
             semester = self._latest_submission_semester(proposal_code)
 
-        stmt = text(
-            """
-SELECT
-    P.Pool_Id           AS id,
-    P.Pool_Name         AS name
-FROM Pool P
-    JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
-    JOIN Semester S ON P.Semester_Id = S.Semester_Id
-WHERE PC.Proposal_Code = :proposal_code
-    AND CONCAT(S.Year, '-', S.Semester) = :semester
-            """
-        )
         pools = []
         for row in self.connection.execute(
-            stmt,
+            _statements["pools"],
             {
                 "proposal_code": proposal_code,
                 "semester": semester,
@@ -0,0 +1,167 @@
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from types import FrameType
+from typing import Any, Optional
+
+from loguru import logger
+from sqlalchemy import event
+
+from saltapi.settings import get_settings
+
+# Package containing the repositories
+REPOSITORY_PACKAGE = "saltapi.repository"
+
+# Modules of the repository package which execute statements on behalf of the actual
+# repositories, and which hence should not be reported as the origin of a statement
+_INFRASTRUCTURE_MODULES = {
+    "saltapi.repository.database",
+    "saltapi.repository.query_statistics",
+    "saltapi.repository.unit_of_work",
+}
+
+
+class QueryStatistics:
+    """
+    Number and total duration of the SQL statements executed for a request.
+
+    An instance is made the current statistics with the collect_query_statistics
+    function, and the statements executed in the same context (including any worker
+    threads and asyncio database calls started from it) are then recorded in it.
+    """
+
+    def __init__(self, description: str = "") -> None:
+        self.description = description
+        self._lock = threading.Lock()
+        self.count = 0
+        self.duration = 0.0
+
+    def record(self, duration: float) -> None:
+        """Record an executed statement and its duration, in seconds."""
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+
+
+_current_query_statistics: ContextVar[Optional[QueryStatistics]] = ContextVar(
+    "current_query_statistics", default=None
+)
+
+
+def collect_query_statistics(statistics: QueryStatistics) -> Any:
+    """
+    Make a query statistics instance the current one.
+
+    The returned token must be passed to stop_collecting_query_statistics once the
+    statements should not be recorded any longer.
+    """
+    return _current_query_statistics.set(statistics)
+
+
+def stop_collecting_query_statistics(token: Any) -> None:
+    """Restore the query statistics which were current before."""
+    _current_query_statistics.reset(token)
+
+
+def current_query_statistics() -> Optional[QueryStatistics]:
+    """Return the current query statistics, or None if there are none."""
+    return _current_query_statistics.get()
+
+
+def is_executing(connection: Any) -> bool:
+    """
+    Whether a connection of an instrumented engine is currently executing a statement.
+    """
+    return bool(connection.info.get("query_start_time"))
+
+
+def repository_method() -> Optional[str]:
+    """
+    Return the repository method from which a statement is executed.
+
+    The method is returned in the form "ClassName.method_name" (or just the function
+    name for a module-level function). None is returned if the statement is not
+    executed from a repository.
+    """
+    frame: Optional[FrameType] = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        is_repository_module = module == REPOSITORY_PACKAGE or module.startswith(
+            REPOSITORY_PACKAGE + "."
+        )
+        if is_repository_module and module not in _INFRASTRUCTURE_MODULES:
+            instance = frame.f_locals.get("self")
+            if instance is not None:
+                return f"{type(instance).__name__}.{frame.f_code.co_name}"
+            return frame.f_code.co_name
+        frame = frame.f_back
+    return None
+
+
+def _before_cursor_execute(
+    conn: Any,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Any,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    statistics = _current_query_statistics.get()
+    if statistics is not None:
+        statistics.record(duration)
+
+    if duration >= get_settings().slow_query_threshold:
+        method = repository_method()
+        logger.bind(
+            duration=round(duration, 6),
+            repository_method=method,
+            request=statistics.description if statistics else None,
+            statement=" ".join(statement.split()),
+        ).warning(
+            f"Slow SQL query ({duration:.3f} seconds) issued by"
+            f" {method or 'non-repository code'}"
+            + (f" for {statistics.description}" if statistics else "")
+        )
+
+
+def _handle_error(context: Any) -> None:
+    # A failing statement never reaches _after_cursor_execute, so its start time must
+    # be removed here. Otherwise the connection would be taken to be executing a
+    # statement for good.
+    if context.connection is not None:
+        start_times = context.connection.info.get("query_start_time")
+        if start_times:
+            start_times.pop()
+
+
+def _checkin(dbapi_connection: Any, connection_record: Any) -> None:
+    # A connection returned to the pool is not executing any statement.
+    if connection_record is not None:
+        connection_record.info.pop("query_start_time", None)
+
+
+def instrument(db_engine: Any) -> None:
+    """
+    Record the SQL statements executed with an engine.
+
+    The number and duration of the statements are recorded in the current query
+    statistics, and statements taking longer than the SLOW_QUERY_THRESHOLD setting are
+    logged. For an asyncio engine the underlying synchronous engine must be passed.
+    """
+    event.listen(db_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(db_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(db_engine, "handle_error", _handle_error)
+    event.listen(db_engine, "checkin", _checkin)
@@ -0,0 +1,107 @@
+from typing import Any, Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.pool import NullPool
+
+from saltapi.settings import get_settings
+
+# MySQL error code for a statement which has been interrupted because it exceeded the
+# maximum execution time
+ER_QUERY_TIMEOUT = 3024
+
+# Driver used for killing statements executed with an asyncio engine
+SYNC_DRIVER_NAME = "mysql+pymysql"
+
+# Keys for the information stored with a pooled connection
+_CONNECTION_ID = "connection_id"
+_MAX_EXECUTION_TIME = "max_execution_time"
+
+
+def default_statement_timeout() -> float:
+    """Return the default maximum execution time for statements, in seconds."""
+    return get_settings().statement_timeout
+
+
+def apply_statement_timeout(connection: Connection, timeout: float) -> None:
+    """
+    Limit the execution time of the read-only statements executed with a connection.
+
+    The timeout is given in seconds, and 0 means that there is no limit. MySQL
+    interrupts a SELECT statement taking longer with error ER_QUERY_TIMEOUT.
+
+    The limit is set as a session variable. Session variables survive when a
+    connection is returned to the pool, and the limit hence is stored with the pooled
+    connection, so that the variable is only updated if the limit actually changes.
+
+    Nothing is done for databases other than MySQL.
+    """
+    if connection.dialect.name != "mysql":
+        return
+    milliseconds = round(1000 * timeout)
+    if connection.info.get(_MAX_EXECUTION_TIME) == milliseconds:
+        return
+    connection.execute(
+        text("SET SESSION max_execution_time = :milliseconds"),
+        {"milliseconds": milliseconds},
+    )
+    connection.info[_MAX_EXECUTION_TIME] = milliseconds
+
+
+def connection_id(connection: Connection) -> Optional[int]:
+    """
+    Return the MySQL connection id (as returned by CONNECTION_ID()) of a connection.
+
+    None is returned if the id is not known.
+    """
+    _id: Optional[int] = connection.info.get(_CONNECTION_ID)
+    return _id
+
+
+def _record_connection_id(dbapi_connection: Any, connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SELECT CONNECTION_ID()")
+        connection_record.info[_CONNECTION_ID] = int(cursor.fetchone()[0])
+    finally:
+        cursor.close()
+
+
+def record_connection_ids(db_engine: Any) -> None:
+    """
+    Record the MySQL connection id of every new connection opened by an engine.
+
+    The ids are needed for killing statements. For an asyncio engine the underlying
+    synchronous engine must be passed. Nothing is done for databases other than MySQL.
+    """
+    if db_engine.dialect.name == "mysql":
+        event.listen(db_engine, "connect", _record_connection_id)
+
+
+def kill_query(db_engine: Engine, connection_id: int) -> None:
+    """
+    Kill the statement a connection is currently executing.
+
+    The connection itself remains open, and the statement fails with an error. The
+    KILL QUERY statement is executed with a new connection outside the engine's pool,
+    as the pool may well be exhausted when statements need to be killed.
+
+    The engine must be the one the connection was checked out from, so that the
+    statement is killed on the right database server. For an asyncio engine (or its
+    underlying synchronous engine) the KILL QUERY statement is executed with the
+    synchronous driver, as it is not executed from within the event loop.
+    """
+    url = db_engine.url
+    if db_engine.dialect.is_async:
+        url = url.set(drivername=SYNC_DRIVER_NAME)
+    kill_engine = create_engine(url, poolclass=NullPool, future=True)
+    try:
+        dbapi_connection = kill_engine.raw_connection()
+        try:
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f"KILL QUERY {int(connection_id)}")  # nosec
+            cursor.close()
+        finally:
+            dbapi_connection.close()
+    finally:
+        kill_engine.dispose()
@@ -0,0 +1,66 @@
+from typing import Dict, Iterator, Mapping
+
+from sqlalchemy import text
+from sqlalchemy.sql.elements import BindParameter, TextClause
+
+
+class StatementRegistry(Mapping[str, TextClause]):
+    """
+    Registry of the SQL statements used by a repository.
+
+    The statements are turned into SQLAlchemy text clauses once, when they are
+    registered (which usually happens when the repository module is imported), rather
+    than on every call of a repository method. Statements must not be modified with
+    string formatting; all varying values must be passed as bound parameters. The
+    statement text hence is the same for every call, so that SQLAlchemy's compiled
+    statement cache and the server's statement digests apply to it.
+
+    Statements are registered with the register method and retrieved by name:
+
+    ```python
+    _statements = StatementRegistry()
+
+    _statements.register(
+        "institutions",
+        '''
+    SELECT Institute_Id AS id, InstituteName_Name AS name
+    FROM Institute
+             JOIN InstituteName USING (InstituteName_Id)
+    WHERE Partner_Id = :partner_id
+        ''',
+    )
+
+    ...
+
+    result = self.connection.execute(
+        _statements["institutions"], {"partner_id": partner_id}
+    )
+    ```
+
+    Bound parameters which need special treatment, such as the expanding parameters
+    required for IN clauses, can be passed to the register method as well.
+    """
+
+    def __init__(self) -> None:
+        self._statements: Dict[str, TextClause] = {}
+
+    def register(
+        self, name: str, sql: str, *bind_parameters: BindParameter
+    ) -> TextClause:
+        """Compile and register a statement."""
+        if name in self._statements:
+            raise ValueError(f"There exists a statement {name} already.")
+        statement = text(sql)
+        if bind_parameters:
+            statement = statement.bindparams(*bind_parameters)
+        self._statements[name] = statement
+        return statement
+
+    def __getitem__(self, name: str) -> TextClause:
+        return self._statements[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._statements)
+
+    def __len__(self) -> int:
+        return len(self._statements)
@@ -6,6 +6,7 @@ from sqlalchemy import text
 from sqlalchemy.engine import Connection
 
 from saltapi.exceptions import ValidationError
+from saltapi.repository.lookup_tables import LookupTable
 from saltapi.util import is_timezone_aware
 
 SubsystemStatusDetails = TypedDict(
@@ -20,6 +21,19 @@ SubsystemStatusDetails = TypedDict(
     },
 )
 
+_subsystems = LookupTable(
+    "salt_subsystems",
+    "SELECT SaltSubsystem AS value, SaltSubsystem_Id AS id FROM SaltSubsystem",
+)
+
+_subsystem_statuses = LookupTable(
+    "salt_subsystem_statuses",
+    """
+SELECT SaltSubsystemStatus AS value, SaltSubsystemStatus_Id AS id
+FROM SaltSubsystemStatus
+    """,
+)
+
 
 class StatusRepository:
     ALL_SUBSYSTEMS = [
@@ -69,10 +83,8 @@ class StatusRepository:
 INSERT INTO SaltSubsystemStatusUpdate (SaltSubsystem_Id, SaltSubsystemStatus_Id,
                                        StatusChangedAt, Reason,
                                        ExpectedAvailableAgainAt, ReportingUser)
-VALUES ((SELECT SaltSubsystem_Id FROM SaltSubsystem WHERE SaltSubsystem = :subsystem),
-        (SELECT SaltSubsystemStatus_Id
-         FROM SaltSubsystemStatus
-         WHERE SaltSubsystemStatus = :status),
+VALUES (:subsystem_id,
+        :status_id,
         :status_changed_at,
         :reason,
         :expected_available_again_at,
@@ -82,8 +94,12 @@ VALUES ((SELECT SaltSubsystem_Id FROM SaltSubsystem WHERE SaltSubsystem = :subsy
         self.connection.execute(
             stmt,
             {
-                "subsystem": subsystem_status_update["subsystem"],
-                "status": subsystem_status_update["status"],
+                "subsystem_id": self._subsystem_id(
+                    subsystem_status_update["subsystem"]
+                ),
+                "status_id": self._subsystem_status_id(
+                    subsystem_status_update["status"]
+                ),
                 "status_changed_at": subsystem_status_update["status_changed_at"],
                 "reason": subsystem_status_update["reason"],
                 "expected_available_again_at": subsystem_status_update[
@@ -104,14 +120,15 @@ SELECT sss.SaltSubsystemStatus       AS status,
 FROM SaltSubsystemStatusUpdate sssu
          JOIN SaltSubsystemStatus sss
               ON sssu.SaltSubsystemStatus_Id = sss.SaltSubsystemStatus_Id
-WHERE sssu.SaltSubsystem_Id =
-      (SELECT SaltSubsystem_Id FROM SaltSubsystem WHERE SaltSubsystem = :subsystem)
+WHERE sssu.SaltSubsystem_Id = :subsystem_id
 ORDER BY sssu.CreatedAt DESC, sssu.SaltSubsystemStatusUpdate_Id DESC
 LIMIT 1
         """
         )
 
-        result = self.connection.execute(stmt, {"subsystem": subsystem})
+        result = self.connection.execute(
+            stmt, {"subsystem_id": self._subsystem_id(subsystem)}
+        )
         row = result.fetchone()
         status_changed_at = (
             pytz.utc.localize(row["status_changed_at"])
@@ -132,6 +149,18 @@ LIMIT 1
             "reporting_user": row["reporting_user"],
         }
 
+    def _subsystem_id(self, subsystem: str) -> int:
+        subsystem_id = _subsystems.id(self.connection, subsystem)
+        if subsystem_id is None:
+            raise ValidationError(f"Unknown subsystem: {subsystem}")
+        return subsystem_id
+
+    def _subsystem_status_id(self, status: str) -> int:
+        status_id = _subsystem_statuses.id(self.connection, status)
+        if status_id is None:
+            raise ValidationError(f"Unknown subsystem status: {status}")
+        return status_id
+
     def _validate(self, subsystem_status_update: SubsystemStatusDetails) -> None:
         # subsystem is required
         subsystem = subsystem_status_update.get("subsystem")
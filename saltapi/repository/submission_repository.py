@@ -8,6 +8,7 @@ from sqlalchemy.engine import Connection
 from sqlalchemy.exc import NoResultFound
 
 from saltapi.exceptions import NotFoundError
+from saltapi.repository.proposal_metadata_repository import ProposalMetadataRepository
 from saltapi.service.submission import SubmissionMessageType, SubmissionStatus
 from saltapi.service.user import User
 
@@ -26,6 +27,7 @@ class SubmissionRepository:
             connection.
         """
         self.connection = connection
+        self.proposal_metadata_repository = ProposalMetadataRepository(connection)
 
     def get(self, identifier: str) -> Dict[str, Any]:
         """
@@ -172,18 +174,10 @@ SELECT Submission_Id AS submission_id FROM Submission S WHERE S.Identifier = :id
             )
 
     def _proposal_code_id(self, proposal_code: str) -> str:
-        stmt = text(
-            """
-SELECT ProposalCode_Id
-FROM ProposalCode
-WHERE Proposal_Code = :proposal_code
-        """
-        )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
         try:
-            proposal_code_id = result.scalar_one()
-            return str(proposal_code_id)
-        except NoResultFound:
+            metadata = self.proposal_metadata_repository.get(proposal_code)
+            return str(metadata.proposal_code_id)
+        except NotFoundError:
             raise NotFoundError(f"The proposal code {proposal_code} does not exist.")
 
     def get_log_entries(
@@ -1,19 +1,454 @@
-from typing import Any
+import logging
+import threading
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional, Tuple, TypeVar, cast
 
-from saltapi.repository.database import engine
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from saltapi.repository.cache import (
+    PendingInvalidations,
+    repeat_cache_invalidations,
+    stop_tracking_cache_invalidations,
+    track_cache_invalidations,
+)
+from saltapi.repository.database import (
+    async_connect,
+    async_engine,
+    async_replica_engine,
+    async_replica_pool_statistics,
+    connect,
+    engine,
+    replica_engine,
+    replica_monitor,
+    replica_pool_statistics,
+    replication_lag,
+)
+from saltapi.repository.query_statistics import is_executing
+from saltapi.repository.statement_timeout import (
+    apply_statement_timeout,
+    connection_id,
+    default_statement_timeout,
+    kill_query,
+)
+
+T = TypeVar("T")
+
+
+class RequestConnections:
+    """
+    Connections to the SALT Science Database shared by the units of work of a request.
+
+    Without sharing, an authenticated request checks out (at least) two pooled
+    connections, one for finding the user and one for the endpoint. While an instance
+    of this class is the current one (see use_request_connections), all units of work
+    for the primary database use the same connection instead. There is one such
+    connection for units of work and one for asyncio units of work.
+
+    The connections are only checked out when they are first used, so that requests
+    which never query the database don't need a connection at all. They must be
+    returned to the pool by calling close and close_async once the request has been
+    handled.
+
+    Only the outermost of nested units of work rolls back the transaction when exiting.
+
+    Units of work for the replica use their own connections. They register these with
+    the register method while they are using them, so that their statements can be
+    killed as well.
+
+    The execution time of read-only statements is limited by the statement_timeout
+    attribute (in seconds), which by default is given by the STATEMENT_TIMEOUT setting.
+    See the set_statement_timeout function for changing it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.statement_timeout = default_statement_timeout()
+        self._connection: Optional[Connection] = None
+        self._async_connection: Optional[AsyncConnection] = None
+        self._registered_connections: List[Connection] = []
+        self._depth = 0
+        self._async_depth = 0
+
+    def connection(self) -> Connection:
+        """Return the (synchronous) connection, checking it out if necessary."""
+        with self._lock:
+            if self._connection is None:
+                self._connection = connect(engine())
+            apply_statement_timeout(self._connection, self.statement_timeout)
+            return self._connection
+
+    async def async_connection(self) -> AsyncConnection:
+        """Return the asyncio connection, checking it out if necessary."""
+        if self._async_connection is None:
+            self._async_connection = await async_connect(async_engine())
+        await self._async_connection.run_sync(
+            apply_statement_timeout, self.statement_timeout
+        )
+        return self._async_connection
+
+    @property
+    def is_connected(self) -> bool:
+        """Whether a connection has been checked out."""
+        return self._connection is not None or self._async_connection is not None
+
+    def enter(self, asynchronous: bool = False) -> None:
+        """Register that a unit of work has been entered."""
+        with self._lock:
+            if asynchronous:
+                self._async_depth += 1
+            else:
+                self._depth += 1
+
+    def exit(self, asynchronous: bool = False) -> bool:
+        """
+        Register that a unit of work has been exited.
+
+        Whether the unit of work is the outermost one is returned.
+        """
+        with self._lock:
+            if asynchronous:
+                self._async_depth -= 1
+                return self._async_depth == 0
+            self._depth -= 1
+            return self._depth == 0
+
+    def release(self) -> None:
+        """
+        Return the (synchronous) connection to the pool, unless a unit of work is
+        using it.
+
+        The connection is checked out again when it is next used.
+        """
+        with self._lock:
+            if self._depth == 0 and self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def register(self, connection: Connection) -> None:
+        """
+        Register a connection which is not shared, such as a connection to the replica.
+
+        For an asyncio connection, its synchronous connection must be passed. The
+        connection must be unregistered before it is returned to the pool.
+        """
+        with self._lock:
+            self._registered_connections.append(connection)
+
+    def unregister(self, connection: Connection) -> None:
+        """Unregister a connection registered with the register method."""
+        with self._lock:
+            self._registered_connections = [
+                c for c in self._registered_connections if c is not connection
+            ]
+
+    def executing_connection_ids(self) -> List[int]:
+        """Return the MySQL ids of the connections currently executing a statement."""
+        return [_id for _, _id in self._executing_connections()]
+
+    def kill_executing_statements(self) -> None:
+        """
+        Kill the statements currently executed with the connections.
+
+        Every statement is killed on the database server of the engine its connection
+        has been checked out from.
+        """
+        for db_engine, _id in self._executing_connections():
+            kill_query(db_engine, _id)
+
+    def _executing_connections(self) -> List[Tuple[Any, int]]:
+        # Return the engine and MySQL id of the connections executing a statement.
+        with self._lock:
+            connections = [self._connection, *self._registered_connections]
+        if self._async_connection is not None:
+            connections.append(self._async_connection.sync_connection)
+        executing = []
+        for connection in connections:
+            if connection is not None and is_executing(connection):
+                _id = connection_id(connection)
+                if _id is not None:
+                    executing.append((connection.engine, _id))
+        return executing
+
+    def close(self) -> None:
+        """Return the (synchronous) connection to the pool, if it was checked out."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    async def close_async(self) -> None:
+        """Return the asyncio connection to the pool, if it was checked out."""
+        if self._async_connection is not None:
+            await self._async_connection.close()
+            self._async_connection = None
+
+
+_current_request_connections: ContextVar[Optional[RequestConnections]] = ContextVar(
+    "current_request_connections", default=None
+)
+
+
+def use_request_connections(connections: RequestConnections) -> Any:
+    """
+    Make a request connections instance the current one.
+
+    The returned token must be passed to stop_using_request_connections once the
+    request has been handled.
+    """
+    return _current_request_connections.set(connections)
+
+
+def stop_using_request_connections(token: Any) -> None:
+    """Restore the request connections which were current before."""
+    _current_request_connections.reset(token)
+
+
+def release_request_connection() -> None:
+    """
+    Return the (synchronous) connection of the current request to the pool.
+
+    This should be called before a request waits for something other than the
+    database, so that it does not hold on to a pooled connection meanwhile. The
+    connection is not returned while a unit of work is using it. The function has no
+    effect outside a request.
+    """
+    connections = _current_request_connections.get()
+    if connections is not None:
+        connections.release()
+
+
+def set_statement_timeout(timeout: float) -> None:
+    """
+    Set the maximum execution time for the read-only statements of the current request.
+
+    The timeout is given in seconds, and 0 means that there is no limit. It replaces
+    the default given by the STATEMENT_TIMEOUT setting for all the units of work
+    subsequently created for the request. The function has no effect outside a
+    request.
+    """
+    connections = _current_request_connections.get()
+    if connections is not None:
+        connections.statement_timeout = timeout
+
+
+def _statement_timeout() -> float:
+    connections = _current_request_connections.get()
+    if connections is not None:
+        return connections.statement_timeout
+    return default_statement_timeout()
 
 
 class UnitOfWork:
+    """
+    Unit of work.
+
+    The connection is only checked out when it is first used. Within a request, the
+    unit of work uses the connection shared by all the units of work of that request
+    (see RequestConnections).
+
+    A read-only unit of work uses the replica of the SALT Science Database if a replica
+    is defined and its replication lag is acceptable. Otherwise, it falls back to the
+    primary database. A read-only unit of work cannot be committed.
+
+    The execution time of read-only statements is limited by the STATEMENT_TIMEOUT
+    setting, unless a different limit is set with the set_statement_timeout function.
+
+    Repository caches invalidated while the unit of work is used are invalidated again
+    once it has been committed or rolled back, so that no results read before the
+    transaction ended remain cached.
+    """
+
+    def __init__(self, read_only: bool = False) -> None:
+        self.read_only = read_only
+        self._connection: Optional[Connection] = None
+        self._request_connections: Optional[RequestConnections] = None
+        self._registered_with: Optional[RequestConnections] = None
+        self._pending_invalidations: Optional[PendingInvalidations] = None
+
     def __enter__(self) -> "UnitOfWork":
-        self.connection = engine().connect()
+        self._pending_invalidations = track_cache_invalidations()
+        replica = self._usable_replica_engine() if self.read_only else None
+        if replica is not None:
+            self._connection = connect(replica, replica_pool_statistics)
+            self._registered_with = _current_request_connections.get()
+            if self._registered_with is not None:
+                self._registered_with.register(self._connection)
+            apply_statement_timeout(self._connection, _statement_timeout())
+        else:
+            self._request_connections = _current_request_connections.get()
+            if self._request_connections is not None:
+                self._request_connections.enter()
         return self
 
     def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
-        self.rollback()
-        self.connection.close()
+        if self._request_connections is not None:
+            if self._request_connections.exit():
+                self.rollback()
+            self._request_connections = None
+        elif self._connection is not None:
+            if self._registered_with is not None:
+                self._registered_with.unregister(self._connection)
+                self._registered_with = None
+            self.rollback()
+            self._connection.close()
+        self._connection = None
+        stop_tracking_cache_invalidations(self._pending_invalidations)
+        self._pending_invalidations = None
+
+    @property
+    def connection(self) -> Connection:
+        """Return the connection, checking it out if necessary."""
+        if self._connection is None:
+            if self._request_connections is not None:
+                self._connection = self._request_connections.connection()
+            else:
+                self._connection = connect(engine())
+                apply_statement_timeout(self._connection, _statement_timeout())
+        return self._connection
 
     def rollback(self) -> None:
-        self.connection.rollback()
+        if self._connection is not None:
+            self._connection.rollback()
+        repeat_cache_invalidations()
 
     def commit(self) -> None:
-        self.connection.commit()
+        if self.read_only:
+            raise RuntimeError("A read-only unit of work cannot be committed.")
+        if self._connection is not None:
+            self._connection.commit()
+        repeat_cache_invalidations()
+
+    @staticmethod
+    def _usable_replica_engine() -> Optional[Any]:
+        replica = replica_engine()
+        if replica is None:
+            return None
+        if replica_monitor.needs_check():
+            try:
+                with replica.connect() as connection:
+                    lag = replication_lag(connection)
+            except SQLAlchemyError as e:
+                logging.warning(f"The SDB replication lag could not be checked: {e}")
+                lag = None
+            replica_monitor.update(lag)
+        return replica if replica_monitor.is_usable else None
+
+
+class AsyncUnitOfWork:
+    """
+    Unit of work for asyncio endpoints.
+
+    The repositories expect a (synchronous) SQLAlchemy connection. Rather than
+    duplicating them, the run method passes them such a connection, which uses the
+    asyncio driver under the hood. So the event loop is not blocked while waiting for
+    the database, and no worker thread is needed.
+
+    For example:
+
+    ```python
+    def get_status(connection: Connection) -> List[SubsystemStatusDetails]:
+        return StatusService(StatusRepository(connection)).get_status()
+
+    async with AsyncUnitOfWork() as unit_of_work:
+        status = await unit_of_work.run(get_status)
+    ```
+
+    The function passed to the run method must not perform any other blocking
+    operations such as reading files.
+
+    As for the UnitOfWork class, a read-only unit of work uses the replica of the SALT
+    Science Database if possible, and it cannot be committed. Similarly, the
+    connection is only checked out when it is first used, and within a request it is
+    shared with the other asyncio units of work of the request.
+    """
+
+    def __init__(self, read_only: bool = False) -> None:
+        self.read_only = read_only
+        self._connection: Optional[AsyncConnection] = None
+        self._request_connections: Optional[RequestConnections] = None
+        self._registered_with: Optional[RequestConnections] = None
+        self._pending_invalidations: Optional[PendingInvalidations] = None
+
+    async def __aenter__(self) -> "AsyncUnitOfWork":
+        self._pending_invalidations = track_cache_invalidations()
+        replica = await self._usable_replica_engine() if self.read_only else None
+        if replica is not None:
+            self._connection = await async_connect(
+                replica, async_replica_pool_statistics
+            )
+            self._registered_with = _current_request_connections.get()
+            if self._registered_with is not None:
+                self._registered_with.register(self._connection.sync_connection)
+            await self._connection.run_sync(
+                apply_statement_timeout, _statement_timeout()
+            )
+        else:
+            self._request_connections = _current_request_connections.get()
+            if self._request_connections is not None:
+                self._request_connections.enter(asynchronous=True)
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        if self._request_connections is not None:
+            if self._request_connections.exit(asynchronous=True):
+                await self.rollback()
+            self._request_connections = None
+        elif self._connection is not None:
+            if self._registered_with is not None:
+                self._registered_with.unregister(self._connection.sync_connection)
+                self._registered_with = None
+            await self.rollback()
+            await self._connection.close()
+        self._connection = None
+        stop_tracking_cache_invalidations(self._pending_invalidations)
+        self._pending_invalidations = None
+
+    async def connection(self) -> AsyncConnection:
+        """Return the connection, checking it out if necessary."""
+        if self._connection is None:
+            if self._request_connections is not None:
+                self._connection = await self._request_connections.async_connection()
+            else:
+                self._connection = await async_connect(async_engine())
+                await self._connection.run_sync(
+                    apply_statement_timeout, _statement_timeout()
+                )
+        return self._connection
+
+    async def run(self, f: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a function which expects a connection as its first argument.
+
+        Any further arguments are passed on to the function.
+        """
+        connection = await self.connection()
+        return cast(T, await connection.run_sync(f, *args, **kwargs))
+
+    async def rollback(self) -> None:
+        if self._connection is not None:
+            await self._connection.rollback()
+        repeat_cache_invalidations()
+
+    async def commit(self) -> None:
+        if self.read_only:
+            raise RuntimeError("A read-only unit of work cannot be committed.")
+        if self._connection is not None:
+            await self._connection.commit()
+        repeat_cache_invalidations()
+
+    @staticmethod
+    async def _usable_replica_engine() -> Optional[Any]:
+        replica = async_replica_engine()
+        if replica is None:
+            return None
+        if replica_monitor.needs_check():
+            try:
+                async with replica.connect() as connection:
+                    lag = await connection.run_sync(replication_lag)
+            except SQLAlchemyError as e:
+                logging.warning(f"The SDB replication lag could not be checked: {e}")
+                lag = None
+            replica_monitor.update(lag)
+        return replica if replica_monitor.is_usable else None
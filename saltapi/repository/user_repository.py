@@ -3,56 +3,969 @@ import hashlib
 import secrets
 import string
 import uuid
-from typing import Any, Dict, List, Optional, cast
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, cast
 
 from passlib.context import CryptContext
-from sqlalchemy import text
+from sqlalchemy import bindparam
 from sqlalchemy.engine import Connection
 from sqlalchemy.exc import IntegrityError, NoResultFound
 
 from saltapi.exceptions import NotFoundError, ValidationError
-from saltapi.service.user import RIGHT_DB_NAMES, Role, User, UserRight
+from saltapi.repository.cache import cached, invalidate_cache, request_cached
+from saltapi.repository.lookup_tables import LookupTable
+from saltapi.repository.proposal_metadata_repository import ProposalMetadataRepository
+from saltapi.repository.statements import StatementRegistry
+from saltapi.service.password_verification import password_verification_executor
+from saltapi.service.user import (
+    RIGHT_DB_NAMES,
+    AccessibleProposals,
+    ProposalRelationships,
+    Role,
+    User,
+    UserRight,
+)
+from saltapi.settings import get_settings
+
+pwd_context = CryptContext(
+    schemes=["bcrypt", "md5_crypt"], default="bcrypt", deprecated="auto"
+)
+
+
+class ProposalPermission(enum.Enum):
+    VIEW = "View"
+
+
+_statements = StatementRegistry()
+
+# The general roles of a user. Each column corresponds to one of the is_... methods of
+# the UserRepository class (such as is_administrator or is_tac_chair_in_general).
+_statements.register(
+    "general_roles",
+    """
+SELECT MAX(CASE
+               WHEN PS.PiptSetting_Name = 'RightAdmin' AND PUS.Value > 1 THEN 1
+               ELSE 0 END)            AS is_administrator,
+       MAX(CASE
+               WHEN PS.PiptSetting_Name = 'RightAstronomer' AND PUS.Value > 0 THEN 1
+               ELSE 0 END)            AS is_salt_astronomer,
+       MAX(CASE
+               WHEN PS.PiptSetting_Name = 'RightOperator' AND PUS.Value > 0 THEN 1
+               ELSE 0 END)            AS is_salt_operator,
+       MAX(CASE
+               WHEN PS.PiptSetting_Name = 'RightMaskCutting' AND PUS.Value > 1 THEN 1
+               ELSE 0 END)            AS is_mask_cutter,
+       MAX(CASE
+               WHEN PS.PiptSetting_Name = 'RightBoard' AND PUS.Value > 0 THEN 1
+               ELSE 0 END)            AS is_board_member,
+       MAX(CASE
+               WHEN PS.PiptSetting_Name = 'RightLibrarian' AND PUS.Value > 0 THEN 1
+               ELSE 0 END)            AS is_librarian,
+       EXISTS(SELECT 1
+              FROM PiptUserTAC PUT
+              WHERE PUT.PiptUser_Id = PU.PiptUser_Id
+                AND PUT.Chair > 0)    AS is_tac_chair,
+       EXISTS(SELECT 1
+              FROM PiptUserTAC PUT
+              WHERE PUT.PiptUser_Id = PU.PiptUser_Id)
+                                      AS is_tac_member
+FROM PiptUser PU
+         LEFT JOIN PiptUserSetting PUS ON PU.PiptUser_Id = PUS.PiptUser_Id
+         LEFT JOIN PiptSetting PS ON PUS.PiptSetting_Id = PS.PiptSetting_Id
+WHERE PU.Username = :username
+GROUP BY PU.PiptUser_Id
+    """,
+)
+
+# The proposals a user may view because of their relationships with them, and whether
+# the relationship is that of an investigator
+_statements.register(
+    "accessible_proposal_codes",
+    """
+SELECT PC.Proposal_Code AS proposal_code, 1 AS is_investigator
+FROM ProposalInvestigator PI
+         JOIN Investigator I ON PI.Investigator_Id = I.Investigator_Id
+         JOIN PiptUser PU ON I.PiptUser_Id = PU.PiptUser_Id
+         JOIN ProposalCode PC ON PI.ProposalCode_Id = PC.ProposalCode_Id
+WHERE PU.Username = :username
+UNION
+SELECT PC.Proposal_Code AS proposal_code, 0 AS is_investigator
+FROM MultiPartner MP
+         JOIN PiptUserTAC PUT ON MP.Partner_Id = PUT.Partner_Id
+         JOIN PiptUser PU ON PUT.PiptUser_Id = PU.PiptUser_Id
+         JOIN ProposalCode PC ON MP.ProposalCode_Id = PC.ProposalCode_Id
+WHERE PU.Username = :username
+  AND MP.ReqTimePercent > 0
+UNION
+SELECT PC.Proposal_Code AS proposal_code, 0 AS is_investigator
+FROM ProposalPermissionGrant PPG
+         JOIN PiptUser PU ON PPG.Grantee_Id = PU.PiptUser_Id
+         JOIN ProposalPermission PP
+              ON PPG.ProposalPermission_Id = PP.ProposalPermission_Id
+         JOIN ProposalCode PC ON PPG.ProposalCode_Id = PC.ProposalCode_Id
+WHERE PU.Username = :username
+  AND PP.ProposalPermission = 'View'
+    """,
+)
+
+# Those of a list of proposals which a user may view because they are an investigator
+# on them, because they belong to a TAC from which time is requested or because they
+# have been granted permission to view them
+_statements.register(
+    "related_proposal_codes",
+    """
+SELECT PC.Proposal_Code AS proposal_code
+FROM ProposalCode PC
+         JOIN PiptUser PU ON PU.Username = :username
+WHERE PC.Proposal_Code IN :proposal_codes
+  AND (EXISTS(SELECT 1
+              FROM ProposalInvestigator PI
+                       JOIN Investigator I ON PI.Investigator_Id = I.Investigator_Id
+              WHERE PI.ProposalCode_Id = PC.ProposalCode_Id
+                AND I.PiptUser_Id = PU.PiptUser_Id)
+    OR EXISTS(SELECT 1
+              FROM PiptUserTAC PUT
+                       JOIN MultiPartner MP ON PUT.Partner_Id = MP.Partner_Id
+              WHERE MP.ProposalCode_Id = PC.ProposalCode_Id
+                AND MP.ReqTimePercent > 0
+                AND PUT.PiptUser_Id = PU.PiptUser_Id)
+    OR EXISTS(SELECT 1
+              FROM ProposalPermissionGrant PPG
+                       JOIN ProposalPermission PP
+                            ON PPG.ProposalPermission_Id = PP.ProposalPermission_Id
+              WHERE PPG.ProposalCode_Id = PC.ProposalCode_Id
+                AND PPG.Grantee_Id = PU.PiptUser_Id
+                AND PP.ProposalPermission = 'View'))
+    """,
+    bindparam("proposal_codes", expanding=True),
+)
+
+# Those of a list of proposals which a user has been granted permission to view
+_statements.register(
+    "proposal_codes_with_view_permission",
+    """
+SELECT PC.Proposal_Code AS proposal_code
+FROM ProposalPermissionGrant PPG
+         JOIN PiptUser PU ON PPG.Grantee_Id = PU.PiptUser_Id
+         JOIN ProposalPermission PP
+              ON PPG.ProposalPermission_Id = PP.ProposalPermission_Id
+         JOIN ProposalCode PC ON PPG.ProposalCode_Id = PC.ProposalCode_Id
+WHERE PU.Username = :username
+  AND PP.ProposalPermission = 'View'
+  AND PC.Proposal_Code IN :proposal_codes
+    """,
+    bindparam("proposal_codes", expanding=True),
+)
+
+# Whether a user may view proposals irrespective of their relationships with them
+_statements.register(
+    "proposal_access_rights",
+    """
+SELECT EXISTS(SELECT 1
+              FROM Investigator I
+                       JOIN Institute I2 ON I.Institute_Id = I2.Institute_Id
+                       JOIN Partner P ON I2.Partner_Id = P.Partner_Id
+              WHERE I.PiptUser_Id = PU.PiptUser_Id
+                AND P.Partner_Code != 'OTH'
+                AND P.Virtual = 0)                AS is_partner_affiliated,
+       EXISTS(SELECT 1
+              FROM PiptUserSetting PUS
+                       JOIN PiptSetting PS ON PUS.PiptSetting_Id = PS.PiptSetting_Id
+              WHERE PUS.PiptUser_Id = PU.PiptUser_Id
+                AND PS.PiptSetting_Name = 'RightProposals'
+                AND PUS.Value >= 2)               AS may_view_all_proposals
+FROM PiptUser PU
+WHERE PU.Username = :username
+    """,
+)
+
+# The relationships between a user and a proposal. Each role column corresponds to one
+# of the is_..._for_proposal methods of the UserRepository class (or to is_investigator,
+# is_principal_investigator or is_principal_contact).
+_statements.register(
+    "proposal_relationships",
+    """
+SELECT EXISTS(SELECT 1
+              FROM ProposalInvestigator PI
+                       JOIN Investigator I ON PI.Investigator_Id = I.Investigator_Id
+              WHERE PI.ProposalCode_Id = PC.ProposalCode_Id
+                AND I.PiptUser_Id = PU.PiptUser_Id)     AS is_investigator,
+       EXISTS(SELECT 1
+              FROM ProposalContact PContact
+                       JOIN Investigator I ON PContact.Leader_Id = I.Investigator_Id
+              WHERE PContact.ProposalCode_Id = PC.ProposalCode_Id
+                AND I.PiptUser_Id = PU.PiptUser_Id)     AS is_principal_investigator,
+       EXISTS(SELECT 1
+              FROM ProposalContact PContact
+                       JOIN Investigator I ON PContact.Contact_Id = I.Investigator_Id
+              WHERE PContact.ProposalCode_Id = PC.ProposalCode_Id
+                AND I.PiptUser_Id = PU.PiptUser_Id)     AS is_principal_contact,
+       EXISTS(SELECT 1
+              FROM PiptUserTAC PUT
+                       JOIN MultiPartner MP ON PUT.Partner_Id = MP.Partner_Id
+              WHERE MP.ProposalCode_Id = PC.ProposalCode_Id
+                AND MP.ReqTimePercent > 0
+                AND PUT.PiptUser_Id = PU.PiptUser_Id)   AS is_tac_member,
+       EXISTS(SELECT 1
+              FROM PiptUserTAC PUT
+                       JOIN MultiPartner MP ON PUT.Partner_Id = MP.Partner_Id
+              WHERE MP.ProposalCode_Id = PC.ProposalCode_Id
+                AND MP.ReqTimePercent > 0
+                AND PUT.Chair > 0
+                AND PUT.PiptUser_Id = PU.PiptUser_Id)   AS is_tac_chair,
+       EXISTS(SELECT 1
+              FROM ProposalPermissionGrant PPG
+                       JOIN ProposalPermission PP
+                            ON PPG.ProposalPermission_Id = PP.ProposalPermission_Id
+              WHERE PPG.ProposalCode_Id = PC.ProposalCode_Id
+                AND PPG.Grantee_Id = PU.PiptUser_Id
+                AND PP.ProposalPermission = 'View')     AS may_view
+FROM PiptUser PU
+         CROSS JOIN ProposalCode PC
+WHERE PU.Username = :username
+  AND PC.Proposal_Code = :proposal_code
+    """,
+)
+
+_proposal_permissions = LookupTable(
+    "proposal_permissions",
+    """
+SELECT ProposalPermission AS value, ProposalPermission_Id AS id
+FROM ProposalPermission
+    """,
+)
+
+_legal_statuses = LookupTable(
+    "legal_statuses",
+    """
+SELECT SouthAfricanLegalStatus AS value, SouthAfricanLegalStatus_Id AS id
+FROM SouthAfricanLegalStatus
+    """,
+)
+
+# The details of a user, with a row for each of their affiliations. A condition for
+# selecting the user is appended.
+_USER_SQL = """
+SELECT PU.PiptUser_Id           AS id,
+       I1.Email                 AS preferred_email,
+       I0.Email                 AS email,
+       I0.Investigator_Id       AS investigator_id,
+       I1.Surname               AS family_name,
+       I1.FirstName             AS given_name,
+       PU.Password              AS password_hash,
+       PU.Username              AS username,
+       P.Partner_Code           AS partner_code,
+       P.Partner_Name           AS partner_name,
+       I.InstituteName_Name     AS institution_name,
+       I2.Institute_Id          AS institution_id,
+       I2.Department            AS department,
+       PU.Active                AS active,
+       PU.UserVerified          AS user_verified,
+       CASE 
+            WHEN PEV.ValidationCode IS NULL THEN TRUE
+            ELSE FALSE
+        END AS is_contact_validated
+FROM PiptUser AS PU
+         JOIN Investigator I0 ON PU.PiptUser_Id = I0.PiptUser_Id
+         JOIN Investigator I1 ON PU.Investigator_Id = I1.Investigator_Id
+         JOIN Institute I2 ON I0.Institute_Id = I2.Institute_Id
+         JOIN Partner P ON I2.Partner_Id = P.Partner_Id
+         JOIN InstituteName I ON I2.InstituteName_Id = I.InstituteName_Id
+         LEFT JOIN PiptEmailValidation PEV ON I0.Investigator_Id = PEV.Investigator_Id
+"""
+
+_statements.register("user_by_username", _USER_SQL + "WHERE PU.Username = :username")
+
+_statements.register("user_by_id", _USER_SQL + "WHERE PU.PiptUser_Id = :user_id")
+
+_statements.register("user_by_email", _USER_SQL + "WHERE I1.Email = :email")
+
+_statements.register(
+    "users",
+    """
+SELECT DISTINCT PU.PiptUser_Id          AS id,
+                PU.Username             AS username,
+                I.FirstName             AS given_name,
+                I.Surname               AS family_name
+FROM PiptUser PU
+         JOIN Investigator I ON I.Investigator_Id = PU.Investigator_Id
+WHERE I.FirstName != 'Guest'
+ORDER BY I.Surname, I.FirstName
+    """,
+)
+
+_statements.register(
+    "auth_token_version",
+    """
+SELECT Version
+FROM AuthTokenVersion
+WHERE PiptUser_Id = :user_id
+    """,
+)
+
+_statements.register(
+    "revoke_auth_tokens",
+    """
+INSERT INTO AuthTokenVersion (PiptUser_Id, Version)
+VALUES (:user_id, 1)
+ON DUPLICATE KEY UPDATE Version = Version + 1
+    """,
+)
+
+_statements.register(
+    "is_existing_user_id",
+    """
+SELECT COUNT(*) AS user_count FROM PiptUser WHERE PiptUser_Id=:user_id
+    """,
+)
+
+_statements.register(
+    "create_investigator_details",
+    """
+INSERT INTO Investigator (Institute_Id, FirstName, Surname, Email)
+VALUES (:institution_id, :given_name, :family_name, :email)
+    """,
+)
+
+_statements.register(
+    "create_pipt_user",
+    """
+INSERT INTO PiptUser (Username, Password, Investigator_Id, EmailValidation, Active, UserVerified)
+VALUES (:username, :password_hash, :investigator_id, :email_validation, 1, 0)
+    """,
+)
+
+_statements.register(
+    "add_investigator_to_pipt_user",
+    """
+UPDATE Investigator
+SET PiptUser_Id = :pipt_user_id
+WHERE Investigator_Id = :investigator_id
+    """,
+)
+
+_statements.register(
+    "user_details",
+    """
+SELECT  SL.SouthAfricanLegalStatus  AS legal_status,
+        G.Gender                       AS gender,
+        R.Race                         AS race,
+        US.PhD                            AS has_phd,
+        US.YearOfPhD                      AS year_of_phd
+FROM UserStatistics US
+    JOIN SouthAfricanLegalStatus SL ON US.SouthAfricanLegalStatus_Id = SL.SouthAfricanLegalStatus_Id
+    LEFT JOIN Race R ON US.Race_Id = R.Race_Id
+    LEFT JOIN Gender G ON US.Gender_Id = G.Gender_Id
+WHERE US.PiptUser_Id = :user_id
+    """,
+)
+
+_statements.register(
+    "update_username",
+    """
+UPDATE PiptUser
+SET Username = :new_username
+WHERE PiptUser_Id = :user_id
+    """,
+)
+
+_statements.register(
+    "is_investigator",
+    """
+SELECT COUNT(*)
+FROM ProposalCode PC
+         JOIN ProposalInvestigator PI ON PC.ProposalCode_Id = PI.ProposalCode_Id
+         JOIN Investigator I on PI.Investigator_Id = I.Investigator_Id
+         JOIN PiptUser PU ON I.PiptUser_Id = PU.PiptUser_Id
+WHERE PC.Proposal_Code = :proposal_code AND PU.Username = :username
+    """,
+)
+
+_statements.register(
+    "is_principal_investigator",
+    """
+SELECT COUNT(*)
+FROM ProposalCode PCode
+         JOIN ProposalContact PContact
+                   ON PCode.ProposalCode_Id = PContact.ProposalCode_Id
+         JOIN Investigator I ON PContact.Leader_Id = I.Investigator_Id
+         JOIN PiptUser PU ON I.PiptUser_Id = PU.PiptUser_Id
+WHERE PCode.Proposal_Code = :proposal_code AND PU.Username = :username
+    """,
+)
+
+_statements.register(
+    "is_principal_contact",
+    """
+SELECT COUNT(*)
+FROM ProposalCode PCode
+         JOIN ProposalContact PContact
+                    ON PCode.ProposalCode_Id = PContact.ProposalCode_Id
+         JOIN Investigator I ON PContact.Contact_Id = I.Investigator_Id
+         JOIN PiptUser PU ON I.PiptUser_Id = PU.PiptUser_Id
+WHERE PCode.Proposal_Code = :proposal_code AND PU.Username = :username
+    """,
+)
+
+_statements.register(
+    "is_salt_astronomer",
+    """
+SELECT COUNT(*)
+FROM PiptUser PU
+         JOIN PiptUserSetting PUS ON PU.PiptUser_Id = PUS.PiptUser_Id
+         JOIN PiptSetting PS ON PUS.PiptSetting_Id = PS.PiptSetting_Id
+WHERE PU.Username = :username
+  AND PS.PiptSetting_Name = 'RightAstronomer'
+  AND PUS.Value > 0
+    """,
+)
+
+_statements.register(
+    "is_salt_operator",
+    """
+SELECT COUNT(*)
+FROM PiptUser PU
+         JOIN PiptUserSetting PUS ON PU.PiptUser_Id = PUS.PiptUser_Id
+         JOIN PiptSetting PS ON PUS.PiptSetting_Id = PS.PiptSetting_Id
+WHERE PU.Username = :username
+  AND PS.PiptSetting_Name = 'RightOperator'
+  AND PUS.Value > 0
+    """,
+)
+
+_statements.register(
+    "is_tac_member_for_proposal",
+    """
+SELECT COUNT(*)
+FROM PiptUser PU
+         JOIN PiptUserTAC PUT ON PU.PiptUser_Id = PUT.PiptUser_Id
+         JOIN MultiPartner MP ON PUT.Partner_Id = MP.Partner_Id
+         JOIN ProposalCode PC ON MP.ProposalCode_Id = PC.ProposalCode_Id
+WHERE PC.Proposal_Code = :proposal_code
+  AND MP.ReqTimePercent > 0
+  AND Username = :username
+    """,
+)
+
+_statements.register(
+    "is_tac_chair_for_proposal",
+    """
+SELECT COUNT(*)
+FROM PiptUser PU
+         JOIN PiptUserTAC PUT ON PU.PiptUser_Id = PUT.PiptUser_Id
+         JOIN MultiPartner MP ON PUT.Partner_Id = MP.Partner_Id
+         JOIN ProposalCode PC ON MP.ProposalCode_Id = PC.ProposalCode_Id
+WHERE PC.Proposal_Code = :proposal_code
+  AND MP.ReqTimePercent > 0
+  AND PUT.Chair > 0
+  AND Username = :username
+    """,
+)
+
+_statements.register(
+    "is_tac_chair_in_general",
+    """
+SELECT COUNT(Username)
+FROM PiptUserTAC PUT
+    JOIN PiptUser PU ON PU.PiptUser_Id = PUT.PiptUser_Id
+WHERE Username = :username
+    AND PUT.Chair > 0
+    """,
+)
+
+_statements.register(
+    "is_tac_member_in_general",
+    """
+SELECT COUNT(Username)
+FROM PiptUserTAC PUT
+    JOIN PiptUser PU ON PU.PiptUser_Id = PUT.PiptUser_Id
+WHERE Username = :username
+    """,
+)
+
+_statements.register(
+    "is_board_member",
+    """
+SELECT COUNT(*)
+FROM PiptUserSetting PUS
+         JOIN PiptSetting PS ON PUS.PiptSetting_Id = PS.PiptSetting_Id
+         JOIN PiptUser PU ON PUS.PiptUser_Id = PU.PiptUser_Id
+WHERE PU.Username = :username
+  AND PS.PiptSetting_Name = 'RightBoard'
+  AND PUS.Value > 0;
+    """,
+)
+
+_statements.register(
+    "is_partner_affiliated_user",
+    """
+SELECT COUNT(*)
+FROM Investigator I
+         JOIN PiptUser PU ON I.PiptUser_Id = PU.PiptUser_Id
+         JOIN Institute I2 ON I.Institute_Id = I2.Institute_Id
+         JOIN Partner P ON I2.Partner_Id = P.Partner_Id
+WHERE PU.Username = :username
+  AND P.Partner_Code != 'OTH'
+  AND P.Virtual = 0;
+    """,
+)
+
+_statements.register(
+    "is_administrator",
+    """
+SELECT COUNT(*)
+FROM PiptUser PU
+         JOIN PiptUserSetting PUS ON PU.PiptUser_Id = PUS.PiptUser_Id
+         JOIN PiptSetting PS ON PUS.PiptSetting_Id = PS.PiptSetting_Id
+WHERE PS.PiptSetting_Name = 'RightAdmin'
+  AND PUS.Value > 1
+  AND PU.Username = :username
+    """,
+)
+
+_statements.register(
+    "is_mask_cutter",
+    """
+SELECT COUNT(*)
+FROM PiptUser PU
+         JOIN PiptUserSetting PUS ON PU.PiptUser_Id = PUS.PiptUser_Id
+         JOIN PiptSetting PS ON PUS.PiptSetting_Id = PS.PiptSetting_Id
+WHERE PS.PiptSetting_Name = 'RightMaskCutting'
+  AND PUS.Value > 1
+  AND PU.Username = :username
+    """,
+)
+
+_statements.register(
+    "is_librarian",
+    """
+SELECT COUNT(*)
+FROM PiptUser PU
+    JOIN PiptUserSetting PUS ON PU.PiptUser_Id = PUS.PiptUser_Id
+    JOIN PiptSetting PS ON PUS.PiptSetting_Id = PS.PiptSetting_Id
+WHERE PS.PiptSetting_Name = 'RightLibrarian'
+    AND PUS.Value > 0
+    AND PU.Username = :username
+    """,
+)
+
+_statements.register(
+    "update_password_hash",
+    """
+INSERT INTO Password (Username, Password)
+VALUES (:username, :password)
+ON DUPLICATE KEY UPDATE Password = :password
+    """,
+)
+
+_statements.register(
+    "does_user_id_exist",
+    """
+SELECT COUNT(*) FROM PiptUser WHERE PiptUser_Id = :user_id
+    """,
+)
+
+_statements.register(
+    "update_password",
+    """
+UPDATE PiptUser
+SET Password = :password
+WHERE PiptUser_Id = :user_id
+    """,
+)
+
+_statements.register(
+    "update_user_details",
+    """
+UPDATE Investigator
+SET FirstName = :given_name,
+    Surname   = :family_name
+WHERE Investigator_Id =
+      (SELECT Investigator_Id FROM PiptUser WHERE PiptUser_Id = :user_id)
+    """,
+)
+
+_statements.register(
+    "replace_password_hash",
+    """
+UPDATE PiptUser
+SET Password = :password
+WHERE PiptUser_Id = :user_id
+    """,
+)
+
+_statements.register(
+    "salt_astronomers",
+    """
+SELECT
+    I.PiptUser_Id          AS id,
+    I.FirstName             AS given_name,
+    I.Surname               AS family_name
+FROM SaltAstronomers SA
+    JOIN Investigator I ON SA.Investigator_Id = I.Investigator_Id
+    ORDER BY I.Surname
+    """,
+)
+
+_statements.register(
+    "proposal_permissions",
+    """
+SELECT PC.Proposal_Code AS proposal_code, PP.ProposalPermission AS permission_type
+FROM ProposalPermissionGrant PPG
+         JOIN ProposalCode PC ON PPG.ProposalCode_Id = PC.ProposalCode_Id
+         JOIN ProposalPermission PP
+              ON PPG.ProposalPermission_Id = PP.ProposalPermission_Id
+WHERE PPG.Grantee_Id = :grantee_id
+    """,
+)
+
+_statements.register(
+    "grant_proposal_permission",
+    """
+INSERT IGNORE INTO ProposalPermissionGrant (ProposalCode_Id,
+                                            ProposalPermission_Id,
+                                            Grantee_Id)
+VALUES (:proposal_code_id, :permission_type_id, :grantee_id)
+    """,
+)
+
+_statements.register(
+    "revoke_proposal_permission",
+    """
+DELETE
+FROM ProposalPermissionGrant
+WHERE Grantee_Id = :grantee_id
+  AND ProposalCode_Id = :proposal_code_id
+  AND ProposalPermission_Id = :permission_type_id;
+    """,
+)
+
+_statements.register(
+    "user_has_proposal_permission",
+    """
+SELECT COUNT(*)
+FROM ProposalPermissionGrant
+WHERE Grantee_Id = :grantee_id
+  AND ProposalCode_Id =
+      (SELECT ProposalCode_Id FROM ProposalCode WHERE Proposal_Code = :proposal_code)
+  AND ProposalPermission_Id = (SELECT ProposalPermission_Id
+                               FROM ProposalPermission
+                               WHERE ProposalPermission = :permission)
+    """,
+)
+
+_statements.register(
+    "accessible_proposals_changed",
+    """
+SELECT Username FROM PiptUser WHERE PiptUser_Id = :user_id
+    """,
+)
+
+# Genders and races are added when users update their details, so that their ids are
+# queried in the current transaction rather than taken from a lookup table.
+_statements.register(
+    "gender_id",
+    """
+SELECT Gender_Id FROM Gender WHERE Gender = :gender
+    """,
+)
+
+_statements.register(
+    "race_id",
+    """
+SELECT Race_Id FROM Race WHERE Race = :race
+    """,
+)
+
+_statements.register(
+    "add_gender",
+    """
+INSERT INTO Gender (Gender) VALUES (:gender)
+    """,
+)
+
+_statements.register(
+    "add_race",
+    """
+INSERT INTO Race (Race) VALUES (:race)
+    """,
+)
+
+_statements.register(
+    "update_user_statistics",
+    """
+INSERT INTO UserStatistics (
+                PiptUser_Id, 
+                SouthAfricanLegalStatus_Id, 
+                Gender_Id, 
+                Race_Id, 
+                PhD, 
+                YearOfPhD
+                )
+VALUES (:pipt_user_id, :legal_status_id, :gender_id, :race_id, :has_phd, :year_of_phd )
+ON DUPLICATE KEY UPDATE
+    SouthAfricanLegalStatus_Id = :legal_status_id,
+    Gender_Id = :gender_id,
+    Race_Id = :race_id,
+    PhD = :has_phd,
+    YearOfPhD = :year_of_phd
+    """,
+)
+
+_statements.register(
+    "verify_user",
+    """
+UPDATE PiptUser
+SET UserVerified = :verify
+WHERE PiptUser_Id = :user_id
+    """,
+)
+
+_statements.register(
+    "activate_user",
+    """
+UPDATE PiptUser
+SET Active = :active
+WHERE PiptUser_Id = :user_id
+    """,
+)
+
+_statements.register(
+    "update_right",
+    """
+INSERT INTO PiptUserSetting (PiptUser_Id, PiptSetting_Id, Value)
+VALUES (
+     :user_id,
+    (SELECT PiptSetting_Id FROM PiptSetting WHERE PiptSetting_Name = :right_setting),
+    :value)
+ON DUPLICATE KEY UPDATE Value = :value
+    """,
+)
+
+_statements.register(
+    "delete_right",
+    """
+DELETE FROM PiptUserSetting
+WHERE PiptUser_Id = :user_id 
+    AND PiptSetting_Id = (
+        SELECT PiptSetting_Id FROM PiptSetting
+            WHERE PiptSetting_Name = :right_setting
+        )
+    """,
+)
+
+_statements.register(
+    "investigator_id",
+    """
+SELECT Investigator_Id FROM PiptUser WHERE PiptUser_Id = :user_id
+    """,
+)
+
+_statements.register(
+    "add_salt_astronomer",
+    """
+INSERT INTO SaltAstronomers (Investigator_Id)
+VALUES (:investigator_id)
+    """,
+)
+
+_statements.register(
+    "remove_salt_astronomer",
+    """
+DELETE FROM SaltAstronomers
+WHERE Investigator_id = :investigator_id
+    """,
+)
+
+_statements.register(
+    "add_salt_operator",
+    """
+INSERT INTO SaltOperator (FirstName, Surname, Email, Phone, Current)
+VALUES (:firstname, :surname, :email, :phone, 1)
+    """,
+)
+
+_statements.register(
+    "remove_salt_operator",
+    """
+DELETE FROM SaltOperator
+WHERE Email = :email
+    """,
+)
 
-pwd_context = CryptContext(
-    schemes=["bcrypt", "md5_crypt"], default="bcrypt", deprecated="auto"
+_statements.register(
+    "set_preferred_contact",
+    """
+UPDATE PiptUser
+SET Investigator_Id = :investigator_id
+WHERE PiptUser_Id = :user_id
+    """,
 )
 
+_statements.register(
+    "add_contact_details",
+    """
+INSERT INTO Investigator (Institute_Id, FirstName, Surname, Email, PiptUser_Id)
+VALUES (:institution_id, :given_name, :family_name, :email, :user_id)
+    """,
+)
 
-class ProposalPermission(enum.Enum):
-    VIEW = "View"
+_statements.register(
+    "subscribe_to_gravitational_wave_notifications",
+    """
+INSERT INTO PiptUserSetting (PiptUser_Id, PiptSetting_Id, Value)
+    SELECT :user_id,
+            (SELECT PiptSetting_Id FROM PiptSetting WHERE PiptSetting_Name = 'GravitationalWaveProposals'), 
+            :value
+ON DUPLICATE KEY UPDATE Value = VALUES(Value);
+    """,
+)
+
+_statements.register(
+    "subscribe_to_salt_news",
+    """
+UPDATE PiptUser
+SET ReceiveNews = :value
+WHERE PiptUser_Id = :user_id
+    """,
+)
+
+_statements.register(
+    "is_user_subscribed_to_salt_news",
+    """
+SELECT COUNT(*) FROM PiptUser
+WHERE ReceiveNews > 0 AND PiptUser_Id = :user_id
+    """,
+)
+
+_statements.register(
+    "is_user_subscribed_to_gravitational_wave_notifications",
+    """
+SELECT COUNT(*) FROM PiptUserSetting
+WHERE PiptSetting_Id = 32     # ID for PiptSetting_Name = 'GravitationalWaveProposals'
+    AND PiptUser_Id = :user_id    
+    AND Value > 0
+    """,
+)
+
+_statements.register(
+    "user_emails",
+    """
+SELECT 
+    I.Investigator_Id AS investigator_id,
+    I.Email AS email,
+    CASE 
+        WHEN P.ValidationCode IS NOT NULL THEN TRUE
+        ELSE FALSE
+    END AS pending
+FROM Investigator I
+LEFT JOIN PiptEmailValidation P
+    ON P.Investigator_Id = I.Investigator_Id
+WHERE I.PiptUser_Id = :user_id
+    """,
+)
+
+_statements.register(
+    "add_email_validation",
+    """
+INSERT INTO PiptEmailValidation (Investigator_Id, ValidationCode)
+VALUES (:investigator_id, :validation_code)
+    """,
+)
+
+_statements.register(
+    "validation_code",
+    """
+SELECT ValidationCode
+FROM PiptEmailValidation
+WHERE Investigator_Id = :investigator_id
+    """,
+)
+
+_statements.register(
+    "clear_validation_code",
+    """
+DELETE FROM PiptEmailValidation
+WHERE Investigator_Id = :investigator_id
+    """,
+)
+
+_statements.register(
+    "investigator_by_validation_code",
+    """
+SELECT I.Investigator_Id, I.PiptUser_Id, P.ValidationCode, I.Email
+FROM Investigator I
+LEFT JOIN PiptEmailValidation P ON P.Investigator_Id = I.Investigator_Id
+WHERE P.ValidationCode = :validation_code
+    """,
+)
+
+_statements.register(
+    "user_rights",
+    """
+SELECT PS.PiptSetting_Name
+FROM PiptUserSetting PUS
+JOIN PiptSetting PS ON PUS.PiptSetting_Id = PS.PiptSetting_Id
+WHERE PUS.PiptUser_Id = :user_id AND PUS.Value > 0
+    """,
+)
+
+_statements.register(
+    "set_user_right",
+    """
+INSERT INTO PiptUserSetting (PiptUser_Id, PiptSetting_Id, Value)
+SELECT :user_id,
+    (SELECT PiptSetting_Id FROM PiptSetting WHERE PiptSetting_Name = :right_name),:value
+ON DUPLICATE KEY UPDATE Value = :value;
+    """,
+)
+
+_statements.register(
+    "users_contact",
+    """
+SELECT 
+    I.Investigator_Id AS investigator_id,
+    I.Email AS email,
+    CASE 
+        WHEN P.ValidationCode IS NULL THEN TRUE
+        ELSE FALSE
+    END AS is_validated
+FROM Investigator I
+LEFT JOIN PiptEmailValidation P
+    ON P.Investigator_Id = I.Investigator_Id
+WHERE
+    I.PiptUser_Id = :user_id
+    AND I.Investigator_Id = :investigator_id
+    """,
+)
+
+_statements.register(
+    "preferred_contact",
+    """
+SELECT 
+    PU.PiptUser_Id      AS user_id,
+    I.Email             AS preferred_email,
+    I.Investigator_Id   AS investigator_id
+FROM PiptUser AS PU
+JOIN Investigator I
+    ON PU.Investigator_Id = I.Investigator_Id
+WHERE PU.PiptUser_Id = :user_id
+    """,
+)
+
+_statements.register(
+    "contact_count",
+    """
+SELECT COUNT(*) AS contact_count
+FROM Investigator
+WHERE PiptUser_Id = :user_id
+    """,
+)
 
 
 class UserRepository:
     def __init__(self, connection: Connection) -> None:
         self.connection = connection
-        self._get_user_query = """
-SELECT PU.PiptUser_Id           AS id,
-       I1.Email                 AS preferred_email,
-       I0.Email                 AS email,
-       I0.Investigator_Id       AS investigator_id,
-       I1.Surname               AS family_name,
-       I1.FirstName             AS given_name,
-       PU.Password              AS password_hash,
-       PU.Username              AS username,
-       P.Partner_Code           AS partner_code,
-       P.Partner_Name           AS partner_name,
-       I.InstituteName_Name     AS institution_name,
-       I2.Institute_Id          AS institution_id,
-       I2.Department            AS department,
-       PU.Active                AS active,
-       PU.UserVerified          AS user_verified,
-       CASE 
-            WHEN PEV.ValidationCode IS NULL THEN TRUE
-            ELSE FALSE
-        END AS is_contact_validated
-FROM PiptUser AS PU
-         JOIN Investigator I0 ON PU.PiptUser_Id = I0.PiptUser_Id
-         JOIN Investigator I1 ON PU.Investigator_Id = I1.Investigator_Id
-         JOIN Institute I2 ON I0.Institute_Id = I2.Institute_Id
-         JOIN Partner P ON I2.Partner_Id = P.Partner_Id
-         JOIN InstituteName I ON I2.InstituteName_Id = I.InstituteName_Id
-         LEFT JOIN PiptEmailValidation PEV ON I0.Investigator_Id = PEV.Investigator_Id
-"""
+        self.proposal_metadata_repository = ProposalMetadataRepository(connection)
 
     def _get(self, rows: Any) -> Optional[User]:
         user = {}
@@ -93,9 +1006,9 @@ FROM PiptUser AS PU
 
         If the username does not exist, a NotFoundError is raised.
         """
-        query = self._get_user_query + """ WHERE PU.Username = :username"""
-        stmt = text(query)
-        result = self.connection.execute(stmt, {"username": username})
+        result = self.connection.execute(
+            _statements["user_by_username"], {"username": username}
+        )
         user = self._get(result)
         return user
 
@@ -105,21 +1018,63 @@ FROM PiptUser AS PU
 
         If there is no such user, a NotFoundError is raised.
         """
-        query = self._get_user_query + """\nWHERE PU.PiptUser_Id = :user_id"""
-        stmt = text(query)
-        result = self.connection.execute(stmt, {"user_id": user_id})
+        result = self.connection.execute(
+            _statements["user_by_id"], {"user_id": user_id}
+        )
         user = self._get(result)
         return user
 
+    @cached("authenticated_users", ttl=60, max_size=5000)
+    def get_authenticated_user(self, user_id: int) -> Optional[User]:
+        """
+        Returns the user with a given user id, for authenticating a request.
+
+        The user is cached for up to a minute, so that authenticated requests don't
+        have to query the user details and roles every time. The methods of this class
+        which change the user invalidate the cached user, but changes made otherwise
+        only take effect once the cached user has expired.
+        """
+        return self.get(user_id)
+
+    @cached("auth_token_versions", ttl=60, max_size=5000)
+    def get_auth_token_version(self, user_id: int) -> int:
+        """
+        Returns the version of a user's authentication tokens.
+
+        Authentication tokens which include the user details are only valid for the
+        version they were issued with. The version is 0 if it has never been bumped.
+        It is cached for up to a minute.
+        """
+        result = self.connection.execute(
+            _statements["auth_token_version"], {"user_id": user_id}
+        )
+        version = result.scalar_one_or_none()
+        return cast(int, version) if version is not None else 0
+
+    def revoke_auth_tokens(self, user_id: int) -> None:
+        """
+        Revoke the authentication tokens of a user which include the user details.
+
+        This is done by bumping the user's token version. Other server processes may
+        still accept the revoked tokens until their cached version has expired.
+        """
+        self.connection.execute(_statements["revoke_auth_tokens"], {"user_id": user_id})
+        invalidate_cache("auth_token_versions", user_id)
+
+    def _user_details_changed(self, user_id: int) -> None:
+        # The cached user is out of date, and so are the user details included in
+        # authentication tokens.
+        invalidate_cache("authenticated_users", user_id)
+        if get_settings().auth_token_claims:
+            self.revoke_auth_tokens(user_id)
+
     def get_by_email(self, email: str) -> Optional[User]:
         """
         Returns the user with a given email
 
         If there is no such user, a NotFoundError is raised.
         """
-        query = self._get_user_query + """\nWHERE I1.Email = :email"""
-        stmt = text(query)
-        result = self.connection.execute(stmt, {"email": email})
+        result = self.connection.execute(_statements["user_by_email"], {"email": email})
         user = self._get(result)
         return user
 
@@ -128,12 +1083,9 @@ FROM PiptUser AS PU
         Return whether a user id exists.
         """
 
-        stmt = text(
-            """
-SELECT COUNT(*) AS user_count FROM PiptUser WHERE PiptUser_Id=:user_id
-        """
+        result = self.connection.execute(
+            _statements["is_existing_user_id"], {"user_id": user_id}
         )
-        result = self.connection.execute(stmt, {"user_id": user_id})
 
         return cast(int, result.scalar_one()) > 0
 
@@ -141,31 +1093,26 @@ SELECT COUNT(*) AS user_count FROM PiptUser WHERE PiptUser_Id=:user_id
         """
         Returns a list of users information
         """
-        stmt = text(
-            """
-SELECT DISTINCT PU.PiptUser_Id          AS id,
-                PU.Username             AS username,
-                I.FirstName             AS given_name,
-                I.Surname               AS family_name
-FROM PiptUser PU
-         JOIN Investigator I ON I.Investigator_Id = PU.Investigator_Id
-WHERE I.FirstName != 'Guest'
-ORDER BY I.Surname, I.FirstName
+        return list(self.iter_users())
+
+    def iter_users(self) -> Iterator[Dict[str, Any]]:
         """
-        )
+        Generate the users information returned by get_users.
 
-        result = self.connection.execute(stmt)
+        The rows are read with a server-side cursor, so no other statement may be
+        executed with the connection until all users have been generated.
+        """
+        result = self.connection.execute(
+            _statements["users"].execution_options(stream_results=True)
+        )
 
-        users = [
-            {
+        for row in result:
+            yield {
                 "id": row.id,
                 "username": row.username,
                 "given_name": row.given_name,
                 "family_name": row.family_name,
             }
-            for row in result
-        ]
-        return users
 
     def create(self, new_user_details: Dict[str, Any]) -> int:
         """Creates a new user."""
@@ -198,14 +1145,8 @@ ORDER BY I.Surname, I.FirstName
         The primary key of the new database entry is returned.
         """
 
-        stmt = text(
-            """
-INSERT INTO Investigator (Institute_Id, FirstName, Surname, Email)
-VALUES (:institution_id, :given_name, :family_name, :email)
-        """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["create_investigator_details"],
             {
                 "institution_id": new_user_details["institution_id"],
                 "given_name": new_user_details["given_name"],
@@ -227,14 +1168,8 @@ VALUES (:institution_id, :given_name, :family_name, :email)
         # self._update_password_hash(username, password)
         password_hash = self.get_password_hash(password)
 
-        stmt = text(
-            """
-INSERT INTO PiptUser (Username, Password, Investigator_Id, EmailValidation, Active, UserVerified)
-VALUES (:username, :password_hash, :investigator_id, :email_validation, 1, 0)
-        """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["create_pipt_user"],
             {
                 "username": new_user_details["username"],
                 "password_hash": password_hash,
@@ -251,15 +1186,9 @@ VALUES (:username, :password_hash, :investigator_id, :email_validation, 1, 0)
     def _add_investigator_to_pipt_user(
         self, pipt_user_id: int, investigator_id: int
     ) -> None:
-        stmt = text(
-            """
-UPDATE Investigator
-SET PiptUser_Id = :pipt_user_id
-WHERE Investigator_Id = :investigator_id
-        """
-        )
         self.connection.execute(
-            stmt, {"pipt_user_id": pipt_user_id, "investigator_id": investigator_id}
+            _statements["add_investigator_to_pipt_user"],
+            {"pipt_user_id": pipt_user_id, "investigator_id": investigator_id},
         )
 
     def _does_username_exist(self, username: str) -> bool:
@@ -293,6 +1222,8 @@ WHERE Investigator_Id = :investigator_id
             ),
         )
 
+        self._user_details_changed(user_id)
+
     def get_user_details(
         self,
         user_id: int,
@@ -300,23 +1231,8 @@ WHERE Investigator_Id = :investigator_id
         """
         Returns the details of a user.
         """
-        stmt = text(
-            """
-SELECT  SL.SouthAfricanLegalStatus  AS legal_status,
-        G.Gender                       AS gender,
-        R.Race                         AS race,
-        US.PhD                            AS has_phd,
-        US.YearOfPhD                      AS year_of_phd
-FROM UserStatistics US
-    JOIN SouthAfricanLegalStatus SL ON US.SouthAfricanLegalStatus_Id = SL.SouthAfricanLegalStatus_Id
-    LEFT JOIN Race R ON US.Race_Id = R.Race_Id
-    LEFT JOIN Gender G ON US.Gender_Id = G.Gender_Id
-WHERE US.PiptUser_Id = :user_id
-                """
-        )
-
         result = self.connection.execute(
-            stmt,
+            _statements["user_details"],
             {
                 "user_id": user_id,
             },
@@ -361,15 +1277,12 @@ WHERE US.PiptUser_Id = :user_id
         if self._does_username_exist(new_username):
             raise ValueError(f"The username {new_username} exists already.")
 
-        stmt = text(
-            """
-UPDATE PiptUser
-SET Username = :new_username
-WHERE PiptUser_Id = :user_id
-        """
-        )
+        # The index of accessible proposals is cached by username.
+        self._accessible_proposals_changed(user_id)
+
         self.connection.execute(
-            stmt, {"new_username": new_username, "user_id": user_id}
+            _statements["update_username"],
+            {"new_username": new_username, "user_id": user_id},
         )
 
     def is_investigator(self, username: str, proposal_code: str) -> bool:
@@ -378,18 +1291,9 @@ WHERE PiptUser_Id = :user_id
 
         If the user or proposal do not exist, it is assumed the user is no investigator.
         """
-        stmt = text(
-            """
-SELECT COUNT(*)
-FROM ProposalCode PC
-         JOIN ProposalInvestigator PI ON PC.ProposalCode_Id = PI.ProposalCode_Id
-         JOIN Investigator I on PI.Investigator_Id = I.Investigator_Id
-         JOIN PiptUser PU ON I.PiptUser_Id = PU.PiptUser_Id
-WHERE PC.Proposal_Code = :proposal_code AND PU.Username = :username
-        """
-        )
         result = self.connection.execute(
-            stmt, {"proposal_code": proposal_code, "username": username}
+            _statements["is_investigator"],
+            {"proposal_code": proposal_code, "username": username},
         )
         return cast(int, result.scalar_one()) > 0
 
@@ -400,19 +1304,9 @@ WHERE PC.Proposal_Code = :proposal_code AND PU.Username = :username
         If the user or proposal do not exist, it is assumed the user is no Principal
         Investigator.
         """
-        stmt = text(
-            """
-SELECT COUNT(*)
-FROM ProposalCode PCode
-         JOIN ProposalContact PContact
-                   ON PCode.ProposalCode_Id = PContact.ProposalCode_Id
-         JOIN Investigator I ON PContact.Leader_Id = I.Investigator_Id
-         JOIN PiptUser PU ON I.PiptUser_Id = PU.PiptUser_Id
-WHERE PCode.Proposal_Code = :proposal_code AND PU.Username = :username
-        """
-        )
         result = self.connection.execute(
-            stmt, {"proposal_code": proposal_code, "username": username}
+            _statements["is_principal_investigator"],
+            {"proposal_code": proposal_code, "username": username},
         )
         return cast(int, result.scalar_one()) > 0
 
@@ -423,19 +1317,9 @@ WHERE PCode.Proposal_Code = :proposal_code AND PU.Username = :username
         If the user or proposal do not exist, it is assumed the user is no Principal
         Contact.
         """
-        stmt = text(
-            """
-SELECT COUNT(*)
-FROM ProposalCode PCode
-         JOIN ProposalContact PContact
-                    ON PCode.ProposalCode_Id = PContact.ProposalCode_Id
-         JOIN Investigator I ON PContact.Contact_Id = I.Investigator_Id
-         JOIN PiptUser PU ON I.PiptUser_Id = PU.PiptUser_Id
-WHERE PCode.Proposal_Code = :proposal_code AND PU.Username = :username
-        """
-        )
         result = self.connection.execute(
-            stmt, {"proposal_code": proposal_code, "username": username}
+            _statements["is_principal_contact"],
+            {"proposal_code": proposal_code, "username": username},
         )
         return cast(int, result.scalar()) > 0
 
@@ -445,18 +1329,9 @@ WHERE PCode.Proposal_Code = :proposal_code AND PU.Username = :username
 
         If the user does not exist, it is assumed they are no SALT Astronomer.
         """
-        stmt = text(
-            """
-SELECT COUNT(*)
-FROM PiptUser PU
-         JOIN PiptUserSetting PUS ON PU.PiptUser_Id = PUS.PiptUser_Id
-         JOIN PiptSetting PS ON PUS.PiptSetting_Id = PS.PiptSetting_Id
-WHERE PU.Username = :username
-  AND PS.PiptSetting_Name = 'RightAstronomer'
-  AND PUS.Value > 0
-        """
+        result = self.connection.execute(
+            _statements["is_salt_astronomer"], {"username": username}
         )
-        result = self.connection.execute(stmt, {"username": username})
         return cast(int, result.scalar_one()) > 0
 
     def is_salt_operator(self, username: str) -> bool:
@@ -465,18 +1340,9 @@ WHERE PU.Username = :username
 
         If the user does not exist, it is assumed they are no SALT Operator.
         """
-        stmt = text(
-            """
-SELECT COUNT(*)
-FROM PiptUser PU
-         JOIN PiptUserSetting PUS ON PU.PiptUser_Id = PUS.PiptUser_Id
-         JOIN PiptSetting PS ON PUS.PiptSetting_Id = PS.PiptSetting_Id
-WHERE PU.Username = :username
-  AND PS.PiptSetting_Name = 'RightOperator'
-  AND PUS.Value > 0
-        """
+        result = self.connection.execute(
+            _statements["is_salt_operator"], {"username": username}
         )
-        result = self.connection.execute(stmt, {"username": username})
         return cast(int, result.scalar_one()) > 0
 
     def is_tac_member_for_proposal(self, username: str, proposal_code: str) -> bool:
@@ -485,20 +1351,9 @@ WHERE PU.Username = :username
 
         If the user or proposal do not exist, it is assumed the user is no TAC member.
         """
-        stmt = text(
-            """
-SELECT COUNT(*)
-FROM PiptUser PU
-         JOIN PiptUserTAC PUT ON PU.PiptUser_Id = PUT.PiptUser_Id
-         JOIN MultiPartner MP ON PUT.Partner_Id = MP.Partner_Id
-         JOIN ProposalCode PC ON MP.ProposalCode_Id = PC.ProposalCode_Id
-WHERE PC.Proposal_Code = :proposal_code
-  AND MP.ReqTimePercent > 0
-  AND Username = :username
-        """
-        )
         result = self.connection.execute(
-            stmt, {"proposal_code": proposal_code, "username": username}
+            _statements["is_tac_member_for_proposal"],
+            {"proposal_code": proposal_code, "username": username},
         )
 
         return cast(int, result.scalar_one()) > 0
@@ -509,21 +1364,9 @@ WHERE PC.Proposal_Code = :proposal_code
 
         If the user or proposal do not exist, it is assumed the user is no TAC chair.
         """
-        stmt = text(
-            """
-SELECT COUNT(*)
-FROM PiptUser PU
-         JOIN PiptUserTAC PUT ON PU.PiptUser_Id = PUT.PiptUser_Id
-         JOIN MultiPartner MP ON PUT.Partner_Id = MP.Partner_Id
-         JOIN ProposalCode PC ON MP.ProposalCode_Id = PC.ProposalCode_Id
-WHERE PC.Proposal_Code = :proposal_code
-  AND MP.ReqTimePercent > 0
-  AND PUT.Chair > 0
-  AND Username = :username
-        """
-        )
         result = self.connection.execute(
-            stmt, {"proposal_code": proposal_code, "username": username}
+            _statements["is_tac_chair_for_proposal"],
+            {"proposal_code": proposal_code, "username": username},
         )
 
         return cast(int, result.scalar_one()) > 0
@@ -534,16 +1377,9 @@ WHERE PC.Proposal_Code = :proposal_code
 
         If the user does not exist, it is assumed the user is no TAC chair.
         """
-        stmt = text(
-            """
-SELECT COUNT(Username)
-FROM PiptUserTAC PUT
-    JOIN PiptUser PU ON PU.PiptUser_Id = PUT.PiptUser_Id
-WHERE Username = :username
-    AND PUT.Chair > 0
-        """
+        result = self.connection.execute(
+            _statements["is_tac_chair_in_general"], {"username": username}
         )
-        result = self.connection.execute(stmt, {"username": username})
 
         return cast(int, result.scalar_one()) > 0
 
@@ -553,15 +1389,9 @@ WHERE Username = :username
 
         If the user does not exist, it is assumed the user is not a TAC member.
         """
-        stmt = text(
-            """
-SELECT COUNT(Username)
-FROM PiptUserTAC PUT
-    JOIN PiptUser PU ON PU.PiptUser_Id = PUT.PiptUser_Id
-WHERE Username = :username
-        """
+        result = self.connection.execute(
+            _statements["is_tac_member_in_general"], {"username": username}
         )
-        result = self.connection.execute(stmt, {"username": username})
 
         return cast(int, result.scalar_one()) > 0
 
@@ -571,18 +1401,9 @@ WHERE Username = :username
 
         If the user does not exist, it is assumed they are no Board member.
         """
-        stmt = text(
-            """
-SELECT COUNT(*)
-FROM PiptUserSetting PUS
-         JOIN PiptSetting PS ON PUS.PiptSetting_Id = PS.PiptSetting_Id
-         JOIN PiptUser PU ON PUS.PiptUser_Id = PU.PiptUser_Id
-WHERE PU.Username = :username
-  AND PS.PiptSetting_Name = 'RightBoard'
-  AND PUS.Value > 0;
-        """
+        result = self.connection.execute(
+            _statements["is_board_member"], {"username": username}
         )
-        result = self.connection.execute(stmt, {"username": username})
 
         return cast(int, result.scalar_one()) > 0
 
@@ -590,19 +1411,9 @@ WHERE PU.Username = :username
         """
         Check whether the user is a user that is affiliated to a SALT partner.
         """
-        stmt = text(
-            """
-SELECT COUNT(*)
-FROM Investigator I
-         JOIN PiptUser PU ON I.PiptUser_Id = PU.PiptUser_Id
-         JOIN Institute I2 ON I.Institute_Id = I2.Institute_Id
-         JOIN Partner P ON I2.Partner_Id = P.Partner_Id
-WHERE PU.Username = :username
-  AND P.Partner_Code != 'OTH'
-  AND P.Virtual = 0;
-        """
+        result = self.connection.execute(
+            _statements["is_partner_affiliated_user"], {"username": username}
         )
-        result = self.connection.execute(stmt, {"username": username})
         return cast(int, result.scalar_one()) > 0
 
     def is_administrator(self, username: str) -> bool:
@@ -611,18 +1422,9 @@ WHERE PU.Username = :username
 
         If the user does not exist, it is assumed they are no administrator.
         """
-        stmt = text(
-            """
-            SELECT COUNT(*)
-            FROM PiptUser PU
-                     JOIN PiptUserSetting PUS ON PU.PiptUser_Id = PUS.PiptUser_Id
-                     JOIN PiptSetting PS ON PUS.PiptSetting_Id = PS.PiptSetting_Id
-            WHERE PS.PiptSetting_Name = 'RightAdmin'
-              AND PUS.Value > 1
-              AND PU.Username = :username
-            """
-        )
-        result = self.connection.execute(stmt, {"username": username})
+        result = self.connection.execute(
+            _statements["is_administrator"], {"username": username}
+        )
         return cast(int, result.scalar()) > 0
 
     def is_mask_cutter(self, username: str) -> bool:
@@ -631,18 +1433,9 @@ WHERE PU.Username = :username
 
         If the user does not exist, it is assumed they are no mask cutter.
         """
-        stmt = text(
-            """
-            SELECT COUNT(*)
-            FROM PiptUser PU
-                     JOIN PiptUserSetting PUS ON PU.PiptUser_Id = PUS.PiptUser_Id
-                     JOIN PiptSetting PS ON PUS.PiptSetting_Id = PS.PiptSetting_Id
-            WHERE PS.PiptSetting_Name = 'RightMaskCutting'
-              AND PUS.Value > 1
-              AND PU.Username = :username
-            """
-        )
-        result = self.connection.execute(stmt, {"username": username})
+        result = self.connection.execute(
+            _statements["is_mask_cutter"], {"username": username}
+        )
         return cast(int, result.scalar()) > 0
 
     def is_engineer(self) -> bool:
@@ -656,18 +1449,9 @@ WHERE PU.Username = :username
         """
         Should check whether the user is a librarian
         """
-        stmt = text(
-            """
-SELECT COUNT(*)
-FROM PiptUser PU
-    JOIN PiptUserSetting PUS ON PU.PiptUser_Id = PUS.PiptUser_Id
-    JOIN PiptSetting PS ON PUS.PiptSetting_Id = PS.PiptSetting_Id
-WHERE PS.PiptSetting_Name = 'RightLibrarian'
-    AND PUS.Value > 0
-    AND PU.Username = :username
-        """
+        result = self.connection.execute(
+            _statements["is_librarian"], {"username": username}
         )
-        result = self.connection.execute(stmt, {"username": username})
         return cast(int, result.scalar()) > 0
 
     @staticmethod
@@ -677,24 +1461,15 @@ WHERE PS.PiptSetting_Name = 'RightLibrarian'
 
     def _update_password_hash(self, username: str, password: str) -> None:
         new_password_hash = self.get_new_password_hash(password)
-        stmt = text(
-            """
-INSERT INTO Password (Username, Password)
-VALUES (:username, :password)
-ON DUPLICATE KEY UPDATE Password = :password
-        """
-        )
         self.connection.execute(
-            stmt, {"username": username, "password": new_password_hash}
+            _statements["update_password_hash"],
+            {"username": username, "password": new_password_hash},
         )
 
     def _does_user_id_exist(self, user_id: int) -> bool:
-        stmt = text(
-            """
-SELECT COUNT(*) FROM PiptUser WHERE PiptUser_Id = :user_id
-        """
+        result = self.connection.execute(
+            _statements["does_user_id_exist"], {"user_id": user_id}
         )
-        result = self.connection.execute(stmt, {"user_id": user_id})
 
         return cast(int, result.scalar_one()) > 0
 
@@ -702,33 +1477,20 @@ SELECT COUNT(*) FROM PiptUser WHERE PiptUser_Id = :user_id
         # TODO: Uncomment once the Password table exists.
         # self._update_password_hash(username, password)
         password_hash = self.get_password_hash(password)
-        stmt = text(
-            """
-UPDATE PiptUser
-SET Password = :password
-WHERE PiptUser_Id = :user_id
-        """
-        )
 
         if not self._does_user_id_exist(user_id):
             raise NotFoundError(f"Unknown user id: {user_id}")
 
-        self.connection.execute(stmt, {"user_id": user_id, "password": password_hash})
-
-    def _update_user_details(self, user_id: int, user_update: Dict[str, str]) -> None:
-        stmt = text(
-            """
-UPDATE Investigator
-SET FirstName = :given_name,
-    Surname   = :family_name
-WHERE Investigator_Id =
-      (SELECT Investigator_Id FROM PiptUser WHERE PiptUser_Id = :user_id)
-             """
+        self.connection.execute(
+            _statements["update_password"],
+            {"user_id": user_id, "password": password_hash},
         )
+        self._user_details_changed(user_id)
 
+    def _update_user_details(self, user_id: int, user_update: Dict[str, str]) -> None:
         try:
             self.connection.execute(
-                stmt,
+                _statements["update_user_details"],
                 {
                     "user_id": user_id,
                     "given_name": user_update["given_name"],
@@ -747,10 +1509,43 @@ WHERE Investigator_Id =
         return cast(str, pwd_context.hash(password))
 
     def verify_password(self, password: str, hashed_password: str) -> bool:
-        """Check a plain text password against a hash."""
+        """
+        Check a plain text password against a hash.
+
+        The hash may be a legacy (MD5) hash or any hash supported by pwd_context.
+        """
+        if pwd_context.identify(hashed_password) is not None:
+            return cast(bool, pwd_context.verify(password, hashed_password))
         password_hash = self.get_password_hash(password)
         return secrets.compare_digest(password_hash, hashed_password)
 
+    def verify_and_update_password(
+        self, password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Check a plain text password against a hash, and rehash it if necessary.
+
+        Whether the password is valid is returned together with a new bcrypt hash, if
+        the hash uses a deprecated scheme (such as md5_crypt), or None otherwise. The
+        database is not queried.
+        """
+        # Legacy hashes are shared with other clients of the SDB and hence cannot be
+        # replaced.
+        if pwd_context.identify(hashed_password) is None:
+            return self.verify_password(password, hashed_password), None
+        return cast(
+            Tuple[bool, Optional[str]],
+            pwd_context.verify_and_update(password, hashed_password),
+        )
+
+    def replace_password_hash(self, user_id: int, password_hash: str) -> None:
+        """Replace the password hash of a user."""
+        self.connection.execute(
+            _statements["replace_password_hash"],
+            {"user_id": user_id, "password": password_hash},
+        )
+        invalidate_cache("authenticated_users", user_id)
+
     def find_user_with_username_and_password(
         self, username: str, password: str
     ) -> Optional[User]:
@@ -759,14 +1554,30 @@ WHERE Investigator_Id =
 
         If the combination of username and password is valid, then the corresponding
         user is returned. Otherwise, None is returned
+
+        The password is verified by the password verification executor, which limits
+        the number of concurrent verifications. If the password is valid but its hash
+        uses a deprecated scheme (such as md5_crypt), the hash is replaced with a bcrypt
+        hash. The unit of work must be committed for this to take effect.
+
+        The connection is held while waiting for the verification. Endpoints should
+        authenticate users with the AuthenticationService class instead, which allows
+        the connection to be released meanwhile.
         """
         user = self.get_by_username(username)
         if not user:
             return None
-        if not self.verify_password(password, user.password_hash):
+        valid, new_password_hash = password_verification_executor.run(
+            self.verify_and_update_password, password, user.password_hash
+        )
+        if not valid:
             return None
+        if new_password_hash is not None:
+            self.replace_password_hash(user.id, new_password_hash)
+            user.password_hash = new_password_hash
         return user
 
+    @request_cached("user_roles")
     def get_user_roles(self, username: str) -> List[Role]:
         """
         Get a user's roles.
@@ -774,54 +1585,56 @@ WHERE Investigator_Id =
         The roles do not include roles which are specific to a particular proposal (such
         as Principal Investigator). However, they include roles which are specific to a
         partner (i.e. TAC chair and member).
+
+        All the roles are determined with a single query, and the result is memoised
+        for the rest of the request. The roles are used for permission checks, so they
+        are not cached across requests; otherwise a revoked role would remain in effect
+        until the cached roles expire. If the user does not exist, an empty list is
+        returned.
         """
+        result = self.connection.execute(
+            _statements["general_roles"], {"username": username}
+        )
+        row = result.one_or_none()
+        if row is None:
+            return []
+
         roles = []
-        if self.is_administrator(username):
+        if row.is_administrator:
             roles.append(Role.ADMINISTRATOR)
 
-        if self.is_salt_astronomer(username):
+        if row.is_salt_astronomer:
             roles.append(Role.SALT_ASTRONOMER)
 
-        if self.is_salt_operator(username):
+        if row.is_salt_operator:
             roles.append(Role.SALT_OPERATOR)
 
-        if self.is_mask_cutter(username):
+        if row.is_mask_cutter:
             roles.append(Role.MASK_CUTTER)
 
         if self.is_engineer():
             roles.append(Role.ENGINEER)
 
-        if self.is_board_member(username):
+        if row.is_board_member:
             roles.append(Role.BOARD_MEMBER)
 
-        if self.is_tac_chair_in_general(username):
+        if row.is_tac_chair:
             roles.append(Role.TAC_CHAIR)
 
-        if self.is_tac_member_in_general(username):
+        if row.is_tac_member:
             roles.append(Role.TAC_MEMBER)
 
-        if self.is_librarian(username):
+        if row.is_librarian:
             roles.append(Role.LIBRARIAN)
 
         return roles
 
+    @cached("salt_astronomers", ttl=3600)
     def get_salt_astronomers(self) -> List[Dict[str, Any]]:
         """
         Return the list of SALT Astronomers, sorted by family name.
         """
-        stmt = text(
-            """
-SELECT
-    I.PiptUser_Id          AS id,
-    I.FirstName             AS given_name,
-    I.Surname               AS family_name
-FROM SaltAstronomers SA
-    JOIN Investigator I ON SA.Investigator_Id = I.Investigator_Id
-    ORDER BY I.Surname
-        """
-        )
-
-        result = self.connection.execute(stmt)
+        result = self.connection.execute(_statements["salt_astronomers"])
 
         return [
             {
@@ -843,17 +1656,9 @@ FROM SaltAstronomers SA
         if not self.is_existing_user_id(user_id):
             raise NotFoundError(f"No such user id: {user_id}")
 
-        stmt = text(
-            """
-SELECT PC.Proposal_Code AS proposal_code, PP.ProposalPermission AS permission_type
-FROM ProposalPermissionGrant PPG
-         JOIN ProposalCode PC ON PPG.ProposalCode_Id = PC.ProposalCode_Id
-         JOIN ProposalPermission PP
-              ON PPG.ProposalPermission_Id = PP.ProposalPermission_Id
-WHERE PPG.Grantee_Id = :grantee_id
-        """
+        result = self.connection.execute(
+            _statements["proposal_permissions"], {"grantee_id": user_id}
         )
-        result = self.connection.execute(stmt, {"grantee_id": user_id})
 
         return [
             {"proposal_code": row.proposal_code, "permission_type": row.permission_type}
@@ -880,22 +1685,16 @@ WHERE PPG.Grantee_Id = :grantee_id
         permission_type_id = self._get_proposal_permission_type_id(permission_type)
         proposal_code_id = self._get_proposal_code_id(proposal_code)
 
-        stmt = text(
-            """
-INSERT IGNORE INTO ProposalPermissionGrant (ProposalCode_Id,
-                                            ProposalPermission_Id,
-                                            Grantee_Id)
-VALUES (:proposal_code_id, :permission_type_id, :grantee_id)
-        """
-        )
         self.connection.execute(
-            stmt,
+            _statements["grant_proposal_permission"],
             {
                 "permission_type_id": permission_type_id,
                 "proposal_code_id": proposal_code_id,
                 "grantee_id": user_id,
             },
         )
+        invalidate_cache("proposal_relationships")
+        self._accessible_proposals_changed(user_id)
 
     def revoke_proposal_permission(
         self, user_id: int, permission_type: str, proposal_code: str
@@ -918,55 +1717,28 @@ VALUES (:proposal_code_id, :permission_type_id, :grantee_id)
         permission_type_id = self._get_proposal_permission_type_id(permission_type)
         proposal_code_id = self._get_proposal_code_id(proposal_code)
 
-        stmt = text(
-            """
-DELETE
-FROM ProposalPermissionGrant
-WHERE Grantee_Id = :grantee_id
-  AND ProposalCode_Id = :proposal_code_id
-  AND ProposalPermission_Id = :permission_type_id;
-        """
-        )
         self.connection.execute(
-            stmt,
+            _statements["revoke_proposal_permission"],
             {
                 "grantee_id": user_id,
                 "proposal_code_id": proposal_code_id,
                 "permission_type_id": permission_type_id,
             },
         )
+        invalidate_cache("proposal_relationships")
+        self._accessible_proposals_changed(user_id)
 
     def _get_proposal_permission_type_id(self, permission_type: str) -> int:
-        stmt = text(
-            """
-SELECT ProposalPermission_Id
-FROM ProposalPermission
-WHERE ProposalPermission = :permission
-        """
-        )
-        result = self.connection.execute(stmt, {"permission": permission_type})
-        try:
-            return cast(int, result.scalar_one())
-        except NoResultFound:
+        permission_type_id = _proposal_permissions.id(self.connection, permission_type)
+        if permission_type_id is None:
             raise NotFoundError()
+        return permission_type_id
 
     def user_has_proposal_permission(
         self, user_id: int, permission_type: str, proposal_code: str
     ) -> bool:
-        stmt = text(
-            """
-SELECT COUNT(*)
-FROM ProposalPermissionGrant
-WHERE Grantee_Id = :grantee_id
-  AND ProposalCode_Id =
-      (SELECT ProposalCode_Id FROM ProposalCode WHERE Proposal_Code = :proposal_code)
-  AND ProposalPermission_Id = (SELECT ProposalPermission_Id
-                               FROM ProposalPermission
-                               WHERE ProposalPermission = :permission)
-        """
-        )
         result = self.connection.execute(
-            stmt,
+            _statements["user_has_proposal_permission"],
             {
                 "grantee_id": user_id,
                 "proposal_code": proposal_code,
@@ -976,19 +1748,128 @@ WHERE Grantee_Id = :grantee_id
 
         return cast(int, result.scalar_one()) > 0
 
-    def _get_proposal_code_id(self, proposal_code: str) -> int:
-        stmt = text(
-            """
-SELECT ProposalCode_Id
-FROM ProposalCode
-WHERE Proposal_Code = :proposal_code
+    @cached("accessible_proposals", ttl=60, max_size=5000)
+    def get_accessible_proposals(self, username: str) -> AccessibleProposals:
         """
+        Get the index of the proposals a user may view because of their relationships
+        with them.
+
+        The index is cached for up to a minute and used for listing proposals. Changes
+        made by this class (such as granting a permission) or by a submission refresh
+        the index in the current process, but other changes (such as a new TAC member)
+        only take effect once the cached index has expired. Hence the index must not be
+        used for checking whether a user may view a particular proposal.
+        """
+        result = self.connection.execute(
+            _statements["accessible_proposal_codes"], {"username": username}
         )
-        result = self.connection.execute(stmt, {"proposal_code": proposal_code})
-        try:
-            return cast(int, result.scalar_one())
-        except NoResultFound:
-            raise NotFoundError()
+        proposal_codes = set()
+        investigator_proposal_codes = set()
+        for row in result:
+            proposal_codes.add(row.proposal_code)
+            if row.is_investigator:
+                investigator_proposal_codes.add(row.proposal_code)
+
+        result = self.connection.execute(
+            _statements["proposal_access_rights"], {"username": username}
+        )
+        row = result.one_or_none()
+
+        return AccessibleProposals(
+            proposal_codes=frozenset(proposal_codes),
+            investigator_proposal_codes=frozenset(investigator_proposal_codes),
+            is_partner_affiliated=bool(row and row.is_partner_affiliated),
+            may_view_all_proposals=bool(row and row.may_view_all_proposals),
+        )
+
+    def _accessible_proposals_changed(self, user_id: int) -> None:
+        username = self.connection.execute(
+            _statements["accessible_proposals_changed"], {"user_id": user_id}
+        ).scalar()
+        if username is not None:
+            invalidate_cache("accessible_proposals", username)
+
+    def get_related_proposal_codes(
+        self, username: str, proposal_codes: List[str]
+    ) -> Set[str]:
+        """
+        Get those of a list of proposal codes for which the user is an investigator or
+        a TAC member, or for which the user has been granted permission to view the
+        proposal.
+
+        Unlike the index returned by get_accessible_proposals, the result is never out
+        of date, and it is obtained with a single query irrespective of the number of
+        proposal codes.
+        """
+        if not proposal_codes:
+            return set()
+        result = self.connection.execute(
+            _statements["related_proposal_codes"],
+            {"username": username, "proposal_codes": proposal_codes},
+        )
+        return set(result.scalars())
+
+    def get_proposal_codes_with_view_permission(
+        self, username: str, proposal_codes: List[str]
+    ) -> Set[str]:
+        """
+        Get those of a list of proposal codes for which the user has been granted
+        permission to view the proposal.
+
+        The result is obtained with a single query irrespective of the number of
+        proposal codes.
+        """
+        if not proposal_codes:
+            return set()
+        result = self.connection.execute(
+            _statements["proposal_codes_with_view_permission"],
+            {"username": username, "proposal_codes": proposal_codes},
+        )
+        return set(result.scalars())
+
+    @request_cached("proposal_relationships")
+    def get_proposal_relationships(
+        self, username: str, proposal_code: str
+    ) -> ProposalRelationships:
+        """
+        Get the relationships between a user and a proposal.
+
+        All the proposal-specific roles and granted proposal permissions are determined
+        with a single query, and the result is memoised for the rest of the request. If
+        the user or proposal do not exist, there are no roles and permissions.
+        """
+        result = self.connection.execute(
+            _statements["proposal_relationships"],
+            {"username": username, "proposal_code": proposal_code},
+        )
+        row = result.one_or_none()
+        roles: List[Role] = []
+        permissions: List[str] = []
+        if row is None:
+            return ProposalRelationships(roles=roles, permissions=permissions)
+
+        if row.is_investigator:
+            roles.append(Role.INVESTIGATOR)
+
+        if row.is_principal_investigator:
+            roles.append(Role.PRINCIPAL_INVESTIGATOR)
+
+        if row.is_principal_contact:
+            roles.append(Role.PRINCIPAL_CONTACT)
+
+        if row.is_tac_member:
+            roles.append(Role.PROPOSAL_TAC_MEMBER)
+
+        if row.is_tac_chair:
+            roles.append(Role.PROPOSAL_TAC_CHAIR)
+
+        if row.may_view:
+            permissions.append(ProposalPermission.VIEW.value)
+
+        return ProposalRelationships(roles=roles, permissions=permissions)
+
+    def _get_proposal_code_id(self, proposal_code: str) -> int:
+        return self.proposal_metadata_repository.get(proposal_code).proposal_code_id
 
     @staticmethod
     def _normalize_gender(gender: str) -> str:
@@ -996,20 +1877,14 @@ WHERE Proposal_Code = :proposal_code
         return gender[:1] + gender[1:]
 
     def _add_gender(self, gender: str) -> int:
-        stmt = text(
-            """
-INSERT INTO Gender (Gender) VALUES (:gender)
-            """
-        )
         result = self.connection.execute(
-            stmt, {"gender": self._normalize_gender(gender)}
+            _statements["add_gender"], {"gender": self._normalize_gender(gender)}
         )
         return cast(int, result.lastrowid)
 
     def _get_gender_id(self, gender: str) -> int:
-        stmt = text("""SELECT Gender_Id FROM Gender Where Gender = :gender""")
         result = self.connection.execute(
-            stmt, {"gender": self._normalize_gender(gender)}
+            _statements["gender_id"], {"gender": self._normalize_gender(gender)}
         )
         try:
             return cast(int, result.scalar_one())
@@ -1017,59 +1892,33 @@ INSERT INTO Gender (Gender) VALUES (:gender)
             return self._add_gender(gender)
 
     def _add_race(self, race: str) -> int:
-        stmt = text(
-            """
-INSERT INTO Race (Race) VALUES (:race)
-            """
+        result = self.connection.execute(
+            _statements["add_race"], {"race": self._normalize_gender(race)}
         )
-        result = self.connection.execute(stmt, {"race": self._normalize_gender(race)})
         return cast(int, result.lastrowid)
 
     def _get_race_id(self, race: str) -> int:
-        stmt = text("""SELECT Race_Id FROM Race Where Race = :race""")
-        result = self.connection.execute(stmt, {"race": self._normalize_gender(race)})
+        result = self.connection.execute(
+            _statements["race_id"], {"race": self._normalize_gender(race)}
+        )
         try:
             return cast(int, result.scalar_one())
         except NoResultFound:
             return self._add_race(race)
 
     def _get_legal_status_id(self, legal_status: str) -> int:
-        stmt = text(
-            """
-SELECT SouthAfricanLegalStatus_Id
-FROM SouthAfricanLegalStatus
-Where SouthAfricanLegalStatus = :legal_status
-            """
-        )
-        result = self.connection.execute(
-            stmt, {"legal_status": self._normalize_gender(legal_status)}
+        legal_status_id = _legal_statuses.id(
+            self.connection, self._normalize_gender(legal_status)
         )
-        return cast(int, result.scalar_one())
+        if legal_status_id is None:
+            raise NoResultFound()
+        return legal_status_id
 
     def _update_user_statistics(
         self, pipt_user_id: int, user_information: Dict[str, Any]
     ) -> None:
-        stmt = text(
-            """
-INSERT INTO UserStatistics (
-                PiptUser_Id, 
-                SouthAfricanLegalStatus_Id, 
-                Gender_Id, 
-                Race_Id, 
-                PhD, 
-                YearOfPhD
-                )
-VALUES (:pipt_user_id, :legal_status_id, :gender_id, :race_id, :has_phd, :year_of_phd )
-ON DUPLICATE KEY UPDATE
-    SouthAfricanLegalStatus_Id = :legal_status_id,
-    Gender_Id = :gender_id,
-    Race_Id = :race_id,
-    PhD = :has_phd,
-    YearOfPhD = :year_of_phd
-            """
-        )
         self.connection.execute(
-            stmt,
+            _statements["update_user_statistics"],
             {
                 "pipt_user_id": pipt_user_id,
                 "legal_status_id": self._get_legal_status_id(
@@ -1092,18 +1941,13 @@ ON DUPLICATE KEY UPDATE
 
         If the user id does not exist, a NotFoundError is raised.
         """
-        stmt = text(
-            """
-UPDATE PiptUser
-SET UserVerified = :verify
-WHERE PiptUser_Id = :user_id
-        """
-        )
-
         if not self._does_user_id_exist(user_id):
             raise NotFoundError(f"Unknown user id: {user_id}")
 
-        self.connection.execute(stmt, {"user_id": user_id, "verify": verify})
+        self.connection.execute(
+            _statements["verify_user"], {"user_id": user_id, "verify": verify}
+        )
+        self._user_details_changed(user_id)
         # User only can only use this verify if they only have one contact
         count = self.contact_count(user_id)
         if count > 1:
@@ -1117,94 +1961,51 @@ WHERE PiptUser_Id = :user_id
 
         If the user id does not exist, a NotFoundError is raised.
         """
-        stmt = text(
-            """
-UPDATE PiptUser
-SET Active = :active
-WHERE PiptUser_Id = :user_id
-        """
-        )
-
         if not self._does_user_id_exist(user_id):
             raise NotFoundError(f"Unknown user id: {user_id}")
 
-        self.connection.execute(stmt, {"user_id": user_id, "active": active})
+        self.connection.execute(
+            _statements["activate_user"], {"user_id": user_id, "active": active}
+        )
+        self._user_details_changed(user_id)
 
     def _update_right(self, user_id: int, right_setting: str, value: int) -> None:
-        stmt = text(
-            """
-INSERT INTO PiptUserSetting (PiptUser_Id, PiptSetting_Id, Value)
-VALUES (
-     :user_id,
-    (SELECT PiptSetting_Id FROM PiptSetting WHERE PiptSetting_Name = :right_setting),
-    :value)
-ON DUPLICATE KEY UPDATE Value = :value
-            """
-        )
         self.connection.execute(
-            stmt, {"user_id": user_id, "right_setting": right_setting, "value": value}
+            _statements["update_right"],
+            {"user_id": user_id, "right_setting": right_setting, "value": value},
         )
 
     def _delete_right(self, user_id: int, right_setting: str) -> None:
-        stmt = text(
-            """
-DELETE FROM PiptUserSetting
-WHERE PiptUser_Id = :user_id 
-    AND PiptSetting_Id = (
-        SELECT PiptSetting_Id FROM PiptSetting
-            WHERE PiptSetting_Name = :right_setting
-        )       
-
-            """
-        )
         self.connection.execute(
-            stmt, {"user_id": user_id, "right_setting": right_setting}
+            _statements["delete_right"],
+            {"user_id": user_id, "right_setting": right_setting},
         )
 
     def _get_investigator_id(self, user_id) -> int:
-        stmt = text(
-            """
-SELECT Investigator_Id FROM PiptUser WHERE PiptUser_Id = :user_id     
-        """
+        result = self.connection.execute(
+            _statements["investigator_id"], {"user_id": user_id}
         )
-
-        result = self.connection.execute(stmt, {"user_id": user_id})
         return cast(int, result.scalar_one())
 
     def _add_salt_astronomer(self, user: User):
-        stmt = text(
-            """
-INSERT INTO SaltAstronomers (Investigator_Id)
-VALUES (:investigator_id)
-       """
-        )
         self.connection.execute(
-            stmt, {"investigator_id": self._get_investigator_id(user.id)}
+            _statements["add_salt_astronomer"],
+            {"investigator_id": self._get_investigator_id(user.id)},
         )
+        invalidate_cache("salt_astronomers")
 
     def _remove_salt_astronomer(self, user: User):
-        stmt = text(
-            """
-DELETE FROM SaltAstronomers
-WHERE Investigator_id = :investigator_id
-       """
-        )
         self.connection.execute(
-            stmt,
+            _statements["remove_salt_astronomer"],
             {
                 "investigator_id": self._get_investigator_id(user.id),
             },
         )
+        invalidate_cache("salt_astronomers")
 
     def _add_salt_operator(self, user: User) -> None:
-        stmt = text(
-            """
-INSERT INTO SaltOperator (FirstName, Surname, Email, Phone, Current)
-VALUES (:firstname, :surname, :email, :phone, 1)
-       """
-        )
         self.connection.execute(
-            stmt,
+            _statements["add_salt_operator"],
             {
                 "firstname": user.given_name,
                 "surname": user.family_name,
@@ -1214,13 +2015,9 @@ VALUES (:firstname, :surname, :email, :phone, 1)
         )
 
     def _remove_salt_operator(self, user: User) -> None:
-        stmt = text(
-            """
-DELETE FROM SaltOperator
-WHERE Email = :email
-       """
+        self.connection.execute(
+            _statements["remove_salt_operator"], {"email": user.email}
         )
-        self.connection.execute(stmt, {"email": user.email})
 
     def _get_right_setting(self, role: Role) -> str:
         if role == Role.ADMINISTRATOR:
@@ -1239,6 +2036,8 @@ WHERE Email = :email
         raise ValidationError("Unknown user role: " + role)
 
     def update_user_roles(self, user_id: int, new_roles: List[Role]) -> None:
+        # Make sure that the current roles are not taken from the cache.
+        invalidate_cache("user_roles")
         user = self.get(user_id)
         new_roles_set = set(new_roles)
         current_roles_set = set(user.roles)
@@ -1261,17 +2060,16 @@ WHERE Email = :email
             right_setting = self._get_right_setting(role)
             self._delete_right(user_id, right_setting)
 
+        invalidate_cache("user_roles", user.username)
+        self._accessible_proposals_changed(user_id)
+        self._user_details_changed(user_id)
+
     def set_preferred_contact(self, user_id, investigator_id):
-        stmt = text(
-            """
-UPDATE PiptUser
-SET Investigator_Id = :investigator_id
-WHERE PiptUser_Id = :user_id            
-            """
-        )
         self.connection.execute(
-            stmt, {"user_id": user_id, "investigator_id": investigator_id}
+            _statements["set_preferred_contact"],
+            {"user_id": user_id, "investigator_id": investigator_id},
         )
+        self._user_details_changed(user_id)
 
     def add_contact_details(
         self, user_id: int, new_user_contact: Dict[str, Any]
@@ -1282,15 +2080,9 @@ WHERE PiptUser_Id = :user_id
         The primary key of the new Investigator entry is returned.
         """
 
-        stmt = text(
-            """
-INSERT INTO Investigator (Institute_Id, FirstName, Surname, Email, PiptUser_Id)
-VALUES (:institution_id, :given_name, :family_name, :email, :user_id)
-        """
-        )
         try:
             result = self.connection.execute(
-                stmt,
+                _statements["add_contact_details"],
                 {
                     "user_id": user_id,
                     "institution_id": new_user_contact["institution_id"],
@@ -1305,66 +2097,42 @@ VALUES (:institution_id, :given_name, :family_name, :email, :user_id)
                 " institution."
             )
 
+        self._user_details_changed(user_id)
         return cast(int, result.lastrowid)
 
     def subscribe_to_gravitational_wave_notifications(
         self, user_id, subscribe: bool
     ) -> None:
-        stmt = text(
-            """
-INSERT INTO PiptUserSetting (PiptUser_Id, PiptSetting_Id, Value)
-    SELECT :user_id,
-            (SELECT PiptSetting_Id FROM PiptSetting WHERE PiptSetting_Name = 'GravitationalWaveProposals'), 
-            :value
-ON DUPLICATE KEY UPDATE Value = VALUES(Value);            
-            """
-        )
         if not self._does_user_id_exist(user_id):
             raise NotFoundError(f"Unknown user id: {user_id}")
 
         self.connection.execute(
-            stmt,
+            _statements["subscribe_to_gravitational_wave_notifications"],
             {"user_id": user_id, "value": subscribe},
         )
 
     def subscribe_to_salt_news(self, user_id, subscribe: bool) -> None:
-        stmt = text(
-            """
-UPDATE PiptUser
-SET ReceiveNews = :value
-WHERE PiptUser_Id = :user_id    
-            """
-        )
         if not self._does_user_id_exist(user_id):
             raise NotFoundError(f"Unknown user id: {user_id}")
 
         self.connection.execute(
-            stmt,
+            _statements["subscribe_to_salt_news"],
             {"user_id": user_id, "value": subscribe},
         )
 
     def _is_user_subscribed_to_salt_news(self, user_id: int) -> bool:
-        stmt = text(
-            """
-SELECT COUNT(*) FROM PiptUser
-WHERE ReceiveNews > 0 AND PiptUser_Id = :user_id    
-            """
+        result = self.connection.execute(
+            _statements["is_user_subscribed_to_salt_news"], {"user_id": user_id}
         )
-        result = self.connection.execute(stmt, {"user_id": user_id})
         return cast(int, result.scalar_one()) > 0
 
     def _is_user_subscribed_to_gravitational_wave_notifications(
         self, user_id: int
     ) -> bool:
-        stmt = text(
-            """
-SELECT COUNT(*) FROM PiptUserSetting
-WHERE PiptSetting_Id = 32     # ID for PiptSetting_Name = 'GravitationalWaveProposals'
-    AND PiptUser_Id = :user_id    
-    AND Value > 0
-            """
+        result = self.connection.execute(
+            _statements["is_user_subscribed_to_gravitational_wave_notifications"],
+            {"user_id": user_id},
         )
-        result = self.connection.execute(stmt, {"user_id": user_id})
         return cast(int, result.scalar_one()) > 0
 
     def get_subscriptions(self, user_id: int) -> List[Dict[str, Any]]:
@@ -1382,22 +2150,9 @@ WHERE PiptSetting_Id = 32     # ID for PiptSetting_Name = 'GravitationalWaveProp
         ]
 
     def get_user_emails(self, user_id: int) -> List[Dict[str, Any]]:
-        stmt = text(
-            """
-            SELECT 
-                I.Investigator_Id AS investigator_id,
-                I.Email AS email,
-                CASE 
-                    WHEN P.ValidationCode IS NOT NULL THEN TRUE
-                    ELSE FALSE
-                END AS pending
-            FROM Investigator I
-            LEFT JOIN PiptEmailValidation P
-                ON P.Investigator_Id = I.Investigator_Id
-            WHERE I.PiptUser_Id = :user_id
-            """
-        )
-        result = self.connection.execute(stmt, {"user_id": user_id})
+        result = self.connection.execute(
+            _statements["user_emails"], {"user_id": user_id}
+        )
         return [dict(row) for row in result.fetchall()]
 
     def generate_validation_code(self, length: int = 20) -> str:
@@ -1407,68 +2162,41 @@ WHERE PiptSetting_Id = 32     # ID for PiptSetting_Name = 'GravitationalWaveProp
 
     def add_email_validation(self, investigator_id: int, validation_code: str) -> None:
         """Insert validation code for an Investigator."""
-        stmt = text(
-            """
-            INSERT INTO PiptEmailValidation (Investigator_Id, ValidationCode)
-            VALUES (:investigator_id, :validation_code)
-            """
-        )
         self.connection.execute(
-            stmt,
+            _statements["add_email_validation"],
             {"investigator_id": investigator_id, "validation_code": validation_code},
         )
 
     def get_validation_code(self, investigator_id: int) -> str:
         """Return validation code for an investigator."""
-        stmt = text(
-            """
-            SELECT ValidationCode
-            FROM PiptEmailValidation
-            WHERE Investigator_Id = :investigator_id
-            """
-        )
         result = self.connection.execute(
-            stmt, {"investigator_id": investigator_id}
+            _statements["validation_code"], {"investigator_id": investigator_id}
         ).fetchone()
         if result:
             return result["ValidationCode"]
         raise ValueError(f"No validation code found for Investigator {investigator_id}")
 
     def clear_validation_code(self, investigator_id: int) -> None:
-        stmt = text(
-            """
-            DELETE FROM PiptEmailValidation
-            WHERE Investigator_Id = :investigator_id
-        """
+        self.connection.execute(
+            _statements["clear_validation_code"], {"investigator_id": investigator_id}
         )
-        self.connection.execute(stmt, {"investigator_id": investigator_id})
+        # The user owning the investigator is not known, so all cached users are
+        # invalidated.
+        invalidate_cache("authenticated_users")
 
     def get_investigator_by_validation_code(
         self, validation_code: str
     ) -> Optional[Dict[str, Any]]:
-        stmt = text(
-            """
-            SELECT I.Investigator_Id, I.PiptUser_Id, P.ValidationCode, I.Email
-            FROM Investigator I
-            LEFT JOIN PiptEmailValidation P ON P.Investigator_Id = I.Investigator_Id
-            WHERE P.ValidationCode = :validation_code
-        """
-        )
         result = self.connection.execute(
-            stmt, {"validation_code": validation_code}
+            _statements["investigator_by_validation_code"],
+            {"validation_code": validation_code},
         ).fetchone()
         return dict(result) if result else None
 
     def get_user_rights(self, user_id: int) -> List[Dict[str, Any]]:
-        stmt = text(
-            """
-            SELECT PS.PiptSetting_Name
-            FROM PiptUserSetting PUS
-            JOIN PiptSetting PS ON PUS.PiptSetting_Id = PS.PiptSetting_Id
-            WHERE PUS.PiptUser_Id = :user_id AND PUS.Value > 0
-        """
+        result = self.connection.execute(
+            _statements["user_rights"], {"user_id": user_id}
         )
-        result = self.connection.execute(stmt, {"user_id": user_id})
         current_rights = {row[0] for row in result.fetchall()}
         return [
             {
@@ -1481,61 +2209,29 @@ WHERE PiptSetting_Id = 32     # ID for PiptSetting_Name = 'GravitationalWaveProp
     def set_user_right(self, user_id: int, right_name: str, grant: bool) -> None:
         right_label = next((r for r in UserRight if r.value == right_name))
         right = RIGHT_DB_NAMES[right_label]
-        stmt = text(
-            """
-            INSERT INTO PiptUserSetting (PiptUser_Id, PiptSetting_Id, Value)
-            SELECT :user_id,
-                (SELECT PiptSetting_Id FROM PiptSetting WHERE PiptSetting_Name = :right_name),:value
-            ON DUPLICATE KEY UPDATE Value = :value;
-            """
-        )
         self.connection.execute(
-            stmt, {"user_id": user_id, "right_name": right, "value": int(grant)}
+            _statements["set_user_right"],
+            {"user_id": user_id, "right_name": right, "value": int(grant)},
         )
+        # Some rights (such as mask cutting) imply a role.
+        invalidate_cache("user_roles")
+        self._user_details_changed(user_id)
+        self._accessible_proposals_changed(user_id)
 
     def get_users_contact(
         self, user_id: int, investigator_id: int
     ) -> Optional[Dict[str, Any]]:
-        stmt = text(
-            """
-            SELECT 
-                I.Investigator_Id AS investigator_id,
-                I.Email AS email,
-                CASE 
-                    WHEN P.ValidationCode IS NULL THEN TRUE
-                    ELSE FALSE
-                END AS is_validated
-            FROM Investigator I
-            LEFT JOIN PiptEmailValidation P
-                ON P.Investigator_Id = I.Investigator_Id
-            WHERE
-                I.PiptUser_Id = :user_id
-                AND I.Investigator_Id = :investigator_id
-            """
-        )
-
         result = self.connection.execute(
-            stmt,
+            _statements["users_contact"],
             {"user_id": user_id, "investigator_id": investigator_id},
         ).fetchone()
 
         return dict(result) if result else None
 
     def get_preferred_contact(self, user_id: int) -> dict | None:
-        stmt = text(
-            """
-            SELECT 
-                PU.PiptUser_Id      AS user_id,
-                I.Email             AS preferred_email,
-                I.Investigator_Id   AS investigator_id
-            FROM PiptUser AS PU
-            JOIN Investigator I
-                ON PU.Investigator_Id = I.Investigator_Id
-            WHERE PU.PiptUser_Id = :user_id
-            """
-        )
-
-        result = self.connection.execute(stmt, {"user_id": user_id}).fetchone()
+        result = self.connection.execute(
+            _statements["preferred_contact"], {"user_id": user_id}
+        ).fetchone()
 
         return dict(result) if result else None
 
@@ -1557,12 +2253,8 @@ WHERE PiptSetting_Id = 32     # ID for PiptSetting_Name = 'GravitationalWaveProp
             The total number of contact records linked to the given user.
             Returns 0 if the user has no contacts.
         """
-        stmt = text("""
-SELECT COUNT(*) AS contact_count
-FROM Investigator
-WHERE PiptUser_Id = :user_id
-       """)
-
-        count = self.connection.execute(stmt, {"user_id": user_id}).scalar_one()
+        count = self.connection.execute(
+            _statements["contact_count"], {"user_id": user_id}
+        ).scalar_one()
 
         return count
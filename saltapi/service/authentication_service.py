@@ -1,16 +1,23 @@
+from dataclasses import asdict, is_dataclass
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional, cast
 
 from fastapi import HTTPException, Request
 from fastapi.security.utils import get_authorization_scheme_param
 from jose import JWTError, jwt
+from sqlalchemy.engine import Connection
 from starlette import status
 
 from saltapi.exceptions import AuthenticationError, NotFoundError, ValidationError
-from saltapi.repository.unit_of_work import UnitOfWork
+from saltapi.repository.cache import invalidate_cache
+from saltapi.repository.unit_of_work import AsyncUnitOfWork, UnitOfWork
 from saltapi.repository.user_repository import UserRepository
 from saltapi.service.authentication import AccessToken
-from saltapi.service.user import User
+from saltapi.service.password_verification import (
+    login_throttle,
+    password_verification_executor,
+)
+from saltapi.service.user import Role, User
 from saltapi.settings import get_settings
 from saltapi.util import validate_user
 
@@ -20,6 +27,8 @@ SECRET_KEY = get_settings().secret_key
 VERIFICATION_KEY = get_settings().verification_key
 USER_ID_KEY = "user_id"  # nosec
 SECONDARY_AUTH_TOKEN_KEY = "secondary_auth_token"  # nosec
+USER_CLAIMS_KEY = "usr"
+TOKEN_VERSION_KEY = "ver"
 
 
 class AuthenticationService:
@@ -28,15 +37,28 @@ class AuthenticationService:
 
     @staticmethod
     def access_token(
-        user: User, token_lifetime_hours: Optional[int] = None
+        user: User,
+        token_lifetime_hours: Optional[int] = None,
+        token_version: Optional[int] = None,
     ) -> AccessToken:
-        """Generate an authentication token."""
+        """
+        Generate an authentication token.
+
+        If a token version is passed, the token includes the user details (including
+        the roles), so that it can be validated without querying the user. Such a token
+        is only valid as long as the user's token version remains the same.
+        """
         if token_lifetime_hours is not None:
             token_expires = timedelta(hours=token_lifetime_hours)
         else:
             token_expires = timedelta(hours=ACCESS_TOKEN_LIFETIME_HOURS)
+        # subject must be a string, not an integer
+        payload: Dict[str, Any] = {"sub": str(user.id)}
+        if token_version is not None:
+            payload[TOKEN_VERSION_KEY] = token_version
+            payload[USER_CLAIMS_KEY] = _user_claims(user)
         token = AuthenticationService.jwt_token(
-            payload={"sub": str(user.id)},  # subject must be a string, not an integer
+            payload=payload,
             expires_delta=token_expires,
         )
 
@@ -67,14 +89,89 @@ class AuthenticationService:
 
         return cast(str, encoded_jwt)
 
+    def access_token_with_claims(
+        self, user: User, token_lifetime_hours: Optional[int] = None
+    ) -> AccessToken:
+        """
+        Generate an authentication token which includes the user details.
+
+        See the access_token method.
+        """
+        # A token must not be issued for an outdated version, as it would be rejected
+        # once the cached version has expired.
+        invalidate_cache("auth_token_versions", user.id)
+        token_version = self.user_repository.get_auth_token_version(user.id)
+        return self.access_token(user, token_lifetime_hours, token_version)
+
     def authenticate_user(self, username: str, password: str) -> User:
-        user = self.user_repository.find_user_with_username_and_password(
-            username, password
-        )
+        """
+        Authenticate a user by username and password.
+
+        Login attempts for a username are rejected if there have been too many failed
+        attempts recently (see the LoginThrottle class). If the user's password hash
+        uses a deprecated scheme, it is replaced; the unit of work must be committed
+        for this to take effect.
+
+        The database connection is held while the password is verified. Endpoints
+        should instead call the find_user_for_login, verify_login_password and
+        replace_password_hash methods, and release the connection after finding the
+        user.
+        """
+        user = self.find_user_for_login(username)
+        new_password_hash = self.verify_login_password(user, password)
+        if new_password_hash is not None:
+            self.replace_password_hash(user, new_password_hash)
+        return user
+
+    def find_user_for_login(self, username: str) -> User:
+        """
+        Find the user who is logging in, without verifying the password.
+
+        This is the first step of authenticating a user (see authenticate_user).
+        """
+        if login_throttle.is_throttled(username):
+            raise AuthenticationError(
+                "Too many failed login attempts. Please try again later."
+            )
+        try:
+            user = self.user_repository.get_by_username(username)
+        except NotFoundError:
+            login_throttle.record_failure(username)
+            raise
         if not user:
+            login_throttle.record_failure(username)
             raise AuthenticationError("User not found.")
         return user
 
+    def verify_login_password(self, user: User, password: str) -> Optional[str]:
+        """
+        Verify the password of the user who is logging in.
+
+        This is the second step of authenticating a user (see authenticate_user). The
+        database is not queried, but the verification may have to wait for the
+        password verification executor. A new password hash is returned if the hash
+        uses a deprecated scheme; otherwise None is returned.
+        """
+        valid, new_password_hash = password_verification_executor.run(
+            self.user_repository.verify_and_update_password,
+            password,
+            user.password_hash,
+        )
+        if not valid:
+            login_throttle.record_failure(user.username)
+            raise AuthenticationError("User not found.")
+        login_throttle.record_success(user.username)
+        return new_password_hash
+
+    def replace_password_hash(self, user: User, password_hash: str) -> None:
+        """
+        Replace a user's password hash with the one returned by verify_login_password.
+
+        The unit of work must be committed for this to take effect.
+        """
+        self.user_repository.replace_password_hash(user.id, password_hash)
+        user.password_hash = password_hash
+
     def validate_auth_token(
         self, token: str, verification: bool = False
     ) -> Optional[User]:
@@ -85,7 +182,51 @@ class AuthenticationService:
         if not payload:
             raise JWTError("Token failed to decode.")
 
-        return self.user_repository.get(payload["sub"])
+        if USER_CLAIMS_KEY in payload and get_settings().auth_token_claims:
+            return self._user_from_claims(payload)
+
+        return self.user_repository.get_authenticated_user(int(payload["sub"]))
+
+    def _user_from_claims(self, payload: Dict[str, Any]) -> User:
+        user_id = int(payload["sub"])
+        token_version = self.user_repository.get_auth_token_version(user_id)
+        if payload.get(TOKEN_VERSION_KEY) != token_version:
+            raise AuthenticationError("The authentication token has been revoked.")
+
+        return _user_from_claims(user_id, payload[USER_CLAIMS_KEY])
+
+
+def _user_claims(user: User) -> Dict[str, Any]:
+    # The password hash must never be included in a token.
+    return {
+        "username": user.username,
+        "given_name": user.given_name,
+        "family_name": user.family_name,
+        "email": user.email,
+        "affiliations": [
+            asdict(affiliation) if is_dataclass(affiliation) else affiliation
+            for affiliation in user.affiliations
+        ],
+        "roles": [role.value for role in user.roles],
+        "user_verified": user.user_verified,
+        "active": user.active,
+    }
+
+
+def _user_from_claims(user_id: int, claims: Dict[str, Any]) -> User:
+    return User(
+        id=user_id,
+        username=claims["username"],
+        given_name=claims["given_name"],
+        family_name=claims["family_name"],
+        email=claims["email"],
+        password_hash="",  # nosec
+        affiliations=claims["affiliations"],
+        roles=[Role(role) for role in claims["roles"]],
+        user_verified=claims["user_verified"],
+        active=claims["active"],
+        demographics=None,
+    )
 
 
 def get_current_user(request: Request) -> User:
@@ -100,7 +241,28 @@ def get_current_user(request: Request) -> User:
     return user
 
 
-def _user_from_auth_header(authorization: str, verification: bool = False) -> User:
+async def get_current_user_async(request: Request) -> User:
+    """
+    Get the current user without blocking a worker thread.
+
+    This is the counterpart of get_current_user for asyncio endpoints.
+    """
+    authorization: Optional[str] = request.headers.get("Authorization")
+    if authorization:
+        token = _bearer_token(authorization)
+        async with AsyncUnitOfWork() as unit_of_work:
+            user = await unit_of_work.run(_user_from_token, token)
+    else:
+        user_id = _session_user_id(request)
+        async with AsyncUnitOfWork() as unit_of_work:
+            user = await unit_of_work.run(_session_user, user_id)
+    if not user:
+        raise NotFoundError("Could not validate token.")
+    validate_user(user)
+    return user
+
+
+def _bearer_token(authorization: str) -> str:
     # Based on FastAPI's OAuth2PasswordBearer class
     scheme, token = get_authorization_scheme_param(authorization)
     if scheme.lower() != "bearer":
@@ -110,10 +272,16 @@ def _user_from_auth_header(authorization: str, verification: bool = False) -> Us
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    return token
+
+
+def _user_from_auth_header(authorization: str, verification: bool = False) -> User:
+    token = _bearer_token(authorization)
+
     return find_user_from_token(token, verification)
 
 
-def _user_from_session(request: Request) -> User:
+def _session_user_id(request: Request) -> Any:
     user_id = request.session.get(USER_ID_KEY)
     secondary_auth_token = request.cookies.get(SECONDARY_AUTH_TOKEN_KEY)
     secondary_auth_token_from_session = request.session.get(SECONDARY_AUTH_TOKEN_KEY)
@@ -128,17 +296,41 @@ def _user_from_session(request: Request) -> User:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    return user_id
+
+
+def _user_from_session(request: Request) -> Optional[User]:
+    user_id = _session_user_id(request)
+
     with UnitOfWork() as unit_of_work:
-        user_repository = UserRepository(unit_of_work.connection)
-        return user_repository.get(user_id)
+        return _session_user(unit_of_work.connection, user_id)
+
+
+def _session_user(connection: Connection, user_id: Any) -> Optional[User]:
+    """
+    Get the user of a session.
+
+    The session only stores the user id, so that the session cookie contains no user
+    details. The user is taken from the cache of authenticated users (see
+    UserRepository.get_authenticated_user), so that the parallel requests made for a
+    page don't all have to query the user.
+    """
+    user_repository = UserRepository(connection)
+    return user_repository.get_authenticated_user(int(user_id))
+
+
+def _user_from_token(
+    connection: Connection, token: str, verification: bool = False
+) -> Optional[User]:
+    user_repository = UserRepository(connection)
+    authentication_repository = AuthenticationService(user_repository)
+
+    return authentication_repository.validate_auth_token(token, verification)
 
 
 def find_user_from_token(token: str, verification: bool = False) -> Optional[User]:
     with UnitOfWork() as unit_of_work:
-        user_repository = UserRepository(unit_of_work.connection)
-        authentication_repository = AuthenticationService(user_repository)
-
-        return authentication_repository.validate_auth_token(token, verification)
+        return _user_from_token(unit_of_work.connection, token, verification)
 
 
 def get_user_to_verify(request: Request) -> User:
@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Optional, Tuple, TypeVar
+
+from fastapi import HTTPException
+from starlette import status
+
+from saltapi.settings import get_settings
+
+T = TypeVar("T")
+
+
+class PasswordVerificationExecutor:
+    """
+    Executor for verifying passwords.
+
+    Verifying a bcrypt hash takes a lot of CPU time. All password verifications are
+    hence run by a dedicated pool of worker threads, whose size is defined by the
+    MAX_CONCURRENT_PASSWORD_VERIFICATIONS setting. Other verifications have to wait
+    until a worker thread becomes available, so that a burst of logins cannot starve
+    the other requests. (The bcrypt library releases the GIL while hashing.)
+
+    At most as many verifications as defined by the MAX_QUEUED_PASSWORD_VERIFICATIONS
+    setting may be waiting for a worker thread. Any further verification is rejected
+    with a 503 (Service Unavailable) error.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        return self._start()[0]
+
+    def run(self, f: Callable[..., T], *args: Any) -> T:
+        """
+        Call a function in a worker thread and wait for its result.
+
+        An HTTPException with status 503 is raised if too many calls are waiting for a
+        worker thread already.
+        """
+        executor, slots = self._start()
+        if not slots.acquire(blocking=False):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many logins. Please try again later.",
+                headers={
+                    "Retry-After": str(get_settings().rejected_request_retry_after)
+                },
+            )
+        try:
+            return executor.submit(f, *args).result()
+        finally:
+            slots.release()
+
+    def _start(self) -> Tuple[ThreadPoolExecutor, threading.BoundedSemaphore]:
+        with self._lock:
+            if self._executor is None or self._slots is None:
+                settings = get_settings()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.max_concurrent_password_verifications,
+                    thread_name_prefix="password-verification",
+                )
+                self._slots = threading.BoundedSemaphore(
+                    settings.max_concurrent_password_verifications
+                    + settings.max_queued_password_verifications
+                )
+            return self._executor, self._slots
+
+    def shutdown(self) -> None:
+        """Shut down the worker threads."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+                self._slots = None
+
+
+password_verification_executor = PasswordVerificationExecutor()
+
+
+class LoginThrottle:
+    """
+    Throttle for failed login attempts.
+
+    If there have been as many failed login attempts for a username as defined by the
+    MAX_FAILED_LOGIN_ATTEMPTS setting within the time window defined by the
+    LOGIN_FAILURE_WINDOW setting, further login attempts are rejected without
+    verifying the password, until the oldest failed attempt is outside the window. A
+    successful login clears the failed attempts.
+
+    The failed attempts are recorded per server process, for at most
+    MAX_RECORDED_USERNAMES usernames. The usernames are kept in the order of their
+    latest failed attempt, and if there are too many, those whose latest failed attempt
+    is oldest are forgotten. Failed logins for made-up usernames thus cannot exhaust
+    memory.
+    """
+
+    # Maximum number of usernames for which failed attempts are recorded
+    MAX_RECORDED_USERNAMES = 10000
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._failures: OrderedDict[str, Deque[float]] = OrderedDict()
+
+    def is_throttled(self, username: str) -> bool:
+        """Check whether login attempts for a username are rejected."""
+        with self._lock:
+            failures = self._failures.get(username)
+            if failures is None:
+                return False
+            self._remove_outdated(failures)
+            if not failures:
+                del self._failures[username]
+                return False
+            return len(failures) >= get_settings().max_failed_login_attempts
+
+    def record_failure(self, username: str) -> None:
+        """Record a failed login attempt."""
+        with self._lock:
+            failures = self._failures.setdefault(username, deque())
+            failures.append(time.monotonic())
+            self._failures.move_to_end(username)
+            if len(self._failures) > self.MAX_RECORDED_USERNAMES:
+                self._failures.popitem(last=False)
+
+    def record_success(self, username: str) -> None:
+        """Record a successful login, which clears the failed attempts."""
+        with self._lock:
+            self._failures.pop(username, None)
+
+    def reset(self) -> None:
+        """Remove all recorded failed attempts."""
+        with self._lock:
+            self._failures.clear()
+
+    @staticmethod
+    def _remove_outdated(failures: Deque[float]) -> None:
+        window_start = time.monotonic() - get_settings().login_failure_window
+        while failures and failures[0] < window_start:
+            failures.popleft()
+
+
+login_throttle = LoginThrottle()
@@ -1,5 +1,5 @@
 import re
-from typing import Any, Dict, List, Optional, cast
+from typing import Any, Dict, List, Optional, Sequence
 
 from fastapi import Request
 
@@ -7,7 +7,7 @@ from saltapi.exceptions import AuthorizationError, ValidationError
 from saltapi.repository.block_repository import BlockRepository
 from saltapi.repository.proposal_repository import ProposalRepository
 from saltapi.repository.submission_repository import SubmissionRepository
-from saltapi.repository.user_repository import UserRepository
+from saltapi.repository.user_repository import ProposalPermission, UserRepository
 from saltapi.repository.utils import Utils
 from saltapi.service.user import Role, User
 from saltapi.settings import get_settings
@@ -16,6 +16,28 @@ from saltapi.web.schema.proposal import (
     ProprietaryPeriodUpdateRequest,
 )
 
+# Roles which are not specific to a particular proposal
+_GENERAL_ROLES = {
+    Role.ADMINISTRATOR,
+    Role.BOARD_MEMBER,
+    Role.ENGINEER,
+    Role.LIBRARIAN,
+    Role.MASK_CUTTER,
+    Role.SALT_ASTRONOMER,
+    Role.SALT_OPERATOR,
+    Role.TAC_CHAIR,
+    Role.TAC_MEMBER,
+}
+
+# Roles which are specific to a particular proposal
+_PROPOSAL_ROLES = {
+    Role.INVESTIGATOR,
+    Role.PRINCIPAL_CONTACT,
+    Role.PRINCIPAL_INVESTIGATOR,
+    Role.PROPOSAL_TAC_CHAIR,
+    Role.PROPOSAL_TAC_MEMBER,
+}
+
 
 class PermissionService:
     def __init__(
@@ -42,60 +64,23 @@ class PermissionService:
         Check that the user has a role required to perform a specific
         action on a given proposal.
         """
-        if role == Role.ADMINISTRATOR:
-            return self.user_repository.is_administrator(username)
-
-        elif role == Role.BOARD_MEMBER:
-            return self.user_repository.is_board_member(username)
-
-        elif role == Role.MASK_CUTTER:
-            return self.user_repository.is_mask_cutter(username)
-
-        elif role == Role.ENGINEER:
-            return self.user_repository.is_engineer()
-
-        elif role == Role.LIBRARIAN:
-            return self.user_repository.is_librarian(username)
-
-        elif role == Role.INVESTIGATOR:
-            return self.user_repository.is_investigator(
-                username, cast(str, proposal_code)
+        if role in _GENERAL_ROLES:
+            # All general roles are resolved with a single (cached) query.
+            return role in self.user_repository.get_user_roles(username)
+
+        elif role in _PROPOSAL_ROLES:
+            if proposal_code is None:
+                return False
+            # All proposal-specific roles are resolved with a single query, whose
+            # result is memoised for the request.
+            relationships = self.user_repository.get_proposal_relationships(
+                username, proposal_code
             )
+            return role in relationships.roles
 
         elif role == Role.PARTNER_AFFILIATED:
             return self.user_repository.is_partner_affiliated_user(username)
 
-        elif role == Role.PRINCIPAL_CONTACT:
-            return self.user_repository.is_principal_contact(
-                username, cast(str, proposal_code)
-            )
-
-        elif role == Role.PRINCIPAL_INVESTIGATOR:
-            return self.user_repository.is_principal_investigator(
-                username, cast(str, proposal_code)
-            )
-
-        elif role == Role.PROPOSAL_TAC_CHAIR:
-            return self.user_repository.is_tac_chair_for_proposal(
-                username, cast(str, proposal_code)
-            )
-
-        elif role == Role.PROPOSAL_TAC_MEMBER:
-            return self.user_repository.is_tac_member_for_proposal(
-                username, cast(str, proposal_code)
-            )
-
-        elif role == Role.SALT_ASTRONOMER:
-            return self.user_repository.is_salt_astronomer(username)
-
-        elif role == Role.SALT_OPERATOR:
-            return self.user_repository.is_salt_operator(username)
-
-        elif role == Role.TAC_CHAIR:
-            return self.user_repository.is_tac_chair_in_general(username)
-
-        elif role == Role.TAC_MEMBER:
-            return self.user_repository.is_tac_member_in_general(username)
         else:
             return False
 
@@ -129,47 +114,129 @@ class PermissionService:
         * a user who has been granted permission
 
         Gravitational wave proposals are a special case; they can be viewed by anyone
-        belonging to a SALT partner.
+        belonging to a SALT partner, but being an investigator or TAC member does not
+        suffice for viewing them. So apart from SALT staff and partner-affiliated users
+        only users who have been granted permission may view them.
         """
         username = user.username
-        try:
-            proposal_type = self.proposal_repository.get_proposal_type(proposal_code)
-
-            if proposal_type != "Gravitational Wave Event":
-                roles = [
-                    Role.SALT_ASTRONOMER,
-                    Role.SALT_OPERATOR,
-                    Role.INVESTIGATOR,
-                    Role.PROPOSAL_TAC_MEMBER,
-                    Role.ADMINISTRATOR,
-                    Role.LIBRARIAN,
-                ]
-                self.check_role(username, roles, proposal_code)
-            else:
-                # Gravitational wave event proposals are a special case; they can be
-                # viewed by anyone who belongs to a SALT partner.
-                roles = [
-                    Role.SALT_ASTRONOMER,
-                    Role.SALT_OPERATOR,
-                    Role.PARTNER_AFFILIATED,
-                    Role.ADMINISTRATOR,
-                    Role.LIBRARIAN,
-                ]
-
-                self.check_role(username, roles, proposal_code)
-        except AuthorizationError:
-            try:
-                # Granting a proposal view permission should be the exception rather
-                # than the norm. We therefore only check for it (and incur an additional
-                # database query) if the user doesn't have the permission to view the
-                # proposal because of one of their roles already.
-                if self.user_repository.user_has_proposal_permission(
-                    user_id=user.id, permission_type="View", proposal_code=proposal_code
-                ):
-                    return
-            except Exception:
-                raise AuthorizationError()
-            raise
+        # This raises a NotFoundError if the proposal does not exist.
+        proposal_type = self.proposal_repository.get_proposal_type(proposal_code)
+        is_gravitational_wave_proposal = proposal_type == "Gravitational Wave Event"
+
+        roles = [
+            Role.SALT_ASTRONOMER,
+            Role.SALT_OPERATOR,
+            Role.ADMINISTRATOR,
+            Role.LIBRARIAN,
+        ]
+        if any(self.user_has_role(username, role) for role in roles):
+            return
+
+        # The index of accessible proposals (see
+        # UserRepository.get_accessible_proposals) may be out of date, so the user's
+        # relationships with the proposal are queried instead.
+        relationships = self.user_repository.get_proposal_relationships(
+            username, proposal_code
+        )
+        if ProposalPermission.VIEW.value in relationships.permissions:
+            return
+        if not is_gravitational_wave_proposal and (
+            Role.INVESTIGATOR in relationships.roles
+            or Role.PROPOSAL_TAC_MEMBER in relationships.roles
+        ):
+            return
+
+        # Gravitational wave event proposals are a special case; they can be viewed by
+        # anyone who belongs to a SALT partner.
+        if is_gravitational_wave_proposal and self.user_has_role(
+            username, Role.PARTNER_AFFILIATED
+        ):
+            return
+
+        raise AuthorizationError()
+
+    def may_view_proposals(
+        self, user: User, proposal_codes: Sequence[str]
+    ) -> Dict[str, bool]:
+        """
+        Check which of a list of proposals the user may view.
+
+        A dictionary of the proposal codes and whether the user may view the proposal
+        is returned. The rules are the same as for check_permission_to_view_proposal,
+        but the check requires the same number of queries irrespective of the number of
+        proposals. Proposals which do not exist may not be viewed.
+        """
+        username = user.username
+        proposal_codes = list(dict.fromkeys(proposal_codes))
+        proposal_types = self.proposal_repository.get_proposal_types(proposal_codes)
+        existing_proposal_codes = [
+            proposal_code
+            for proposal_code in proposal_codes
+            if proposal_code in proposal_types
+        ]
+
+        roles = [
+            Role.SALT_ASTRONOMER,
+            Role.SALT_OPERATOR,
+            Role.ADMINISTRATOR,
+            Role.LIBRARIAN,
+        ]
+        if any(self.user_has_role(username, role) for role in roles):
+            viewable_proposal_codes = set(existing_proposal_codes)
+        else:
+            gravitational_wave_proposal_codes = [
+                proposal_code
+                for proposal_code in existing_proposal_codes
+                if proposal_types[proposal_code] == "Gravitational Wave Event"
+            ]
+            other_proposal_codes = [
+                proposal_code
+                for proposal_code in existing_proposal_codes
+                if proposal_types[proposal_code] != "Gravitational Wave Event"
+            ]
+
+            # As in check_permission_to_view_proposal, the user's relationships with
+            # the proposals are queried rather than taken from the (possibly out of
+            # date) index of accessible proposals. Only partner affiliation or a
+            # granted permission allows viewing a gravitational wave proposal.
+            viewable_proposal_codes = self.user_repository.get_related_proposal_codes(
+                username, other_proposal_codes
+            )
+            if gravitational_wave_proposal_codes:
+                if self.user_has_role(username, Role.PARTNER_AFFILIATED):
+                    viewable_proposal_codes.update(gravitational_wave_proposal_codes)
+                else:
+                    viewable_proposal_codes.update(
+                        self.user_repository.get_proposal_codes_with_view_permission(
+                            username, gravitational_wave_proposal_codes
+                        )
+                    )
+
+        return {
+            proposal_code: proposal_code in viewable_proposal_codes
+            for proposal_code in proposal_codes
+        }
+
+    def check_permission_to_view_proposals(
+        self, user: User, proposal_codes: Sequence[str]
+    ) -> None:
+        """
+        Check that the user may view all of a list of proposals.
+
+        See the may_view_proposals method for details.
+        """
+        forbidden_proposal_codes = [
+            proposal_code
+            for proposal_code, may_view in self.may_view_proposals(
+                user, proposal_codes
+            ).items()
+            if not may_view
+        ]
+        if forbidden_proposal_codes:
+            raise AuthorizationError(
+                "You may not view the following proposals: "
+                + ", ".join(forbidden_proposal_codes)
+            )
 
     def check_permission_to_submit_proposal(
         self, user: User, proposal_code: Optional[str]
@@ -609,6 +676,21 @@ class PermissionService:
                 f"You may not update the status from this ip address: {host}"
             )
 
+    @staticmethod
+    def check_permission_to_view_database_statistics(request: Request) -> None:
+        """
+        Check that the database statistics may be requested.
+
+        This is the case if the request comes from an address from which the telescope
+        status may be updated. No database access is required for this check, so that
+        the statistics remain available when the connection pool is exhausted.
+        """
+        host = request.client.host
+        if not re.match(get_settings().allow_status_update_origin_regex, host):
+            raise AuthorizationError(
+                f"You may not view the database statistics from this ip address: {host}"
+            )
+
     def check_permission_to_validate_user(self, user_id: int, user: User) -> None:
         if self.check_user_has_role(user, Role.ADMINISTRATOR):
             return
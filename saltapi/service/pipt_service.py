@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from saltapi.repository.pipt_repository import PiptRepository
 from saltapi.service.user import User
@@ -105,6 +105,12 @@ class PiptService:
         """
         return self.pipt_repository.get_block_visits(proposal_code)
 
+    def iter_block_visits(self, proposal_code: str) -> Iterator[Dict[str, Any]]:
+        """
+        Generate the block visits for a given proposal code one by one.
+        """
+        return self.pipt_repository.iter_block_visits(proposal_code)
+
     def get_proposals(
         self,
         user: User,
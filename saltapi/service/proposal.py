@@ -1,4 +1,5 @@
-from typing import Any, NewType
+from dataclasses import dataclass
+from typing import Any, NewType, Optional, Tuple
 
 Proposal = Any
 
@@ -10,3 +11,49 @@ ProposalCode = NewType("ProposalCode", str)
 ProposalListItem = Any
 
 ProposalProgressReport = Any
+
+
+@dataclass(frozen=True)
+class ProposalMetadata:
+    """
+    Basic details of a proposal, as needed by permission checks and other lookups.
+
+    The proposal type is the value stored in the database, and it is None if the
+    proposal has no general info yet.
+    """
+
+    proposal_code_id: int
+    proposal_type: Optional[str]
+
+
+@dataclass(frozen=True)
+class ProposalListFilter:
+    """
+    Criteria for filtering a list of proposals.
+
+    A proposal must satisfy all the given criteria. Its status and type must be
+    among the given ones (unless none are given), and the principal investigator
+    and liaison astronomer are identified by their user id. The title must contain
+    the given text, irrespective of case.
+    """
+
+    statuses: Tuple[str, ...] = ()
+    proposal_types: Tuple[str, ...] = ()
+    principal_investigator_id: Optional[int] = None
+    liaison_astronomer_id: Optional[int] = None
+    title: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ProposalText:
+    """
+    The text of a proposal for a semester, as used by the proposal search.
+
+    The read-me is the summary for the SALT Astronomer.
+    """
+
+    proposal_code: str
+    semester: str
+    title: str
+    abstract: Optional[str]
+    read_me: Optional[str]
@@ -0,0 +1,293 @@
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from fastapi import HTTPException
+from starlette import status
+
+from saltapi.service.proposal import ProposalText
+from saltapi.settings import get_settings
+
+# Weight of a word occurring in the title, relative to the abstract and read-me
+TITLE_WEIGHT = 3
+
+_WORD_REGEX = re.compile(r"\w+")
+
+
+def words(text: Optional[str]) -> List[str]:
+    """
+    Split a text into the words used by the search index.
+
+    The words are lower-cased and accents are removed. Single characters are
+    ignored.
+    """
+    if not text:
+        return []
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return [word for word in _WORD_REGEX.findall(stripped) if len(word) > 1]
+
+
+@dataclass(frozen=True)
+class ProposalSearchHit:
+    """A proposal matching a search, and its relevance score."""
+
+    proposal_code: str
+    semester: str
+    title: str
+    score: int
+
+
+@dataclass(frozen=True)
+class _Document:
+    semester: str
+    title: str
+    # Weighted number of occurrences of each word in the title, abstract and read-me
+    word_counts: Dict[str, int]
+
+
+class ProposalSearchIndex:
+    """
+    In-memory inverted index of the proposal texts.
+
+    The index maps every word of the title, abstract and read-me of the latest
+    proposal text of a proposal to the proposals containing it, so that proposals can
+    be searched without scanning the texts in the database.
+
+    Loading the index means reading the texts of all proposals, which takes too long
+    for a request. The index is therefore loaded in a background thread, which should
+    be started with the warm_up method when the server starts. Until the index has
+    been loaded for the first time, searching raises an HTTPException with status
+    503.
+
+    A proposal whose text may have changed (for example, because a submission has
+    finished) must be marked as outdated with the mark_outdated method; its text is
+    then reloaded before the next search. As the texts may be read from a replica of
+    the database, a text read shortly after the proposal has been marked may still be
+    the old one. If a replica is used, a proposal therefore remains outdated until the
+    maximum replication lag defined by the SDB_REPLICA_MAX_LAG setting has passed since
+    it was marked.
+
+    The index is shared by all requests of a server process. As other processes may
+    change proposals as well, the whole index is reloaded in the background once it is
+    older than defined by the PROPOSAL_SEARCH_INDEX_LIFETIME setting. The current
+    index is searched until the reloaded one is available.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._loader: Optional[threading.Thread] = None
+        self._loaded_at: Optional[float] = None
+        self._outdated: Set[str] = set()
+        # Times (as given by time.monotonic) when proposals were marked as outdated
+        self._marked_at: Dict[str, float] = {}
+        self._documents: Dict[str, _Document] = {}
+        self._postings: Dict[str, Set[str]] = {}
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the index has been loaded."""
+        return self._loaded_at is not None
+
+    def mark_outdated(self, proposal_code: str) -> None:
+        """Mark the text of a proposal as outdated."""
+        with self._lock:
+            self._outdated.add(proposal_code)
+            self._marked_at[proposal_code] = time.monotonic()
+
+    def reset(self) -> None:
+        """Remove all proposals, so that the index is loaded again when needed."""
+        with self._lock:
+            self._loaded_at = None
+            self._outdated.clear()
+            self._marked_at.clear()
+            self._documents.clear()
+            self._postings.clear()
+
+    def warm_up(
+        self, all_texts: Callable[[], Iterable[ProposalText]]
+    ) -> Optional[threading.Thread]:
+        """
+        Load the index in a background thread.
+
+        The all_texts function is called in the background thread, and it must return
+        the proposal texts for all proposals. So it cannot use the database connection
+        of a request.
+
+        The thread is returned. If the index is being loaded already, no thread is
+        started and None is returned.
+        """
+        with self._lock:
+            if self._loader is not None and self._loader.is_alive():
+                return None
+            self._loader = threading.Thread(
+                target=self._load_in_background, args=(all_texts,), daemon=True
+            )
+            self._loader.start()
+            return self._loader
+
+    def search(
+        self,
+        query: str,
+        all_texts: Callable[[], Iterable[ProposalText]],
+        texts: Callable[[List[str]], Iterable[ProposalText]],
+    ) -> List[ProposalSearchHit]:
+        """
+        Search for proposals containing all the words of a query.
+
+        The hits are sorted by their score, which is the weighted number of
+        occurrences of the query words, and then by proposal code, latest first.
+        They are not filtered by any permissions.
+
+        The all_texts function is used for (re)loading the index in the background
+        (see warm_up), and the texts function is used for reloading outdated proposals
+        before searching.
+        """
+        self._refresh(all_texts, texts)
+
+        query_words = set(words(query))
+        if not query_words:
+            return []
+
+        with self._lock:
+            postings = sorted(
+                (self._postings.get(word, set()) for word in query_words), key=len
+            )
+            proposal_codes = set.intersection(*postings)
+            hits = []
+            for proposal_code in proposal_codes:
+                document = self._documents[proposal_code]
+                hits.append(
+                    ProposalSearchHit(
+                        proposal_code=proposal_code,
+                        semester=document.semester,
+                        title=document.title,
+                        score=sum(document.word_counts[w] for w in query_words),
+                    )
+                )
+
+        hits.sort(key=lambda hit: hit.proposal_code, reverse=True)
+        hits.sort(key=lambda hit: hit.score, reverse=True)
+        return hits
+
+    def _refresh(
+        self,
+        all_texts: Callable[[], Iterable[ProposalText]],
+        texts: Callable[[List[str]], Iterable[ProposalText]],
+    ) -> None:
+        loaded_at = self._loaded_at
+        lifetime = get_settings().proposal_search_index_lifetime
+        if loaded_at is None or time.monotonic() - loaded_at > lifetime:
+            self.warm_up(all_texts)
+        if loaded_at is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="The search index is being built. Please try again later.",
+                headers={
+                    "Retry-After": str(get_settings().rejected_request_retry_after)
+                },
+            )
+
+        # Only one thread reloads outdated proposals at a time; the others search the
+        # index as it is. The texts are read without holding the lock for the index,
+        # so that searches are not blocked by the database.
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            with self._lock:
+                outdated = sorted(self._outdated)
+                self._outdated.clear()
+            if not outdated:
+                return
+
+            read_at = time.monotonic()
+            try:
+                documents = {
+                    t.proposal_code: self._document(t) for t in texts(outdated)
+                }
+            except Exception:
+                with self._lock:
+                    self._outdated.update(outdated)
+                raise
+            with self._lock:
+                for proposal_code in outdated:
+                    self._remove(proposal_code)
+                    if proposal_code in documents:
+                        self._add(proposal_code, documents[proposal_code])
+                self._mark_possibly_stale(read_at)
+        finally:
+            self._refresh_lock.release()
+
+    def _load_in_background(
+        self, all_texts: Callable[[], Iterable[ProposalText]]
+    ) -> None:
+        try:
+            self._load(all_texts)
+        except Exception:
+            logging.exception("The proposal search index could not be loaded.")
+
+    def _load(self, all_texts: Callable[[], Iterable[ProposalText]]) -> None:
+        # A new index is built and then replaces the current one.
+        loaded_at = time.monotonic()
+        documents: Dict[str, _Document] = {}
+        postings: Dict[str, Set[str]] = {}
+        for proposal_text in all_texts():
+            document = self._document(proposal_text)
+            documents[proposal_text.proposal_code] = document
+            for word in document.word_counts:
+                postings.setdefault(word, set()).add(proposal_text.proposal_code)
+        with self._refresh_lock, self._lock:
+            self._documents = documents
+            self._postings = postings
+            self._loaded_at = loaded_at
+            self._mark_possibly_stale(loaded_at)
+
+    def _mark_possibly_stale(self, read_at: float) -> None:
+        # Proposals marked as outdated less than the maximum replication lag before
+        # their texts were read may have been read with the old text, so they remain
+        # outdated. The lock for the index must be held.
+        settings = get_settings()
+        max_lag = settings.sdb_replica_max_lag if settings.sdb_replica_dsn else 0
+        for proposal_code, marked_at in list(self._marked_at.items()):
+            if marked_at < time.monotonic() - max_lag:
+                del self._marked_at[proposal_code]
+            if marked_at > read_at - max_lag:
+                self._outdated.add(proposal_code)
+
+    @staticmethod
+    def _document(proposal_text: ProposalText) -> _Document:
+        word_counts: Counter[str] = Counter()
+        for word in words(proposal_text.title):
+            word_counts[word] += TITLE_WEIGHT
+        word_counts.update(words(proposal_text.abstract))
+        word_counts.update(words(proposal_text.read_me))
+        return _Document(
+            semester=proposal_text.semester,
+            title=proposal_text.title,
+            word_counts=dict(word_counts),
+        )
+
+    def _add(self, proposal_code: str, document: _Document) -> None:
+        self._remove(proposal_code)
+        self._documents[proposal_code] = document
+        for word in document.word_counts:
+            self._postings.setdefault(word, set()).add(proposal_code)
+
+    def _remove(self, proposal_code: str) -> None:
+        document = self._documents.pop(proposal_code, None)
+        if document is None:
+            return
+        for word in document.word_counts:
+            proposal_codes = self._postings[word]
+            proposal_codes.discard(proposal_code)
+            if not proposal_codes:
+                del self._postings[word]
+
+
+proposal_search_index = ProposalSearchIndex()
@@ -2,7 +2,7 @@ import logging
 import pathlib
 import urllib.parse
 from io import BytesIO
-from typing import Any, Dict, List, Optional, Tuple, cast
+from typing import Any, Dict, Iterator, List, Optional, Tuple, cast
 
 import pdfkit
 import requests
@@ -12,10 +12,16 @@ from starlette.datastructures import URLPath
 
 from saltapi.exceptions import NotFoundError, SSDAError
 from saltapi.repository.proposal_repository import ProposalRepository
+from saltapi.repository.unit_of_work import UnitOfWork
 from saltapi.service.create_proposal_progress_html import (
     create_proposal_progress_html,
 )
-from saltapi.service.proposal import ProposalListItem
+from saltapi.service.proposal import (
+    ProposalListFilter,
+    ProposalListItem,
+    ProposalText,
+)
+from saltapi.service.proposal_search import ProposalSearchHit, proposal_search_index
 from saltapi.service.user import User
 from saltapi.settings import get_settings
 from saltapi.util import (
@@ -27,6 +33,17 @@ from saltapi.web.schema.common import ProposalCode, Semester
 from saltapi.web.schema.proposal import ProposalProgressInput
 
 
+def all_proposal_texts() -> Iterator[ProposalText]:
+    """
+    Generate the latest proposal text of all proposals.
+
+    The texts are read with a database connection of their own, so that the proposal
+    search index can be loaded in a background thread (see ProposalSearchIndex).
+    """
+    with UnitOfWork(read_only=True) as unit_of_work:
+        yield from ProposalRepository(unit_of_work.connection).iter_proposal_texts()
+
+
 def generate_route_url(request: Request, router_path: URLPath) -> str:
     url = urllib.parse.urljoin(str(request.base_url), router_path)
     return url
@@ -53,12 +70,18 @@ class ProposalService:
         from_semester: str = "2000-1",
         to_semester: str = "2099-2",
         limit: int = 1000,
+        list_filter: Optional[ProposalListFilter] = None,
+        sort_by: str = "id",
+        descending: bool = True,
+        after_id: Optional[int] = None,
+        after_sort_value: Optional[str] = None,
     ) -> List[ProposalListItem]:
         """
         Return the list of proposals for a semester range.
 
         The maximum number of proposals to be returned can be set with the limit
-        parameter; the default is 1000.
+        parameter; the default is 1000. See ProposalRepository.list for the filter,
+        the sort order and fetching the list page by page.
         """
         if semester_start(from_semester) > semester_start(to_semester):
             raise ValueError(
@@ -68,7 +91,59 @@ class ProposalService:
         if limit < 0:
             raise ValueError("The limit must not be negative.")
 
-        return self.repository.list(username, from_semester, to_semester, limit)
+        return self.repository.list(
+            username,
+            from_semester,
+            to_semester,
+            limit,
+            list_filter=list_filter,
+            sort_by=sort_by,
+            descending=descending,
+            after_id=after_id,
+            after_sort_value=after_sort_value,
+        )
+
+    def iter_proposal_summaries(
+        self,
+        username: str,
+        from_semester: str = "2000-1",
+        to_semester: str = "2099-2",
+        limit: int = 1000,
+        list_filter: Optional[ProposalListFilter] = None,
+        sort_by: str = "id",
+        descending: bool = True,
+        after_id: Optional[int] = None,
+        after_sort_value: Optional[str] = None,
+    ) -> Iterator[ProposalListItem]:
+        """
+        Generate the proposals returned by list_proposal_summaries one by one.
+        """
+        return self.repository.iter_list(
+            username,
+            from_semester,
+            to_semester,
+            limit,
+            list_filter=list_filter,
+            sort_by=sort_by,
+            descending=descending,
+            after_id=after_id,
+            after_sort_value=after_sort_value,
+        )
+
+    def search_proposals(self, query: str) -> List[ProposalSearchHit]:
+        """
+        Search the titles, abstracts and read-mes of the proposals.
+
+        Only the latest proposal text of a proposal is searched, and a proposal must
+        contain all the words of the query. The results are ranked by relevance, and
+        they are not filtered by the user's permissions. See ProposalSearchIndex for
+        details.
+        """
+        return proposal_search_index.search(
+            query,
+            all_texts=all_proposal_texts,
+            texts=self.repository.iter_proposal_texts,
+        )
 
     def get_phase1_summary(self, proposal_code: str) -> pathlib.Path:
         """
@@ -447,6 +522,9 @@ class ProposalService:
             raise ValueError(f"Proposal status not allowed for phase {phase}")
         self.repository.update_proposal_status(proposal_code, status, status_comment)
 
+        # Deleted proposals are not included in the search index.
+        proposal_search_index.mark_outdated(proposal_code)
+
     def update_is_self_activatable(
         self, proposal_code: str, is_self_activatable: bool
     ) -> None:
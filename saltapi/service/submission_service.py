@@ -13,8 +13,10 @@ from fastapi import UploadFile
 from sqlalchemy.engine import Connection
 
 from saltapi.exceptions import ValidationError
+from saltapi.repository.cache import invalidate_cache
 from saltapi.repository.database import engine
 from saltapi.repository.submission_repository import SubmissionRepository
+from saltapi.service.proposal_search import proposal_search_index
 from saltapi.service.submission import SubmissionMessageType, SubmissionStatus
 from saltapi.service.user import User
 from saltapi.settings import get_settings
@@ -153,6 +155,14 @@ class SubmissionService:
         submission_repository = SubmissionRepository(connection)
         submission = submission_repository.get(submission_identifier)
 
+        # The submission may have created the proposal's general info, and it may have
+        # changed the proposal text and investigators. As the previous investigators
+        # aren't known any longer, the proposal indexes of all users are discarded.
+        if submission["proposal_code"]:
+            invalidate_cache("proposal_metadata", submission["proposal_code"])
+            invalidate_cache("accessible_proposals")
+            proposal_search_index.mark_outdated(submission["proposal_code"])
+
         # Make sure the submission is marked as finished in the database
         if submission["finished_at"] is None:
             if return_code:
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Any, Dict, FrozenSet, List, Optional
 
 from saltapi.web.schema.user import UserRight
 
@@ -30,6 +30,45 @@ class ContactDetails:
     email: str
 
 
+@dataclass()
+class ProposalRelationships:
+    """
+    The relationships between a user and a proposal.
+
+    The roles are the proposal-specific roles (such as Principal Investigator) the user
+    has for the proposal, and the permissions are the proposal permissions (such as
+    "View") the user has been granted.
+    """
+
+    roles: List[Role]
+    permissions: List[str]
+
+
+@dataclass(frozen=True)
+class AccessibleProposals:
+    """
+    Index of the proposals a user may view because of their relationships with them.
+
+    The proposal codes are those of the proposals on which the user is an investigator,
+    which request time from a partner whose TAC the user belongs to, or which the user
+    has been granted permission to view. The investigator proposal codes are the subset
+    of proposals on which the user is an investigator.
+
+    In addition, users affiliated to a SALT partner may view all Gravitational Wave
+    Event proposals, and users with the respective right may view all proposals.
+
+    The index is immutable, so that it need not be copied when taken from a cache.
+    """
+
+    proposal_codes: FrozenSet[str]
+    investigator_proposal_codes: FrozenSet[str]
+    is_partner_affiliated: bool
+    may_view_all_proposals: bool
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "AccessibleProposals":
+        return self
+
+
 @dataclass()
 class UserListItem:
     id: int
@@ -1,5 +1,5 @@
 from datetime import timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from saltapi.exceptions import (
     AuthorizationError,
@@ -118,6 +118,9 @@ SALT Team
         users_details = self.repository.get_users()
         return users_details
 
+    def iter_users(self) -> Iterator[Dict[str, Any]]:
+        return self.repository.iter_users()
+
     def get_user_by_email(self, email: str) -> Optional[User]:
         user = self.repository.get_by_email(email)
         if user:
@@ -1,5 +1,8 @@
 """Utility functions."""
+import base64
+import binascii
 import inspect
+import json
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -10,7 +13,7 @@ from astropy.coordinates import Angle
 from fastapi import Form
 from pydantic import BaseModel
 
-from saltapi.exceptions import AuthorizationError
+from saltapi.exceptions import AuthorizationError, ValidationError
 from saltapi.service.user import User
 from saltapi.settings import get_settings
 from saltapi.web.schema.common import PartnerCode
@@ -353,3 +356,34 @@ def remove_file(path: Path | str, missing_ok: bool = True) -> None:
         path.unlink(missing_ok=missing_ok)
     except Exception as e:
         logging.error(f"Failed to remove file {path}: {e}")
+
+
+# Response header with the cursor for the next page of a paginated list
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """
+    Encode the position after the last item of a page as an opaque cursor.
+
+    The position must be JSON serialisable. The cursor is URL-safe, so that it can be
+    passed as a query parameter.
+    """
+    data = json.dumps(position, separators=(",", ":"), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a cursor created with encode_cursor.
+
+    A ValidationError is raised if the cursor is invalid.
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(data)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationError(f"Invalid cursor: {cursor}")
+    if not isinstance(position, dict):
+        raise ValidationError(f"Invalid cursor: {cursor}")
+    return position
@@ -6,7 +6,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from starlette import status
 
 from saltapi.exceptions import AuthenticationError, ValidationError
-from saltapi.repository.unit_of_work import UnitOfWork
+from saltapi.repository.unit_of_work import UnitOfWork, release_request_connection
 from saltapi.service.authentication import AccessToken
 from saltapi.service.authentication_service import (SECONDARY_AUTH_TOKEN_KEY,
                                                     USER_ID_KEY,
@@ -27,14 +27,29 @@ def get_user_authentication_function() -> Callable[[str, str], User]:
     """
 
     def authenticate_user(username: str, password: str) -> User:
+        if username == "gw":
+            raise AuthenticationError("User cannot be authenticated.")
         with UnitOfWork() as unit_of_work:
             authentication_service = services.authentication_service(
                 unit_of_work.connection
             )
-            if username == "gw":
-                raise AuthenticationError("User cannot be authenticated.")
-            user = authentication_service.authenticate_user(username, password)
-            return user
+            user = authentication_service.find_user_for_login(username)
+
+        # The password verification may have to wait for a worker thread, and the
+        # database connection must not be held meanwhile.
+        release_request_connection()
+        new_password_hash = authentication_service.verify_login_password(
+            user, password
+        )
+
+        if new_password_hash is not None:
+            with UnitOfWork() as unit_of_work:
+                authentication_service = services.authentication_service(
+                    unit_of_work.connection
+                )
+                authentication_service.replace_password_hash(user, new_password_hash)
+                unit_of_work.commit()
+        return user
 
     return authenticate_user
 
@@ -68,7 +83,13 @@ def token(
     if not user:
         raise AuthenticationError("User not found")
     validate_user(user)
-    return AuthenticationService.access_token(user)
+    if not get_settings().auth_token_claims:
+        return AuthenticationService.access_token(user)
+    with UnitOfWork() as unit_of_work:
+        authentication_service = services.authentication_service(
+            unit_of_work.connection
+        )
+        return authentication_service.access_token_with_claims(user)
 
 
 def _login_user(user: User, request: Request) -> Response:
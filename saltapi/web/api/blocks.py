@@ -1,10 +1,14 @@
 from typing import Optional
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Path
+from sqlalchemy.engine import Connection
 from starlette import status
 
-from saltapi.repository.unit_of_work import UnitOfWork
-from saltapi.service.authentication_service import get_current_user
+from saltapi.repository.unit_of_work import AsyncUnitOfWork, UnitOfWork
+from saltapi.service.authentication_service import (
+    get_current_user,
+    get_current_user_async,
+)
 from saltapi.service.block import Block as _Block
 from saltapi.service.block import BlockStatus as _BlockStatus
 from saltapi.service.user import User
@@ -49,23 +53,26 @@ def get_next_scheduled_block(user: User = Depends(get_current_user)) -> _Block:
 
 
 @router.get("/{block_id}", summary="Get a block", response_model=Block)
-def get_block(
+async def get_block(
     block_id: int = Path(
         ..., title="Block id", description="Unique identifier for the block"
     ),
-    user: User = Depends(get_current_user),
+    user: User = Depends(get_current_user_async),
 ) -> _Block:
     """
     Returns the block with a given id.
     """
 
-    with UnitOfWork() as unit_of_work:
-        permission_service = services.permission_service(unit_of_work.connection)
+    def get(connection: Connection) -> _Block:
+        permission_service = services.permission_service(connection)
         permission_service.check_permission_to_view_block(user, block_id)
 
-        block_service = services.block_service(unit_of_work.connection)
+        block_service = services.block_service(connection)
         return block_service.get_block(block_id)
 
+    async with AsyncUnitOfWork() as unit_of_work:
+        return await unit_of_work.run(get)
+
 
 @router.get(
     "/{block_id}/status", summary="Get a block status", response_model=BlockStatus
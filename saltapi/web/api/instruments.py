@@ -1,6 +1,9 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Path, Query
+from sqlalchemy.engine import Connection
+from starlette.requests import Request
+from starlette.responses import Response
 
 from saltapi.repository.unit_of_work import UnitOfWork
 from saltapi.service.authentication_service import get_current_user
@@ -15,6 +18,7 @@ from saltapi.web.schema.rss import (
     RssMask,
     Filter,
 )
+from saltapi.web.streaming import NDJSON_RESPONSES, accepts_ndjson, ndjson_response
 
 router = APIRouter(tags=["Instrument"])
 
@@ -51,8 +55,10 @@ def get_rss_masks_in_magazine(
     summary="Get MOS data",
     response_model=List[MosBlock],
     status_code=200,
+    responses=NDJSON_RESPONSES,
 )
 def get_mos_masks_metadata(
+    request: Request,
     user: User = Depends(get_current_user),
     from_semester: Semester = Query(
         "2000-1",
@@ -66,11 +72,15 @@ def get_mos_masks_metadata(
         description="Only include MOS masks for this semester and earlier.",
         title="To semester",
     ),
-) -> List[Dict[str, Any]]:
+) -> Union[List[Dict[str, Any]], Response]:
     """
     Get the list of blocks using MOS.
+
+    If the Accept header requests application/x-ndjson, the blocks are returned as
+    newline-delimited JSON. The blocks are completed with the details of other
+    blocks, so they are all fetched before the first one is written.
     """
-    with UnitOfWork() as unit_of_work:
+    with UnitOfWork(read_only=True) as unit_of_work:
         if from_semester > to_semester:
             raise HTTPException(
                 status_code=400,
@@ -79,6 +89,15 @@ def get_mos_masks_metadata(
         permission_service = services.permission_service(unit_of_work.connection)
         permission_service.check_permission_to_view_mos_mask_metadata(user)
 
+        if accepts_ndjson(request):
+
+            def all_mos_blocks(connection: Connection) -> List[Dict[str, Any]]:
+                return services.instrument_service(connection).get_mos_masks_metadata(
+                    from_semester, to_semester
+                )
+
+            return ndjson_response(all_mos_blocks, MosBlock)
+
         instrument_service = services.instrument_service(unit_of_work.connection)
         mos_blocks = instrument_service.get_mos_masks_metadata(
             from_semester, to_semester
@@ -111,7 +130,7 @@ def update_mos_mask_metadata(
         args["barcode"] = barcode
         instrument_service.update_mos_mask_metadata(args)
 
-        unit_of_work.connection.commit()
+        unit_of_work.commit()
 
         mask_metadata = instrument_service.get_mos_mask_metadata(barcode)
         return MosMaskMetadata(**mask_metadata)
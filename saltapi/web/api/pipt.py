@@ -1,7 +1,10 @@
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Dict, Iterator, List, Literal, Optional, Union
 
 from fastapi import APIRouter, Depends, Query
 from pydantic.networks import EmailStr
+from sqlalchemy.engine import Connection
+from starlette.requests import Request
+from starlette.responses import Response
 
 from saltapi.exceptions import AuthorizationError, NotFoundError
 from saltapi.repository.unit_of_work import UnitOfWork
@@ -27,6 +30,7 @@ from saltapi.web.schema.pipt import (
     SmiFlatDetailsSetup,
     PiptInvestigator,
 )
+from saltapi.web.streaming import NDJSON_RESPONSES, accepts_ndjson, ndjson_response
 
 router = APIRouter(prefix="/pipt", tags=["PIPT"])
 
@@ -148,7 +152,7 @@ def get_nirwals_flat_details() -> NirwalsFlatDetailsSetup:
     """
     Returns NIRWALS flat field calibration details.
     """
-    with UnitOfWork() as unit_of_work:
+    with UnitOfWork(read_only=True) as unit_of_work:
         service = services.pipt_service(unit_of_work.connection)
         return service.get_nir_flat_details()
 
@@ -162,7 +166,7 @@ def get_nirwals_arc_details() -> NirwalsArcDetailsSetup:
     """
     Return the arc calibration details for NIRWALS setups.
     """
-    with UnitOfWork() as unit_of_work:
+    with UnitOfWork(read_only=True) as unit_of_work:
         service = services.pipt_service(unit_of_work.connection)
         return service.get_nir_arc_details()
 
@@ -176,7 +180,7 @@ def get_rss_arc_details() -> RssArcDetailsSetup:
     """
     Get the arc calibration details for non-SMI RSS setups.
     """
-    with UnitOfWork() as unit_of_work:
+    with UnitOfWork(read_only=True) as unit_of_work:
         service = services.pipt_service(unit_of_work.connection)
         return service.get_rss_arc_details()
 
@@ -187,7 +191,7 @@ def get_rss_arc_details() -> RssArcDetailsSetup:
     response_model=RssRingDetailsSetup,
 )
 def get_rss_ring_details() -> RssRingDetailsSetup:
-    with UnitOfWork() as unit_of_work:
+    with UnitOfWork(read_only=True) as unit_of_work:
         """Get calibration regions and plus lines for non-SMI RSS setups."""
         service = services.pipt_service(unit_of_work.connection)
         return service.get_rss_ring_details()
@@ -202,7 +206,7 @@ def get_smi_flat_details() -> SmiFlatDetailsSetup:
     """
     Get the flat-field calibration details for non-SMI RSS setups.
     """
-    with UnitOfWork() as unit_of_work:
+    with UnitOfWork(read_only=True) as unit_of_work:
         service = services.pipt_service(unit_of_work.connection)
         return service.get_smi_flat_details()
 
@@ -216,7 +220,7 @@ def get_smi_arc_details() -> SmiArcDetailsSetup:
     """
     Get the arc calibration details for SMI RSS setups.
     """
-    with UnitOfWork() as unit_of_work:
+    with UnitOfWork(read_only=True) as unit_of_work:
         service = services.pipt_service(unit_of_work.connection)
         return service.get_smi_arc_details()
 
@@ -251,19 +255,34 @@ def get_previous_proposals_info(
     "/block-visits",
     summary="Get block visits for a given proposal code",
     response_model=List[PiptBlockVisit],
+    responses=NDJSON_RESPONSES,
 )
 def get_block_visits(
+    request: Request,
     proposal_code: ProposalCode = Query(
         ...,
         title="Proposal code",
         description="Proposal code of the returned constraints.",
     ),
     user: User = Depends(get_current_user),
-) -> List[PiptBlockVisit]:
+) -> Union[List[Dict[str, Any]], Response]:
+    """
+    Returns the block visits of a proposal. If the Accept header requests
+    application/x-ndjson, the block visits are streamed as newline-delimited JSON.
+    """
     with UnitOfWork() as unit_of_work:
         permission_service = services.permission_service(unit_of_work.connection)
         permission_service.check_permission_to_view_proposal(user, proposal_code)
 
+        if accepts_ndjson(request):
+
+            def iter_block_visits(connection: Connection) -> Iterator[Dict[str, Any]]:
+                return services.pipt_service(connection).iter_block_visits(
+                    proposal_code
+                )
+
+            return ndjson_response(iter_block_visits, PiptBlockVisit)
+
         service = services.pipt_service(unit_of_work.connection)
         block_visits = service.get_block_visits(proposal_code)
         return block_visits
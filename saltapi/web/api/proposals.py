@@ -2,7 +2,7 @@ import mimetypes
 import os
 import tempfile
 from datetime import date
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 from fastapi import (
     APIRouter,
@@ -16,17 +16,29 @@ from fastapi import (
     status,
 )
 from fastapi.responses import FileResponse
+from sqlalchemy.engine import Connection
 from starlette.background import BackgroundTask
+from starlette.requests import Request
 from starlette.responses import JSONResponse
 
 from saltapi.exceptions import NotFoundError, SSDAError, ValidationError
-from saltapi.repository.unit_of_work import UnitOfWork
-from saltapi.service.authentication_service import get_current_user
+from saltapi.repository.unit_of_work import AsyncUnitOfWork, UnitOfWork
+from saltapi.service.authentication_service import (
+    get_current_user,
+    get_current_user_async,
+)
 from saltapi.service.proposal import Proposal as _Proposal
+from saltapi.service.proposal import ProposalListFilter
 from saltapi.service.proposal import ProposalListItem as _ProposalListItem
 from saltapi.service.proposal import ProposalStatus as _ProposalStatus
 from saltapi.service.user import LiaisonAstronomer, User
-from saltapi.util import remove_file, semester_start
+from saltapi.util import (
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+    remove_file,
+    semester_start,
+)
 from saltapi.web import services
 from saltapi.web.schema.common import Message, ProposalCode, Semester
 from saltapi.web.schema.p1_proposal import P1Proposal
@@ -39,23 +51,40 @@ from saltapi.web.schema.proposal import (
     ObservationComment,
     ProposalApprovalStatus,
     ProposalListItem,
+    ProposalListSortField,
+    ProposalSearchResult,
     ProposalStatus,
+    ProposalStatusValue,
+    ProposalType,
+    ProposalViewPermission,
+    ProposalViewPermissionsRequest,
     ProprietaryPeriodUpdateRequest,
     SelfActivation,
     UpdateStatus,
 )
 from saltapi.web.schema.user import UserId
+from saltapi.web.streaming import NDJSON_RESPONSES, accepts_ndjson, ndjson_response
 
 router = APIRouter(prefix="/proposals", tags=["Proposals"])
 
+# Number of search hits for which the view permission is checked at once
+SEARCH_PERMISSION_BATCH_SIZE = 200
+
 
 class PDFResponse(Response):
     media_type = "application/pdf"
 
 
-@router.get("/", summary="List proposals", response_model=List[ProposalListItem])
-def get_proposals(
-    user: User = Depends(get_current_user),
+@router.get(
+    "/",
+    summary="List proposals",
+    response_model=List[ProposalListItem],
+    responses=NDJSON_RESPONSES,
+)
+async def get_proposals(
+    request: Request,
+    response: Response,
+    user: User = Depends(get_current_user_async),
     from_semester: Semester = Query(
         "2000-1",
         alias="from",
@@ -71,7 +100,61 @@ def get_proposals(
     limit: int = Query(
         1000, description="Maximum number of results to return.", title="Limit", ge=0
     ),
-) -> List[_ProposalListItem]:
+    cursor: Optional[str] = Query(
+        None,
+        description=(
+            "Cursor for the next page, as returned in the X-Next-Cursor header"
+            " of the previous page."
+        ),
+        title="Cursor",
+    ),
+    proposal_status: Optional[List[ProposalStatusValue]] = Query(
+        None,
+        alias="status",
+        description=(
+            "Only include proposals with this status. The parameter may be repeated."
+        ),
+        title="Proposal status",
+    ),
+    proposal_type: Optional[List[ProposalType]] = Query(
+        None,
+        description=(
+            "Only include proposals of this type. The parameter may be repeated."
+        ),
+        title="Proposal type",
+    ),
+    principal_investigator: Optional[int] = Query(
+        None,
+        description=(
+            "Only include proposals with the Principal Investigator with this user id."
+        ),
+        title="Principal Investigator",
+    ),
+    liaison_astronomer: Optional[int] = Query(
+        None,
+        description=(
+            "Only include proposals with the liaison astronomer with this user id."
+        ),
+        title="Liaison astronomer",
+    ),
+    title: Optional[str] = Query(
+        None,
+        description=(
+            "Only include proposals whose title contains this text (ignoring case)."
+        ),
+        title="Title",
+        min_length=1,
+        max_length=100,
+    ),
+    sort_by: ProposalListSortField = Query(
+        ProposalListSortField.ID,
+        description="Field by which to sort the proposals.",
+        title="Sort by",
+    ),
+    descending: bool = Query(
+        True, description="Whether to sort in descending order.", title="Descending"
+    ),
+) -> Union[List[_ProposalListItem], Response]:
     """
     Lists all proposals the user may view. The proposals returned can be limited to
     those with submissions within a semester range by supplying a from or to a
@@ -81,22 +164,223 @@ def get_proposals(
     A proposal is included for a semester if there exists a submission for that
     semester. For multi-semester proposals this implies that a proposal may not be
     included for a semester even though time has been requested for that semester.
+
+    The proposals can be filtered further by status, proposal type, Principal
+    Investigator, liaison astronomer and title. A proposal must match all the given
+    filters.
+
+    By default the proposals are ordered by their id, latest first. Alternatively
+    they can be sorted by proposal code, semester or title, in which case proposals
+    with the same value are ordered by their id.
+
+    The list can be fetched page by page. If there may be more proposals than
+    returned, the response has an X-Next-Cursor header. Its value must be passed as
+    the cursor parameter (with the same values for the other parameters) to get the
+    next page.
+
+    If the Accept header requests application/x-ndjson, the proposals are streamed as
+    newline-delimited JSON instead, one proposal per line. This is meant for exports
+    of long lists. As the headers are sent before the proposals, no X-Next-Cursor
+    header is included; instead the cursor for the next page is included as
+    next_cursor in the trailer line ending the stream.
     """
 
-    with UnitOfWork() as unit_of_work:
-        if semester_start(from_semester) > semester_start(to_semester):
-            raise HTTPException(
-                status_code=400,
-                detail="The from semester must not be later than the to semester.",
+    if semester_start(from_semester) > semester_start(to_semester):
+        raise HTTPException(
+            status_code=400,
+            detail="The from semester must not be later than the to semester.",
+        )
+
+    list_filter = ProposalListFilter(
+        statuses=tuple(s.value for s in proposal_status or []),
+        proposal_types=tuple(t.value for t in proposal_type or []),
+        principal_investigator_id=principal_investigator,
+        liaison_astronomer_id=liaison_astronomer,
+        title=title,
+    )
+    after_id: Optional[int] = None
+    after_sort_value: Optional[str] = None
+    if cursor is not None:
+        after_id, after_sort_value = _cursor_position(cursor, sort_by.value, descending)
+
+    if accepts_ndjson(request):
+
+        def proposal_summaries(connection: Connection) -> Iterator[_ProposalListItem]:
+            proposal_service = services.proposal_service(connection)
+            return proposal_service.iter_proposal_summaries(
+                username=user.username,
+                from_semester=from_semester,
+                to_semester=to_semester,
+                limit=limit,
+                list_filter=list_filter,
+                sort_by=sort_by.value,
+                descending=descending,
+                after_id=after_id,
+                after_sort_value=after_sort_value,
             )
 
-        proposal_service = services.proposal_service(unit_of_work.connection)
+        def next_cursor(
+            count: int, last_proposal: Optional[_ProposalListItem]
+        ) -> Optional[str]:
+            return _next_cursor(count, last_proposal, limit, sort_by, descending)
+
+        return ndjson_response(proposal_summaries, ProposalListItem, next_cursor)
+
+    def list_proposals(connection: Connection) -> List[_ProposalListItem]:
+        proposal_service = services.proposal_service(connection)
         return proposal_service.list_proposal_summaries(
             username=user.username,
             from_semester=from_semester,
             to_semester=to_semester,
             limit=limit,
+            list_filter=list_filter,
+            sort_by=sort_by.value,
+            descending=descending,
+            after_id=after_id,
+            after_sort_value=after_sort_value,
+        )
+
+    async with AsyncUnitOfWork(read_only=True) as unit_of_work:
+        proposals = await unit_of_work.run(list_proposals)
+
+    cursor = _next_cursor(
+        len(proposals), proposals[-1] if proposals else None, limit, sort_by, descending
+    )
+    if cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return proposals
+
+
+def _next_cursor(
+    count: int,
+    last_proposal: Optional[_ProposalListItem],
+    limit: int,
+    sort_by: ProposalListSortField,
+    descending: bool,
+) -> Optional[str]:
+    """
+    Return the cursor for the page following a page of proposals.
+
+    None is returned if the page has fewer proposals than the limit, as there can be
+    no further proposals then.
+    """
+    if limit == 0 or count < limit or last_proposal is None:
+        return None
+    position = {
+        "sort_by": sort_by.value,
+        "descending": descending,
+        "id": last_proposal["id"],
+    }
+    if sort_by != ProposalListSortField.ID:
+        position["value"] = last_proposal[sort_by.value]
+    return encode_cursor(position)
+
+
+def _cursor_position(
+    cursor: str, sort_by: str, descending: bool
+) -> Tuple[int, Optional[str]]:
+    """
+    Return the id and sort value of the last proposal on the previous page.
+
+    The cursor must have been created for the same sort order.
+    """
+    position = decode_cursor(cursor)
+    if position.get("sort_by") != sort_by or position.get("descending") != descending:
+        raise ValidationError("The cursor is for a different sort order.")
+    _id = position.get("id")
+    value = position.get("value")
+    if not isinstance(_id, int) or (sort_by != "id" and not isinstance(value, str)):
+        raise ValidationError(f"Invalid cursor: {cursor}")
+    return _id, value
+
+
+@router.post(
+    "/view-permissions",
+    summary="Check which proposals you may view",
+    response_model=List[ProposalViewPermission],
+)
+def get_proposal_view_permissions(
+    view_permissions_request: ProposalViewPermissionsRequest = Body(
+        ...,
+        title="Proposal codes",
+        description="Proposals for which to check the view permission.",
+    ),
+    user: User = Depends(get_current_user),
+) -> List[Dict[str, Any]]:
+    """
+    Checks for a list of proposals whether the user may view them. This requires far
+    fewer database queries than checking the proposals one by one, so that it can be
+    used to check hundreds of proposals at once.
+
+    A proposal may not be viewed if it does not exist.
+    """
+    with UnitOfWork() as unit_of_work:
+        permission_service = services.permission_service(unit_of_work.connection)
+        view_permissions = permission_service.may_view_proposals(
+            user, view_permissions_request.proposal_codes
         )
+        return [
+            {"proposal_code": proposal_code, "may_view": may_view}
+            for proposal_code, may_view in view_permissions.items()
+        ]
+
+
+@router.get(
+    "/search",
+    summary="Search proposals",
+    response_model=List[ProposalSearchResult],
+)
+def search_proposals(
+    q: str = Query(
+        ...,
+        description="Words to search for.",
+        title="Query",
+        min_length=1,
+        max_length=200,
+    ),
+    limit: int = Query(
+        50,
+        description="Maximum number of results to return.",
+        title="Limit",
+        ge=0,
+        le=1000,
+    ),
+    user: User = Depends(get_current_user),
+) -> List[Dict[str, Any]]:
+    """
+    Searches the titles, abstracts and read-mes of the proposals the user may view.
+    For every proposal only the latest proposal text is searched, and a proposal is
+    only returned if it contains all the words of the query. Case and accents are
+    ignored, and words must match completely.
+
+    The results are ordered by relevance. A word in the title counts more than a word
+    in the abstract or read-me.
+    """
+    with UnitOfWork(read_only=True) as unit_of_work:
+        proposal_service = services.proposal_service(unit_of_work.connection)
+        hits = proposal_service.search_proposals(q)
+
+        # The hits are checked in batches, so that the permissions of all the hits of
+        # a common word need not be checked.
+        permission_service = services.permission_service(unit_of_work.connection)
+        results: List[Dict[str, Any]] = []
+        for start in range(0, len(hits), SEARCH_PERMISSION_BATCH_SIZE):
+            if len(results) >= limit:
+                break
+            batch = hits[start : start + SEARCH_PERMISSION_BATCH_SIZE]
+            may_view = permission_service.may_view_proposals(
+                user, [hit.proposal_code for hit in batch]
+            )
+            results.extend(
+                {
+                    "proposal_code": hit.proposal_code,
+                    "semester": hit.semester,
+                    "title": hit.title,
+                }
+                for hit in batch
+                if may_view[hit.proposal_code]
+            )
+        return results[:limit]
 
 
 @router.get(
@@ -163,7 +447,7 @@ def get_proposal_zip(
     summary="Get a proposal",
     response_model=Union[P1Proposal, P2Proposal],
 )
-def get_proposal(
+async def get_proposal(
     proposal_code: ProposalCode = Path(
         ProposalCode,
         title="Proposal code",
@@ -179,7 +463,7 @@ def get_proposal(
         description="Phase of the returned proposal.",
         title="Phase",
     ),
-    user: User = Depends(get_current_user),
+    user: User = Depends(get_current_user_async),
 ) -> _Proposal:
     """
     Returns a JSON representation of the proposal with a given proposal code, semester and phase.
@@ -191,16 +475,19 @@ def get_proposal(
     representation of a specific block.
     """
 
-    with UnitOfWork() as unit_of_work:
-        permission_service = services.permission_service(unit_of_work.connection)
+    def get(connection: Connection) -> Dict[str, Any]:
+        permission_service = services.permission_service(connection)
         permission_service.check_permission_to_view_proposal(user, proposal_code)
 
-        proposal_service = services.proposal_service(unit_of_work.connection)
-        proposal = proposal_service.get_proposal(proposal_code, semester, phase)
-        if proposal["phase"] == 1:
-            return P1Proposal(**proposal)
-        if proposal["phase"] == 2:
-            return P2Proposal(**proposal)
+        proposal_service = services.proposal_service(connection)
+        return proposal_service.get_proposal(proposal_code, semester, phase)
+
+    async with AsyncUnitOfWork() as unit_of_work:
+        proposal = await unit_of_work.run(get)
+    if proposal["phase"] == 1:
+        return P1Proposal(**proposal)
+    if proposal["phase"] == 2:
+        return P2Proposal(**proposal)
 
 
 @router.get(
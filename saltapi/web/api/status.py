@@ -1,13 +1,37 @@
-from typing import List
+from typing import Any, Dict, List
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request
+from sqlalchemy.engine import Connection
 
-from saltapi.repository.status_repository import (StatusRepository,
-                                                  SubsystemStatusDetails)
-from saltapi.repository.unit_of_work import UnitOfWork
+from saltapi.middleware import admission_controller
+from saltapi.repository.cache import cache_statistics
+from saltapi.repository.database import (
+    async_engine,
+    async_pool_statistics,
+    engine,
+    pool_statistics,
+    replica_engine,
+    replica_pool_statistics,
+)
+from saltapi.repository.status_repository import (
+    StatusRepository,
+    SubsystemStatusDetails,
+)
+from saltapi.repository.unit_of_work import (
+    AsyncUnitOfWork,
+    UnitOfWork,
+    set_statement_timeout,
+)
+from saltapi.service.permission_service import PermissionService
 from saltapi.service.status_service import StatusService
 from saltapi.web import services
-from saltapi.web.schema.status import SubsystemStatus, SubsystemStatusUpdate
+from saltapi.web.schema.status import (
+    AdmissionControlStatistics,
+    DatabasePoolStatistics,
+    RepositoryCacheStatistics,
+    SubsystemStatus,
+    SubsystemStatusUpdate,
+)
 
 router = APIRouter(prefix="", tags=["Status"])
 
@@ -15,16 +39,24 @@ router = APIRouter(prefix="", tags=["Status"])
 @router.get(
     "/status", summary="Get the SALT status", response_model=List[SubsystemStatus]
 )
-def get_status() -> List[SubsystemStatusDetails]:
+async def get_status() -> List[SubsystemStatusDetails]:
     """
     Returns the SALT status.
     """
-    with UnitOfWork() as unit_of_work:
-        status_repository = StatusRepository(unit_of_work.connection)
+
+    # The status is polled regularly, so a status request should rather fail than
+    # pile up behind a slow query.
+    set_statement_timeout(5)
+
+    def get(connection: Connection) -> List[SubsystemStatusDetails]:
+        status_repository = StatusRepository(connection)
         status_service = StatusService(status_repository)
 
         return status_service.get_status()
 
+    async with AsyncUnitOfWork() as unit_of_work:
+        return await unit_of_work.run(get)
+
 
 @router.patch(
     "/status", summary="Update the SALT status", response_model=List[SubsystemStatus]
@@ -48,3 +80,105 @@ def update_status(
         unit_of_work.commit()
 
         return status_service.get_status()
+
+
+@router.get(
+    "/status/database-pool",
+    summary="Get the database connection pool statistics",
+    response_model=DatabasePoolStatistics,
+)
+def get_database_pool_statistics(request: Request) -> Dict[str, Any]:
+    """
+    Returns statistics for the connection pool of the SALT Science Database.
+
+    The statistics include the current number of checked out and overflow connections
+    as well as the number of checkouts, the number of checkout timeouts and the time
+    spent waiting for a connection since the server was started. They may be used for
+    sizing the pool against the number of workers.
+
+    The statistics can only be requested from the addresses from which the SALT status
+    may be updated.
+    """
+    PermissionService.check_permission_to_view_database_statistics(request)
+
+    return pool_statistics.as_dict(engine().pool)
+
+
+@router.get(
+    "/status/async-database-pool",
+    summary="Get the asyncio database connection pool statistics",
+    response_model=DatabasePoolStatistics,
+)
+def get_async_database_pool_statistics(request: Request) -> Dict[str, Any]:
+    """
+    Returns statistics for the connection pool used by the asyncio endpoints.
+
+    See the endpoint `/status/database-pool` for details.
+    """
+    PermissionService.check_permission_to_view_database_statistics(request)
+
+    return async_pool_statistics.as_dict(async_engine().pool)
+
+
+@router.get(
+    "/status/replica-database-pool",
+    summary="Get the replica database connection pool statistics",
+    response_model=DatabasePoolStatistics,
+)
+def get_replica_database_pool_statistics(request: Request) -> Dict[str, Any]:
+    """
+    Returns statistics for the connection pool of the SALT Science Database replica,
+    which is used by the read-only endpoints.
+
+    See the endpoint `/status/database-pool` for details.
+    """
+    PermissionService.check_permission_to_view_database_statistics(request)
+
+    replica = replica_engine()
+    if replica is None:
+        raise HTTPException(status_code=404, detail="No replica is defined.")
+    return replica_pool_statistics.as_dict(replica.pool)
+
+
+@router.get(
+    "/status/admission-control",
+    summary="Get the admission control statistics",
+    response_model=AdmissionControlStatistics,
+)
+async def get_admission_control_statistics(request: Request) -> Dict[str, Any]:
+    """
+    Returns statistics for the admission control, which limits the number of requests
+    for sync endpoints handled concurrently.
+
+    The statistics include the current number of active and waiting requests as well
+    as the number of admitted and rejected requests since the server was started.
+    Requests are rejected if too many requests are waiting already or if they have been
+    waiting for too long.
+
+    The statistics can only be requested from the addresses from which the SALT status
+    may be updated.
+    """
+    PermissionService.check_permission_to_view_database_statistics(request)
+
+    return admission_controller.as_dict()
+
+
+@router.get(
+    "/status/repository-caches",
+    summary="Get the repository cache statistics",
+    response_model=List[RepositoryCacheStatistics],
+)
+def get_repository_cache_statistics(request: Request) -> List[Dict[str, Any]]:
+    """
+    Returns statistics for the caches of repository results, which are used for data
+    which rarely changes.
+
+    The statistics include the number of cached results and the number of hits, misses
+    and evictions since the server was started.
+
+    The statistics can only be requested from the addresses from which the SALT status
+    may be updated.
+    """
+    PermissionService.check_permission_to_view_database_statistics(request)
+
+    return cache_statistics()
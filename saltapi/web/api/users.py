@@ -1,7 +1,10 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Union
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Path, Query
+from sqlalchemy.engine import Connection
 from starlette import status
+from starlette.requests import Request
+from starlette.responses import Response
 
 from saltapi.exceptions import NotFoundError, ValidationError
 from saltapi.repository.unit_of_work import UnitOfWork
@@ -28,6 +31,7 @@ from saltapi.web.schema.user import (
     UserRightStatus,
     UserUpdate,
 )
+from saltapi.web.streaming import NDJSON_RESPONSES, accepts_ndjson, ndjson_response
 
 router = APIRouter(prefix="/users", tags=["User"])
 
@@ -104,18 +108,36 @@ def create_user(
         return user_service.get_user_by_username(user.username)
 
 
-@router.get("/", summary="Get users information", response_model=List[UserListItem])
+@router.get(
+    "/",
+    summary="Get users information",
+    response_model=List[UserListItem],
+    responses=NDJSON_RESPONSES,
+)
 def get_users(
+    request: Request,
     user: _User = Depends(get_current_user),
-) -> List[Dict[str, Any]]:
+) -> Union[List[Dict[str, Any]], Response]:
+    """
+    Returns the list of users. If the Accept header requests application/x-ndjson,
+    the users are streamed as newline-delimited JSON.
+    """
     with UnitOfWork() as unit_of_work:
         permission_service = services.permission_service(unit_of_work.connection)
         permission_service.check_permission_to_view_users(user)
+
+        if accepts_ndjson(request):
+
+            def iter_users(connection: Connection) -> Iterator[Dict[str, Any]]:
+                return services.user_service(connection).iter_users()
+
+            return ndjson_response(iter_users, UserListItem)
+
         user_service = services.user_service(unit_of_work.connection)
-        user = user_service.get_users()
-        if user is None:
+        users = user_service.get_users()
+        if users is None:
             raise NotFoundError("User Unknown.")
-        return user
+        return users
 
 
 @router.post(
@@ -84,6 +84,15 @@ class ProposalType(str, Enum):
     SCIENCE_VERIFICATION = "Science Verification"
 
 
+class ProposalListSortField(str, Enum):
+    """Field by which a list of proposals can be sorted."""
+
+    ID = "id"
+    PROPOSAL_CODE = "proposal_code"
+    SEMESTER = "semester"
+    TITLE = "title"
+
+
 class UpdateStatus(str, Enum):
     SUCCESSFUL = "Successful"
     PENDING = "Pending"
@@ -501,6 +510,33 @@ class ProposalListItem(BaseModel):
     )
 
 
+class ProposalViewPermissionsRequest(BaseModel):
+    """The proposals for which the view permission should be checked."""
+
+    proposal_codes: List[ProposalCode] = Field(
+        ...,
+        max_items=1000,
+        title="Proposal codes",
+        description="Codes of the proposals (at most 1000).",
+    )
+
+
+class ProposalViewPermission(BaseModel):
+    """Whether the user may view a proposal."""
+
+    proposal_code: ProposalCode = Field(
+        ..., title="Proposal code", description="Proposal code"
+    )
+    may_view: bool = Field(
+        ...,
+        title="May the user view the proposal?",
+        description=(
+            "Whether the currently logged in user may view the proposal. This is false"
+            " if the proposal does not exist."
+        ),
+    )
+
+
 class ProposalStatusContent(BaseModel):
     """Content including a proposal status."""
 
@@ -696,3 +732,17 @@ class DataRequest(BaseModel):
         title="Data formats",
         description="The requested data formats.",
     )
+
+
+class ProposalSearchResult(BaseModel):
+    """Proposal matching a text search."""
+
+    proposal_code: ProposalCode = Field(
+        ..., title="Proposal code", description="Proposal code"
+    )
+    semester: Semester = Field(
+        ...,
+        title="Semester",
+        description="Semester of the proposal text which has been searched",
+    )
+    title: str = Field(..., title="Title", description="Proposal title")
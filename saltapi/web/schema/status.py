@@ -78,3 +78,137 @@ class SubsystemStatusUpdate(BaseModel):
         title="Telescope subsystem",
         description='Telescope subsystem, such as "Telescope" or "RSS"',
     )
+
+
+class DatabasePoolStatistics(BaseModel):
+    pool_size: Optional[int] = Field(
+        ...,
+        title="Pool size",
+        description="Number of connections kept open in the pool.",
+    )
+    checked_out: Optional[int] = Field(
+        ...,
+        title="Checked out connections",
+        description="Number of connections currently in use.",
+    )
+    checked_in: Optional[int] = Field(
+        ...,
+        title="Checked in connections",
+        description="Number of idle connections currently in the pool.",
+    )
+    overflow: Optional[int] = Field(
+        ...,
+        title="Overflow",
+        description="Number of connections currently open in excess of the pool size.",
+    )
+    checkouts: int = Field(
+        ...,
+        title="Checkouts",
+        description="Number of connections checked out since the server started.",
+    )
+    timeouts: int = Field(
+        ...,
+        title="Timeouts",
+        description=(
+            "Number of connection requests which timed out since the server started."
+        ),
+    )
+    average_wait_time: float = Field(
+        ...,
+        title="Average wait time",
+        description="Average time spent waiting for a connection, in seconds.",
+    )
+    max_wait_time: float = Field(
+        ...,
+        title="Maximum wait time",
+        description="Maximum time spent waiting for a connection, in seconds.",
+    )
+
+
+class AdmissionControlStatistics(BaseModel):
+    max_concurrent_requests: int = Field(
+        ...,
+        title="Maximum concurrent requests",
+        description="Maximum number of requests handled concurrently.",
+    )
+    active_requests: int = Field(
+        ...,
+        title="Active requests",
+        description="Number of requests currently being handled.",
+    )
+    queue_depth: int = Field(
+        ...,
+        title="Queue depth",
+        description="Number of requests currently waiting to be handled.",
+    )
+    max_queue_depth: int = Field(
+        ...,
+        title="Maximum queue depth",
+        description=(
+            "Maximum number of requests waiting at the same time since the server"
+            " started."
+        ),
+    )
+    admitted: int = Field(
+        ...,
+        title="Admitted requests",
+        description="Number of requests admitted since the server started.",
+    )
+    rejected_queue_full: int = Field(
+        ...,
+        title="Requests rejected because of a full queue",
+        description=(
+            "Number of requests rejected since the server started because the queue"
+            " was full."
+        ),
+    )
+    rejected_timeout: int = Field(
+        ...,
+        title="Requests rejected because of a timeout",
+        description=(
+            "Number of requests rejected since the server started because they waited"
+            " too long."
+        ),
+    )
+
+
+class RepositoryCacheStatistics(BaseModel):
+    name: str = Field(..., title="Name", description="Name of the cache.")
+    ttl: float = Field(
+        ...,
+        title="Time-to-live",
+        description="Number of seconds after which a cached result expires.",
+    )
+    size: int = Field(
+        ..., title="Size", description="Number of results currently in the cache."
+    )
+    max_size: int = Field(
+        ...,
+        title="Maximum size",
+        description="Maximum number of results kept in the cache.",
+    )
+    hits: int = Field(
+        ...,
+        title="Hits",
+        description="Number of results taken from the cache since the server started.",
+    )
+    misses: int = Field(
+        ...,
+        title="Misses",
+        description=(
+            "Number of results which were not in the cache since the server started."
+        ),
+    )
+    hit_rate: float = Field(
+        ...,
+        title="Hit rate",
+        description="Fraction of lookups for which the result was in the cache.",
+    )
+    evictions: int = Field(
+        ...,
+        title="Evictions",
+        description=(
+            "Number of results removed from the cache since the server started to"
+            " make space for new results."
+        ),
+    )
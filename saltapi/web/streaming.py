@@ -0,0 +1,99 @@
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Type
+
+from loguru import logger
+from pydantic import BaseModel
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+
+from saltapi.repository.statement_timeout import ER_QUERY_TIMEOUT
+from saltapi.repository.unit_of_work import UnitOfWork
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# OpenAPI description of the NDJSON response of list endpoints supporting it
+NDJSON_RESPONSES: Dict[int | str, Dict[str, Any]] = {
+    200: {
+        "content": {NDJSON_MEDIA_TYPE: {}},
+        "description": (
+            "Successful response. With an Accept header requesting"
+            f" {NDJSON_MEDIA_TYPE}, the items are streamed as newline-delimited JSON."
+            ' The last line is not an item but a trailer of the form {"complete":'
+            ' true} or, if the stream ended early because of an error, {"complete":'
+            ' false, "message": "..."}. A stream without a trailer has been cut off.'
+            " If there are more items than streamed, the trailer of a complete stream"
+            " includes the next cursor as next_cursor."
+        ),
+    }
+}
+
+
+def accepts_ndjson(request: Request) -> bool:
+    """Check whether a request's Accept header asks for newline-delimited JSON."""
+    accept = request.headers.get("accept", "")
+    media_types = {
+        media_range.split(";")[0].strip().lower() for media_range in accept.split(",")
+    }
+    return NDJSON_MEDIA_TYPE in media_types
+
+
+def ndjson_response(
+    items: Callable[[Connection], Iterable[Any]],
+    model: Type[BaseModel],
+    next_cursor: Optional[Callable[[int, Any], Optional[str]]] = None,
+) -> StreamingResponse:
+    """
+    Create a response streaming a list of items as newline-delimited JSON.
+
+    The items function is called with a connection once the response is sent, and
+    every item it yields is validated with the model and written as a line of JSON
+    straight away. So neither the list nor its serialisation is held in memory, if the
+    function is a generator reading its rows with a server-side cursor (see the
+    stream_results execution option).
+
+    Any permission checks must have been made before the response is created. The
+    status code has been sent by the time the items are fetched, so an error while
+    streaming cannot turn the response into an error response. Instead the stream ends
+    with a trailer line {"complete": false, "message": ...}, whereas a stream which has
+    been sent completely ends with the trailer {"complete": true}. Clients can thus
+    tell a truncated stream from a complete one.
+
+    If a next_cursor function is passed, it is called with the number of items and
+    the last item (or None if there are no items) after all the items have been
+    streamed. If it returns a cursor, the cursor is included in the trailer of a
+    complete stream as next_cursor.
+    """
+
+    def lines() -> Iterator[str]:
+        try:
+            count = 0
+            last_item = None
+            with UnitOfWork(read_only=True) as unit_of_work:
+                for item in items(unit_of_work.connection):
+                    yield model.parse_obj(item).json(by_alias=True) + "\n"
+                    count += 1
+                    last_item = item
+            trailer: Dict[str, Any] = {"complete": True}
+            cursor = next_cursor(count, last_item) if next_cursor else None
+            if cursor is not None:
+                trailer["next_cursor"] = cursor
+        except Exception as e:
+            logger.exception("Streaming newline-delimited JSON failed")
+            trailer = {"complete": False, "message": _error_message(e)}
+        yield json.dumps(trailer) + "\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+def _error_message(error: Exception) -> str:
+    """Return the message for the trailer of a stream ended by an error."""
+    if isinstance(error, OperationalError):
+        error_code = error.orig.args[0] if error.orig and error.orig.args else None
+        if error_code == ER_QUERY_TIMEOUT:
+            return (
+                "The request took too long to process. Please try again later or"
+                " request less data."
+            )
+    return "Sorry, something has gone wrong. Please try again later."
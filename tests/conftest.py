@@ -26,10 +26,13 @@ import yaml
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
 
 import saltapi.web.api.authentication
 from saltapi.exceptions import AuthenticationError
 from saltapi.main import app
+from saltapi.repository.cache import clear_caches
 from saltapi.repository.user_repository import UserRepository
 from saltapi.service.user import User
 from saltapi.service.user_service import UserService
@@ -79,13 +82,33 @@ def _create_engine() -> Engine:
         raise ValueError("No SDB_DSN environment variable set")
 
 
+def _create_async_engine() -> AsyncEngine:
+    # The test client may use a different event loop for every request, so that
+    # pooled connections cannot be reused.
+    return create_async_engine(
+        saltapi.repository.database.async_dsn(), future=True, poolclass=NullPool
+    )
+
+
 @pytest.fixture(autouse=True)
 def mock_engine(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr(saltapi.repository.unit_of_work, "engine", _create_engine)
+    monkeypatch.setattr(
+        saltapi.repository.unit_of_work, "async_engine", _create_async_engine
+    )
     monkeypatch.setattr(saltapi.web.api.submissions, "engine", _create_engine)
     monkeypatch.setattr(saltapi.service.submission_service, "engine", _create_engine)
 
 
+@pytest.fixture(autouse=True)
+def clear_repository_caches() -> Generator[None, None, None]:
+    # The tests modify the database, so cached results must not be shared between
+    # them.
+    clear_caches()
+    yield
+    clear_caches()
+
+
 @pytest.fixture(scope="function")
 def db_connection() -> Generator[Connection, None, None]:
     with _create_engine().connect() as connection:
@@ -0,0 +1,72 @@
+from fastapi.testclient import TestClient
+from starlette import status
+
+from tests.conftest import authenticate, find_username, not_authenticated
+
+VIEW_PERMISSIONS_URL = "/proposals/view-permissions"
+
+
+def test_should_return_401_when_checking_view_permissions_for_unauthenticated_user(
+    client: TestClient,
+) -> None:
+    not_authenticated(client)
+    response = client.post(
+        VIEW_PERMISSIONS_URL, json={"proposal_codes": ["2018-2-LSP-001"]}
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_should_return_422_for_invalid_proposal_codes(client: TestClient) -> None:
+    username = find_username("Administrator")
+    authenticate(username, client)
+    response = client.post(
+        VIEW_PERMISSIONS_URL, json={"proposal_codes": ["2021-3-ABC-123"]}
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_should_return_view_permissions(client: TestClient) -> None:
+    proposal_code = "2018-2-LSP-001"
+    other_proposal_code = "2020-2-SCI-018"
+    non_existing_proposal_code = "2020-2-SCI-099"
+    username = find_username("Principal Investigator", proposal_code=proposal_code)
+    authenticate(username, client)
+    response = client.post(
+        VIEW_PERMISSIONS_URL,
+        json={
+            "proposal_codes": [
+                proposal_code,
+                other_proposal_code,
+                non_existing_proposal_code,
+            ]
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    view_permissions = {
+        item["proposal_code"]: item["may_view"] for item in response.json()
+    }
+    assert view_permissions[proposal_code] is True
+    assert view_permissions[non_existing_proposal_code] is False
+    for code, may_view in view_permissions.items():
+        expected_status_code = (
+            status.HTTP_200_OK if may_view else status.HTTP_403_FORBIDDEN
+        )
+        if code != non_existing_proposal_code:
+            assert client.get("/proposals/" + code).status_code == expected_status_code
+
+
+def test_should_return_all_existing_proposals_as_viewable_for_administrator(
+    client: TestClient,
+) -> None:
+    username = find_username("Administrator")
+    authenticate(username, client)
+    response = client.post(
+        VIEW_PERMISSIONS_URL,
+        json={"proposal_codes": ["2018-2-LSP-001", "2020-2-SCI-099"]},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        {"proposal_code": "2018-2-LSP-001", "may_view": True},
+        {"proposal_code": "2020-2-SCI-099", "may_view": False},
+    ]
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.engine import Connection
@@ -239,3 +241,132 @@ def test_should_return_1000_proposals_as_the_default_limit(
     response = client.get(PROPOSALS_URL + "/")
     assert response.status_code == status.HTTP_200_OK
     assert len(response.json()) == 1000
+
+
+def test_should_return_all_proposals_page_by_page(client: TestClient) -> None:
+    username = find_username("Administrator")
+    authenticate(username, client)
+    params = {"from": "2018-2", "to": "2019-1"}
+    response = client.get(PROPOSALS_URL + "/", params=params)
+    assert response.status_code == status.HTTP_200_OK
+    all_ids = [p["id"] for p in response.json()]
+
+    paged_ids = []
+    cursor = None
+    while True:
+        page_params = {**params, "limit": 25}
+        if cursor:
+            page_params["cursor"] = cursor
+        response = client.get(PROPOSALS_URL + "/", params=page_params)
+        assert response.status_code == status.HTTP_200_OK
+        paged_ids.extend(p["id"] for p in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert paged_ids == all_ids
+
+
+def test_should_return_400_for_invalid_cursor(client: TestClient) -> None:
+    username = find_username("Administrator")
+    authenticate(username, client)
+    response = client.get(PROPOSALS_URL + "/", params={"cursor": "invalid"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_should_stream_proposals_as_ndjson(client: TestClient) -> None:
+    username = find_username("Administrator")
+    authenticate(username, client)
+    params = {"from": "2018-2", "to": "2019-1"}
+    response = client.get(PROPOSALS_URL + "/", params=params)
+    assert response.status_code == status.HTTP_200_OK
+    proposals = response.json()
+
+    response = client.get(
+        PROPOSALS_URL + "/",
+        params=params,
+        headers={"Accept": "application/x-ndjson"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[:-1] == proposals
+    assert lines[-1] == {"complete": True}
+
+
+def test_should_include_next_cursor_in_ndjson_trailer(client: TestClient) -> None:
+    username = find_username("Administrator")
+    authenticate(username, client)
+    params = {"from": "2018-2", "to": "2019-1", "limit": 10}
+    response = client.get(PROPOSALS_URL + "/", params=params)
+    assert response.status_code == status.HTTP_200_OK
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(
+        PROPOSALS_URL + "/",
+        params=params,
+        headers={"Accept": "application/x-ndjson"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 11
+    assert lines[-1] == {"complete": True, "next_cursor": cursor}
+
+
+def test_should_filter_proposals(client: TestClient) -> None:
+    username = find_username("Administrator")
+    authenticate(username, client)
+    params = {"from": "2018-2", "to": "2019-1"}
+    response = client.get(PROPOSALS_URL + "/", params=params)
+    proposals = response.json()
+
+    response = client.get(
+        PROPOSALS_URL + "/",
+        params={**params, "status": ["Active", "Completed"], "title": "the"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        p
+        for p in proposals
+        if p["status"]["value"] in ("Active", "Completed")
+        and "the" in p["title"].lower()
+    ]
+
+
+def test_should_return_sorted_proposals_page_by_page(client: TestClient) -> None:
+    username = find_username("Administrator")
+    authenticate(username, client)
+    params = {"from": "2018-2", "to": "2019-1", "sort_by": "title", "descending": False}
+    response = client.get(PROPOSALS_URL + "/", params=params)
+    assert response.status_code == status.HTTP_200_OK
+    proposals = response.json()
+
+    paged_proposals = []
+    cursor = None
+    while True:
+        page_params = {**params, "limit": 10}
+        if cursor:
+            page_params["cursor"] = cursor
+        response = client.get(PROPOSALS_URL + "/", params=page_params)
+        assert response.status_code == status.HTTP_200_OK
+        paged_proposals.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert paged_proposals == proposals
+
+
+def test_should_return_400_for_cursor_with_different_sort_order(
+    client: TestClient,
+) -> None:
+    username = find_username("Administrator")
+    authenticate(username, client)
+    params = {"sort_by": "title", "descending": False, "limit": 10}
+    response = client.get(PROPOSALS_URL + "/", params=params)
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(
+        PROPOSALS_URL + "/", params={**params, "descending": True, "cursor": cursor}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
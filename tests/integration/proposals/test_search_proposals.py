@@ -0,0 +1,47 @@
+from fastapi.testclient import TestClient
+from starlette import status
+
+from tests.conftest import authenticate, find_username, not_authenticated
+
+SEARCH_URL = "/proposals/search"
+
+
+def test_should_return_401_when_searching_proposals_for_unauthenticated_user(
+    client: TestClient,
+) -> None:
+    not_authenticated(client)
+    response = client.get(SEARCH_URL, params={"q": "star"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_should_return_422_for_missing_search_query(client: TestClient) -> None:
+    username = find_username("Administrator")
+    authenticate(username, client)
+    response = client.get(SEARCH_URL)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_should_return_proposals_containing_all_search_words(
+    client: TestClient,
+) -> None:
+    username = find_username("Administrator")
+    authenticate(username, client)
+    response = client.get(SEARCH_URL, params={"q": "star formation", "limit": 10})
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()
+    assert len(results) <= 10
+    for result in results:
+        assert set(result.keys()) == {"proposal_code", "semester", "title"}
+
+
+def test_should_only_return_proposals_the_user_may_view(client: TestClient) -> None:
+    username = find_username("Administrator")
+    authenticate(username, client)
+    all_results = client.get(SEARCH_URL, params={"q": "galaxies"}).json()
+
+    username = find_username("Principal Investigator", proposal_code="2018-2-LSP-001")
+    authenticate(username, client)
+    results = client.get(SEARCH_URL, params={"q": "galaxies"}).json()
+
+    all_codes = {result["proposal_code"] for result in all_results}
+    assert {result["proposal_code"] for result in results} <= all_codes
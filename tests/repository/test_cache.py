@@ -0,0 +1,239 @@
+from typing import Any, Dict, List
+
+import pytest
+
+from saltapi.repository.cache import (
+    cache_statistics,
+    cached,
+    clear_caches,
+    invalidate_cache,
+    repeat_cache_invalidations,
+    request_cached,
+    stop_tracking_cache_invalidations,
+    stop_using_request_cache,
+    track_cache_invalidations,
+    use_request_cache,
+)
+from saltapi.settings import get_settings
+
+
+class FakeRepository:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.names = {1: "Alice", 2: "Bob", 3: "Carol"}
+
+    @cached("test_user_names", ttl=60, max_size=2)
+    def get_names(self, user_id: int, title: str = "") -> List[str]:
+        self.calls += 1
+        return [f"{title}{self.names[user_id]}"]
+
+    @cached("test_expired", ttl=-1)
+    def get_expired(self) -> int:
+        self.calls += 1
+        return self.calls
+
+    @request_cached("test_request_names")
+    def get_request_name(self, user_id: int) -> str:
+        self.calls += 1
+        return self.names[user_id]
+
+    def update_name(self, user_id: int, name: str) -> None:
+        self.names[user_id] = name
+        invalidate_cache("test_user_names", user_id)
+        invalidate_cache("test_request_names", user_id)
+
+
+def _statistics(name: str) -> Dict[str, Any]:
+    return next(s for s in cache_statistics() if s["name"] == name)
+
+
+def test_cached_results_are_reused() -> None:
+    repository = FakeRepository()
+
+    assert repository.get_names(1) == ["Alice"]
+    assert repository.get_names(1) == ["Alice"]
+    assert repository.get_names(user_id=1, title="") == ["Alice"]
+    assert repository.get_names(1, "Dr ") == ["Dr Alice"]
+
+    assert repository.calls == 2
+    statistics = _statistics("test_user_names")
+    assert statistics["hits"] == 2
+    assert statistics["misses"] == 2
+    assert statistics["hit_rate"] == pytest.approx(0.5)
+
+
+def test_cached_results_are_copies() -> None:
+    repository = FakeRepository()
+
+    repository.get_names(1).append("Eve")
+
+    assert repository.get_names(1) == ["Alice"]
+
+
+def test_least_recently_used_results_are_evicted() -> None:
+    repository = FakeRepository()
+
+    repository.get_names(1)
+    repository.get_names(2)
+    repository.get_names(1)
+    repository.get_names(3)
+    repository.get_names(1)
+    repository.get_names(2)
+
+    assert repository.calls == 4
+    statistics = _statistics("test_user_names")
+    assert statistics["size"] == 2
+    assert statistics["evictions"] == 2
+
+
+def test_expired_results_are_not_used() -> None:
+    repository = FakeRepository()
+
+    assert repository.get_expired() == 1
+    assert repository.get_expired() == 2
+
+
+def test_invalidated_results_are_not_used() -> None:
+    repository = FakeRepository()
+    repository.get_names(1)
+    repository.get_names(2)
+
+    repository.update_name(1, "Alicia")
+
+    assert repository.get_names(1) == ["Alicia"]
+    assert repository.get_names(2) == ["Bob"]
+    assert repository.calls == 3
+
+
+def test_invalidating_without_arguments_clears_cache() -> None:
+    repository = FakeRepository()
+    repository.get_names(1)
+    repository.get_names(2)
+
+    invalidate_cache("test_user_names")
+
+    assert _statistics("test_user_names")["size"] == 0
+
+
+def test_results_are_not_cached_if_cache_is_disabled(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(get_settings(), "repository_cache_enabled", False)
+    repository = FakeRepository()
+
+    repository.get_names(1)
+    repository.get_names(1)
+
+    assert repository.calls == 2
+
+
+def test_cache_names_must_be_unique() -> None:
+    with pytest.raises(ValueError):
+
+        @cached("test_user_names", ttl=60)
+        def get_something() -> None:
+            pass
+
+
+def test_clear_caches_resets_statistics() -> None:
+    FakeRepository().get_names(1)
+
+    clear_caches()
+
+    statistics = _statistics("test_user_names")
+    assert statistics["misses"] == 0
+    assert statistics["size"] == 0
+
+
+def test_request_cached_results_are_reused_within_a_request() -> None:
+    repository = FakeRepository()
+
+    token = use_request_cache()
+    try:
+        assert repository.get_request_name(1) == "Alice"
+        assert repository.get_request_name(user_id=1) == "Alice"
+        assert repository.get_request_name(2) == "Bob"
+        assert repository.calls == 2
+    finally:
+        stop_using_request_cache(token)
+
+    token = use_request_cache()
+    try:
+        assert repository.get_request_name(1) == "Alice"
+        assert repository.calls == 3
+    finally:
+        stop_using_request_cache(token)
+
+
+def test_request_cached_results_are_not_reused_outside_a_request() -> None:
+    repository = FakeRepository()
+
+    repository.get_request_name(1)
+    repository.get_request_name(1)
+
+    assert repository.calls == 2
+
+
+def test_invalidated_request_cached_results_are_not_used() -> None:
+    repository = FakeRepository()
+
+    token = use_request_cache()
+    try:
+        repository.get_request_name(1)
+        repository.get_request_name(2)
+        repository.update_name(1, "Alicia")
+
+        assert repository.get_request_name(1) == "Alicia"
+        assert repository.get_request_name(2) == "Bob"
+        assert repository.calls == 3
+
+        invalidate_cache("test_request_names")
+        repository.get_request_name(2)
+        assert repository.calls == 4
+    finally:
+        stop_using_request_cache(token)
+
+
+def test_request_cache_names_must_be_unique() -> None:
+    with pytest.raises(ValueError):
+
+        @request_cached("test_user_names")
+        def get_something() -> None:
+            pass
+
+    with pytest.raises(ValueError):
+
+        @cached("test_request_names", ttl=60)
+        def get_something_else() -> None:
+            pass
+
+
+def test_tracked_invalidations_are_repeated() -> None:
+    repository = FakeRepository()
+    repository.get_names(1)
+    repository.get_names(2)
+
+    pending = track_cache_invalidations()
+    assert pending is not None
+    # Invalidations are recorded by the outermost tracker only
+    assert track_cache_invalidations() is None
+    repository.update_name(1, "Alan")
+    # The old name is cached again before the change is committed
+    repository.names[1] = "Alice"
+    repository.get_names(1)
+    repository.names[1] = "Alan"
+    repeat_cache_invalidations()
+    stop_tracking_cache_invalidations(pending)
+
+    calls = repository.calls
+    assert repository.get_names(1) == ["Alan"]
+    assert repository.get_names(2) == ["Bob"]
+    assert repository.calls == calls + 1
+
+    # Invalidations are not recorded any longer
+    repository.get_names(1)
+    repository.update_name(1, "Alice")
+    repository.names[1] = "Alan"
+    repository.get_names(1)
+    repeat_cache_invalidations()
+    assert repository.get_names(1) == ["Alan"]
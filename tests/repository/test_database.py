@@ -0,0 +1,111 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+
+from saltapi.repository.database import (
+    PoolStatistics,
+    ReplicaMonitor,
+    connect,
+    pool_statistics,
+)
+
+
+def _queue_pool_engine(tmp_path: Any) -> Any:
+    return create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        future=True,
+        poolclass=QueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+
+
+def test_pool_statistics_record_checkouts_and_timeouts() -> None:
+    statistics = PoolStatistics()
+    statistics.record_checkout(0.5)
+    statistics.record_checkout(1.5)
+    statistics.record_timeout(4)
+
+    result = statistics.as_dict(None)
+
+    assert result["checkouts"] == 2
+    assert result["timeouts"] == 1
+    assert result["average_wait_time"] == pytest.approx(2)
+    assert result["max_wait_time"] == pytest.approx(4)
+    assert result["pool_size"] is None
+    assert result["checked_out"] is None
+
+
+def test_pool_statistics_include_queue_pool_state(tmp_path: Any) -> None:
+    db_engine = _queue_pool_engine(tmp_path)
+    statistics = PoolStatistics()
+
+    with db_engine.connect():
+        result = statistics.as_dict(db_engine.pool)
+        assert result["pool_size"] == 1
+        assert result["checked_out"] == 1
+        assert result["overflow"] == 0
+
+    result = statistics.as_dict(db_engine.pool)
+    assert result["checked_out"] == 0
+    assert result["checked_in"] == 1
+
+
+def test_pool_statistics_ignore_state_of_other_pools(tmp_path: Any) -> None:
+    db_engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}", future=True, poolclass=NullPool
+    )
+
+    result = PoolStatistics().as_dict(db_engine.pool)
+
+    assert result["pool_size"] is None
+    assert result["overflow"] is None
+
+
+def test_connect_records_checkouts_and_timeouts(tmp_path: Any) -> None:
+    db_engine = _queue_pool_engine(tmp_path)
+    pool_statistics.reset()
+
+    connection = connect(db_engine)
+    with pytest.raises(PoolTimeoutError):
+        connect(db_engine)
+    connection.close()
+
+    assert pool_statistics.checkouts == 1
+    assert pool_statistics.timeouts == 1
+    assert pool_statistics.max_wait_time >= 0.1
+
+
+@pytest.mark.parametrize("lag,is_usable", [(0, True), (30, True), (31, False)])
+def test_replica_monitor_uses_replica_with_acceptable_lag(
+    lag: float, is_usable: bool
+) -> None:
+    monitor = ReplicaMonitor()
+    assert monitor.needs_check()
+
+    monitor.update(lag)
+
+    assert monitor.is_usable is is_usable
+    assert not monitor.needs_check()
+
+
+def test_replica_monitor_does_not_use_replica_without_replication() -> None:
+    monitor = ReplicaMonitor()
+
+    monitor.update(None)
+
+    assert not monitor.is_usable
+
+
+def test_replica_monitor_reset_forces_check() -> None:
+    monitor = ReplicaMonitor()
+    monitor.update(0)
+
+    monitor.reset()
+
+    assert monitor.needs_check()
+    assert not monitor.is_usable
@@ -0,0 +1,77 @@
+from typing import Any, Iterator, List
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection
+
+from saltapi.repository.lookup_tables import LookupTable, refresh_lookup_tables
+
+
+@pytest.fixture()
+def connection() -> Iterator[Connection]:
+    db_engine = create_engine("sqlite://", future=True)
+    with db_engine.connect() as connection:
+        connection.execute(text("CREATE TABLE Colour (Colour_Id INT, Colour TEXT)"))
+        connection.execute(text("INSERT INTO Colour VALUES (1, 'Red'), (2, 'Blue')"))
+        yield connection
+
+
+def _record_statements(connection: Connection) -> List[str]:
+    statements: List[str] = []
+
+    def before_cursor_execute(*args: Any) -> None:
+        statements.append(args[2])
+
+    event.listen(connection, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def test_lookup_table_is_loaded_once(connection: Connection) -> None:
+    colours = LookupTable(
+        "test_colours_loaded_once",
+        "SELECT Colour AS value, Colour_Id AS id FROM Colour",
+    )
+    statements = _record_statements(connection)
+
+    assert colours.id(connection, "Red") == 1
+    assert colours.id(connection, "Blue") == 2
+    assert colours.id(connection, "Red") == 1
+    assert len(statements) == 1
+
+
+def test_lookup_table_values_are_case_insensitive(connection: Connection) -> None:
+    colours = LookupTable(
+        "test_colours_case", "SELECT Colour AS value, Colour_Id AS id FROM Colour"
+    )
+
+    assert colours.id(connection, "blue") == 2
+    assert colours.id(connection, "BLUE ") == 2
+
+
+def test_lookup_table_is_reloaded_for_missing_value(connection: Connection) -> None:
+    colours = LookupTable(
+        "test_colours_missing", "SELECT Colour AS value, Colour_Id AS id FROM Colour"
+    )
+    assert colours.id(connection, "Green") is None
+
+    connection.execute(text("INSERT INTO Colour VALUES (3, 'Green')"))
+    assert colours.id(connection, "Green") == 3
+
+
+def test_refresh_lookup_tables(connection: Connection) -> None:
+    colours = LookupTable(
+        "test_colours_refresh", "SELECT Colour AS value, Colour_Id AS id FROM Colour"
+    )
+    assert colours.id(connection, "Red") == 1
+
+    connection.execute(text("UPDATE Colour SET Colour_Id = 4 WHERE Colour = 'Red'"))
+    assert colours.id(connection, "Red") == 1
+    refresh_lookup_tables("test_colours_refresh")
+    assert colours.id(connection, "Red") == 4
+
+
+def test_lookup_table_names_must_be_unique() -> None:
+    LookupTable("test_colours_unique", "SELECT 'Red' AS value, 1 AS id")
+
+    with pytest.raises(ValueError):
+        LookupTable("test_colours_unique", "SELECT 'Red' AS value, 1 AS id")
@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from saltapi.exceptions import NotFoundError
+from saltapi.repository.cache import invalidate_cache
+from saltapi.repository.proposal_metadata_repository import ProposalMetadataRepository
+from tests.markers import nodatabase
+
+
+@nodatabase
+@pytest.mark.parametrize(
+    "proposal_code,proposal_type",
+    [
+        ("2020-2-SCI-018", "Science"),
+        ("2019-1-GWE-005", "Gravitational Wave Event"),
+        ("2020-2-DDT-005", "Director Discretionary Time (DDT)"),
+    ],
+)
+def test_get_returns_proposal_metadata(
+    proposal_code: str, proposal_type: str, db_connection: Connection
+) -> None:
+    invalidate_cache("proposal_metadata")
+    metadata = ProposalMetadataRepository(db_connection).get(proposal_code)
+
+    assert metadata.proposal_type == proposal_type
+
+
+@nodatabase
+def test_latest_submission_is_not_cached(db_connection: Connection) -> None:
+    proposal_code = "2020-2-SCI-018"
+    repository = ProposalMetadataRepository(db_connection)
+    latest_submission = repository.latest_submission(proposal_code)
+    assert latest_submission is not None
+    assert latest_submission > 0
+
+    db_connection.execute(
+        text(
+            """
+UPDATE Proposal P
+    JOIN ProposalCode PC ON P.ProposalCode_Id = PC.ProposalCode_Id
+SET P.Current = 0
+WHERE PC.Proposal_Code = :proposal_code AND P.Submission = :submission
+        """
+        ),
+        {"proposal_code": proposal_code, "submission": latest_submission},
+    )
+
+    new_latest_submission = repository.latest_submission(proposal_code)
+    assert new_latest_submission is None or new_latest_submission < latest_submission
+
+
+@nodatabase
+def test_get_returns_proposal_code_id(db_connection: Connection) -> None:
+    invalidate_cache("proposal_metadata")
+    metadata = ProposalMetadataRepository(db_connection).get("2020-2-SCI-018")
+
+    assert metadata.proposal_code_id == 2708
+
+
+@nodatabase
+def test_get_raises_error_for_non_existing_proposal_code(
+    db_connection: Connection,
+) -> None:
+    with pytest.raises(NotFoundError):
+        ProposalMetadataRepository(db_connection).get("2023-1-NOT-CODE-001")
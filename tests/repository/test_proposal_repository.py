@@ -151,6 +151,21 @@ def test_list_handles_omitted_limit(db_connection: Connection) -> None:
     )
 
 
+@nodatabase
+def test_list_returns_each_proposal_once_latest_first(
+    db_connection: Connection,
+) -> None:
+    administrator = find_username("administrator")
+    proposal_repository = ProposalRepository(db_connection)
+    proposals = proposal_repository.list(
+        username=administrator, from_semester="2018-2", to_semester="2020-2"
+    )
+
+    ids = [p["id"] for p in proposals]
+    assert len(ids) == len(set(ids))
+    assert ids == sorted(ids, reverse=True)
+
+
 def test_list_raises_error_for_negative_limit(db_connection: Connection) -> None:
     with pytest.raises(ValueError) as excinfo:
         proposal_repository = ProposalRepository(db_connection)
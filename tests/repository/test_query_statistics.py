@@ -0,0 +1,94 @@
+from typing import Any
+
+import pytest
+from loguru import logger
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+
+from saltapi.repository.query_statistics import (
+    QueryStatistics,
+    collect_query_statistics,
+    current_query_statistics,
+    instrument,
+    is_executing,
+    stop_collecting_query_statistics,
+)
+from saltapi.settings import get_settings
+
+
+class FakeRepository:
+    def __init__(self, connection: Connection):
+        self.connection = connection
+
+    def get_answer(self) -> int:
+        return int(self.connection.execute(text("SELECT 42")).scalar_one())
+
+
+def _instrumented_engine(tmp_path: Any) -> Any:
+    db_engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", future=True)
+    instrument(db_engine)
+    return db_engine
+
+
+def test_statements_are_recorded_in_current_statistics(tmp_path: Any) -> None:
+    db_engine = _instrumented_engine(tmp_path)
+    statistics = QueryStatistics("GET /test")
+
+    token = collect_query_statistics(statistics)
+    try:
+        assert current_query_statistics() is statistics
+        with db_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+    finally:
+        stop_collecting_query_statistics(token)
+
+    assert current_query_statistics() is None
+    assert statistics.count == 2
+    assert statistics.duration > 0
+
+
+def test_statements_without_current_statistics_are_ignored(tmp_path: Any) -> None:
+    db_engine = _instrumented_engine(tmp_path)
+
+    with db_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert current_query_statistics() is None
+
+
+def test_slow_queries_are_logged_with_repository_method(
+    tmp_path: Any, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(get_settings(), "slow_query_threshold", 0)
+    monkeypatch.setattr(
+        "saltapi.repository.query_statistics.REPOSITORY_PACKAGE", __name__
+    )
+    db_engine = _instrumented_engine(tmp_path)
+    records = []
+    handler_id = logger.add(lambda message: records.append(message.record))
+
+    token = collect_query_statistics(QueryStatistics("GET /answer"))
+    try:
+        with db_engine.connect() as connection:
+            assert FakeRepository(connection).get_answer() == 42
+    finally:
+        stop_collecting_query_statistics(token)
+        logger.remove(handler_id)
+
+    assert len(records) == 1
+    extra = records[0]["extra"]
+    assert extra["repository_method"] == "FakeRepository.get_answer"
+    assert extra["request"] == "GET /answer"
+    assert extra["statement"] == "SELECT 42"
+
+
+def test_failing_statements_are_not_executing_any_longer(tmp_path: Any) -> None:
+    db_engine = _instrumented_engine(tmp_path)
+
+    with db_engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text("SELECT * FROM NonExistingTable"))
+
+        assert not is_executing(connection)
@@ -0,0 +1,50 @@
+from typing import Any
+from unittest.mock import MagicMock
+
+from sqlalchemy import create_engine
+
+from saltapi.repository.statement_timeout import apply_statement_timeout, connection_id
+
+
+def _mysql_connection() -> Any:
+    connection = MagicMock()
+    connection.dialect.name = "mysql"
+    connection.info = {}
+    return connection
+
+
+def test_statement_timeout_is_set_in_milliseconds() -> None:
+    connection = _mysql_connection()
+
+    apply_statement_timeout(connection, 2.5)
+
+    connection.execute.assert_called_once()
+    assert connection.execute.call_args.args[1] == {"milliseconds": 2500}
+
+
+def test_statement_timeout_is_only_set_if_changed() -> None:
+    connection = _mysql_connection()
+
+    apply_statement_timeout(connection, 10)
+    apply_statement_timeout(connection, 10)
+    assert connection.execute.call_count == 1
+
+    apply_statement_timeout(connection, 0)
+    assert connection.execute.call_count == 2
+    assert connection.execute.call_args.args[1] == {"milliseconds": 0}
+
+
+def test_statement_timeout_is_ignored_for_other_databases() -> None:
+    db_engine = create_engine("sqlite://", future=True)
+
+    with db_engine.connect() as connection:
+        apply_statement_timeout(connection, 10)
+
+        assert "max_execution_time" not in connection.info
+
+
+def test_connection_id_is_none_if_unknown() -> None:
+    db_engine = create_engine("sqlite://", future=True)
+
+    with db_engine.connect() as connection:
+        assert connection_id(connection) is None
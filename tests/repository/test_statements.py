@@ -0,0 +1,117 @@
+from typing import Any, List, Tuple, cast
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import bindparam, create_engine
+from sqlalchemy.engine import Connection
+
+from saltapi.repository import (
+    block_repository,
+    pipt_repository,
+    proposal_repository,
+    user_repository,
+)
+from saltapi.repository.statements import StatementRegistry
+
+
+def test_statements_are_compiled_once() -> None:
+    statements = StatementRegistry()
+    statement = statements.register("answer", "SELECT :answer AS answer")
+
+    assert statements["answer"] is statement
+    assert list(statements) == ["answer"]
+    assert len(statements) == 1
+
+
+def test_statement_names_must_be_unique() -> None:
+    statements = StatementRegistry()
+    statements.register("answer", "SELECT 42")
+
+    with pytest.raises(ValueError):
+        statements.register("answer", "SELECT 43")
+
+
+def test_registered_statements_can_be_executed() -> None:
+    statements = StatementRegistry()
+    statements.register("answer", "SELECT :answer AS answer")
+    db_engine = create_engine("sqlite://", future=True)
+
+    with db_engine.connect() as connection:
+        result = connection.execute(statements["answer"], {"answer": 42})
+        assert result.scalar_one() == 42
+
+
+def test_statements_may_have_expanding_parameters() -> None:
+    statements = StatementRegistry()
+    statements.register(
+        "answers",
+        "SELECT COUNT(*) FROM (SELECT 42 AS answer) A WHERE answer IN :answers",
+        bindparam("answers", expanding=True),
+    )
+    db_engine = create_engine("sqlite://", future=True)
+
+    with db_engine.connect() as connection:
+        result = connection.execute(statements["answers"], {"answers": [41, 42]})
+        assert result.scalar_one() == 1
+        result = connection.execute(statements["answers"], {"answers": [43]})
+        assert result.scalar_one() == 0
+
+
+class RecordingConnection:
+    """Connection recording the executed statements."""
+
+    def __init__(self) -> None:
+        self.statements: List[Any] = []
+
+    def execute(self, statement: Any, parameters: Any = None) -> Any:
+        self.statements.append(statement)
+        result = MagicMock()
+        result.scalar_one.return_value = 1
+        return result
+
+
+@pytest.mark.parametrize(
+    "module,repository_class,method,args,name",
+    [
+        (
+            block_repository,
+            block_repository.BlockRepository,
+            "get_block_status",
+            (42,),
+            "block_status",
+        ),
+        (
+            pipt_repository,
+            pipt_repository.PiptRepository,
+            "get_pipt_news_for_days",
+            (7,),
+            "news_for_days",
+        ),
+        (
+            proposal_repository,
+            proposal_repository.ProposalRepository,
+            "latest_submission_phase",
+            ("2022-1-SCI-001",),
+            "latest_submission_phase",
+        ),
+        (
+            user_repository,
+            user_repository.UserRepository,
+            "is_existing_user_id",
+            (42,),
+            "is_existing_user_id",
+        ),
+    ],
+)
+def test_repositories_reuse_registered_statements(
+    module: Any, repository_class: Any, method: str, args: Tuple[Any, ...], name: str
+) -> None:
+    connection = RecordingConnection()
+    repository = repository_class(cast(Connection, connection))
+
+    getattr(repository, method)(*args)
+    getattr(repository, method)(*args)
+
+    assert len(connection.statements) == 2
+    assert connection.statements[0] is module._statements[name]
+    assert connection.statements[1] is module._statements[name]
@@ -0,0 +1,202 @@
+from typing import Any, Generator
+
+import pytest
+from sqlalchemy import create_engine, text
+
+import saltapi.repository.unit_of_work
+from saltapi.repository.cache import cached, invalidate_cache
+from saltapi.repository.database import pool_statistics
+from saltapi.repository.unit_of_work import (
+    RequestConnections,
+    UnitOfWork,
+    release_request_connection,
+    set_statement_timeout,
+    stop_using_request_connections,
+    use_request_connections,
+)
+from saltapi.settings import get_settings
+
+
+@pytest.fixture()
+def sqlite_engine(tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> Any:
+    db_engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", future=True)
+    with db_engine.connect() as connection:
+        connection.execute(text("CREATE TABLE Item (Name VARCHAR(20))"))
+        connection.commit()
+    monkeypatch.setattr(saltapi.repository.unit_of_work, "engine", lambda: db_engine)
+    pool_statistics.reset()
+    return db_engine
+
+
+@pytest.fixture()
+def request_connections() -> Generator[RequestConnections, None, None]:
+    connections = RequestConnections()
+    token = use_request_connections(connections)
+    yield connections
+    stop_using_request_connections(token)
+    connections.close()
+
+
+class ItemRepository:
+    def __init__(self, connection: Any) -> None:
+        self.connection = connection
+
+    @cached("test_item_count", ttl=60)
+    def count(self) -> int:
+        return int(
+            self.connection.execute(text("SELECT COUNT(*) FROM Item")).scalar_one()
+        )
+
+    def add(self, name: str) -> None:
+        self.connection.execute(
+            text("INSERT INTO Item (Name) VALUES (:name)"), {"name": name}
+        )
+        invalidate_cache("test_item_count")
+
+
+def _item_count(db_engine: Any) -> int:
+    with db_engine.connect() as connection:
+        return int(connection.execute(text("SELECT COUNT(*) FROM Item")).scalar_one())
+
+
+def test_unit_of_work_connects_lazily(sqlite_engine: Any) -> None:
+    with UnitOfWork():
+        pass
+
+    assert pool_statistics.checkouts == 0
+
+
+def test_units_of_work_share_request_connection(
+    sqlite_engine: Any, request_connections: RequestConnections
+) -> None:
+    with UnitOfWork() as unit_of_work:
+        first_connection = unit_of_work.connection
+    with UnitOfWork() as unit_of_work:
+        second_connection = unit_of_work.connection
+
+    assert first_connection is second_connection
+    assert pool_statistics.checkouts == 1
+
+
+def test_request_connection_is_only_checked_out_when_used(
+    sqlite_engine: Any, request_connections: RequestConnections
+) -> None:
+    with UnitOfWork():
+        pass
+
+    assert not request_connections.is_connected
+    assert pool_statistics.checkouts == 0
+
+
+def test_nested_unit_of_work_does_not_roll_back(
+    sqlite_engine: Any, request_connections: RequestConnections
+) -> None:
+    with UnitOfWork() as outer:
+        outer.connection.execute(text("INSERT INTO Item (Name) VALUES ('A')"))
+        with UnitOfWork() as inner:
+            inner.connection.execute(text("SELECT * FROM Item"))
+        outer.commit()
+
+    assert _item_count(sqlite_engine) == 1
+
+
+def test_uncommitted_changes_are_rolled_back(
+    sqlite_engine: Any, request_connections: RequestConnections
+) -> None:
+    with UnitOfWork() as unit_of_work:
+        unit_of_work.connection.execute(text("INSERT INTO Item (Name) VALUES ('A')"))
+
+    with UnitOfWork() as unit_of_work:
+        count = unit_of_work.connection.execute(
+            text("SELECT COUNT(*) FROM Item")
+        ).scalar_one()
+
+    assert count == 0
+
+
+def test_statement_timeout_can_be_set_for_request(
+    request_connections: RequestConnections,
+) -> None:
+    assert request_connections.statement_timeout == get_settings().statement_timeout
+
+    set_statement_timeout(5)
+
+    assert request_connections.statement_timeout == 5
+
+
+def test_executing_connection_ids(
+    sqlite_engine: Any, request_connections: RequestConnections
+) -> None:
+    assert request_connections.executing_connection_ids() == []
+
+    with UnitOfWork() as unit_of_work:
+        info = unit_of_work.connection.info
+        info["connection_id"] = 42
+        assert request_connections.executing_connection_ids() == []
+
+        info["query_start_time"] = [0.0]
+        assert request_connections.executing_connection_ids() == [42]
+        info["query_start_time"].pop()
+
+
+def test_replica_connections_are_registered_with_request(
+    tmp_path: Any,
+    monkeypatch: pytest.MonkeyPatch,
+    request_connections: RequestConnections,
+) -> None:
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}", future=True)
+    monkeypatch.setattr(
+        UnitOfWork, "_usable_replica_engine", staticmethod(lambda: replica)
+    )
+    killed = []
+    monkeypatch.setattr(
+        saltapi.repository.unit_of_work,
+        "kill_query",
+        lambda db_engine, _id: killed.append((db_engine, _id)),
+    )
+
+    with UnitOfWork(read_only=True) as unit_of_work:
+        info = unit_of_work.connection.info
+        info["connection_id"] = 7
+        info["query_start_time"] = [0.0]
+        assert request_connections.executing_connection_ids() == [7]
+
+        request_connections.kill_executing_statements()
+        assert killed == [(replica, 7)]
+        info["query_start_time"].pop()
+
+    info["query_start_time"] = [0.0]
+    assert request_connections.executing_connection_ids() == []
+    info["query_start_time"].pop()
+
+
+def test_request_connection_is_released_when_unused(
+    sqlite_engine: Any, request_connections: RequestConnections
+) -> None:
+    with UnitOfWork() as unit_of_work:
+        unit_of_work.connection.execute(text("SELECT 1"))
+        release_request_connection()
+        assert request_connections.is_connected
+
+    release_request_connection()
+    assert not request_connections.is_connected
+
+    with UnitOfWork() as unit_of_work:
+        unit_of_work.connection.execute(text("SELECT 1"))
+    assert pool_statistics.checkouts == 2
+
+
+@pytest.mark.parametrize("commit", [True, False])
+def test_cache_invalidations_are_repeated_after_transaction(
+    sqlite_engine: Any, commit: bool
+) -> None:
+    invalidate_cache("test_item_count")
+    with UnitOfWork() as unit_of_work:
+        ItemRepository(unit_of_work.connection).add("A")
+        # The count is cached again before the transaction ends
+        assert ItemRepository(unit_of_work.connection).count() == 1
+        if commit:
+            unit_of_work.commit()
+
+    with UnitOfWork() as unit_of_work:
+        assert ItemRepository(unit_of_work.connection).count() == (1 if commit else 0)
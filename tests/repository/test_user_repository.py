@@ -1,6 +1,7 @@
 import uuid
 from dataclasses import asdict
 from typing import Any, Callable, Optional, cast
+from unittest.mock import MagicMock
 
 import pytest
 from pydantic import EmailStr
@@ -8,8 +9,9 @@ from pytest import MonkeyPatch
 from sqlalchemy.engine import Connection
 
 from saltapi.exceptions import NotFoundError, ResourceExistsError
-from saltapi.repository.user_repository import UserRepository
-from saltapi.service.user import UserStatistics
+from saltapi.repository.cache import invalidate_cache
+from saltapi.repository.user_repository import UserRepository, pwd_context
+from saltapi.service.user import Role, UserStatistics
 from tests.conftest import find_usernames, find_username
 from tests.markers import nodatabase
 
@@ -718,3 +720,242 @@ def test_activate_user_update_users_activation_status(
     # Set the activeness status back to False
     user = _update_active_status(user.id, False, db_connection)
     assert user.active is False
+
+
+def test_get_authenticated_user_caches_users(monkeypatch: MonkeyPatch) -> None:
+    queried_user_ids = []
+
+    def get(self: UserRepository, user_id: int) -> Any:
+        queried_user_ids.append(user_id)
+        return {"id": user_id}
+
+    monkeypatch.setattr(UserRepository, "get", get)
+    user_repository = UserRepository(cast(Connection, None))
+
+    assert user_repository.get_authenticated_user(42) == {"id": 42}
+    assert user_repository.get_authenticated_user(42) == {"id": 42}
+    assert user_repository.get_authenticated_user(43) == {"id": 43}
+    assert queried_user_ids == [42, 43]
+
+
+@nodatabase
+def test_activate_user_invalidates_authenticated_user(
+    db_connection: Connection,
+) -> None:
+    username = find_username("Inactive User")
+    user_repository = UserRepository(db_connection)
+    user_id = user_repository.get_by_username(username).id
+
+    user_repository.activate_user(user_id, True)
+    assert user_repository.get_authenticated_user(user_id).active is True
+
+    user_repository.activate_user(user_id, False)
+    assert user_repository.get_authenticated_user(user_id).active is False
+
+
+@nodatabase
+@pytest.mark.parametrize(
+    "role,method",
+    [
+        (Role.ADMINISTRATOR, "is_administrator"),
+        (Role.SALT_ASTRONOMER, "is_salt_astronomer"),
+        (Role.BOARD_MEMBER, "is_board_member"),
+        (Role.TAC_CHAIR, "is_tac_chair_in_general"),
+        (Role.TAC_MEMBER, "is_tac_member_in_general"),
+    ],
+)
+def test_get_user_roles_agrees_with_role_checks(
+    db_connection: Connection, role: Role, method: str
+) -> None:
+    invalidate_cache("user_roles")
+    user_repository = UserRepository(db_connection)
+    for username in find_usernames("any", True):
+        has_role = getattr(user_repository, method)(username)
+        assert (role in user_repository.get_user_roles(username)) == has_role
+
+
+@nodatabase
+def test_get_user_roles_returns_no_roles_for_non_existing_user(
+    db_connection: Connection,
+) -> None:
+    invalidate_cache("user_roles")
+    user_repository = UserRepository(db_connection)
+    assert user_repository.get_user_roles("idontexist") == []
+
+
+@nodatabase
+@pytest.mark.parametrize(
+    "role,method",
+    [
+        (Role.INVESTIGATOR, "is_investigator"),
+        (Role.PRINCIPAL_INVESTIGATOR, "is_principal_investigator"),
+        (Role.PRINCIPAL_CONTACT, "is_principal_contact"),
+        (Role.PROPOSAL_TAC_MEMBER, "is_tac_member_for_proposal"),
+        (Role.PROPOSAL_TAC_CHAIR, "is_tac_chair_for_proposal"),
+    ],
+)
+def test_get_proposal_relationships_agrees_with_role_checks(
+    db_connection: Connection, role: Role, method: str
+) -> None:
+    proposal_code = "2020-2-SCI-018"
+    user_repository = UserRepository(db_connection)
+    for username in find_usernames("any", True):
+        has_role = getattr(user_repository, method)(username, proposal_code)
+        relationships = user_repository.get_proposal_relationships(
+            username, proposal_code
+        )
+        assert (role in relationships.roles) == has_role
+
+
+@nodatabase
+def test_get_proposal_relationships_includes_granted_permissions(
+    db_connection: Connection,
+) -> None:
+    proposal_code = "2020-2-SCI-018"
+    username = find_username("Inactive User")
+    user_repository = UserRepository(db_connection)
+    user_id = user_repository.get_by_username(username).id
+
+    user_repository.grant_proposal_permission(user_id, "View", proposal_code)
+    relationships = user_repository.get_proposal_relationships(username, proposal_code)
+    assert "View" in relationships.permissions
+
+    user_repository.revoke_proposal_permission(user_id, "View", proposal_code)
+    relationships = user_repository.get_proposal_relationships(username, proposal_code)
+    assert "View" not in relationships.permissions
+
+
+@nodatabase
+def test_revoke_auth_tokens_bumps_token_version(db_connection: Connection) -> None:
+    username = find_username("Inactive User")
+    user_repository = UserRepository(db_connection)
+    user_id = user_repository.get_by_username(username).id
+    version = user_repository.get_auth_token_version(user_id)
+
+    user_repository.revoke_auth_tokens(user_id)
+
+    assert user_repository.get_auth_token_version(user_id) == version + 1
+
+
+@pytest.mark.parametrize("scheme", ["bcrypt", "md5_crypt"])
+def test_verify_password_supports_passlib_hashes(scheme: str) -> None:
+    user_repository = UserRepository(cast(Connection, None))
+    password_hash = pwd_context.hash("secret", scheme=scheme)
+
+    assert user_repository.verify_password("secret", password_hash)
+    assert not user_repository.verify_password("wrong", password_hash)
+
+
+def test_verify_password_supports_legacy_hashes() -> None:
+    user_repository = UserRepository(cast(Connection, None))
+    password_hash = UserRepository.get_password_hash("secret")
+
+    assert user_repository.verify_password("secret", password_hash)
+    assert not user_repository.verify_password("wrong", password_hash)
+
+
+@pytest.mark.parametrize(
+    "scheme,is_replaced", [("md5_crypt", True), ("bcrypt", False), (None, False)]
+)
+def test_deprecated_password_hashes_are_replaced_on_login(
+    monkeypatch: MonkeyPatch, scheme: Optional[str], is_replaced: bool
+) -> None:
+    if scheme is not None:
+        password_hash = pwd_context.hash("secret", scheme=scheme)
+    else:
+        password_hash = UserRepository.get_password_hash("secret")
+    user = MagicMock(id=42, password_hash=password_hash)
+    replaced_hashes = []
+    monkeypatch.setattr(UserRepository, "get_by_username", lambda self, _: user)
+    monkeypatch.setattr(
+        UserRepository,
+        "replace_password_hash",
+        lambda self, user_id, new_hash: replaced_hashes.append(new_hash),
+    )
+    user_repository = UserRepository(cast(Connection, None))
+
+    assert user_repository.find_user_with_username_and_password("jdoe", "secret")
+    assert bool(replaced_hashes) == is_replaced
+    if is_replaced:
+        assert pwd_context.identify(replaced_hashes[0]) == "bcrypt"
+        assert user_repository.verify_password("secret", replaced_hashes[0])
+
+
+@nodatabase
+def test_get_accessible_proposals_agrees_with_role_checks(
+    db_connection: Connection,
+) -> None:
+    invalidate_cache("accessible_proposals")
+    proposal_code = "2020-2-SCI-018"
+    user_repository = UserRepository(db_connection)
+    for username in find_usernames("any", True):
+        accessible_proposals = user_repository.get_accessible_proposals(username)
+        is_investigator = user_repository.is_investigator(username, proposal_code)
+        is_tac_member = user_repository.is_tac_member_for_proposal(
+            username, proposal_code
+        )
+        assert (
+            proposal_code in accessible_proposals.investigator_proposal_codes
+        ) == is_investigator
+        if is_investigator or is_tac_member:
+            assert proposal_code in accessible_proposals.proposal_codes
+
+
+@nodatabase
+def test_granting_permission_refreshes_accessible_proposals(
+    db_connection: Connection,
+) -> None:
+    proposal_code = "2020-2-SCI-018"
+    username = find_username("Inactive User")
+    user_repository = UserRepository(db_connection)
+    user_id = user_repository.get_by_username(username).id
+
+    user_repository.grant_proposal_permission(user_id, "View", proposal_code)
+    accessible_proposals = user_repository.get_accessible_proposals(username)
+    assert proposal_code in accessible_proposals.proposal_codes
+
+    user_repository.revoke_proposal_permission(user_id, "View", proposal_code)
+    accessible_proposals = user_repository.get_accessible_proposals(username)
+    assert proposal_code not in accessible_proposals.proposal_codes
+
+
+@nodatabase
+def test_get_related_proposal_codes_agrees_with_proposal_relationships(
+    db_connection: Connection,
+) -> None:
+    proposal_codes = ["2020-2-SCI-018", "2019-1-GWE-005", "2018-2-LSP-001"]
+    user_repository = UserRepository(db_connection)
+    for username in find_usernames("any", True):
+        related_proposal_codes = user_repository.get_related_proposal_codes(
+            username, proposal_codes
+        )
+        for proposal_code in proposal_codes:
+            relationships = user_repository.get_proposal_relationships(
+                username, proposal_code
+            )
+            is_related = (
+                Role.INVESTIGATOR in relationships.roles
+                or Role.PROPOSAL_TAC_MEMBER in relationships.roles
+                or "View" in relationships.permissions
+            )
+            assert (proposal_code in related_proposal_codes) == is_related
+
+
+@nodatabase
+def test_get_proposal_codes_with_view_permission_agrees_with_proposal_relationships(
+    db_connection: Connection,
+) -> None:
+    proposal_codes = ["2020-2-SCI-018", "2019-1-GWE-005", "2018-2-LSP-001"]
+    user_repository = UserRepository(db_connection)
+    for username in find_usernames("any", True):
+        granted_proposal_codes = (
+            user_repository.get_proposal_codes_with_view_permission(
+                username, proposal_codes
+            )
+        )
+        for proposal_code in proposal_codes:
+            relationships = user_repository.get_proposal_relationships(
+                username, proposal_code
+            )
+            is_granted = "View" in relationships.permissions
+            assert (proposal_code in granted_proposal_codes) == is_granted
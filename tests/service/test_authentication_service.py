@@ -1,14 +1,20 @@
+from dataclasses import replace
 from datetime import datetime, timedelta
-from typing import Optional, cast
+from typing import List, Optional, Tuple, Type, cast
 
 import pytest
 from freezegun import freeze_time
+from jose import jwt
 from pydantic import EmailStr
+from sqlalchemy.engine import Connection
 
-from saltapi.exceptions import NotFoundError
+from saltapi.exceptions import AuthenticationError, NotFoundError
+from saltapi.repository.cache import invalidate_cache
 from saltapi.repository.user_repository import UserRepository
+from saltapi.service import authentication_service as authentication_service_module
 from saltapi.service.authentication_service import AuthenticationService
-from saltapi.service.user import Institution, User
+from saltapi.service.password_verification import login_throttle
+from saltapi.service.user import Institution, Role, User
 from saltapi.settings import get_settings
 
 TEST_DATA_PATH = "service/authentication_service.yaml"
@@ -38,6 +44,17 @@ USER = User(
 
 
 class FakeUserRepository:
+    def __init__(self, token_version: int = 0) -> None:
+        self.token_version = token_version
+        self.authenticated_user_ids: List[int] = []
+
+    def get_auth_token_version(self, user_id: int) -> int:
+        return self.token_version
+
+    def get_authenticated_user(self, user_id: int) -> Optional[User]:
+        self.authenticated_user_ids.append(user_id)
+        return USER
+
     def get(self, username: str) -> Optional[User]:
         if username == "jdoe":
             return User(
@@ -62,34 +79,9 @@ class FakeUserRepository:
             )
         return None
 
-    def find_user_with_username_and_password(
-        self, username: str, password: str
-    ) -> User:
-        if username == "jdoe" and password == "hashedpassword":
-            return User(
-                id=1,
-                username="jdoe",
-                given_name="John",
-                family_name="Doe",
-                email=EmailStr("johndoe@email.com"),
-                password_hash="hashedpassword",
-                affiliations=[
-                    Institution(
-                        institution_id=1332,
-                        institution="Other",
-                        department="Other",
-                        partner_code="Code",
-                    )
-                ],
-                roles=[],
-                user_verified=True,
-                active=True,
-                demographics=None,
-            )
-
-        raise NotFoundError("User not found or password doesn't match.")
-
     def get_by_username(self, username: str) -> User:
+        if username != "jdoe":
+            raise NotFoundError("User not found.")
         return User(
             id=1,
             username=username,
@@ -111,10 +103,23 @@ class FakeUserRepository:
             demographics=None,
         )
 
+    def verify_and_update_password(
+        self, password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        return password == hashed_password, None
+
+    def replace_password_hash(self, user_id: int, password_hash: str) -> None:
+        pass
+
 
 user_repository = cast(UserRepository, FakeUserRepository())
 
 
+@pytest.fixture(autouse=True)
+def reset_login_throttle() -> None:
+    login_throttle.reset()
+
+
 def test_access_token_by_default_expires_in_seven_days() -> None:
     with freeze_time("2021-10-17 12:00:01"):
         authentication_service = AuthenticationService(user_repository)
@@ -164,18 +169,118 @@ def test_authenticate_user_raises_error_for_wrong_user(
 
 
 @pytest.mark.parametrize(
-    "username, password",
+    "username, password, error",
     [
-        ("jdoe", "hashedpasswordd"),
-        ("jdoe", "wrongpassword"),
-        ("jdoe", ""),
-        ("jdoe", None),
-        (None, None),
+        ("jdoe", "hashedpasswordd", AuthenticationError),
+        ("jdoe", "wrongpassword", AuthenticationError),
+        ("jdoe", "", AuthenticationError),
+        ("jdoe", None, AuthenticationError),
+        (None, None, NotFoundError),
     ],
 )
 def test_authenticate_user_raises_error_for_wrong_password(
-    username: str, password: str
+    username: str, password: str, error: Type[Exception]
 ) -> None:
     authentication_service = AuthenticationService(user_repository)
-    with pytest.raises(NotFoundError):
+    with pytest.raises(error):
         authentication_service.authenticate_user(username, password)
+
+
+def test_access_token_includes_user_details_only_with_token_version() -> None:
+    token = AuthenticationService.access_token(USER).access_token
+    assert "usr" not in jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+    token = AuthenticationService.access_token(USER, token_version=3).access_token
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    assert payload["ver"] == 3
+    assert payload["usr"]["username"] == "jdoe"
+    assert "password_hash" not in payload["usr"]
+
+
+def test_validate_auth_token_uses_user_details_from_token(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(get_settings(), "auth_token_claims", True)
+    user = replace(USER, roles=[Role.ADMINISTRATOR, Role.TAC_MEMBER])
+    repository = FakeUserRepository(token_version=2)
+    authentication_service = AuthenticationService(cast(UserRepository, repository))
+    token = authentication_service.access_token_with_claims(user).access_token
+
+    validated_user = authentication_service.validate_auth_token(token)
+
+    assert validated_user is not None
+    assert validated_user.id == USER.id
+    assert validated_user.username == USER.username
+    assert validated_user.roles == [Role.ADMINISTRATOR, Role.TAC_MEMBER]
+    assert validated_user.password_hash == ""
+    assert repository.authenticated_user_ids == []
+
+
+def test_validate_auth_token_rejects_revoked_token(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(get_settings(), "auth_token_claims", True)
+    repository = FakeUserRepository(token_version=2)
+    authentication_service = AuthenticationService(cast(UserRepository, repository))
+    token = AuthenticationService.access_token(USER, token_version=1).access_token
+
+    with pytest.raises(AuthenticationError):
+        authentication_service.validate_auth_token(token)
+
+
+def test_validate_auth_token_ignores_user_details_if_disabled(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(get_settings(), "auth_token_claims", False)
+    repository = FakeUserRepository()
+    authentication_service = AuthenticationService(cast(UserRepository, repository))
+    token = AuthenticationService.access_token(USER, token_version=0).access_token
+
+    authentication_service.validate_auth_token(token)
+
+    assert repository.authenticated_user_ids == [USER.id]
+
+
+def test_authenticate_user_rejects_throttled_username(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(get_settings(), "max_failed_login_attempts", 2)
+    authentication_service = AuthenticationService(user_repository)
+    for _ in range(2):
+        with pytest.raises(AuthenticationError):
+            authentication_service.authenticate_user("jdoe", "wrongpassword")
+
+    with pytest.raises(AuthenticationError, match="Too many"):
+        authentication_service.authenticate_user("jdoe", "hashedpassword")
+
+
+def _use_fake_user_repository(
+    monkeypatch: pytest.MonkeyPatch, repository: FakeUserRepository
+) -> None:
+    monkeypatch.setattr(
+        authentication_service_module, "UserRepository", lambda connection: repository
+    )
+
+
+def test_session_user_is_taken_from_authenticated_users_cache(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(get_settings(), "repository_cache_enabled", True)
+    queried_user_ids = []
+
+    def get(self: UserRepository, user_id: int) -> User:
+        queried_user_ids.append(user_id)
+        return USER
+
+    monkeypatch.setattr(UserRepository, "get", get)
+    invalidate_cache("authenticated_users")
+    try:
+        for _ in range(2):
+            user = authentication_service_module._session_user(
+                cast(Connection, None), str(USER.id)
+            )
+            assert user == USER
+    finally:
+        invalidate_cache("authenticated_users")
+
+    assert queried_user_ids == [USER.id]
@@ -0,0 +1,124 @@
+import threading
+import time
+from typing import List
+
+import pytest
+from fastapi import HTTPException
+
+from saltapi.service.password_verification import (
+    LoginThrottle,
+    PasswordVerificationExecutor,
+)
+from saltapi.settings import get_settings
+
+
+def test_executor_limits_concurrent_verifications(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(get_settings(), "max_concurrent_password_verifications", 2)
+    executor = PasswordVerificationExecutor()
+    lock = threading.Lock()
+    running: List[int] = [0]
+    max_running: List[int] = [0]
+
+    def verify() -> bool:
+        with lock:
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return True
+
+    threads = [threading.Thread(target=lambda: executor.run(verify)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    executor.shutdown()
+
+    assert max_running[0] == 2
+
+
+def test_executor_returns_result() -> None:
+    executor = PasswordVerificationExecutor()
+
+    assert executor.run(lambda a, b: a + b, 40, 2) == 42
+    executor.shutdown()
+
+
+def test_login_throttle_rejects_after_too_many_failures(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(get_settings(), "max_failed_login_attempts", 3)
+    throttle = LoginThrottle()
+
+    for _ in range(2):
+        throttle.record_failure("jdoe")
+    assert not throttle.is_throttled("jdoe")
+
+    throttle.record_failure("jdoe")
+    assert throttle.is_throttled("jdoe")
+    assert not throttle.is_throttled("someone")
+
+
+def test_login_throttle_forgets_old_failures(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(get_settings(), "max_failed_login_attempts", 1)
+    monkeypatch.setattr(get_settings(), "login_failure_window", -1)
+    throttle = LoginThrottle()
+
+    throttle.record_failure("jdoe")
+
+    assert not throttle.is_throttled("jdoe")
+
+
+def test_successful_login_clears_failures(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(get_settings(), "max_failed_login_attempts", 1)
+    throttle = LoginThrottle()
+
+    throttle.record_failure("jdoe")
+    throttle.record_success("jdoe")
+
+    assert not throttle.is_throttled("jdoe")
+
+
+def test_login_throttle_forgets_least_recently_failed_usernames(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(get_settings(), "max_failed_login_attempts", 1)
+    monkeypatch.setattr(LoginThrottle, "MAX_RECORDED_USERNAMES", 2)
+    throttle = LoginThrottle()
+
+    throttle.record_failure("jdoe")
+    throttle.record_failure("someone")
+    throttle.record_failure("jdoe")
+    throttle.record_failure("someone_else")
+
+    assert throttle.is_throttled("jdoe")
+    assert not throttle.is_throttled("someone")
+    assert throttle.is_throttled("someone_else")
+
+
+def test_executor_rejects_verifications_if_too_many_are_waiting(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(get_settings(), "max_concurrent_password_verifications", 1)
+    monkeypatch.setattr(get_settings(), "max_queued_password_verifications", 1)
+    executor = PasswordVerificationExecutor()
+    release = threading.Event()
+    threads = [
+        threading.Thread(target=lambda: executor.run(release.wait)) for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+
+    with pytest.raises(HTTPException) as excinfo:
+        executor.run(lambda: True)
+    assert excinfo.value.status_code == 503
+
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert executor.run(lambda: True)
+    executor.shutdown()
@@ -1,4 +1,4 @@
-from typing import Any, Iterable, List, Tuple, cast
+from typing import Any, Dict, Iterable, List, Set, Tuple, cast
 
 import pytest
 from pydantic import EmailStr
@@ -8,9 +8,16 @@ from saltapi.repository.block_repository import BlockRepository
 from saltapi.repository.proposal_repository import ProposalRepository
 from saltapi.repository.submission_repository import SubmissionRepository
 from saltapi.repository.user_repository import UserRepository
+from saltapi.repository.utils import Utils
 from saltapi.service.permission_service import PermissionService
 from saltapi.service.proposal import ProposalCode
-from saltapi.service.user import Institution, User
+from saltapi.service.user import (
+    AccessibleProposals,
+    Institution,
+    ProposalRelationships,
+    Role,
+    User,
+)
 
 
 class FakeUserRepository:
@@ -97,6 +104,63 @@ class FakeUserRepository:
     def is_salt_operator(self, username: str) -> bool:
         return self._is_salt_operator
 
+    def get_accessible_proposals(self, username: str) -> AccessibleProposals:
+        # The proposal-specific roles are resolved by get_proposal_relationships.
+        return AccessibleProposals(
+            proposal_codes=frozenset(),
+            investigator_proposal_codes=frozenset(),
+            is_partner_affiliated=self._is_partner_affiliated_user,
+            may_view_all_proposals=False,
+        )
+
+    def get_proposal_relationships(
+        self, username: str, proposal_code: ProposalCode
+    ) -> ProposalRelationships:
+        roles = []
+        if self.is_investigator(username, proposal_code):
+            roles.append(Role.INVESTIGATOR)
+        if self._is_principal_investigator:
+            roles.append(Role.PRINCIPAL_INVESTIGATOR)
+        if self._is_principal_contact:
+            roles.append(Role.PRINCIPAL_CONTACT)
+        if self.is_tac_member_for_proposal(username, proposal_code):
+            roles.append(Role.PROPOSAL_TAC_MEMBER)
+        if self._is_tac_chair:
+            roles.append(Role.PROPOSAL_TAC_CHAIR)
+        return ProposalRelationships(roles=roles, permissions=[])
+
+    def get_related_proposal_codes(
+        self, username: str, proposal_codes: List[str]
+    ) -> Set[str]:
+        if self.is_investigator(username, "") or self.is_tac_member_for_proposal(
+            username, ""
+        ):
+            return set(proposal_codes)
+        return set()
+
+    def get_proposal_codes_with_view_permission(
+        self, username: str, proposal_codes: List[str]
+    ) -> Set[str]:
+        return set()
+
+    def get_user_roles(self, username: str) -> List[Role]:
+        roles = []
+        if self._is_administrator:
+            roles.append(Role.ADMINISTRATOR)
+        if self._is_salt_astronomer:
+            roles.append(Role.SALT_ASTRONOMER)
+        if self._is_salt_operator:
+            roles.append(Role.SALT_OPERATOR)
+        if self._is_engineer:
+            roles.append(Role.ENGINEER)
+        if self._is_board_member:
+            roles.append(Role.BOARD_MEMBER)
+        if self._is_tac_chair_in_general:
+            roles.append(Role.TAC_CHAIR)
+        if self._is_tac_member_in_general:
+            roles.append(Role.TAC_MEMBER)
+        return roles
+
 
 class FakeProposalRepository:
     def __init__(self, is_self_activatable: bool = False) -> None:
@@ -108,6 +172,13 @@ class FakeProposalRepository:
     def get_proposal_type(self, proposal_code: str) -> str:
         return "Science " if "GW" not in proposal_code else "Gravitational Wave Event"
 
+    def get_proposal_types(self, proposal_codes: List[str]) -> Dict[str, str]:
+        return {
+            proposal_code: self.get_proposal_type(proposal_code)
+            for proposal_code in proposal_codes
+            if proposal_code != UNKNOWN_PROPOSAL_CODE
+        }
+
 
 class FakeBlockRepository:
     pass
@@ -144,7 +215,7 @@ USER = User(
     given_name="Some",
     family_name="One",
     email=EmailStr("someone@example.com"),
-    alternative_emails=[EmailStr("ex@gmail.com")],
+    demographics=None,
     password_hash="1234",
     affiliations=[
         Institution(
@@ -158,6 +229,8 @@ USER = User(
 
 PROPOSAL_CODE = ProposalCode("some_code")
 
+UNKNOWN_PROPOSAL_CODE = ProposalCode("unknown_code")
+
 
 def _user_repositories_and_expected_results(
     roles_with_permission: Iterable[str],
@@ -205,6 +278,7 @@ def _assert_role_based_permission(
             proposal_repository,
             block_repository,
             submission_repository,
+            cast(Utils, None),
         )
         if expected_result:
             getattr(permission_service, permission)(user=USER, **kwargs)
@@ -239,6 +313,32 @@ def test_check_permission_to_view_gravitational_wave_proposal() -> None:
     )
 
 
+def test_check_permission_to_view_non_gravitational_wave_proposals() -> None:
+    roles_with_permission = [
+        INVESTIGATOR,
+        PRINCIPAL_INVESTIGATOR,
+        PRINCIPAL_CONTACT,
+        SALT_ASTRONOMER,
+        TAC_MEMBER_FOR_PROPOSAL,
+        TAC_CHAIR_FOR_PROPOSAL,
+        ADMINISTRATOR,
+    ]
+    _assert_role_based_permission(
+        "check_permission_to_view_proposals",
+        roles_with_permission,
+        proposal_codes=[PROPOSAL_CODE, "another_code"],
+    )
+
+
+def test_check_permission_to_view_gravitational_wave_proposals() -> None:
+    roles_with_permission = [PARTNER_AFFILIATED_USER]
+    _assert_role_based_permission(
+        "check_permission_to_view_proposals",
+        roles_with_permission,
+        proposal_codes=["2019-1-GWE-005", "2019-1-GWE-006"],
+    )
+
+
 def test_check_permission_to_update_proposal_status() -> None:
     roles_with_permission = [SALT_ASTRONOMER, ADMINISTRATOR]
     _assert_role_based_permission(
@@ -247,3 +347,225 @@ def test_check_permission_to_update_proposal_status() -> None:
         proposal_code=PROPOSAL_CODE,
         proposal_status="Accepted",
     )
+
+
+def test_user_has_role_resolves_general_roles_from_user_roles() -> None:
+    user_repository = cast(
+        UserRepository, FakeUserRepository(is_administrator=True, is_engineer=True)
+    )
+    permission_service = PermissionService(
+        user_repository,
+        cast(ProposalRepository, FakeProposalRepository()),
+        cast(BlockRepository, FakeBlockRepository),
+        cast(SubmissionRepository, FakeSubmissionRepository),
+        cast(Utils, None),
+    )
+
+    assert permission_service.user_has_role(USER.username, Role.ADMINISTRATOR)
+    assert permission_service.user_has_role(USER.username, Role.ENGINEER)
+    assert not permission_service.user_has_role(USER.username, Role.BOARD_MEMBER)
+    assert not permission_service.user_has_role(USER.username, Role.TAC_MEMBER)
+
+
+def test_user_has_role_resolves_proposal_roles_from_proposal_relationships() -> None:
+    user_repository = cast(
+        UserRepository, FakeUserRepository(is_principal_contact=True)
+    )
+    permission_service = PermissionService(
+        user_repository,
+        cast(ProposalRepository, FakeProposalRepository()),
+        cast(BlockRepository, FakeBlockRepository),
+        cast(SubmissionRepository, FakeSubmissionRepository),
+        cast(Utils, None),
+    )
+
+    assert permission_service.user_has_role(
+        USER.username, Role.PRINCIPAL_CONTACT, PROPOSAL_CODE
+    )
+    assert permission_service.user_has_role(
+        USER.username, Role.INVESTIGATOR, PROPOSAL_CODE
+    )
+    assert not permission_service.user_has_role(
+        USER.username, Role.PRINCIPAL_INVESTIGATOR, PROPOSAL_CODE
+    )
+    assert not permission_service.user_has_role(USER.username, Role.INVESTIGATOR)
+
+
+def test_check_permission_to_view_proposal_accepts_granted_permission() -> None:
+    class GranteeUserRepository(FakeUserRepository):
+        def get_proposal_relationships(
+            self, username: str, proposal_code: ProposalCode
+        ) -> ProposalRelationships:
+            permissions = ["View"] if proposal_code == PROPOSAL_CODE else []
+            return ProposalRelationships(roles=[], permissions=permissions)
+
+    permission_service = PermissionService(
+        cast(UserRepository, GranteeUserRepository()),
+        cast(ProposalRepository, FakeProposalRepository()),
+        cast(BlockRepository, FakeBlockRepository),
+        cast(SubmissionRepository, FakeSubmissionRepository),
+        cast(Utils, None),
+    )
+
+    permission_service.check_permission_to_view_proposal(USER, PROPOSAL_CODE)
+    with pytest.raises(AuthorizationError):
+        permission_service.check_permission_to_view_proposal(
+            USER, ProposalCode("another_code")
+        )
+
+
+class IndexedUserRepository(FakeUserRepository):
+    """
+    A user whose index of accessible proposals is out of date. The index includes a
+    proposal the user has no relationship with any longer.
+    """
+
+    def get_accessible_proposals(self, username: str) -> AccessibleProposals:
+        return AccessibleProposals(
+            proposal_codes=frozenset(["indexed_code"]),
+            investigator_proposal_codes=frozenset(["indexed_code"]),
+            is_partner_affiliated=False,
+            may_view_all_proposals=False,
+        )
+
+
+def test_check_permission_to_view_proposal_ignores_accessible_proposals() -> None:
+    permission_service = PermissionService(
+        cast(UserRepository, IndexedUserRepository()),
+        cast(ProposalRepository, FakeProposalRepository()),
+        cast(BlockRepository, FakeBlockRepository),
+        cast(SubmissionRepository, FakeSubmissionRepository),
+        cast(Utils, None),
+    )
+
+    with pytest.raises(AuthorizationError):
+        permission_service.check_permission_to_view_proposal(
+            cast(User, USER), ProposalCode("indexed_code")
+        )
+
+
+def test_may_view_proposals_checks_proposals_in_bulk() -> None:
+    related_proposal_code_requests = []
+
+    class BulkUserRepository(IndexedUserRepository):
+        def get_related_proposal_codes(
+            self, username: str, proposal_codes: List[str]
+        ) -> Set[str]:
+            related_proposal_code_requests.append(proposal_codes)
+            return {"related_code"}
+
+    permission_service = PermissionService(
+        cast(UserRepository, BulkUserRepository()),
+        cast(ProposalRepository, FakeProposalRepository()),
+        cast(BlockRepository, FakeBlockRepository),
+        cast(SubmissionRepository, FakeSubmissionRepository),
+        cast(Utils, None),
+    )
+
+    view_permissions = permission_service.may_view_proposals(
+        USER,
+        [
+            "indexed_code",
+            "related_code",
+            "other_code",
+            "indexed_code",
+            UNKNOWN_PROPOSAL_CODE,
+        ],
+    )
+
+    assert view_permissions == {
+        "indexed_code": False,
+        "related_code": True,
+        "other_code": False,
+        UNKNOWN_PROPOSAL_CODE: False,
+    }
+    assert related_proposal_code_requests == [
+        ["indexed_code", "related_code", "other_code"]
+    ]
+    with pytest.raises(AuthorizationError):
+        permission_service.check_permission_to_view_proposals(
+            USER, ["related_code", "other_code"]
+        )
+
+
+def test_may_view_proposals_lets_staff_view_all_existing_proposals() -> None:
+    class StaffUserRepository(FakeUserRepository):
+        def get_related_proposal_codes(
+            self, username: str, proposal_codes: List[str]
+        ) -> Set[str]:
+            raise AssertionError("The relationships should not have been queried.")
+
+    permission_service = PermissionService(
+        cast(UserRepository, StaffUserRepository(is_salt_astronomer=True)),
+        cast(ProposalRepository, FakeProposalRepository()),
+        cast(BlockRepository, FakeBlockRepository),
+        cast(SubmissionRepository, FakeSubmissionRepository),
+        cast(Utils, None),
+    )
+
+    assert permission_service.may_view_proposals(
+        USER, [PROPOSAL_CODE, "2019-1-GWE-005", UNKNOWN_PROPOSAL_CODE]
+    ) == {PROPOSAL_CODE: True, "2019-1-GWE-005": True, UNKNOWN_PROPOSAL_CODE: False}
+
+
+GRAVITATIONAL_WAVE_PROPOSAL_CODE = ProposalCode("2019-1-GWE-005")
+
+
+class RelatedUserRepository(FakeUserRepository):
+    """
+    A user who is an investigator on all proposals and who has been granted permission
+    to view the proposals given.
+    """
+
+    def __init__(self, granted_proposal_codes: Iterable[str] = ()) -> None:
+        super().__init__(is_investigator=True)
+        self.granted_proposal_codes = set(granted_proposal_codes)
+
+    def get_proposal_relationships(
+        self, username: str, proposal_code: ProposalCode
+    ) -> ProposalRelationships:
+        relationships = super().get_proposal_relationships(username, proposal_code)
+        if proposal_code in self.granted_proposal_codes:
+            relationships.permissions.append("View")
+        return relationships
+
+    def get_proposal_codes_with_view_permission(
+        self, username: str, proposal_codes: List[str]
+    ) -> Set[str]:
+        return self.granted_proposal_codes.intersection(proposal_codes)
+
+
+def _permission_service(user_repository: FakeUserRepository) -> PermissionService:
+    return PermissionService(
+        cast(UserRepository, user_repository),
+        cast(ProposalRepository, FakeProposalRepository()),
+        cast(BlockRepository, FakeBlockRepository),
+        cast(SubmissionRepository, FakeSubmissionRepository),
+        cast(Utils, None),
+    )
+
+
+def test_investigators_may_not_view_gravitational_wave_proposals() -> None:
+    permission_service = _permission_service(RelatedUserRepository())
+
+    permission_service.check_permission_to_view_proposal(USER, PROPOSAL_CODE)
+    with pytest.raises(AuthorizationError):
+        permission_service.check_permission_to_view_proposal(
+            USER, GRAVITATIONAL_WAVE_PROPOSAL_CODE
+        )
+    assert permission_service.may_view_proposals(
+        USER, [PROPOSAL_CODE, GRAVITATIONAL_WAVE_PROPOSAL_CODE]
+    ) == {PROPOSAL_CODE: True, GRAVITATIONAL_WAVE_PROPOSAL_CODE: False}
+
+
+def test_grantees_may_view_gravitational_wave_proposals() -> None:
+    permission_service = _permission_service(
+        RelatedUserRepository(granted_proposal_codes=[GRAVITATIONAL_WAVE_PROPOSAL_CODE])
+    )
+
+    permission_service.check_permission_to_view_proposal(
+        USER, GRAVITATIONAL_WAVE_PROPOSAL_CODE
+    )
+    assert permission_service.may_view_proposals(
+        USER, [GRAVITATIONAL_WAVE_PROPOSAL_CODE]
+    ) == {GRAVITATIONAL_WAVE_PROPOSAL_CODE: True}
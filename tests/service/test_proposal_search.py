@@ -0,0 +1,227 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable, List
+
+import pytest
+from fastapi import HTTPException
+
+from saltapi.service.proposal import ProposalText
+from saltapi.service.proposal_search import ProposalSearchIndex, words
+from saltapi.settings import get_settings
+
+
+class FakeProposalTexts:
+    def __init__(self, texts: Iterable[ProposalText]) -> None:
+        self.texts: Dict[str, ProposalText] = {t.proposal_code: t for t in texts}
+        self.loaded: List[List[str]] = []
+        # Loading all texts waits until this event is set
+        self.may_load_all = threading.Event()
+        self.may_load_all.set()
+
+    def all_texts(self) -> List[ProposalText]:
+        assert self.may_load_all.wait(timeout=5)
+        self.loaded.append(sorted(self.texts))
+        return list(self.texts.values())
+
+    def proposal_texts(self, proposal_codes: List[str]) -> List[ProposalText]:
+        self.loaded.append(proposal_codes)
+        return [self.texts[c] for c in proposal_codes if c in self.texts]
+
+
+@pytest.fixture(autouse=True)
+def no_replica(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(get_settings(), "sdb_replica_dsn", None)
+
+
+def _text(proposal_code: str, title: str, abstract: str = "") -> ProposalText:
+    return ProposalText(
+        proposal_code=proposal_code,
+        semester="2023-1",
+        title=title,
+        abstract=abstract,
+        read_me=None,
+    )
+
+
+def _loaded_index(proposal_texts: FakeProposalTexts) -> ProposalSearchIndex:
+    index = ProposalSearchIndex()
+    loader = index.warm_up(proposal_texts.all_texts)
+    assert loader is not None
+    loader.join(timeout=5)
+    assert index.is_loaded
+    return index
+
+
+def _wait_until(condition: Callable[[], bool]) -> None:
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def _search(
+    index: ProposalSearchIndex, proposal_texts: FakeProposalTexts, query: str
+) -> List[str]:
+    hits = index.search(query, proposal_texts.all_texts, proposal_texts.proposal_texts)
+    return [hit.proposal_code for hit in hits]
+
+
+def test_words_are_normalised() -> None:
+    assert words("Étoiles à neutrons, X-ray (2023)") == [
+        "etoiles",
+        "neutrons",
+        "ray",
+        "2023",
+    ]
+    assert words(None) == []
+
+
+def test_search_requires_all_words() -> None:
+    proposal_texts = FakeProposalTexts(
+        [
+            _text(
+                "2023-1-SCI-001", "Dwarf novae", "Outbursts of cataclysmic variables"
+            ),
+            _text("2023-1-SCI-002", "Cataclysmic variables in globular clusters"),
+            _text("2023-1-SCI-003", "Supernova spectra"),
+        ]
+    )
+    index = _loaded_index(proposal_texts)
+
+    assert _search(index, proposal_texts, "cataclysmic VARIABLES") == [
+        "2023-1-SCI-002",
+        "2023-1-SCI-001",
+    ]
+    assert _search(index, proposal_texts, "cataclysmic spectra") == []
+    assert _search(index, proposal_texts, "a") == []
+
+
+def test_search_ranks_title_words_higher() -> None:
+    proposal_texts = FakeProposalTexts(
+        [
+            _text("2023-1-SCI-001", "Dwarf novae", "Spectra of dwarf novae"),
+            _text("2023-1-SCI-002", "Supernova spectra"),
+            _text("2023-1-SCI-003", "Quasars", "Spectra and more spectra"),
+        ]
+    )
+    index = _loaded_index(proposal_texts)
+
+    assert _search(index, proposal_texts, "spectra") == [
+        "2023-1-SCI-002",
+        "2023-1-SCI-003",
+        "2023-1-SCI-001",
+    ]
+
+
+def test_search_is_unavailable_until_index_is_loaded() -> None:
+    proposal_texts = FakeProposalTexts([_text("2023-1-SCI-001", "Dwarf novae")])
+    proposal_texts.may_load_all.clear()
+    index = ProposalSearchIndex()
+
+    # The index is loaded in the background, and searches don't wait for it.
+    for _ in range(2):
+        with pytest.raises(HTTPException) as excinfo:
+            _search(index, proposal_texts, "novae")
+        assert excinfo.value.status_code == 503
+    assert not index.is_loaded
+
+    proposal_texts.may_load_all.set()
+    _wait_until(lambda: index.is_loaded)
+    assert _search(index, proposal_texts, "novae") == ["2023-1-SCI-001"]
+    assert proposal_texts.loaded == [["2023-1-SCI-001"]]
+
+
+def test_index_is_updated_for_outdated_proposals() -> None:
+    proposal_texts = FakeProposalTexts(
+        [
+            _text("2023-1-SCI-001", "Dwarf novae"),
+            _text("2023-1-SCI-002", "Supernova spectra"),
+        ]
+    )
+    index = _loaded_index(proposal_texts)
+
+    assert _search(index, proposal_texts, "novae") == ["2023-1-SCI-001"]
+    assert _search(index, proposal_texts, "spectra") == ["2023-1-SCI-002"]
+    assert proposal_texts.loaded == [["2023-1-SCI-001", "2023-1-SCI-002"]]
+
+    # Changed proposal
+    proposal_texts.texts["2023-1-SCI-001"] = _text("2023-1-SCI-001", "Nova spectra")
+    # Deleted proposal
+    del proposal_texts.texts["2023-1-SCI-002"]
+    # New proposal
+    proposal_texts.texts["2023-1-SCI-003"] = _text("2023-1-SCI-003", "Quasar spectra")
+    for proposal_code in ["2023-1-SCI-001", "2023-1-SCI-002", "2023-1-SCI-003"]:
+        index.mark_outdated(proposal_code)
+
+    assert _search(index, proposal_texts, "spectra") == [
+        "2023-1-SCI-003",
+        "2023-1-SCI-001",
+    ]
+    assert _search(index, proposal_texts, "novae") == []
+    assert proposal_texts.loaded[1:] == [
+        ["2023-1-SCI-001", "2023-1-SCI-002", "2023-1-SCI-003"]
+    ]
+
+
+def test_recently_outdated_proposals_are_reloaded_with_replica(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(get_settings(), "sdb_replica_dsn", "mysql+pymysql://replica")
+    monkeypatch.setattr(get_settings(), "sdb_replica_max_lag", 30)
+    proposal_texts = FakeProposalTexts([_text("2023-1-SCI-001", "Dwarf novae")])
+    index = _loaded_index(proposal_texts)
+    index.mark_outdated("2023-1-SCI-001")
+
+    # The replica may not have the new text yet
+    _search(index, proposal_texts, "novae")
+    proposal_texts.texts["2023-1-SCI-001"] = _text("2023-1-SCI-001", "Nova spectra")
+    assert _search(index, proposal_texts, "spectra") == ["2023-1-SCI-001"]
+    assert proposal_texts.loaded[1:] == [["2023-1-SCI-001"], ["2023-1-SCI-001"]]
+
+    # Once the maximum replication lag has passed, the text is not reloaded any
+    # longer.
+    monkeypatch.setattr(get_settings(), "sdb_replica_max_lag", 0)
+    _search(index, proposal_texts, "spectra")
+    _search(index, proposal_texts, "spectra")
+    assert len(proposal_texts.loaded) == 4
+
+
+def test_index_is_reloaded_in_background_when_outdated(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    proposal_texts = FakeProposalTexts([_text("2023-1-SCI-001", "Dwarf novae")])
+    index = _loaded_index(proposal_texts)
+
+    proposal_texts.texts["2023-1-SCI-002"] = _text("2023-1-SCI-002", "More novae")
+    assert _search(index, proposal_texts, "novae") == ["2023-1-SCI-001"]
+
+    # While the index is reloaded, the current index is searched.
+    monkeypatch.setattr(get_settings(), "proposal_search_index_lifetime", -1)
+    proposal_texts.may_load_all.clear()
+    assert _search(index, proposal_texts, "novae") == ["2023-1-SCI-001"]
+
+    monkeypatch.setattr(get_settings(), "proposal_search_index_lifetime", 3600)
+    proposal_texts.may_load_all.set()
+    _wait_until(lambda: len(proposal_texts.loaded) == 2)
+    _wait_until(
+        lambda: _search(index, proposal_texts, "novae")
+        == ["2023-1-SCI-002", "2023-1-SCI-001"]
+    )
+    assert len(proposal_texts.loaded) == 2
+
+
+def test_proposals_outdated_while_loading_remain_outdated() -> None:
+    proposal_texts = FakeProposalTexts([_text("2023-1-SCI-001", "Dwarf novae")])
+    proposal_texts.may_load_all.clear()
+    index = ProposalSearchIndex()
+    loader = index.warm_up(proposal_texts.all_texts)
+    assert loader is not None
+    assert index.warm_up(proposal_texts.all_texts) is None
+
+    # The proposal is changed after its text has been read by the loader
+    index.mark_outdated("2023-1-SCI-001")
+    proposal_texts.may_load_all.set()
+    loader.join(timeout=5)
+    proposal_texts.texts["2023-1-SCI-001"] = _text("2023-1-SCI-001", "Nova spectra")
+
+    assert _search(index, proposal_texts, "spectra") == ["2023-1-SCI-001"]
@@ -4,7 +4,7 @@ import pytest
 
 from saltapi.exceptions import NotFoundError
 from saltapi.repository.proposal_repository import ProposalRepository
-from saltapi.service.proposal import ProposalListItem
+from saltapi.service.proposal import ProposalListFilter, ProposalListItem
 from saltapi.service.proposal_service import ProposalService
 
 
@@ -13,13 +13,29 @@ class FakeProposalRepository:
         self.proposal_status = {"value": "Under scientific review", "reason": None}
 
     def list(
-        self, username: str, from_semester: str, to_semester: str, limit: str
+        self,
+        username: str,
+        from_semester: str,
+        to_semester: str,
+        limit: str,
+        list_filter: Optional[ProposalListFilter] = None,
+        sort_by: str = "id",
+        descending: bool = True,
+        after_id: Optional[int] = None,
+        after_sort_value: Optional[str] = None,
     ) -> List[ProposalListItem]:
-        return [
+        proposals = [
             cast(ProposalListItem, from_semester),
             cast(ProposalListItem, to_semester),
             cast(ProposalListItem, limit),
         ]
+        if list_filter is not None:
+            proposals.append(cast(ProposalListItem, list_filter))
+        if sort_by != "id" or not descending:
+            proposals.append(cast(ProposalListItem, (sort_by, descending)))
+        if after_id is not None:
+            proposals.append(cast(ProposalListItem, (after_id, after_sort_value)))
+        return proposals
 
     def get_proposal_status(self, proposal_code: str) -> Dict[str, Optional[str]]:
         if proposal_code == VALID_PROPOSAL_CODE:
@@ -68,6 +84,27 @@ def test_list_proposal_summaries_returns_correct_proposals() -> None:
     ]
 
 
+def test_list_proposal_summaries_passes_on_the_keyset_position() -> None:
+    proposal_service = create_proposal_repository()
+    assert proposal_service.list_proposal_summaries(
+        username="someone", limit=20, after_id=1234
+    ) == ["2000-1", "2099-2", 20, (1234, None)]
+
+
+def test_list_proposal_summaries_passes_on_the_filter_and_sort_order() -> None:
+    proposal_service = create_proposal_repository()
+    list_filter = ProposalListFilter(statuses=("Active",), liaison_astronomer_id=42)
+    assert proposal_service.list_proposal_summaries(
+        username="someone",
+        limit=20,
+        list_filter=list_filter,
+        sort_by="title",
+        descending=False,
+        after_id=1234,
+        after_sort_value="Spectra",
+    ) == ["2000-1", "2099-2", 20, list_filter, ("title", False), (1234, "Spectra")]
+
+
 def test_list_proposal_summaries_raises_error_for_negative_limit() -> None:
     proposal_service = create_proposal_repository()
     with pytest.raises(ValueError) as excinfo:
@@ -0,0 +1,236 @@
+import asyncio
+from typing import Any, Dict
+
+import anyio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from starlette.types import Message, Receive, Scope, Send
+
+from saltapi.middleware import (
+    AdmissionControlMiddleware,
+    QueryStatisticsMiddleware,
+    RequestConnectionsMiddleware,
+    admission_controller,
+)
+from saltapi.repository.query_statistics import instrument
+from saltapi.repository.unit_of_work import RequestConnections
+from saltapi.settings import get_settings
+
+
+def test_query_statistics_headers(tmp_path: Any) -> None:
+    db_engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", future=True)
+    instrument(db_engine)
+    app = FastAPI()
+    app.add_middleware(QueryStatisticsMiddleware)
+
+    @app.get("/sync")
+    def sync_endpoint() -> str:
+        with db_engine.connect() as connection:
+            for i in range(3):
+                connection.execute(text(f"SELECT {i}"))
+        return "done"
+
+    @app.get("/none")
+    async def endpoint_without_queries() -> str:
+        return "done"
+
+    client = TestClient(app)
+
+    response = client.get("/sync")
+    assert response.headers["X-DB-Query-Count"] == "3"
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+
+    response = client.get("/none")
+    assert response.headers["X-DB-Query-Count"] == "0"
+
+
+@pytest.fixture()
+def admission_settings(monkeypatch: pytest.MonkeyPatch) -> Any:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "max_concurrent_requests", 1)
+    monkeypatch.setattr(settings, "max_queued_requests", 1)
+    monkeypatch.setattr(settings, "max_queue_wait", 0.2)
+    admission_controller.reset()
+    yield settings
+    admission_controller.reset()
+
+
+@pytest.mark.asyncio
+async def test_admission_controller_rejects_requests_if_queue_is_full(
+    admission_settings: Any,
+) -> None:
+    first_token = await admission_controller.admit()
+    assert first_token is not None
+
+    # The second request has to wait, and the third is rejected immediately.
+    second_request = asyncio.ensure_future(admission_controller.admit())
+    await asyncio.sleep(0.01)
+    assert admission_controller.as_dict()["queue_depth"] == 1
+    assert await admission_controller.admit() is None
+
+    admission_controller.release(first_token)
+    second_token = await second_request
+    assert second_token is not None
+    admission_controller.release(second_token)
+
+    statistics = admission_controller.as_dict()
+    assert statistics["admitted"] == 2
+    assert statistics["rejected_queue_full"] == 1
+    assert statistics["rejected_timeout"] == 0
+    assert statistics["queue_depth"] == 0
+    assert statistics["max_queue_depth"] == 1
+
+
+@pytest.mark.asyncio
+async def test_admission_controller_rejects_requests_waiting_too_long(
+    admission_settings: Any,
+) -> None:
+    token = await admission_controller.admit()
+    assert token is not None
+
+    assert await admission_controller.admit() is None
+    admission_controller.release(token)
+
+    statistics = admission_controller.as_dict()
+    assert statistics["rejected_timeout"] == 1
+    assert statistics["active_requests"] == 0
+
+
+def test_rejected_requests_get_retry_after_header(
+    admission_settings: Any, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    app = FastAPI()
+    app.add_middleware(AdmissionControlMiddleware, exempt_paths=["/exempt"])
+
+    @app.get("/busy")
+    def busy() -> str:
+        return "done"
+
+    @app.get("/async")
+    async def not_busy() -> str:
+        return "done"
+
+    @app.get("/exempt")
+    async def exempt() -> str:
+        return "done"
+
+    async def reject() -> None:
+        return None
+
+    monkeypatch.setattr(admission_controller, "admit", reject)
+    client = TestClient(app)
+
+    response = client.get("/busy")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(
+        admission_settings.rejected_request_retry_after
+    )
+
+    assert client.get("/exempt").status_code == 200
+    assert client.get("/async").status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_async_endpoints_are_not_subject_to_admission_control(
+    admission_settings: Any, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    fastapi_app = FastAPI()
+
+    @fastapi_app.get("/sync")
+    def sync_endpoint() -> str:
+        return "done"
+
+    @fastapi_app.get("/async")
+    async def async_endpoint() -> str:
+        return "done"
+
+    async def reject() -> None:
+        return None
+
+    monkeypatch.setattr(admission_controller, "admit", reject)
+    handled = []
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        handled.append(scope["path"])
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        pass
+
+    middleware = AdmissionControlMiddleware(app)
+    for path in ["/sync", "/async"]:
+        scope = {**_http_scope(), "path": path, "app": fastapi_app}
+        await middleware(scope, receive, send)
+
+    assert handled == ["/async"]
+
+
+@pytest.mark.asyncio
+async def test_worker_threads_are_limited_to_connection_pool_size(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "sdb_pool_size", 3)
+    monkeypatch.setattr(settings, "sdb_max_overflow", 4)
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    total_tokens = limiter.total_tokens
+    try:
+        admission_controller.limit_worker_threads()
+        assert limiter.total_tokens == 7
+    finally:
+        limiter.total_tokens = total_tokens
+
+
+def _http_scope() -> Dict[str, Any]:
+    return {"type": "http", "method": "GET", "path": "/", "headers": []}
+
+
+@pytest.mark.asyncio
+async def test_statements_are_killed_if_client_disconnects(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    killed = asyncio.Event()
+    monkeypatch.setattr(
+        RequestConnections, "executing_connection_ids", lambda self: [42]
+    )
+    monkeypatch.setattr(
+        RequestConnections, "kill_executing_statements", lambda self: killed.set()
+    )
+    messages = [
+        {"type": "http.request", "body": b"", "more_body": False},
+        {"type": "http.disconnect"},
+    ]
+
+    async def receive() -> Message:
+        return messages.pop(0)
+
+    async def send(message: Message) -> None:
+        pass
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        await receive()
+        await asyncio.wait_for(killed.wait(), timeout=1)
+
+    await RequestConnectionsMiddleware(app)(_http_scope(), receive, send)
+
+    assert killed.is_set()
+
+
+@pytest.mark.asyncio
+async def test_app_errors_are_passed_on_if_listening_for_disconnects() -> None:
+    async def receive() -> Message:
+        await asyncio.sleep(10)
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        pass
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        raise ValueError("Something is wrong.")
+
+    with pytest.raises(ValueError):
+        await RequestConnectionsMiddleware(app)(_http_scope(), receive, send)
@@ -1,11 +1,14 @@
-from typing import Tuple
+from typing import Any, Dict, Tuple
 
 import freezegun
 import pytest
 from dateutil.parser import parse
 
+from saltapi.exceptions import ValidationError
 from saltapi.util import (
     TimeInterval,
+    decode_cursor,
+    encode_cursor,
     next_semester,
     parse_partner_requested_percentages,
     partner_name,
@@ -211,3 +214,19 @@ def test_parse_partner_requested_percentages(
         for partner_code, percentage in percentages
     ]
     assert parse_partner_requested_percentages(value) == expected_percentages
+
+
+@pytest.mark.parametrize(
+    "position", [{"before_id": 1234}, {"before_id": 7, "title": "Spectra ä ö"}]
+)
+def test_decode_cursor_inverts_encode_cursor(position: Dict[str, Any]) -> None:
+    cursor = encode_cursor(position)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == position
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor!", "MTIz", "W10", "{}"])
+def test_decode_cursor_raises_error_for_invalid_cursor(cursor: str) -> None:
+    with pytest.raises(ValidationError) as excinfo:
+        decode_cursor(cursor)
+    assert "cursor" in str(excinfo.value)
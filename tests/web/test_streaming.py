@@ -0,0 +1,102 @@
+import asyncio
+import json
+from typing import Any, Dict, Iterator, List, Optional
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from starlette.responses import StreamingResponse
+
+import saltapi.repository.unit_of_work
+from saltapi.repository.statement_timeout import ER_QUERY_TIMEOUT
+from saltapi.repository.unit_of_work import UnitOfWork
+from saltapi.web.streaming import ndjson_response
+
+
+class Item(BaseModel):
+    name: str
+
+
+@pytest.fixture(autouse=True)
+def sqlite_engine(tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> Any:
+    db_engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", future=True)
+    monkeypatch.setattr(saltapi.repository.unit_of_work, "engine", lambda: db_engine)
+    monkeypatch.setattr(
+        UnitOfWork, "_usable_replica_engine", staticmethod(lambda: None)
+    )
+    return db_engine
+
+
+def _lines(response: StreamingResponse) -> List[Dict[str, Any]]:
+    async def body() -> List[str]:
+        return [
+            chunk if isinstance(chunk, str) else chunk.decode()
+            async for chunk in response.body_iterator
+        ]
+
+    text = "".join(asyncio.run(body()))
+    assert text.endswith("\n")
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def test_stream_ends_with_trailer() -> None:
+    def items(connection: Connection) -> Iterator[Dict[str, Any]]:
+        yield {"name": "A"}
+        yield {"name": "B"}
+
+    assert _lines(ndjson_response(items, Item)) == [
+        {"name": "A"},
+        {"name": "B"},
+        {"complete": True},
+    ]
+
+
+def test_trailer_includes_next_cursor() -> None:
+    calls = []
+
+    def items(connection: Connection) -> Iterator[Dict[str, Any]]:
+        yield {"name": "A"}
+        yield {"name": "B"}
+
+    def next_cursor(count: int, last_item: Optional[Dict[str, Any]]) -> str:
+        calls.append((count, last_item))
+        return "cursor"
+
+    assert _lines(ndjson_response(items, Item, next_cursor))[-1] == {
+        "complete": True,
+        "next_cursor": "cursor",
+    }
+    assert calls == [(2, {"name": "B"})]
+
+
+@pytest.mark.parametrize(
+    "error,message",
+    [
+        (
+            ValueError("secret details"),
+            "Sorry, something has gone wrong. Please try again later.",
+        ),
+        (
+            OperationalError(
+                "SELECT",
+                {},
+                Exception(ER_QUERY_TIMEOUT, "Query execution was interrupted"),
+            ),
+            (
+                "The request took too long to process. Please try again later or"
+                " request less data."
+            ),
+        ),
+    ],
+)
+def test_error_ends_stream_with_error_trailer(error: Exception, message: str) -> None:
+    def items(connection: Connection) -> Iterator[Dict[str, Any]]:
+        yield {"name": "A"}
+        raise error
+
+    assert _lines(ndjson_response(items, Item)) == [
+        {"name": "A"},
+        {"complete": False, "message": message},
+    ]